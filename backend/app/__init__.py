@@ -1,19 +1,82 @@
 from flask import Flask
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+import importlib
 import os
 from dotenv import load_dotenv
 from app.config import (
     DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME,
-    SECRET_KEY, CORS_ORIGINS
+    SECRET_KEY, CORS_ORIGINS,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, DB_POOL_PING_INACTIVIDAD_SEGUNDOS,
+    FAST_START, CAPTURA_CONSULTAS,
+    INSTRUMENTACION, SERVER_TIMING, N_MAS_1_UMBRAL
 )
 
 load_dotenv()
 
 db = SQLAlchemy()
 
-def create_app():
-    """Factory function para crear la aplicación Flask"""
+def _opciones_engine():
+    """Opciones del engine: pool instrumentado configurado por variables de entorno"""
+    from app.utils.pool_db import QueuePoolInstrumentado, configurar_eventos_pool
+    
+    # Ping solo a conexiones inactivas en lugar de un round-trip en cada checkout
+    ping_inactividad = float(DB_POOL_PING_INACTIVIDAD_SEGUNDOS) if DB_POOL_PRE_PING == 'inactividad' else 0
+    configurar_eventos_pool(ping_inactividad)
+    
+    return {
+        'connect_args': {
+            'connect_timeout': 10,
+            'read_timeout': 10,
+        },
+        'poolclass': QueuePoolInstrumentado,
+        'pool_size': int(DB_POOL_SIZE),
+        'max_overflow': int(DB_MAX_OVERFLOW),
+        'pool_timeout': float(DB_POOL_TIMEOUT),
+        'pool_recycle': int(DB_POOL_RECYCLE),  # Recicla conexiones (por defecto cada hora)
+        'pool_pre_ping': DB_POOL_PRE_PING == 'siempre',  # Verifica la conexión en cada checkout
+    }
+
+# Blueprints de la API: (módulo, atributo, url_prefix). El proceso web los importa
+# todos en create_app; los procesos sin HTTP (registrar_rutas=False) no importan
+# ningún módulo de rutas. Las dependencias pesadas (Pillow, NumPy, msgpack) se
+# cargan recién en su primer uso
+BLUEPRINTS = [
+    ('app.routes', 'auth_bp', '/api/auth'),
+    ('app.routes.proyecto', 'proyecto_bp', '/api/proyectos'),
+    ('app.routes.tarea', 'tarea_bp', '/api/tareas'),
+    ('app.routes.dia', 'dia_bp', '/api/dias'),
+    ('app.routes.usuario', 'usuario_bp', '/api/usuarios'),
+    ('app.routes.foto', 'foto_bp', '/api/fotos'),
+    ('app.routes.empleado', 'empleado_bp', '/api'),
+    # Sistema de asistencia (url_prefix definido en el blueprint)
+    ('app.routes.invitacion', 'invitacion_bp', None),
+    ('app.routes.notificacion', 'notificacion_bp', None),
+    ('app.routes.asistencia', 'asistencia_bp', None),
+    ('app.routes.deuda', 'deuda_bp', None),
+    ('app.routes.configuracion_asistencia', 'configuracion_bp', None),
+    ('app.routes.metricas', 'metricas_bp', None),
+    ('app.routes.metricas', 'prometheus_bp', None),
+]
+
+def _registrar_blueprints(app):
+    """Importa y registra los blueprints de BLUEPRINTS"""
+    for modulo, atributo, url_prefix in BLUEPRINTS:
+        blueprint = getattr(importlib.import_module(modulo), atributo)
+        if url_prefix is None:
+            app.register_blueprint(blueprint)
+        else:
+            app.register_blueprint(blueprint, url_prefix=url_prefix)
+
+def create_app(crear_tablas=None, registrar_rutas=True):
+    """
+    Factory function para crear la aplicación Flask
+    
+    Args:
+        crear_tablas: Ejecutar db.create_all() al iniciar. None = según FAST_START
+        registrar_rutas: Registrar los blueprints de la API (False en procesos sin HTTP)
+    """
     app = Flask(__name__)
     
     # Configuración
@@ -27,16 +90,18 @@ def create_app():
         f"{DB_NAME}"
     )
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-        'connect_args': {
-            'connect_timeout': 10,
-            'read_timeout': 10,
-        },
-        'pool_pre_ping': True,  # Verifica la conexión antes de usar
-        'pool_recycle': 3600,    # Recicla conexiones cada hora
-    }
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = _opciones_engine()
+    
+    # Estadísticas por forma de consulta (ver scripts/asesor_indices.py)
+    if CAPTURA_CONSULTAS:
+        from app.utils.captura_consultas import configurar_captura_consultas
+        configurar_captura_consultas()
     app.config['SECRET_KEY'] = SECRET_KEY
     
+    # Respuestas JSON con orjson (si está instalado), fechas ISO y Decimal como float
+    from app.utils.json_rapido import ProveedorJSONRapido
+    app.json = ProveedorJSONRapido(app)
+    
     # Inicializar extensiones
     db.init_app(app)
     
@@ -45,37 +110,44 @@ def create_app():
     CORS(app, 
          origins=cors_origins_list, 
          supports_credentials=True,
-         allow_headers=["Content-Type", "Authorization"],
+         allow_headers=["Content-Type", "Authorization", "Idempotency-Key", "X-Metrics-Token",
+                        "If-None-Match", "If-Modified-Since"],
+         expose_headers=["ETag", "Last-Modified", "Server-Timing", "X-Total-Count"],
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
     
-    # Registrar blueprints
-    from app.routes import auth_bp, proyecto_bp, tarea_bp, dia_bp, usuario_bp, empleado_bp
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(proyecto_bp, url_prefix='/api/proyectos')
-    app.register_blueprint(tarea_bp, url_prefix='/api/tareas')
-    app.register_blueprint(dia_bp, url_prefix='/api/dias')
-    app.register_blueprint(usuario_bp, url_prefix='/api/usuarios')
-    app.register_blueprint(empleado_bp, url_prefix='/api')
-    
-    # Registrar nuevos blueprints del sistema de asistencia
-    from app.routes.invitacion import invitacion_bp
-    from app.routes.notificacion import notificacion_bp
-    from app.routes.asistencia import asistencia_bp
-    from app.routes.deuda import deuda_bp
-    from app.routes.configuracion_asistencia import configuracion_bp
-    
-    app.register_blueprint(invitacion_bp)
-    app.register_blueprint(notificacion_bp)
-    app.register_blueprint(asistencia_bp)
-    app.register_blueprint(deuda_bp)
-    app.register_blueprint(configuracion_bp)
-    
-    # Crear tablas al inicializar la app (solo una vez)
-    with app.app_context():
-        try:
-            db.create_all()
-            print("✓ Tablas de base de datos verificadas/creadas")
-        except Exception as e:
-            print(f"⚠ Advertencia al crear tablas: {e}")
+    # Registrar blueprints (los procesos sin HTTP, como el scheduler, no importan las rutas)
+    if registrar_rutas:
+        _registrar_blueprints(app)
+        
+        # Medición por solicitud: Server-Timing, /metrics y aviso de N+1
+        if INSTRUMENTACION:
+            from app.utils.instrumentacion import configurar_instrumentacion
+            configurar_instrumentacion(app, SERVER_TIMING, int(N_MAS_1_UMBRAL))
+    
+    # Versiones de datos por proyecto para los GET condicionales (ETag)
+    from app.services.version_service import VersionService
+    VersionService.configurar()
+    
+    # Índice de meses por proyecto (se registra el mes de cada día insertado)
+    from app.services.proyecto_mes_service import ProyectoMesService
+    ProyectoMesService.configurar()
+    
+    # Buffer de último acceso (se persiste en lote, no en cada login)
+    from app.services.ultimo_acceso_service import UltimoAccesoService
+    UltimoAccesoService.configurar(app)
+    
+    if crear_tablas is None:
+        crear_tablas = not FAST_START
+    
+    # Crear tablas al inicializar la app. Con FAST_START=True el esquema se crea
+    # aparte (python scripts/bootstrap_db.py) y el arranque no necesita la BD
+    if crear_tablas:
+        importlib.import_module('app.models')  # Registra todos los modelos en la metadata
+        with app.app_context():
+            try:
+                db.create_all()
+                print("✓ Tablas de base de datos verificadas/creadas")
+            except Exception as e:
+                print(f"⚠ Advertencia al crear tablas: {e}")
     
     return app
@@ -32,6 +32,75 @@ SMTP_FROM_EMAIL = os.getenv('SMTP_FROM_EMAIL')
 SMTP_FROM_NAME = os.getenv('SMTP_FROM_NAME', 'MisHoras')
 APP_URL = os.getenv('APP_URL', 'http://localhost:21000')
 
+# Intervalo (segundos) para persistir en lote el último acceso de los usuarios
+ULTIMO_ACCESO_FLUSH_SEGUNDOS = os.getenv('ULTIMO_ACCESO_FLUSH_SEGUNDOS', '60')
+
+# Horas durante las que se conserva la respuesta asociada a una Idempotency-Key
+IDEMPOTENCIA_TTL_HORAS = os.getenv('IDEMPOTENCIA_TTL_HORAS', '24')
+
+# Recálculo de horas en segundo plano: marcados por lote y pausa entre lotes (segundos)
+RECALCULO_TAMANO_LOTE = os.getenv('RECALCULO_TAMANO_LOTE', '500')
+RECALCULO_PAUSA_SEGUNDOS = os.getenv('RECALCULO_PAUSA_SEGUNDOS', '0.2')
+
+# Purga de proyectos y empleados eliminados: filas por DELETE y pausa entre lotes (segundos)
+PURGA_TAMANO_LOTE = os.getenv('PURGA_TAMANO_LOTE', '2000')
+PURGA_PAUSA_SEGUNDOS = os.getenv('PURGA_PAUSA_SEGUNDOS', '0.1')
+# Minutos tras los que una purga fallida ('error') vuelve a encolarse
+PURGA_REINTENTO_MINUTOS = os.getenv('PURGA_REINTENTO_MINUTOS', '15')
+
+# Pool de conexiones a la base de datos (por proceso/worker)
+DB_POOL_SIZE = os.getenv('DB_POOL_SIZE', '5')
+DB_MAX_OVERFLOW = os.getenv('DB_MAX_OVERFLOW', '10')
+DB_POOL_TIMEOUT = os.getenv('DB_POOL_TIMEOUT', '30')
+DB_POOL_RECYCLE = os.getenv('DB_POOL_RECYCLE', '3600')
+# 'inactividad' (ping solo a conexiones ociosas), 'siempre' (pool_pre_ping) o 'nunca'
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'inactividad').lower()
+DB_POOL_PING_INACTIVIDAD_SEGUNDOS = os.getenv('DB_POOL_PING_INACTIVIDAD_SEGUNDOS', '300')
+
+# Token para consultar /api/metricas sin JWT y usuarios (IDs separados por coma) que pueden
+# consultarlas con su JWT; sin ninguno de los dos las métricas quedan cerradas
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+METRICS_ADMINS = os.getenv('METRICS_ADMINS', '')
+
+# Arranque rápido: no ejecutar db.create_all() al crear la app (ver scripts/bootstrap_db.py)
+FAST_START = os.getenv('FAST_START', 'False').lower() == 'true'
+
+# Captura de consultas SQL (forma normalizada, cantidad, latencias) para /api/metricas/consultas.
+# Apagada por defecto: toma un lock global por consulta; se activa para perfilar
+CAPTURA_CONSULTAS = os.getenv('CAPTURA_CONSULTAS', 'False').lower() == 'true'
+
+# Serialización JSON de las respuestas: orjson si está instalado y formato
+# compacto ('true'), indentado ('false') o indentado solo con FLASK_DEBUG ('auto')
+JSON_ORJSON = os.getenv('JSON_ORJSON', 'True').lower() == 'true'
+JSON_COMPACTO = os.getenv('JSON_COMPACTO', 'auto').lower()
+
+# Responder en MessagePack a los clientes que lo piden con 'Accept: application/msgpack'
+# (requiere el paquete msgpack; si no está instalado se responde JSON)
+API_MSGPACK = os.getenv('API_MSGPACK', 'True').lower() == 'true'
+
+# Caché de respuestas serializadas en el servidor (grilla del mes): 'memoria' (LRU por
+# proceso), 'redis' (LRU por proceso delante de un Redis compartido) o 'no'
+CACHE_RESPUESTAS = os.getenv('CACHE_RESPUESTAS', 'memoria').lower()
+CACHE_RESPUESTAS_MAX_ENTRADAS = os.getenv('CACHE_RESPUESTAS_MAX_ENTRADAS', '512')
+CACHE_RESPUESTAS_MAX_BYTES = os.getenv('CACHE_RESPUESTAS_MAX_BYTES', '67108864')
+CACHE_RESPUESTAS_REDIS_URL = os.getenv('CACHE_RESPUESTAS_REDIS_URL', 'redis://localhost:6379/0')
+CACHE_RESPUESTAS_TTL_SEGUNDOS = os.getenv('CACHE_RESPUESTAS_TTL_SEGUNDOS', '3600')
+
+# Medición por solicitud (Server-Timing, /metrics y aviso de N+1)
+INSTRUMENTACION = os.getenv('INSTRUMENTACION', 'True').lower() == 'true'
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'True').lower() == 'true'
+# Repeticiones de una misma consulta en una solicitud a partir de las cuales se avisa N+1 (0 = no avisar)
+N_MAS_1_UMBRAL = os.getenv('N_MAS_1_UMBRAL', '10')
+
+# Fotos de perfil: almacén ('local' = directorio FOTOS_DIRECTORIO), URL pública base,
+# lados en píxeles de las variantes cuadradas, hilos de procesamiento y tamaño máximo de subida
+FOTOS_ALMACEN = os.getenv('FOTOS_ALMACEN', 'local').lower()
+FOTOS_DIRECTORIO = os.getenv('FOTOS_DIRECTORIO', 'data/fotos')
+FOTOS_URL_BASE = os.getenv('FOTOS_URL_BASE', '/api/fotos')
+FOTOS_TAMANOS = os.getenv('FOTOS_TAMANOS', '256,64')
+FOTOS_WORKERS = os.getenv('FOTOS_WORKERS', '2')
+FOTOS_MAX_BYTES = os.getenv('FOTOS_MAX_BYTES', '5242880')
+
 # Validar que las variables requeridas estén disponibles
 REQUIRED_VARS = {
     'DB_HOST': DB_HOST,
@@ -1,4 +1,4 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from functools import wraps
 from app.config import SECRET_KEY
 import jwt
@@ -44,4 +44,78 @@ def token_required(f):
         usuario_actual = {'id': user_id}
         
         return f(usuario_actual, *args, **kwargs)
-    return decorated_function
\ No newline at end of file
+    return decorated_function
+
+def idempotente(f):
+    """
+    Decorador para escrituras idempotentes mediante el header Idempotency-Key.
+    Debe ir debajo de @token_required. Si el cliente no envía la clave, la ruta
+    se ejecuta normalmente; si la envía, los reintentos reciben la respuesta
+    almacenada sin volver a ejecutar la operación. Con clave la respuesta es
+    siempre JSON (aunque se pida MessagePack): se guarda como texto y el reintento
+    recibe exactamente la misma representación.
+    """
+    @wraps(f)
+    def decorated_function(usuario_actual, *args, **kwargs):
+        from app.services.idempotencia_service import IdempotenciaService
+        from app.utils.msgpack_rapido import solo_json
+        
+        clave = request.headers.get('Idempotency-Key', '').strip()
+        if not clave:
+            return f(usuario_actual, *args, **kwargs)
+        
+        solo_json()
+        
+        if len(clave) > 100:
+            return jsonify({'success': False, 'error': 'Idempotency-Key demasiado larga (máx. 100)'}), 400
+        
+        endpoint = request.endpoint or request.path
+        hash_solicitud = IdempotenciaService.calcular_hash(request.get_data(cache=True))
+        
+        estado, registro = IdempotenciaService.reservar(
+            usuario_actual['id'], clave, endpoint, hash_solicitud
+        )
+        
+        if estado == 'en_proceso':
+            registro = IdempotenciaService.esperar_respuesta(usuario_actual['id'], clave)
+            estado = 'completada' if registro else 'en_proceso'
+        
+        if estado == 'conflicto':
+            return jsonify({
+                'success': False,
+                'error': 'La Idempotency-Key ya se usó con otra solicitud'
+            }), 422
+        
+        if estado == 'en_proceso':
+            return jsonify({
+                'success': False,
+                'error': 'Una solicitud con la misma Idempotency-Key está en proceso'
+            }), 409
+        
+        if estado == 'completada':
+            respuesta = current_app.response_class(
+                registro.respuesta,
+                status=registro.codigo_estado,
+                mimetype='application/json'
+            )
+            respuesta.headers['Idempotent-Replayed'] = 'true'
+            return respuesta
+        
+        # Reserva obtenida: ejecutar la operación y guardar su respuesta
+        registro_id = registro.id
+        try:
+            respuesta = current_app.make_response(f(usuario_actual, *args, **kwargs))
+        except Exception:
+            IdempotenciaService.liberar(registro_id)
+            raise
+        
+        if respuesta.status_code >= 500:
+            # Errores del servidor no se memorizan: el cliente puede reintentar
+            IdempotenciaService.liberar(registro_id)
+        else:
+            IdempotenciaService.completar(
+                registro_id, respuesta.status_code, respuesta.get_data(as_text=True)
+            )
+        
+        return respuesta
+    return decorated_function
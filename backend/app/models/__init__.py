@@ -10,6 +10,10 @@ from app.models.notificacion import Notificacion
 from app.models.marcado_asistencia import MarcadoAsistencia
 from app.models.deuda_horas import DeudaHoras
 from app.models.justificacion import Justificacion
+from app.models.clave_idempotencia import ClaveIdempotencia
+from app.models.trabajo_fondo import TrabajoFondo
+from app.models.version_proyecto import VersionProyecto
+from app.models.proyecto_mes import ProyectoMes
 
 __all__ = [
     'Usuario', 
@@ -23,5 +27,9 @@ __all__ = [
     'Notificacion',
     'MarcadoAsistencia',
     'DeudaHoras',
-    'Justificacion'
+    'Justificacion',
+    'ClaveIdempotencia',
+    'TrabajoFondo',
+    'VersionProyecto',
+    'ProyectoMes'
 ]
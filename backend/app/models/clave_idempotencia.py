@@ -0,0 +1,31 @@
+from app import db
+from datetime import datetime, timezone, timedelta
+
+# Zona horaria local (Argentina: UTC-3)
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
+class ClaveIdempotencia(db.Model):
+    __tablename__ = "claves_idempotencia"
+    __table_args__ = (
+        db.UniqueConstraint('usuario_id', 'clave', name='uq_idempotencia_usuario_clave'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, index=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey("usuarios.id", ondelete="CASCADE"), nullable=False)
+    clave = db.Column(db.String(100), nullable=False)  # Header Idempotency-Key enviado por el cliente
+    endpoint = db.Column(db.String(100), nullable=False)
+    hash_solicitud = db.Column(db.String(64), nullable=False)  # SHA-256 del body, detecta reuso de clave
+
+    # Estado de la solicitud original
+    estado = db.Column(
+        db.Enum('en_proceso', 'completada', name='estado_idempotencia_enum'),
+        default='en_proceso',
+        nullable=False
+    )
+
+    # Respuesta almacenada para reenviar en reintentos
+    codigo_estado = db.Column(db.Integer, nullable=True)
+    respuesta = db.Column(db.Text(length=16777215), nullable=True)  # MEDIUMTEXT
+
+    fecha_creacion = db.Column(db.DateTime, default=lambda: datetime.now(LOCAL_TZ), nullable=False)
+    fecha_expiracion = db.Column(db.DateTime, nullable=False, index=True)
@@ -49,8 +49,8 @@ class DeudaHoras(db.Model):
         compensadas = float(self.horas_compensadas) if self.horas_compensadas else 0
         return round(debidas - justificadas - compensadas, 2)
 
-    def compensar_con_horas_extras(self, horas_extras):
-        """Compensa la deuda con horas extras trabajadas"""
+    def compensar_con_horas_extras(self, horas_extras, confirmar=True):
+        """Compensa la deuda con horas extras trabajadas (confirmar=False deja el commit al llamador)"""
         pendientes = self.horas_pendientes
         if pendientes <= 0:
             return 0  # No hay nada que compensar
@@ -62,7 +62,8 @@ class DeudaHoras(db.Model):
         if self.horas_pendientes <= 0:
             self.estado = 'compensada'
         
-        db.session.commit()
+        if confirmar:
+            db.session.commit()
         return horas_extras - horas_a_compensar  # Retorna las horas extras que sobran
 
     def to_dict(self):
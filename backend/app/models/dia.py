@@ -1,4 +1,5 @@
 from app import db
+from app.models.serializador import Serializador, hora_hm, iso
 
 # Tabla de asociación muchos-a-muchos
 tarea_dia = db.Table(
@@ -9,6 +10,10 @@ tarea_dia = db.Table(
 
 class Dia(db.Model):
     __tablename__ = "dias"
+    __table_args__ = (
+        # Días de un proyecto por fecha (tareas de proyectos de empleados, ver tarea_fecha)
+        db.Index('idx_dias_proyecto_fecha', 'proyecto_id', 'fecha'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, index=True)
     fecha = db.Column(db.Date, nullable=False, index=True)
@@ -34,19 +39,32 @@ class Dia(db.Model):
 
     def to_dict(self):
         """Convierte el día a diccionario"""
-        return {
-            'id': self.id,
-            'fecha': self.fecha.isoformat(),
-            'dia_semana': self.dia_semana,
-            'horas_trabajadas': self.horas_trabajadas,
-            'horas_reales': self.horas_reales,
-            'hora_entrada': self.hora_entrada.strftime('%H:%M') if self.hora_entrada else None,
-            'hora_salida': self.hora_salida.strftime('%H:%M') if self.hora_salida else None,
-            'turno_manana_entrada': self.turno_manana_entrada.strftime('%H:%M') if self.turno_manana_entrada else None,
-            'turno_manana_salida': self.turno_manana_salida.strftime('%H:%M') if self.turno_manana_salida else None,
-            'turno_tarde_entrada': self.turno_tarde_entrada.strftime('%H:%M') if self.turno_tarde_entrada else None,
-            'turno_tarde_salida': self.turno_tarde_salida.strftime('%H:%M') if self.turno_tarde_salida else None,
-            'horas_extras': self.horas_extras,
-            'proyecto_id': self.proyecto_id,
-            'empleado_id': self.empleado_id,
-        }
+        return _SERIALIZADOR(self)
+
+    @staticmethod
+    def columnas_dict():
+        """Columnas de to_dict() para consultar filas sin instanciar objetos (ver fila_a_dict)"""
+        return _SERIALIZADOR.columnas(Dia)
+
+    @staticmethod
+    def fila_a_dict(fila) -> dict:
+        """Serializa una fila de columnas_dict() igual que to_dict()"""
+        return _SERIALIZADOR(fila)
+
+
+_SERIALIZADOR = Serializador([
+    'id',
+    ('fecha', iso),
+    'dia_semana',
+    'horas_trabajadas',
+    'horas_reales',
+    ('hora_entrada', hora_hm),
+    ('hora_salida', hora_hm),
+    ('turno_manana_entrada', hora_hm),
+    ('turno_manana_salida', hora_hm),
+    ('turno_tarde_entrada', hora_hm),
+    ('turno_tarde_salida', hora_hm),
+    'horas_extras',
+    'proyecto_id',
+    'empleado_id',
+])
@@ -1,4 +1,5 @@
 from app import db
+from app.models.serializador import Serializador, hora_hm, iso
 from datetime import datetime, timezone, timedelta
 
 # Zona horaria local (Argentina: UTC-3)
@@ -33,18 +34,7 @@ class Empleado(db.Model):
 
     def to_dict(self, incluir_usuario=False):
         """Convierte el empleado a diccionario"""
-        data = {
-            'id': self.id,
-            'nombre': self.nombre,
-            'proyecto_id': self.proyecto_id,
-            'activo': self.activo,
-            'usuario_id': self.usuario_id,
-            'estado_asistencia': self.estado_asistencia,
-            'horario_especial_inicio': self.horario_especial_inicio.strftime('%H:%M') if self.horario_especial_inicio else None,
-            'horario_especial_fin': self.horario_especial_fin.strftime('%H:%M') if self.horario_especial_fin else None,
-            'usa_horario_especial': self.usa_horario_especial,
-            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
-        }
+        data = _SERIALIZADOR(self)
         
         # Incluir datos del usuario asociado si se solicita
         if incluir_usuario and self.usuario_asociado:
@@ -56,3 +46,17 @@ class Empleado(db.Model):
             }
         
         return data
+
+
+_SERIALIZADOR = Serializador([
+    'id',
+    'nombre',
+    'proyecto_id',
+    'activo',
+    'usuario_id',
+    'estado_asistencia',
+    ('horario_especial_inicio', hora_hm),
+    ('horario_especial_fin', hora_hm),
+    'usa_horario_especial',
+    ('fecha_creacion', iso),
+])
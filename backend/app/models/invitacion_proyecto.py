@@ -7,6 +7,10 @@ LOCAL_TZ = timezone(timedelta(hours=-3))
 
 class InvitacionProyecto(db.Model):
     __tablename__ = "invitaciones_proyecto"
+    __table_args__ = (
+        # Cola de emails de invitaciones creadas en lote (ver InvitacionService.procesar_envios_pendientes)
+        db.Index('idx_invitaciones_email_pendiente', 'proyecto_id', 'email_pendiente'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, index=True)
     proyecto_id = db.Column(db.Integer, db.ForeignKey("proyectos.id"), nullable=False)
@@ -32,6 +36,9 @@ class InvitacionProyecto(db.Model):
     fecha_expiracion = db.Column(db.DateTime, nullable=False)
     fecha_respuesta = db.Column(db.DateTime, nullable=True)
     
+    # Email por enviar en segundo plano (invitaciones creadas en lote)
+    email_pendiente = db.Column(db.Boolean, default=False, nullable=False)
+    
     # Tracking
     intentos_reenvio = db.Column(db.Integer, default=0)
     ultima_fecha_reenvio = db.Column(db.DateTime, nullable=True)
@@ -6,6 +6,10 @@ LOCAL_TZ = timezone(timedelta(hours=-3))
 
 class Justificacion(db.Model):
     __tablename__ = "justificaciones"
+    __table_args__ = (
+        # Listado del admin: por proyecto y estado, más recientes primero
+        db.Index('idx_justificaciones_proyecto_estado', 'proyecto_id', 'estado', 'fecha_creacion'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, index=True)
     deuda_id = db.Column(db.Integer, db.ForeignKey("deudas_horas.id"), nullable=False, index=True)
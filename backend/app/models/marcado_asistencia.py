@@ -1,4 +1,5 @@
 from app import db
+from app.models.serializador import Serializador, decimal_float, hora_hms, iso
 from datetime import datetime, timezone, timedelta, time as dt_time
 
 # Zona horaria local (Argentina: UTC-3)
@@ -6,6 +7,11 @@ LOCAL_TZ = timezone(timedelta(hours=-3))
 
 class MarcadoAsistencia(db.Model):
     __tablename__ = "marcados_asistencia"
+    __table_args__ = (
+        # Marcados abiertos de un proyecto (cierre automático de salidas)
+        db.Index('idx_marcados_salida_pendiente', 'proyecto_id', 'salida_marcada_manualmente',
+                 'salida_marcada_automaticamente', 'hora_salida'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, index=True)
     empleado_id = db.Column(db.Integer, db.ForeignKey("empleados.id"), nullable=False, index=True)
@@ -93,24 +99,27 @@ class MarcadoAsistencia(db.Model):
 
     def to_dict(self):
         """Convierte el marcado a diccionario"""
-        return {
-            'id': self.id,
-            'empleado_id': self.empleado_id,
-            'proyecto_id': self.proyecto_id,
-            'dia_id': self.dia_id,
-            'fecha': self.fecha.isoformat() if self.fecha else None,
-            'turno': self.turno,
-            'hora_entrada': self.hora_entrada.strftime('%H:%M:%S') if self.hora_entrada else None,
-            'hora_salida': self.hora_salida.strftime('%H:%M:%S') if self.hora_salida else None,
-            'entrada_marcada_manualmente': self.entrada_marcada_manualmente,
-            'salida_marcada_manualmente': self.salida_marcada_manualmente,
-            'salida_marcada_automaticamente': self.salida_marcada_automaticamente,
-            'confirmacion_continua': self.confirmacion_continua,
-            'confirmada_por_admin': self.confirmada_por_admin,
-            'horas_trabajadas': float(self.horas_trabajadas) if self.horas_trabajadas else 0,
-            'horas_extras': float(self.horas_extras) if self.horas_extras else 0,
-            'horas_normales': float(self.horas_normales) if self.horas_normales else 0,
-            'observaciones': self.observaciones,
-            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
-            'fecha_actualizacion': self.fecha_actualizacion.isoformat() if self.fecha_actualizacion else None,
-        }
+        return _SERIALIZADOR(self)
+
+
+_SERIALIZADOR = Serializador([
+    'id',
+    'empleado_id',
+    'proyecto_id',
+    'dia_id',
+    ('fecha', iso),
+    'turno',
+    ('hora_entrada', hora_hms),
+    ('hora_salida', hora_hms),
+    'entrada_marcada_manualmente',
+    'salida_marcada_manualmente',
+    'salida_marcada_automaticamente',
+    'confirmacion_continua',
+    'confirmada_por_admin',
+    ('horas_trabajadas', decimal_float),
+    ('horas_extras', decimal_float),
+    ('horas_normales', decimal_float),
+    'observaciones',
+    ('fecha_creacion', iso),
+    ('fecha_actualizacion', iso),
+])
@@ -1,11 +1,16 @@
 from app import db
+from app.models.serializador import Serializador, hora_hm, iso
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 
 # Zona horaria local (Argentina: UTC-3)
 LOCAL_TZ = timezone(timedelta(hours=-3))
 
 class Proyecto(db.Model):
     __tablename__ = "proyectos"
+    __table_args__ = (
+        db.Index('idx_proyectos_usuario_eliminado', 'usuario_id', 'eliminado'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, index=True)
     nombre = db.Column(db.String(255), nullable=False)
@@ -26,6 +31,10 @@ class Proyecto(db.Model):
     turno_tarde_inicio = db.Column(db.Time, nullable=True)  # Inicio turno tarde
     turno_tarde_fin = db.Column(db.Time, nullable=True)  # Fin turno tarde
     
+    # Eliminación diferida: el proyecto deja de verse y PurgaService borra sus datos en segundo plano
+    eliminado = db.Column(db.Boolean, default=False, nullable=False)
+    fecha_eliminacion = db.Column(db.DateTime, nullable=True)
+    
     fecha_creacion = db.Column(db.DateTime, default=lambda: datetime.now(LOCAL_TZ), nullable=False)
     fecha_actualizacion = db.Column(db.DateTime, default=lambda: datetime.now(LOCAL_TZ), onupdate=lambda: datetime.now(LOCAL_TZ))
 
@@ -35,26 +44,66 @@ class Proyecto(db.Model):
     tareas = db.relationship("Tarea", back_populates="proyecto", cascade="all, delete-orphan")
     empleados = db.relationship("Empleado", back_populates="proyecto", cascade="all, delete-orphan")
 
-    def to_dict(self):
-        """Convierte el proyecto a diccionario"""
-        return {
-            'id': self.id,
-            'nombre': self.nombre,
-            'descripcion': self.descripcion,
-            'anio': self.anio,
-            'mes': self.mes,
-            'usuario_id': self.usuario_id,
-            'activo': self.activo,
-            'tipo_proyecto': self.tipo_proyecto,
-            'horas_reales_activas': self.horas_reales_activas,
-            'modo_horarios': self.modo_horarios,
-            'horario_inicio': self.horario_inicio.strftime('%H:%M') if self.horario_inicio else None,
-            'horario_fin': self.horario_fin.strftime('%H:%M') if self.horario_fin else None,
-            'turno_manana_inicio': self.turno_manana_inicio.strftime('%H:%M') if self.turno_manana_inicio else None,
-            'turno_manana_fin': self.turno_manana_fin.strftime('%H:%M') if self.turno_manana_fin else None,
-            'turno_tarde_inicio': self.turno_tarde_inicio.strftime('%H:%M') if self.turno_tarde_inicio else None,
-            'turno_tarde_fin': self.turno_tarde_fin.strftime('%H:%M') if self.turno_tarde_fin else None,
-            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
-            'fecha_actualizacion': self.fecha_actualizacion.isoformat() if self.fecha_actualizacion else None,
-            'empleados': [e.to_dict() for e in self.empleados] if self.tipo_proyecto == 'empleados' else [],
-        }
+    def to_dict(self, campos=None, incluir_usuario=False):
+        """
+        Convierte el proyecto a diccionario
+
+        Args:
+            campos: Tupla de campos a incluir (None = todos); 'empleados' incluye la lista de empleados
+            incluir_usuario: Incluir el usuario asociado de cada empleado
+        """
+        if campos is None:
+            datos = _SERIALIZADOR(self)
+        else:
+            datos = serializador_campos(campos)(self)
+            if 'empleados' not in campos:
+                return datos
+        datos['empleados'] = (
+            [e.to_dict(incluir_usuario=incluir_usuario) for e in self.empleados]
+            if self.tipo_proyecto == 'empleados' else []
+        )
+        return datos
+
+
+def proyecto_vigente(proyecto_id):
+    """
+    Condición para filas de otras tablas: su proyecto no está eliminado (pendiente de
+    purga). Los datos de un proyecto eliminado dejan de verse y de editarse de inmediato
+    """
+    return ~db.exists().where(Proyecto.id == proyecto_id, Proyecto.eliminado == True)
+
+
+@lru_cache(maxsize=64)
+def serializador_campos(campos: tuple) -> Serializador:
+    """Serializador con solo los campos pedidos (siempre incluye id)"""
+    return Serializador([
+        campo for campo in CAMPOS
+        if (campo if isinstance(campo, str) else campo[0]) in campos or campo == 'id'
+    ])
+
+
+CAMPOS = [
+    'id',
+    'nombre',
+    'descripcion',
+    'anio',
+    'mes',
+    'usuario_id',
+    'activo',
+    'tipo_proyecto',
+    'horas_reales_activas',
+    'modo_horarios',
+    ('horario_inicio', hora_hm),
+    ('horario_fin', hora_hm),
+    ('turno_manana_inicio', hora_hm),
+    ('turno_manana_fin', hora_hm),
+    ('turno_tarde_inicio', hora_hm),
+    ('turno_tarde_fin', hora_hm),
+    ('fecha_creacion', iso),
+    ('fecha_actualizacion', iso),
+]
+
+# Campos de columna que se pueden pedir con ?fields= (además de 'empleados')
+NOMBRES_CAMPOS = tuple(campo if isinstance(campo, str) else campo[0] for campo in CAMPOS)
+
+_SERIALIZADOR = Serializador(CAMPOS)
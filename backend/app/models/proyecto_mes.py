@@ -0,0 +1,26 @@
+from app import db
+from datetime import datetime, timezone, timedelta
+
+# Zona horaria local (Argentina: UTC-3)
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
+class ProyectoMes(db.Model):
+    """
+    Meses que tiene cargados un proyecto (al menos un registro en dias). Evita
+    recorrer todos los días del proyecto para listar sus meses; lo mantiene
+    ProyectoMesService al crear días.
+    """
+    __tablename__ = "proyecto_meses"
+
+    proyecto_id = db.Column(db.Integer, db.ForeignKey("proyectos.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    anio = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    mes = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    fecha_creacion = db.Column(db.DateTime, default=lambda: datetime.now(LOCAL_TZ), nullable=False)
+
+    def to_dict(self):
+        """Convierte el mes del proyecto a diccionario"""
+        return {
+            'proyecto_id': self.proyecto_id,
+            'anio': self.anio,
+            'mes': self.mes,
+        }
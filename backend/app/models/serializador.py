@@ -0,0 +1,68 @@
+"""
+Serializadores precompilados para los to_dict de los modelos más usados.
+Leen todas las columnas de una vez (operator.itemgetter sobre el __dict__ de la
+instancia, donde SQLAlchemy guarda los valores cargados) y solo aplican formato a
+las columnas que lo necesitan, en lugar de un condicional por campo.
+Funcionan con instancias del modelo y con filas de query.with_entities(*columnas).
+"""
+from operator import attrgetter, itemgetter
+
+
+def hora_hm(valor):
+    """time -> 'HH:MM' (equivale a strftime('%H:%M'))"""
+    return valor.isoformat('minutes') if valor else None
+
+
+def hora_hms(valor):
+    """time -> 'HH:MM:SS' (equivale a strftime('%H:%M:%S'))"""
+    return valor.isoformat('seconds') if valor else None
+
+
+def iso(valor):
+    """date/datetime -> ISO 8601"""
+    return valor.isoformat() if valor else None
+
+
+def decimal_float(valor):
+    """Decimal -> float (0 si es nulo o cero)"""
+    return float(valor) if valor else 0
+
+
+class Serializador:
+    """
+    Serializador de un modelo a partir de una lista de campos
+
+    Args:
+        campos: Secuencia de nombres de atributo o tuplas (atributo, formato),
+            donde formato es una función aplicada al valor
+    """
+
+    __slots__ = ('claves', '_leer', '_obtener', '_formatos')
+
+    def __init__(self, campos):
+        normalizados = [(campo, None) if isinstance(campo, str) else campo for campo in campos]
+        self.claves = tuple(nombre for nombre, _ in normalizados)
+        self._leer = itemgetter(*self.claves)
+        self._obtener = attrgetter(*self.claves)
+        self._formatos = tuple(
+            (indice, formato) for indice, (_, formato) in enumerate(normalizados) if formato is not None
+        )
+
+    def columnas(self, modelo):
+        """Columnas del modelo para query.with_entities() y serializar filas sin instanciar objetos"""
+        return [getattr(modelo, clave) for clave in self.claves]
+
+    def __call__(self, objeto) -> dict:
+        try:
+            valores = self._leer(objeto.__dict__)
+        except (AttributeError, KeyError):
+            # Filas sin __dict__ o atributos expirados/diferidos: se leen con getattr (carga lo que falte)
+            valores = self._obtener(objeto)
+        if self._formatos:
+            valores = list(valores)
+            for indice, formato in self._formatos:
+                valores[indice] = formato(valores[indice])
+        return dict(zip(self.claves, valores))
+
+    def lista(self, objetos) -> list:
+        return [self(objeto) for objeto in objetos]
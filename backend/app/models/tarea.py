@@ -1,5 +1,14 @@
 from app import db
-from app.models.dia import tarea_dia
+from app.models.dia import Dia, tarea_dia
+from sqlalchemy import func, select
+
+# Proyectos de empleados: la tarea se asocia a fechas; sus días son los de todos
+# los empleados del proyecto en esas fechas (se resuelven con un join sobre dias)
+tarea_fecha = db.Table(
+    'tarea_fecha',
+    db.Column('tarea_id', db.Integer, db.ForeignKey('tareas.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('fecha', db.Date, primary_key=True)
+)
 
 class Tarea(db.Model):
     __tablename__ = "tareas"
@@ -14,6 +23,81 @@ class Tarea(db.Model):
     proyecto = db.relationship("Proyecto", back_populates="tareas")
     dias = db.relationship("Dia", secondary=tarea_dia, back_populates="tareas")
 
+    @staticmethod
+    def dias_de_fechas(*columnas):
+        """SELECT de columnas sobre tarea_fecha unida a los días del proyecto en esas fechas"""
+        return (
+            select(*columnas)
+            .select_from(tarea_fecha)
+            .join(Tarea, Tarea.id == tarea_fecha.c.tarea_id)
+            .join(Dia, (Dia.proyecto_id == Tarea.proyecto_id) & (Dia.fecha == tarea_fecha.c.fecha))
+        )
+
+    @staticmethod
+    def cargar_datos_empleados(tareas: list) -> dict:
+        """
+        Carga fechas, días y desglose por empleado de tareas de proyectos de empleados
+        con tres consultas para todas las tareas (en lugar de recorrer cada día)
+
+        Args:
+            tareas: Tareas (de proyectos de empleados)
+
+        Returns:
+            {tarea_id: {'fechas', 'dias', 'desglose', 'total_horas_extras'}}; también
+            queda guardado en cada tarea para to_dict
+        """
+        from app.models.empleado import Empleado
+
+        datos = {
+            tarea.id: {'fechas': [], 'dias': [], 'desglose': [], 'total_horas_extras': 0}
+            for tarea in tareas
+        }
+        if not datos:
+            return datos
+        ids = list(datos)
+
+        for tarea_id, fecha in db.session.execute(
+            select(tarea_fecha.c.tarea_id, tarea_fecha.c.fecha)
+            .where(tarea_fecha.c.tarea_id.in_(ids))
+            .order_by(tarea_fecha.c.fecha)
+        ):
+            datos[tarea_id]['fechas'].append(fecha)
+
+        for tarea_id, dia in db.session.execute(
+            Tarea.dias_de_fechas(tarea_fecha.c.tarea_id, Dia)
+            .where(tarea_fecha.c.tarea_id.in_(ids))
+            .order_by(Dia.fecha, Dia.empleado_id)
+        ):
+            datos[tarea_id]['dias'].append(dia)
+
+        for fila in db.session.execute(
+            Tarea.dias_de_fechas(
+                tarea_fecha.c.tarea_id,
+                Dia.empleado_id,
+                Empleado.nombre,
+                func.coalesce(func.sum(Dia.horas_trabajadas), 0).label('horas_totales'),
+                func.coalesce(func.sum(Dia.horas_extras), 0).label('horas_extras'),
+                func.count(Dia.id).label('dias_count'),
+            )
+            .outerjoin(Empleado, Empleado.id == Dia.empleado_id)
+            .where(tarea_fecha.c.tarea_id.in_(ids), Dia.empleado_id.isnot(None))
+            .group_by(tarea_fecha.c.tarea_id, Dia.empleado_id, Empleado.nombre)
+            .order_by(tarea_fecha.c.tarea_id, Dia.empleado_id)
+        ):
+            datos_tarea = datos[fila.tarea_id]
+            datos_tarea['desglose'].append({
+                'empleado_id': fila.empleado_id,
+                'empleado_nombre': fila.nombre or f"Empleado {fila.empleado_id}",
+                'horas_totales': float(fila.horas_totales),
+                'horas_extras': float(fila.horas_extras),
+                'dias_count': fila.dias_count,
+            })
+            datos_tarea['total_horas_extras'] += float(fila.horas_extras)
+
+        for tarea in tareas:
+            tarea._datos_empleados = datos[tarea.id]
+        return datos
+
     def to_dict(self, incluir_desglose_empleados=False):
         """Convierte la tarea a diccionario"""
         result = {
@@ -23,32 +107,20 @@ class Tarea(db.Model):
             'horas': self.horas,
             'que_falta': self.que_falta,
             'proyecto_id': self.proyecto_id,
-            'dias': [dia.to_dict() for dia in self.dias],
         }
         
-        # Si se solicita y es proyecto de empleados, agregar desglose
-        if incluir_desglose_empleados and self.proyecto and self.proyecto.tipo_proyecto == 'empleados':
-            desglose = {}
-            total_horas_extras = 0
-            
-            for dia in self.dias:
-                if dia.empleado_id:
-                    empleado_nombre = dia.empleado.nombre if dia.empleado else f"Empleado {dia.empleado_id}"
-                    if empleado_nombre not in desglose:
-                        desglose[empleado_nombre] = {
-                            'empleado_id': dia.empleado_id,
-                            'empleado_nombre': empleado_nombre,
-                            'horas_totales': 0,
-                            'horas_extras': 0,
-                            'dias_count': 0
-                        }
-                    desglose[empleado_nombre]['horas_totales'] += dia.horas_trabajadas or 0
-                    desglose[empleado_nombre]['horas_extras'] += dia.horas_extras or 0
-                    desglose[empleado_nombre]['dias_count'] += 1
-                    total_horas_extras += dia.horas_extras or 0
-            
-            result['desglose_empleados'] = list(desglose.values())
-            result['total_horas_extras'] = total_horas_extras
-            result['modo_horarios'] = self.proyecto.modo_horarios if self.proyecto else None
+        if not (self.proyecto and self.proyecto.tipo_proyecto == 'empleados'):
+            result['dias'] = [dia.to_dict() for dia in self.dias]
+            return result
+        
+        # Proyecto de empleados: días y desglose resueltos por fecha (ver cargar_datos_empleados)
+        datos = getattr(self, '_datos_empleados', None) or Tarea.cargar_datos_empleados([self])[self.id]
+        result['fechas'] = [fecha.isoformat() for fecha in datos['fechas']]
+        result['dias'] = [dia.to_dict() for dia in datos['dias']]
+        
+        if incluir_desglose_empleados:
+            result['desglose_empleados'] = datos['desglose']
+            result['total_horas_extras'] = datos['total_horas_extras']
+            result['modo_horarios'] = self.proyecto.modo_horarios
         
         return result
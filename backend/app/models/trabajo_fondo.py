@@ -0,0 +1,62 @@
+from app import db
+from datetime import datetime, timezone, timedelta
+
+# Zona horaria local (Argentina: UTC-3)
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
+class TrabajoFondo(db.Model):
+    __tablename__ = "trabajos_fondo"
+    __table_args__ = (
+        db.Index('idx_trabajos_fondo_estado', 'estado', 'fecha_actualizacion'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, index=True)
+    tipo = db.Column(db.String(50), nullable=False)  # Ej: 'recalculo_horas'
+    proyecto_id = db.Column(db.Integer, db.ForeignKey("proyectos.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    estado = db.Column(
+        db.Enum('pendiente', 'en_proceso', 'completado', 'error', 'cancelado', name='estado_trabajo_enum'),
+        default='pendiente',
+        nullable=False
+    )
+    
+    # Progreso y punto de reanudación (último ID procesado)
+    checkpoint = db.Column(db.Integer, default=0, nullable=False)
+    procesados = db.Column(db.Integer, default=0, nullable=False)
+    actualizados = db.Column(db.Integer, default=0, nullable=False)
+    total = db.Column(db.Integer, default=0, nullable=False)
+    
+    error = db.Column(db.Text, nullable=True)
+    
+    fecha_creacion = db.Column(db.DateTime, default=lambda: datetime.now(LOCAL_TZ), nullable=False)
+    fecha_inicio = db.Column(db.DateTime, nullable=True)
+    fecha_fin = db.Column(db.DateTime, nullable=True)
+    fecha_actualizacion = db.Column(db.DateTime, default=lambda: datetime.now(LOCAL_TZ), onupdate=lambda: datetime.now(LOCAL_TZ))
+
+    @property
+    def progreso(self) -> float:
+        """Porcentaje de avance (0-100)"""
+        if self.estado == 'completado':
+            return 100.0
+        if not self.total:
+            return 0.0
+        return round(min(self.procesados / self.total, 1) * 100, 1)
+
+    def to_dict(self):
+        """Convierte el trabajo a diccionario"""
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'proyecto_id': self.proyecto_id,
+            'estado': self.estado,
+            'checkpoint': self.checkpoint,
+            'procesados': self.procesados,
+            'actualizados': self.actualizados,
+            'total': self.total,
+            'progreso': self.progreso,
+            'error': self.error,
+            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
+            'fecha_inicio': self.fecha_inicio.isoformat() if self.fecha_inicio else None,
+            'fecha_fin': self.fecha_fin.isoformat() if self.fecha_fin else None,
+            'fecha_actualizacion': self.fecha_actualizacion.isoformat() if self.fecha_actualizacion else None,
+        }
@@ -1,7 +1,11 @@
 from app import db
+from app.config import FOTOS_URL_BASE, FOTOS_TAMANOS
 from datetime import datetime
 import hashlib
 
+# Lado (px) de la variante que se publica en to_dict
+LADO_FOTO_PERFIL = max(int(lado) for lado in FOTOS_TAMANOS.split(','))
+
 class Usuario(db.Model):
     __tablename__ = "usuarios"
 
@@ -10,7 +14,12 @@ class Usuario(db.Model):
     email = db.Column(db.String(100), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     nombre_completo = db.Column(db.String(100), nullable=True)
-    foto_perfil = db.Column(db.Text, nullable=True)
+    # Data URL de versiones anteriores: diferida para no leerla con cada usuario;
+    # scripts/migrar_fotos_perfil.py la pasa al almacén de imágenes y la vacía
+    foto_perfil = db.deferred(db.Column(db.Text, nullable=True))
+    # Si todavía tiene una foto sin migrar (se calcula en el SELECT sin leer el texto)
+    tiene_foto_legado = db.column_property(foto_perfil.expression.isnot(None))
+    foto_perfil_hash = db.Column(db.String(32), nullable=True)  # Contenido en el almacén de imágenes
     activo = db.Column(db.Boolean, default=True)
     mantener_sesion = db.Column(db.Boolean, default=False)
     usar_horas_reales = db.Column(db.Boolean, default=False)
@@ -30,6 +39,16 @@ class Usuario(db.Model):
         """Genera hash de la contraseña"""
         return hashlib.sha256(password.encode()).hexdigest()
 
+    def url_foto_perfil(self, lado: int = LADO_FOTO_PERFIL, formato: str = 'webp'):
+        """
+        URL de una variante de la foto de perfil (None si no tiene foto).
+        Una foto anterior a la migración al almacén se devuelve como su data URL original
+        """
+        if not self.foto_perfil_hash:
+            # Solo se lee la columna diferida si el usuario tiene una foto sin migrar
+            return self.foto_perfil if self.tiene_foto_legado else None
+        return f"{FOTOS_URL_BASE}/{self.id}/{self.foto_perfil_hash}/{lado}.{formato}"
+
     def to_dict(self):
         """Convierte el usuario a diccionario"""
         return {
@@ -37,7 +56,7 @@ class Usuario(db.Model):
             'username': self.username,
             'email': self.email,
             'nombre_completo': self.nombre_completo,
-            'foto_perfil': self.foto_perfil,
+            'foto_perfil': self.url_foto_perfil(),
             'activo': self.activo,
             'usar_horas_reales': self.usar_horas_reales,
             'dia_inicio_semana': self.dia_inicio_semana,
@@ -0,0 +1,28 @@
+from app import db
+from datetime import datetime, timezone, timedelta
+
+# Zona horaria local (Argentina: UTC-3)
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
+class VersionProyecto(db.Model):
+    """
+    Contador de versión de los datos de un proyecto (periodo 0) y de cada uno de
+    sus meses (periodo AAAAMM). Lo incrementa VersionService en cada escritura y
+    lo usan los GET condicionales (ETag) para responder 304 sin leer filas.
+    """
+    __tablename__ = "versiones_proyecto"
+
+    # Sin FK: el registro puede sobrevivir unos instantes al proyecto eliminado
+    proyecto_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    periodo = db.Column(db.Integer, primary_key=True, autoincrement=False, default=0)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    fecha_actualizacion = db.Column(db.DateTime, default=lambda: datetime.now(LOCAL_TZ), nullable=False)
+
+    def to_dict(self):
+        """Convierte la versión a diccionario"""
+        return {
+            'proyecto_id': self.proyecto_id,
+            'periodo': self.periodo,
+            'version': self.version,
+            'fecha_actualizacion': self.fecha_actualizacion.isoformat() if self.fecha_actualizacion else None,
+        }
@@ -2,16 +2,36 @@
 Rutas para gestión de marcado de asistencia
 """
 
-from flask import Blueprint, request, jsonify
-from app.decorators import token_required
+from flask import Blueprint, request, jsonify, current_app
+from app.decorators import token_required, idempotente
 from app.utils.response import success_response, error_response
-from datetime import datetime, date
+from app.models import (
+    Empleado, MarcadoAsistencia, Dia,
+    ConfiguracionAsistencia, Notificacion
+)
+from app.services.asistencia_service import AsistenciaService
+from app.services.sincronizacion_service import SincronizacionService
+from app.services.proyecto_service import ProyectoService
+from app import db
+from datetime import datetime, date, timedelta, timezone
+import gzip
+import io
+import json
+
+LOCAL_TZ = timezone(timedelta(hours=-3))
 
 asistencia_bp = Blueprint('asistencia', __name__, url_prefix='/api/asistencia')
 
+# Cantidad máxima de marcados aceptados en un único lote
+MAX_MARCADOS_LOTE = 2000
+
+# Tamaño máximo del body descomprimido de una sincronización offline (bytes)
+MAX_BYTES_SINCRONIZACION = 10 * 1024 * 1024
+
 
 @asistencia_bp.route('/marcar-entrada', methods=['POST'])
 @token_required
+@idempotente
 def marcar_entrada(usuario_actual):
     """
     Marca la entrada de un empleado
@@ -33,7 +53,7 @@ def marcar_entrada(usuario_actual):
         
         # Verificar que el usuario es el empleado o el admin del proyecto
         empleado = Empleado.query.get(empleado_id)
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         
         if not empleado or not proyecto:
             return error_response('Empleado o proyecto no encontrado', 404)
@@ -73,6 +93,7 @@ def marcar_entrada(usuario_actual):
 
 @asistencia_bp.route('/marcar-salida', methods=['POST'])
 @token_required
+@idempotente
 def marcar_salida(usuario_actual):
     """
     Marca la salida de un empleado
@@ -96,7 +117,7 @@ def marcar_salida(usuario_actual):
         
         # Verificar permisos
         empleado = Empleado.query.get(empleado_id)
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         
         if not empleado or not proyecto:
             return error_response('Empleado o proyecto no encontrado', 404)
@@ -134,6 +155,233 @@ def marcar_salida(usuario_actual):
         return error_response(f'Error al marcar salida: {str(e)}', 500)
 
 
+@asistencia_bp.route('/marcar-lote', methods=['POST'])
+@token_required
+@idempotente
+def marcar_lote(usuario_actual):
+    """
+    Marca entradas/salidas de varios empleados de un proyecto en una sola petición
+    (kioscos compartidos o correcciones masivas del supervisor)
+    Body: {
+        "proyecto_id": 1,
+        "marcados": [
+            {"empleado_id": 5, "tipo": "entrada", "fecha": "2025-11-20", "hora": "08:30:00"},
+            {"empleado_id": 6, "tipo": "salida", "hora": "17:30:00", "confirmar_continuidad": false}
+        ]
+    }
+    Devuelve un resultado por ítem, en el mismo orden recibido
+    """
+    try:
+        data = request.get_json()
+        
+        proyecto_id = data.get('proyecto_id')
+        items = data.get('marcados')
+        
+        if not proyecto_id or not isinstance(items, list) or not items:
+            return error_response('proyecto_id y marcados (lista no vacía) son requeridos', 400)
+        
+        if len(items) > MAX_MARCADOS_LOTE:
+            return error_response(f'El lote no puede superar {MAX_MARCADOS_LOTE} marcados', 400)
+        
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
+        if not proyecto:
+            return error_response('Proyecto no encontrado', 404)
+        
+        # Permisos validados una sola vez: el admin marca a cualquiera,
+        # un empleado solo a los empleados asociados a su usuario
+        es_admin = proyecto.usuario_id == usuario_actual['id']
+        empleados_propios = set()
+        if not es_admin:
+            empleados_propios = {
+                e.id for e in Empleado.query.filter_by(
+                    proyecto_id=proyecto_id,
+                    usuario_id=usuario_actual['id']
+                ).all()
+            }
+            if not empleados_propios:
+                return error_response('No tienes permisos para marcar asistencia en este proyecto', 403)
+        
+        # Validar y parsear cada ítem; los inválidos se informan sin abortar el lote
+        resultados = [None] * len(items)
+        validos = []
+        indices_validos = []
+        
+        for indice, item in enumerate(items):
+            try:
+                empleado_id = int(item.get('empleado_id'))
+                tipo = item.get('tipo')
+                
+                if tipo not in ('entrada', 'salida'):
+                    raise ValueError('tipo debe ser "entrada" o "salida"')
+                
+                if not es_admin and empleado_id not in empleados_propios:
+                    resultados[indice] = {'indice': indice, 'ok': False, 'marcado': None,
+                                          'error': 'No tienes permisos para marcar la asistencia de este empleado'}
+                    continue
+                
+                fecha = datetime.strptime(item['fecha'], '%Y-%m-%d').date() if item.get('fecha') else None
+                hora = datetime.strptime(item['hora'], '%H:%M:%S').time() if item.get('hora') else None
+                
+                validos.append({
+                    'empleado_id': empleado_id,
+                    'tipo': tipo,
+                    'fecha': fecha,
+                    'hora': hora,
+                    'confirmar_continuidad': item.get('confirmar_continuidad', False)
+                })
+                indices_validos.append(indice)
+                
+            except (TypeError, ValueError, AttributeError) as e:
+                resultados[indice] = {'indice': indice, 'ok': False, 'marcado': None,
+                                      'error': f'Ítem inválido: {str(e)}'}
+        
+        if validos:
+            procesados, error = AsistenciaService.marcar_lote(proyecto_id, validos)
+            
+            if error:
+                return error_response(error, 400)
+            
+            for indice, resultado in zip(indices_validos, procesados):
+                resultado['indice'] = indice
+                resultados[indice] = resultado
+        
+        exitosos = sum(1 for r in resultados if r['ok'])
+        
+        return success_response(
+            data={
+                'resultados': resultados,
+                'exitosos': exitosos,
+                'fallidos': len(resultados) - exitosos
+            },
+            message=f'{exitosos} de {len(resultados)} marcados registrados'
+        )
+        
+    except Exception as e:
+        return error_response(f'Error al procesar lote de marcados: {str(e)}', 500)
+
+
+def _parsear_momento(valor):
+    """Convierte un timestamp ISO 8601 o epoch (segundos) a datetime en hora local"""
+    if isinstance(valor, (int, float)):
+        return datetime.fromtimestamp(valor, LOCAL_TZ)
+    
+    momento = datetime.fromisoformat(valor)
+    if momento.tzinfo is None:
+        return momento.replace(tzinfo=LOCAL_TZ)
+    return momento.astimezone(LOCAL_TZ)
+
+
+@asistencia_bp.route('/sincronizar', methods=['POST'])
+@token_required
+def sincronizar_offline(usuario_actual):
+    """
+    Sincroniza marcas registradas sin conexión. Acepta el body comprimido con
+    Content-Encoding: gzip y responde comprimido si el cliente acepta gzip.
+    Body: {
+        "proyecto_id": 1,
+        "desde": "2025-11-20T00:00:00-03:00" (opcional, última sincronización),
+        "marcas": [
+            [5, "entrada", "2025-11-20T08:31:05-03:00"],
+            {"empleado_id": 5, "tipo": "salida", "timestamp": 1763650800}
+        ]
+    }
+    Respuesta: estados por marca ([indice, estado]) y delta compacto del servidor.
+    Reenviar el mismo lote es seguro: las marcas ya aplicadas vuelven como 'duplicado'.
+    """
+    try:
+        cuerpo = request.get_data(cache=True)
+        if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+            with gzip.GzipFile(fileobj=io.BytesIO(cuerpo)) as archivo:
+                cuerpo = archivo.read(MAX_BYTES_SINCRONIZACION + 1)
+            if len(cuerpo) > MAX_BYTES_SINCRONIZACION:
+                return error_response('El lote descomprimido es demasiado grande', 413)
+        
+        data = json.loads(cuerpo or b'{}')
+        if not isinstance(data, dict):
+            return error_response('El cuerpo debe ser un objeto JSON', 400)
+        
+        proyecto_id = data.get('proyecto_id')
+        marcas_crudas = data.get('marcas')
+        
+        if not proyecto_id or not isinstance(marcas_crudas, list):
+            return error_response('proyecto_id y marcas son requeridos', 400)
+        
+        if len(marcas_crudas) > MAX_MARCADOS_LOTE:
+            return error_response(f'El lote no puede superar {MAX_MARCADOS_LOTE} marcas', 400)
+        
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
+        if not proyecto:
+            return error_response('Proyecto no encontrado', 404)
+        
+        # Permisos validados una sola vez
+        es_admin = proyecto.usuario_id == usuario_actual['id']
+        empleados_propios = None
+        if not es_admin:
+            empleados_propios = {
+                e.id for e in Empleado.query.filter_by(
+                    proyecto_id=proyecto_id,
+                    usuario_id=usuario_actual['id']
+                ).all()
+            }
+            if not empleados_propios:
+                return error_response('No tienes permisos para sincronizar marcados en este proyecto', 403)
+        
+        desde = _parsear_momento(data['desde']) if data.get('desde') else None
+        
+        marcas = []
+        estados_previos = []
+        for indice, cruda in enumerate(marcas_crudas):
+            try:
+                if isinstance(cruda, list):
+                    empleado_id, tipo, timestamp = cruda[0], cruda[1], cruda[2]
+                else:
+                    empleado_id, tipo, timestamp = cruda['empleado_id'], cruda['tipo'], cruda['timestamp']
+                
+                tipo = {'e': 'entrada', 's': 'salida'}.get(tipo, tipo)
+                if tipo not in ('entrada', 'salida'):
+                    raise ValueError('tipo inválido')
+                
+                empleado_id = int(empleado_id)
+                if empleados_propios is not None and empleado_id not in empleados_propios:
+                    estados_previos.append([indice, 'sin_permiso'])
+                    continue
+                
+                marcas.append({
+                    'indice': indice,
+                    'empleado_id': empleado_id,
+                    'tipo': tipo,
+                    'momento': _parsear_momento(timestamp)
+                })
+            except (TypeError, ValueError, KeyError, IndexError):
+                estados_previos.append([indice, 'invalido'])
+        
+        resultado, error = SincronizacionService.sincronizar(
+            proyecto_id, marcas, desde=desde, empleados_visibles=empleados_propios
+        )
+        
+        if error:
+            return error_response(error, 400)
+        
+        resultado['estados'] = sorted(resultado['estados'] + estados_previos)
+        
+        respuesta = current_app.make_response(success_response(
+            data=resultado,
+            message=f'{len(marcas)} marcas sincronizadas'
+        ))
+        
+        if 'gzip' in request.headers.get('Accept-Encoding', '').lower():
+            respuesta.set_data(gzip.compress(respuesta.get_data()))
+            respuesta.headers['Content-Encoding'] = 'gzip'
+            respuesta.headers['Vary'] = 'Accept-Encoding'
+        
+        return respuesta
+        
+    except (ValueError, OSError) as e:
+        return error_response(f'Lote de sincronización inválido: {str(e)}', 400)
+    except Exception as e:
+        return error_response(f'Error al sincronizar marcados: {str(e)}', 500)
+
+
 @asistencia_bp.route('/marcados', methods=['GET'])
 @token_required
 def obtener_marcados(usuario_actual):
@@ -154,7 +402,7 @@ def obtener_marcados(usuario_actual):
         
         # Verificar permisos
         empleado = Empleado.query.get(empleado_id)
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         
         if not empleado or not proyecto:
             return error_response('Empleado o proyecto no encontrado', 404)
@@ -209,7 +457,7 @@ def detectar_ausencias(usuario_actual):
             return error_response('proyecto_id y fecha son requeridos', 400)
         
         # Verificar que el usuario es admin del proyecto
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         
         if not proyecto or proyecto.usuario_id != usuario_actual['id']:
             return error_response('No tienes permisos para detectar ausencias en este proyecto', 403)
@@ -246,7 +494,7 @@ def obtener_estado_hoy(usuario_actual):
         
         # Verificar permisos
         empleado = Empleado.query.get(empleado_id)
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         
         if not empleado or not proyecto:
             return error_response('Empleado o proyecto no encontrado', 404)
@@ -302,7 +550,7 @@ def editar_marcado(usuario_actual, marcado_id):
             return error_response('Marcado no encontrado', 404)
         
         # Verificar que el usuario es admin del proyecto
-        proyecto = Proyecto.query.get(marcado.proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(marcado.proyecto_id)
         if not proyecto or proyecto.usuario_id != usuario_actual['id']:
             return error_response('Solo el administrador del proyecto puede editar marcados', 403)
         
@@ -417,7 +665,7 @@ def confirmar_horas_extras(usuario_actual, marcado_id):
             return error_response('Marcado no encontrado', 404)
         
         # Verificar permisos
-        proyecto = Proyecto.query.get(marcado.proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(marcado.proyecto_id)
         if not proyecto or proyecto.usuario_id != usuario_actual['id']:
             return error_response('Solo el administrador del proyecto puede confirmar horas extras', 403)
         
@@ -10,7 +10,8 @@ from app.utils import (
     verificar_permiso_proyecto,
     validar_configuracion_horarios
 )
-from app.models import Proyecto, ConfiguracionAsistencia, Empleado
+from app.models import ConfiguracionAsistencia, Empleado
+from app.services.proyecto_service import ProyectoService
 from app import db
 from datetime import datetime
 
@@ -26,7 +27,7 @@ def obtener_configuracion(usuario_actual, proyecto_id):
     try:
         
         # Verificar que el proyecto existe y el usuario tiene acceso
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         if not proyecto:
             return error_response('Proyecto no encontrado', 404)
         
@@ -75,7 +76,7 @@ def actualizar_configuracion(usuario_actual, proyecto_id):
     try:
         
         # Verificar que el usuario es admin del proyecto
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         if not proyecto or proyecto.usuario_id != usuario_actual['id']:
             return error_response('No tienes permisos para modificar la configuración de este proyecto', 403)
         
@@ -155,7 +156,7 @@ def activar_modo_asistencia(usuario_actual, proyecto_id):
     """
     try:
         
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         if not proyecto or proyecto.usuario_id != usuario_actual['id']:
             return error_response('No tienes permisos para activar la asistencia en este proyecto', 403)
         
@@ -188,7 +189,7 @@ def desactivar_modo_asistencia(usuario_actual, proyecto_id):
     """
     try:
         
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         if not proyecto or not verificar_permiso_proyecto(proyecto, usuario_actual['id']):
             return error_response('No tienes permisos para desactivar la asistencia en este proyecto', 403)
         
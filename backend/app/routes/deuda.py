@@ -5,8 +5,9 @@ Rutas para gestión de deudas de horas y justificaciones
 from flask import Blueprint, request, jsonify
 from app.decorators import token_required
 from app.utils.response import success_response, error_response
-from app.models import Empleado, Proyecto, DeudaHoras, Justificacion, ConfiguracionAsistencia, Notificacion, Usuario
+from app.models import Empleado, DeudaHoras, Justificacion, ConfiguracionAsistencia, Notificacion, Usuario
 from app.services.email_service import EmailService
+from app.services.proyecto_service import ProyectoService
 from app import db
 from datetime import datetime
 import os
@@ -35,7 +36,7 @@ def obtener_deudas_empleado(usuario_actual):
         
         # Verificar permisos
         empleado = Empleado.query.get(empleado_id)
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         
         if not empleado or not proyecto:
             return error_response('Empleado o proyecto no encontrado', 404)
@@ -92,7 +93,7 @@ def obtener_deuda(usuario_actual, deuda_id):
         
         # Verificar permisos
         empleado = Empleado.query.get(deuda.empleado_id)
-        proyecto = Proyecto.query.get(deuda.proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(deuda.proyecto_id)
         
         if empleado.usuario_id != usuario_actual['id'] and proyecto.usuario_id != usuario_actual['id']:
             return error_response('No tienes permisos para ver esta deuda', 403)
@@ -207,7 +208,7 @@ def aprobar_justificacion(usuario_actual, justificacion_id):
             return error_response('Justificación no encontrada', 404)
         
         # Verificar que el usuario es admin del proyecto
-        proyecto = Proyecto.query.get(justificacion.proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(justificacion.proyecto_id)
         if proyecto.usuario_id != usuario_actual['id']:
             return error_response('Solo el administrador del proyecto puede aprobar justificaciones', 403)
         
@@ -275,7 +276,7 @@ def rechazar_justificacion(usuario_actual, justificacion_id):
             return error_response('Justificación no encontrada', 404)
         
         # Verificar permisos
-        proyecto = Proyecto.query.get(justificacion.proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(justificacion.proyecto_id)
         if proyecto.usuario_id != usuario_actual['id']:
             return error_response('Solo el administrador del proyecto puede rechazar justificaciones', 403)
         
@@ -329,7 +330,7 @@ def obtener_justificaciones_proyecto(usuario_actual, proyecto_id):
     try:
         
         # Verificar permisos
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         if not proyecto or proyecto.usuario_id != usuario_actual['id']:
             return error_response('No tienes permisos para ver las justificaciones de este proyecto', 403)
         
@@ -369,7 +370,7 @@ def obtener_justificaciones_empleado(usuario_actual):
         
         # Verificar permisos
         empleado = Empleado.query.get(empleado_id)
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         
         if not empleado or not proyecto:
             return error_response('Empleado o proyecto no encontrado', 404)
@@ -1,16 +1,165 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from app.services.dia_service import DiaService
+from app.services.proyecto_service import ProyectoService
+from app.services.version_service import PERIODO_PROYECTO, VersionService
+from app.models import Empleado, Usuario
+from app.utils.cache_http import respuesta_condicional
+from app.utils.msgpack_rapido import solo_json
 from app.decorators import token_required
+from datetime import date, timedelta
+import hashlib
 
 dia_bp = Blueprint('dias', __name__)
 
+# Máximo de días por consulta de rango
+RANGO_MAX_DIAS = 366
+
+# Máximo de empleados en el filtro de una consulta de rango
+RANGO_MAX_EMPLEADOS = 1000
+
+# Bytes que se acumulan antes de enviar un fragmento de la respuesta
+TAMANO_FRAGMENTO = 64 * 1024
+
+
+def _periodos(desde: date, hasta: date) -> list:
+    """Periodos AAAAMM entre dos fechas"""
+    periodos, anio, mes = [], desde.year, desde.month
+    while (anio, mes) <= (hasta.year, hasta.month):
+        periodos.append(anio * 100 + mes)
+        anio, mes = (anio, mes + 1) if mes < 12 else (anio + 1, 1)
+    return periodos
+
+
+def _json_por_fragmentos(encabezado: dict, grupos):
+    """
+    Escribe {..encabezado, "empleados": [{"empleado_id", "dias"}, ...]} a medida que
+    llegan los grupos, en fragmentos de TAMANO_FRAGMENTO
+    """
+    dumps = current_app.json.dumps
+    buffer = [dumps(encabezado).rstrip()[:-1], ',"empleados":[']
+    tamano = 0
+    separador = ''
+    for empleado_id, dias in grupos:
+        parte = f'{separador}{{"empleado_id":{dumps(empleado_id)},"dias":{dumps(dias)}}}'
+        separador = ','
+        buffer.append(parte)
+        tamano += len(parte)
+        if tamano >= TAMANO_FRAGMENTO:
+            yield ''.join(buffer)
+            buffer, tamano = [], 0
+    buffer.append(']}')
+    yield ''.join(buffer)
+
 @dia_bp.route('/mes/<int:proyecto_id>/<int:anio>/<int:mes>', methods=['GET'])
 @token_required
 def get_dias_mes(usuario_actual, proyecto_id, anio, mes):
-    """Obtiene días de un mes específico, opcionalmente filtrados por empleado"""
+    """
+    Obtiene días de un mes específico, opcionalmente filtrados por empleado.
+    Con If-None-Match responde 304 si los días del mes no cambiaron; si no, la
+    respuesta serializada sale de la caché del servidor mientras el mes no cambie
+    """
+    # Antes de la caché: un proyecto eliminado no incrementa la versión de sus meses
+    if not ProyectoService.obtener_proyecto_por_id(proyecto_id):
+        return jsonify({'error': 'Proyecto no encontrado'}), 404
+    
     empleado_id = request.args.get('empleado_id', type=int)
-    dias = DiaService.obtener_dias_mes(proyecto_id, anio, mes, empleado_id)
-    return jsonify([d.to_dict() for d in dias]), 200
+    version, actualizado = VersionService.obtener(proyecto_id, anio * 100 + mes)
+    etag = VersionService.etag('dias', proyecto_id, anio * 100 + mes, version, empleado_id or 0)
+    
+    def generar():
+        dias = DiaService.obtener_dias_mes(proyecto_id, anio, mes, empleado_id)
+        return jsonify([d.to_dict() for d in dias]), 200
+    
+    return respuesta_condicional(etag, actualizado, generar, cachear=True)
+
+@dia_bp.route('/rango/<int:proyecto_id>', methods=['GET'])
+@token_required
+def get_dias_rango(usuario_actual, proyecto_id):
+    """
+    Días de un proyecto entre dos fechas (pueden abarcar varios meses), agrupados
+    por empleado, en una sola consulta. La respuesta se envía por fragmentos.
+    Query params:
+        - desde, hasta: fechas AAAA-MM-DD (incluidas), máximo RANGO_MAX_DIAS días
+        - semana: AAAA-MM-DD en lugar de desde/hasta; la semana que contiene la fecha,
+          empezando el día configurado por el usuario (dia_inicio_semana)
+        - empleados: IDs separados por coma (opcional; por defecto todos)
+        - formato: 'matriz' para ejes de fechas y empleados con una matriz por columna
+          (horas_trabajadas, horas_reales, horas_extras, ids) en lugar de objetos por día
+        - minutos: con formato=matriz, agrega los horarios como minutos desde la medianoche
+    Los empleados que no son admin del proyecto solo ven sus propios días.
+    El formato lista es siempre JSON; la matriz también puede pedirse en MessagePack.
+    Con If-None-Match responde 304 si no cambió ningún mes del rango
+    """
+    proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
+    if not proyecto:
+        return jsonify({'error': 'Proyecto no encontrado'}), 404
+    
+    try:
+        if request.args.get('semana'):
+            usuario = Usuario.query.get(usuario_actual['id'])
+            desde, hasta = DiaService.rango_semana(
+                date.fromisoformat(request.args['semana']), usuario.dia_inicio_semana if usuario else 0
+            )
+        else:
+            desde = date.fromisoformat(request.args.get('desde', ''))
+            hasta = date.fromisoformat(request.args.get('hasta', ''))
+        empleado_ids = None
+        if request.args.get('empleados'):
+            empleado_ids = sorted({int(e) for e in request.args['empleados'].split(',') if e.strip()})
+    except ValueError:
+        return jsonify({'error': 'Parámetros inválidos: desde/hasta o semana (AAAA-MM-DD) y empleados (IDs separados por coma)'}), 400
+    
+    formato = request.args.get('formato', 'lista')
+    if formato not in ('lista', 'matriz'):
+        return jsonify({'error': 'formato debe ser "lista" o "matriz"'}), 400
+    minutos = request.args.get('minutos', '').lower() in ('1', 'true')
+    
+    if hasta < desde:
+        return jsonify({'error': 'hasta debe ser mayor o igual que desde'}), 400
+    if hasta - desde >= timedelta(days=RANGO_MAX_DIAS):
+        return jsonify({'error': f'El rango no puede superar {RANGO_MAX_DIAS} días'}), 400
+    if empleado_ids is not None and len(empleado_ids) > RANGO_MAX_EMPLEADOS:
+        return jsonify({'error': f'Máximo {RANGO_MAX_EMPLEADOS} empleados por consulta'}), 400
+    
+    if proyecto.usuario_id != usuario_actual['id']:
+        # Empleado del proyecto: solo sus propios días
+        propios = [
+            fila.id for fila in Empleado.query.with_entities(Empleado.id)
+            .filter_by(proyecto_id=proyecto_id, usuario_id=usuario_actual['id'])
+        ]
+        if not propios:
+            return jsonify({'error': 'No tienes acceso a este proyecto'}), 403
+        empleado_ids = [e for e in (empleado_ids or propios) if e in propios]
+    
+    periodos = _periodos(desde, hasta)
+    if formato == 'matriz':
+        # La matriz incluye los nombres de los empleados y, con minutos, columnas que dependen
+        # del modo de horarios: cambios que solo incrementan la versión del proyecto
+        periodos.append(PERIODO_PROYECTO)
+    huella, actualizado = VersionService.obtener_periodos(proyecto_id, periodos)
+    filtro = '*' if empleado_ids is None else hashlib.sha1(','.join(map(str, empleado_ids)).encode()).hexdigest()[:12]
+    etag = VersionService.etag(
+        'rango', proyecto_id, desde.isoformat(), hasta.isoformat(), huella, filtro,
+        formato + ('-min' if minutos else '')
+    )
+    
+    if formato == 'lista':
+        # La lista se envía por fragmentos siempre en JSON: sin negociar MessagePack
+        # (y sin el sufijo '-mp' en el ETag)
+        solo_json()
+    
+    def generar():
+        if formato == 'matriz':
+            return jsonify(DiaService.obtener_matriz_rango(proyecto, desde, hasta, empleado_ids, minutos)), 200
+        
+        encabezado = {'proyecto_id': proyecto_id, 'desde': desde.isoformat(), 'hasta': hasta.isoformat()}
+        grupos = DiaService.iterar_dias_rango(proyecto_id, desde, hasta, empleado_ids)
+        return Response(
+            stream_with_context(_json_por_fragmentos(encabezado, grupos)),
+            mimetype='application/json'
+        )
+    
+    return respuesta_condicional(etag, actualizado, generar)
 
 @dia_bp.route('/<int:dia_id>', methods=['GET'])
 @token_required
@@ -1,9 +1,29 @@
 from flask import Blueprint, request, jsonify
-from app.services.empleado_service import EmpleadoService
-from app.decorators import token_required
+from app.services.empleado_service import EmpleadoService, IMPORTACION_MAX_EMPLEADOS
+from app.services.proyecto_service import ProyectoService
+from app.utils import verificar_permiso_proyecto
+from app.decorators import token_required, idempotente
+import csv
+import io
 
 empleado_bp = Blueprint('empleados', __name__)
 
+
+def _leer_empleados_csv(texto: str):
+    """Filas de un CSV con encabezado (columnas nombre y, opcional, email; separador , o ;)"""
+    try:
+        dialecto = csv.Sniffer().sniff(texto[:4096], delimiters=',;')
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.DictReader(io.StringIO(texto), dialect=dialecto)
+    if not lector.fieldnames or 'nombre' not in [c.strip().lower() for c in lector.fieldnames]:
+        return None
+    return [
+        {(clave or '').strip().lower(): valor for clave, valor in fila.items()}
+        for fila in lector
+        if any((valor or '').strip() for valor in fila.values() if isinstance(valor, str))
+    ]
+
 @empleado_bp.route('/proyecto/<int:proyecto_id>/empleados', methods=['GET'])
 @token_required
 def get_empleados(usuario_actual, proyecto_id):
@@ -27,6 +47,53 @@ def add_empleado(usuario_actual, proyecto_id):
     
     return jsonify(empleado.to_dict()), 201
 
+@empleado_bp.route('/proyecto/<int:proyecto_id>/empleados/importar', methods=['POST'])
+@token_required
+@idempotente
+def importar_empleados(usuario_actual, proyecto_id):
+    """
+    Importa empleados en bloque con sus días de todos los meses del proyecto
+    Body JSON: {
+        "empleados": [{"nombre": "Ana", "email": "ana@ejemplo.com"}, "Juan", ...],
+        "invitar": true (opcional, crea invitaciones para los que tienen email),
+        "mensaje_invitacion": "..." (opcional)
+    }
+    Body text/csv: encabezado nombre[,email]; invitar y mensaje_invitacion por query string
+    """
+    proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
+    if not proyecto:
+        return jsonify({'error': 'Proyecto no encontrado'}), 404
+    if not verificar_permiso_proyecto(proyecto, usuario_actual['id']):
+        return jsonify({'error': 'No tienes permisos para este proyecto'}), 403
+    
+    if request.mimetype == 'text/csv':
+        empleados = _leer_empleados_csv(request.get_data(as_text=True))
+        if empleados is None:
+            return jsonify({'error': 'El CSV debe tener un encabezado con la columna nombre'}), 400
+        invitar = request.args.get('invitar', '').lower() in ('1', 'true', 'si')
+        mensaje = request.args.get('mensaje_invitacion')
+    else:
+        data = request.get_json(silent=True) or {}
+        empleados = data.get('empleados')
+        if not isinstance(empleados, list):
+            return jsonify({'error': 'Campo requerido: empleados (lista)'}), 400
+        invitar = bool(data.get('invitar', False))
+        mensaje = data.get('mensaje_invitacion')
+    
+    if len(empleados) > IMPORTACION_MAX_EMPLEADOS:
+        return jsonify({'error': f'Máximo {IMPORTACION_MAX_EMPLEADOS} empleados por importación'}), 413
+    
+    resultado, error = EmpleadoService.importar_empleados(
+        proyecto_id, empleados, invitar=invitar, mensaje_invitacion=mensaje
+    )
+    
+    if error:
+        if isinstance(error, list):
+            return jsonify({'error': 'Hay filas inválidas; no se importó ningún empleado', 'errores': error}), 400
+        return jsonify({'error': error}), 400
+    
+    return jsonify(resultado), 201
+
 @empleado_bp.route('/empleados/<int:empleado_id>', methods=['GET'])
 @token_required
 def get_empleado(usuario_actual, empleado_id):
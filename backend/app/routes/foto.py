@@ -0,0 +1,33 @@
+from flask import Blueprint, jsonify, send_file
+from app.services.foto_perfil_service import FotoPerfilService, MIMETYPES
+import re
+
+foto_bp = Blueprint('fotos', __name__)
+
+# Un año: la URL incluye el hash del contenido, una foto nueva tiene otra URL
+MAX_AGE_FOTOS = 365 * 24 * 3600
+
+_PATRON_HASH = re.compile(r'^[0-9a-f]{32}$')
+
+@foto_bp.route('/<int:usuario_id>/<huella>/<int:lado>.<formato>', methods=['GET'])
+def get_foto(usuario_id, huella, lado, formato):
+    """
+    Sirve una variante de la foto de perfil (sin JWT: se usa desde <img>).
+    La respuesta es inmutable y se cachea en el navegador y en proxies
+    """
+    ruta = None
+    if _PATRON_HASH.match(huella):
+        ruta = FotoPerfilService.ruta_variante(usuario_id, huella, lado, formato)
+    if not ruta:
+        return jsonify({'error': 'Foto no encontrada'}), 404
+    
+    respuesta = send_file(
+        ruta,
+        mimetype=MIMETYPES[formato],
+        max_age=MAX_AGE_FOTOS,
+        conditional=True,
+        etag=f'{huella}-{lado}-{formato}'
+    )
+    respuesta.cache_control.public = True
+    respuesta.cache_control.immutable = True
+    return respuesta
@@ -5,6 +5,7 @@ Rutas para gestión de invitaciones a proyectos
 from flask import Blueprint, request, jsonify
 from app.decorators import token_required
 from app.services.invitacion_service import InvitacionService
+from app.services.proyecto_service import ProyectoService
 from app.utils.response import success_response, error_response
 
 invitacion_bp = Blueprint('invitaciones', __name__, url_prefix='/api/invitaciones')
@@ -233,10 +234,12 @@ def validar_token_invitacion(token):
     """
     try:
         from app.models.invitacion_proyecto import InvitacionProyecto
-        from app.models.proyecto import Proyecto
+        from app.models.proyecto import proyecto_vigente
         from app.models.empleado import Empleado
         
-        invitacion = InvitacionProyecto.query.filter_by(token=token).first()
+        invitacion = InvitacionProyecto.query.filter(
+            InvitacionProyecto.token == token, proyecto_vigente(InvitacionProyecto.proyecto_id)
+        ).first()
         
         if not invitacion:
             return error_response('Invitación no encontrada', 404)
@@ -248,7 +251,7 @@ def validar_token_invitacion(token):
             return error_response(f'Esta invitación ya fue {invitacion.estado}', 400)
         
         # Obtener datos adicionales
-        proyecto = Proyecto.query.get(invitacion.proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(invitacion.proyecto_id)
         empleado = Empleado.query.get(invitacion.empleado_id)
         
         invitacion_dict = invitacion.to_dict()
@@ -271,13 +274,12 @@ def obtener_invitaciones_proyecto(usuario_actual, proyecto_id):
     Obtiene todas las invitaciones de un proyecto (solo admin)
     """
     try:
-        from app.models.proyecto import Proyecto
         from app.models.invitacion_proyecto import InvitacionProyecto
         
         print(f"📋 Obteniendo invitaciones del proyecto {proyecto_id} para usuario {usuario_actual['id']}")
         
         # Verificar permisos
-        proyecto = Proyecto.query.get(proyecto_id)
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         if not proyecto:
             print(f"❌ Proyecto {proyecto_id} no encontrado")
             return error_response('Proyecto no encontrado', 404)
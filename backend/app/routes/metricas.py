@@ -0,0 +1,194 @@
+from flask import Blueprint, Response, request, jsonify
+from functools import wraps
+from app import db
+from app.config import METRICS_TOKEN, METRICS_ADMINS
+from app.decorators import validate_token
+from app.utils.pool_db import MetricasPool
+from app.utils.captura_consultas import CapturaConsultas
+from app.utils.cache_respuestas import CacheRespuestas
+from app.utils.instrumentacion import MetricasSolicitudes, exportar_prometheus
+import hmac
+import os
+
+metricas_bp = Blueprint('metricas', __name__, url_prefix='/api/metricas')
+
+# /metrics en la raíz, donde lo busca Prometheus por defecto
+prometheus_bp = Blueprint('prometheus', __name__)
+
+
+# Usuarios que pueden consultar las métricas con su JWT
+ADMINS_METRICAS = frozenset(int(usuario_id) for usuario_id in METRICS_ADMINS.split(',') if usuario_id.strip())
+
+
+def metricas_protegidas(f):
+    """
+    Protege los endpoints de métricas: el header X-Metrics-Token con METRICS_TOKEN
+    (para scrapers sin usuario) o el JWT de un usuario de METRICS_ADMINS. Cualquier
+    otro usuario autenticado recibe 403
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        token = request.headers.get('X-Metrics-Token')
+        if token is not None:
+            if not METRICS_TOKEN or not hmac.compare_digest(token, METRICS_TOKEN):
+                return jsonify({'error': 'Token de métricas inválido'}), 401
+            return f(*args, **kwargs)
+
+        usuario_id = validate_token()
+        if not usuario_id:
+            return jsonify({'error': 'Token requerido o inválido'}), 401
+        if usuario_id not in ADMINS_METRICAS:
+            return jsonify({'error': 'No tienes permisos para ver las métricas'}), 403
+
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+@metricas_bp.route('/salud', methods=['GET'])
+def get_salud():
+    """Verificación liviana de que el worker responde (sin BD ni autenticación)"""
+    return jsonify({'estado': 'ok', 'pid': os.getpid()}), 200
+
+
+@metricas_bp.route('/pool', methods=['GET'])
+@metricas_protegidas
+def get_metricas_pool():
+    """
+    Métricas del pool de conexiones del worker que atiende la solicitud
+
+    Response:
+    {
+        "pid": 12,
+        "checkouts": 1520,
+        "esperas": 3,
+        "timeouts": 0,
+        "tiempo_espera_promedio": 0.0001,
+        "tiempo_espera_max": 0.21,
+        "histograma_espera": {"<=0.001s": 1510, ...},
+        "pico_en_uso": 7,
+        "pico_overflow": 2,
+        "invalidaciones": 0,
+        "pings": 4,
+        "pool": {"tamano": 5, "max_overflow": 10, "en_uso": 1, "overflow": -4, ...}
+    }
+    """
+    return jsonify(MetricasPool.snapshot(db.engine.pool)), 200
+
+
+@metricas_bp.route('/consultas', methods=['GET'])
+@metricas_protegidas
+def get_metricas_consultas():
+    """
+    Consultas SQL más costosas del worker que atiende la solicitud
+
+    Query params:
+        - limite: Cantidad de consultas (por defecto 20, máximo 200)
+        - orden: tiempo_total (por defecto), cantidad, p95 o tiempo_max
+        - muestras: 1 para incluir la sentencia y parámetros de la ejecución más lenta
+          (los textos se reemplazan por '?' al capturarlos: nunca salen valores de usuarios)
+
+    Response:
+    {
+        "pid": 12,
+        "segundos_capturados": 3600.0,
+        "formas": 84,
+        "consultas": [
+            {"forma": "SELECT ... WHERE marcados_asistencia.proyecto_id = ? ...",
+             "cantidad": 1520, "tiempo_total_ms": 830.2, "p50_ms": 0.4, "p95_ms": 1.9, ...}
+        ]
+    }
+    """
+    limite = min(request.args.get('limite', 20, type=int), 200)
+    orden = request.args.get('orden', 'tiempo_total')
+    incluir_muestras = request.args.get('muestras') == '1'
+
+    return jsonify(CapturaConsultas.top(limite, orden, incluir_muestras)), 200
+
+
+@metricas_bp.route('/consultas', methods=['DELETE'])
+@metricas_protegidas
+def reiniciar_metricas_consultas():
+    """Reinicia las estadísticas de consultas del worker"""
+    CapturaConsultas.reiniciar()
+    return jsonify({'message': 'Estadísticas de consultas reiniciadas', 'pid': os.getpid()}), 200
+
+
+@metricas_bp.route('/solicitudes', methods=['GET'])
+@metricas_protegidas
+def get_metricas_solicitudes():
+    """
+    Totales por endpoint del worker que atiende la solicitud, con promedios
+
+    Response:
+    {
+        "pid": 12,
+        "endpoints": [
+            {"metodo": "GET", "endpoint": "/api/tareas/<int:tarea_id>", "solicitudes": 320,
+             "duracion_promedio_ms": 18.2, "consultas_promedio": 4.1, "sql_promedio_ms": 6.3,
+             "serializacion_promedio_ms": 0.9, "bytes_promedio": 5120, "n_mas_1": 0, ...}
+        ]
+    }
+    """
+    datos = MetricasSolicitudes.snapshot()
+    endpoints = []
+    for (metodo, endpoint), d in datos['endpoints'].items():
+        total = sum(d['solicitudes'].values())
+        endpoints.append({
+            'metodo': metodo,
+            'endpoint': endpoint,
+            'solicitudes': total,
+            'por_estado': d['solicitudes'],
+            'duracion_promedio_ms': round(d['duracion_total'] * 1000 / total, 3),
+            'duracion_max_ms': round(d['duracion_max'] * 1000, 3),
+            'consultas_promedio': round(d['consultas'] / total, 2),
+            'sql_promedio_ms': round(d['tiempo_sql'] * 1000 / total, 3),
+            'filas_promedio': round(d['filas'] / total, 1),
+            'serializacion_promedio_ms': round(d['tiempo_serializacion'] * 1000 / total, 3),
+            'bytes_promedio': round(d['bytes'] / total),
+            'n_mas_1': d['n_mas_1'],
+        })
+    endpoints.sort(key=lambda e: e['duracion_promedio_ms'] * e['solicitudes'], reverse=True)
+
+    return jsonify({'pid': datos['pid'], 'endpoints': endpoints}), 200
+
+
+@metricas_bp.route('/cache', methods=['GET'])
+@metricas_protegidas
+def get_metricas_cache():
+    """
+    Caché de respuestas del servidor en el worker que atiende la solicitud
+
+    Response:
+    {
+        "pid": 12,
+        "almacenamiento": "memoria",
+        "aciertos_memoria": 930,
+        "aciertos_compartida": 0,
+        "fallos": 70,
+        "tasa_aciertos": 0.93,
+        "guardadas": 70,
+        "desalojadas": 0,
+        "entradas": 70,
+        "bytes": 3584000,
+        ...
+    }
+    """
+    return jsonify(CacheRespuestas.snapshot()), 200
+
+
+@metricas_bp.route('/cache', methods=['DELETE'])
+@metricas_protegidas
+def vaciar_cache():
+    """Vacía la caché de respuestas en memoria del worker y reinicia sus métricas"""
+    CacheRespuestas.vaciar()
+    return jsonify({'message': 'Caché de respuestas vaciada', 'pid': os.getpid()}), 200
+
+
+@prometheus_bp.route('/metrics', methods=['GET'])
+@metricas_protegidas
+def get_metrics():
+    """Métricas del worker (solicitudes por endpoint, pool de conexiones y caché de respuestas) en formato Prometheus"""
+    return Response(
+        exportar_prometheus(MetricasPool.snapshot(db.engine.pool), CacheRespuestas.snapshot()),
+        mimetype='text/plain; version=0.0.4'
+    )
@@ -1,9 +1,21 @@
 from flask import Blueprint, request, jsonify
 from app.services.proyecto_service import ProyectoService
+from app.services.recalculo_service import RecalculoService
+from app.services.purga_service import PurgaService
+from app.models import Proyecto
+from app.services.version_service import LOCAL_TZ, VersionService, periodo_de
+from app.utils.cache_http import respuesta_condicional
+from app.utils import verificar_permiso_proyecto
 from app.decorators import token_required
+from app.models.proyecto import NOMBRES_CAMPOS
+from datetime import datetime
+import hashlib
 
 proyecto_bp = Blueprint('proyectos', __name__)
 
+# Máximo de proyectos por página en GET /api/proyectos?limit=
+LIMITE_MAXIMO_PROYECTOS = 200
+
 # IMPORTANTE: Las rutas más específicas deben ir PRIMERO antes de las rutas parametrizadas
 
 @proyecto_bp.route('/estadisticas', methods=['GET'])
@@ -16,9 +28,59 @@ def get_estadisticas(usuario_actual):
 @proyecto_bp.route('', methods=['GET'])
 @token_required
 def get_proyectos(usuario_actual):
-    """Obtiene proyectos del usuario"""
-    proyectos = ProyectoService.obtener_proyectos_usuario(usuario_actual['id'])
-    return jsonify([p.to_dict() for p in proyectos]), 200
+    """
+    Obtiene proyectos del usuario (304 con If-None-Match si ninguno cambió; sin
+    validadores con incluir_usuario, porque los cambios de usuarios no tienen versión)
+    Query params:
+        - limit / offset: paginación (sin limit se devuelven todos); el total va en X-Total-Count
+        - fields: campos a incluir separados por coma (p. ej. id,nombre,activo,empleados)
+        - resumen: true para devolver cantidad de empleados, tareas y horas del mes
+          por proyecto en lugar de los objetos anidados
+        - incluir_usuario: true para incluir el usuario asociado de cada empleado
+    """
+    usuario_id = usuario_actual['id']
+    limite = request.args.get('limit', type=int)
+    desplazamiento = max(request.args.get('offset', 0, type=int), 0)
+    resumen = request.args.get('resumen', 'false').lower() == 'true'
+    incluir_usuario = request.args.get('incluir_usuario', 'false').lower() == 'true'
+    
+    if limite is not None and not 1 <= limite <= LIMITE_MAXIMO_PROYECTOS:
+        return jsonify({'error': f'limit debe estar entre 1 y {LIMITE_MAXIMO_PROYECTOS}'}), 400
+    
+    campos = None
+    if request.args.get('fields'):
+        campos = tuple(sorted({c.strip() for c in request.args['fields'].split(',') if c.strip()}))
+        invalidos = [c for c in campos if c not in NOMBRES_CAMPOS and c != 'empleados']
+        if invalidos:
+            return jsonify({'error': f"Campos desconocidos: {', '.join(invalidos)}"}), 400
+    
+    def generar():
+        if resumen:
+            datos = ProyectoService.obtener_resumen_proyectos_usuario(usuario_id, limite, desplazamiento)
+        else:
+            proyectos = ProyectoService.obtener_proyectos_usuario(
+                usuario_id, limite, desplazamiento, campos, incluir_usuario
+            )
+            datos = [p.to_dict(campos, incluir_usuario) for p in proyectos]
+        
+        respuesta = jsonify(datos)
+        if limite is not None:
+            respuesta.headers['X-Total-Count'] = str(ProyectoService.contar_proyectos_usuario(usuario_id))
+        return respuesta, 200
+    
+    if incluir_usuario:
+        # Username, email y nombre de los usuarios no incrementan ninguna versión
+        return generar()
+    
+    huella, actualizado = VersionService.obtener_proyectos_usuario(usuario_id)
+    etag = VersionService.etag(
+        'proyectos', usuario_id, huella,
+        hashlib.sha1(request.query_string).hexdigest()[:8],
+        # Las horas del resumen son las del mes en curso: cambian al empezar otro mes
+        periodo_de(datetime.now(LOCAL_TZ)) if resumen else 0
+    )
+    
+    return respuesta_condicional(etag, actualizado, generar)
 
 @proyecto_bp.route('', methods=['POST'])
 @token_required
@@ -44,23 +106,26 @@ def create_proyecto(usuario_actual):
     if modo_horarios not in ['corrido', 'turnos']:
         return jsonify({'error': 'modo_horarios debe ser "corrido" o "turnos"'}), 400
     
-    proyecto = ProyectoService.crear_proyecto(
-        nombre=data['nombre'],
-        descripcion=data.get('descripcion', ''),
-        anio=data['anio'],
-        mes=data['mes'],
-        usuario_id=usuario_actual['id'],
-        tipo_proyecto=tipo_proyecto,
-        empleados=empleados,
-        horas_reales_activas=data.get('horas_reales_activas', False),
-        modo_horarios=modo_horarios,
-        horario_inicio=data.get('horario_inicio'),
-        horario_fin=data.get('horario_fin'),
-        turno_manana_inicio=data.get('turno_manana_inicio'),
-        turno_manana_fin=data.get('turno_manana_fin'),
-        turno_tarde_inicio=data.get('turno_tarde_inicio'),
-        turno_tarde_fin=data.get('turno_tarde_fin')
-    )
+    try:
+        proyecto = ProyectoService.crear_proyecto(
+            nombre=data['nombre'],
+            descripcion=data.get('descripcion', ''),
+            anio=data['anio'],
+            mes=data['mes'],
+            usuario_id=usuario_actual['id'],
+            tipo_proyecto=tipo_proyecto,
+            empleados=empleados,
+            horas_reales_activas=data.get('horas_reales_activas', False),
+            modo_horarios=modo_horarios,
+            horario_inicio=data.get('horario_inicio'),
+            horario_fin=data.get('horario_fin'),
+            turno_manana_inicio=data.get('turno_manana_inicio'),
+            turno_manana_fin=data.get('turno_manana_fin'),
+            turno_tarde_inicio=data.get('turno_tarde_inicio'),
+            turno_tarde_fin=data.get('turno_tarde_fin')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify(proyecto.to_dict()), 201
 
@@ -133,13 +198,37 @@ def cambiar_estado(usuario_actual, proyecto_id):
 @proyecto_bp.route('/<int:proyecto_id>', methods=['DELETE'])
 @token_required
 def delete_proyecto(usuario_actual, proyecto_id):
-    """Elimina un proyecto"""
-    success = ProyectoService.eliminar_proyecto(proyecto_id)
-    
-    if not success:
+    """
+    Elimina un proyecto. Deja de verse de inmediato y sus datos se borran en
+    segundo plano; el progreso se consulta en GET /<id>/eliminacion
+    """
+    proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
+    if not proyecto:
         return jsonify({'error': 'Proyecto no encontrado'}), 404
+    if not verificar_permiso_proyecto(proyecto, usuario_actual['id']):
+        return jsonify({'error': 'No tienes permisos para este proyecto'}), 403
     
-    return jsonify({'message': 'Proyecto eliminado'}), 200
+    trabajo = ProyectoService.eliminar_proyecto(proyecto_id)
+    if not trabajo:
+        return jsonify({'error': 'No se pudo eliminar el proyecto'}), 500
+    
+    return jsonify({'message': 'Proyecto eliminado', 'purga': trabajo.to_dict()}), 202
+
+@proyecto_bp.route('/<int:proyecto_id>/eliminacion', methods=['GET'])
+@token_required
+def get_eliminacion(usuario_actual, proyecto_id):
+    """Progreso de la purga de un proyecto eliminado (404 cuando ya terminó)"""
+    proyecto = Proyecto.query.get(proyecto_id)
+    if not proyecto or not proyecto.eliminado:
+        return jsonify({'error': 'Proyecto no encontrado o sin eliminación en curso'}), 404
+    if not verificar_permiso_proyecto(proyecto, usuario_actual['id']):
+        return jsonify({'error': 'No tienes permisos para este proyecto'}), 403
+    
+    trabajo = PurgaService.obtener(proyecto_id)
+    if not trabajo:
+        return jsonify({'error': 'Eliminación no encontrada'}), 404
+    
+    return jsonify(trabajo.to_dict()), 200
 
 @proyecto_bp.route('/<int:proyecto_id>/configuracion', methods=['PUT'])
 @token_required
@@ -153,6 +242,10 @@ def update_configuracion(usuario_actual, proyecto_id):
     
     from app import db
     from datetime import datetime
+    from app.utils import obtener_horario_compilado, invalidar_horario_compilado
+    
+    # Firma de los horarios actuales para detectar cambios que requieren recálculo
+    firma_anterior = obtener_horario_compilado(proyecto).firma
     
     # Actualizar configuración básica
     if 'horas_reales_activas' in data:
@@ -204,4 +297,62 @@ def update_configuracion(usuario_actual, proyecto_id):
     
     db.session.commit()
     
-    return jsonify(proyecto.to_dict()), 200
+    # Descartar el horario precompilado del proyecto
+    invalidar_horario_compilado(proyecto_id)
+    
+    respuesta = proyecto.to_dict()
+    
+    # Si cambiaron los horarios, recalcular en segundo plano las horas ya registradas
+    if obtener_horario_compilado(proyecto).firma != firma_anterior:
+        trabajo, _ = RecalculoService.encolar(proyecto_id)
+        if trabajo:
+            respuesta['recalculo'] = trabajo.to_dict()
+    
+    return jsonify(respuesta), 200
+
+@proyecto_bp.route('/<int:proyecto_id>/recalculos', methods=['POST'])
+@token_required
+def encolar_recalculo(usuario_actual, proyecto_id):
+    """Encola el recálculo de horas normales/extras de todos los marcados del proyecto"""
+    proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
+    if not proyecto:
+        return jsonify({'error': 'Proyecto no encontrado'}), 404
+    
+    if not verificar_permiso_proyecto(proyecto, usuario_actual['id']):
+        return jsonify({'error': 'Solo el administrador puede recalcular las horas'}), 403
+    
+    trabajo, error = RecalculoService.encolar(proyecto_id)
+    if error:
+        return jsonify({'error': error}), 500
+    
+    return jsonify(trabajo.to_dict()), 202
+
+@proyecto_bp.route('/<int:proyecto_id>/recalculos', methods=['GET'])
+@token_required
+def get_recalculos(usuario_actual, proyecto_id):
+    """Obtiene los últimos recálculos del proyecto y su progreso"""
+    proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
+    if not proyecto:
+        return jsonify({'error': 'Proyecto no encontrado'}), 404
+    
+    if not verificar_permiso_proyecto(proyecto, usuario_actual['id']):
+        return jsonify({'error': 'No tienes acceso a este proyecto'}), 403
+    
+    return jsonify([t.to_dict() for t in RecalculoService.listar(proyecto_id)]), 200
+
+@proyecto_bp.route('/<int:proyecto_id>/recalculos/<int:trabajo_id>', methods=['GET'])
+@token_required
+def get_recalculo(usuario_actual, proyecto_id, trabajo_id):
+    """Obtiene el progreso de un recálculo"""
+    proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
+    if not proyecto:
+        return jsonify({'error': 'Proyecto no encontrado'}), 404
+    
+    if not verificar_permiso_proyecto(proyecto, usuario_actual['id']):
+        return jsonify({'error': 'No tienes acceso a este proyecto'}), 403
+    
+    trabajo = RecalculoService.obtener(proyecto_id, trabajo_id)
+    if not trabajo:
+        return jsonify({'error': 'Recálculo no encontrado'}), 404
+    
+    return jsonify(trabajo.to_dict()), 200
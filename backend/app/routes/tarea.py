@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
 from app.services.tarea_service import TareaService
+from app.services.proyecto_service import ProyectoService
+from app.services.version_service import VersionService
+from app.utils.cache_http import respuesta_condicional
 from app.decorators import token_required
 
 tarea_bp = Blueprint('tareas', __name__)
@@ -7,10 +10,19 @@ tarea_bp = Blueprint('tareas', __name__)
 @tarea_bp.route('/proyecto/<int:proyecto_id>', methods=['GET'])
 @token_required
 def get_tareas_proyecto(usuario_actual, proyecto_id):
-    """Obtiene tareas de un proyecto"""
-    tareas = TareaService.obtener_tareas_proyecto(proyecto_id)
-    # Incluir desglose de empleados en la respuesta
-    return jsonify([t.to_dict(incluir_desglose_empleados=True) for t in tareas]), 200
+    """Obtiene tareas de un proyecto (304 con If-None-Match si el proyecto no cambió)"""
+    if not ProyectoService.obtener_proyecto_por_id(proyecto_id):
+        return jsonify({'error': 'Proyecto no encontrado'}), 404
+    
+    version, actualizado = VersionService.obtener(proyecto_id)
+    etag = VersionService.etag('tareas', proyecto_id, version)
+    
+    def generar():
+        tareas = TareaService.obtener_tareas_proyecto(proyecto_id)
+        # Incluir desglose de empleados en la respuesta
+        return jsonify([t.to_dict(incluir_desglose_empleados=True) for t in tareas]), 200
+    
+    return respuesta_condicional(etag, actualizado, generar)
 
 @tarea_bp.route('', methods=['POST'])
 @token_required
@@ -35,6 +47,9 @@ def create_tarea(usuario_actual):
         usuario_id=usuario_actual['id']
     )
     
+    if not tarea:
+        return jsonify({'error': 'Proyecto no encontrado'}), 404
+    
     return jsonify(tarea.to_dict(incluir_desglose_empleados=True)), 201
 
 @tarea_bp.route('/<int:tarea_id>', methods=['GET'])
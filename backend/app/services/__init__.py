@@ -1,6 +1,7 @@
 from app import db
 from app.models.usuario import Usuario
-from datetime import datetime
+from app.services.ultimo_acceso_service import UltimoAccesoService
+from app.services.foto_perfil_service import FotoPerfilService
 
 class AuthService:
     @staticmethod
@@ -40,16 +41,18 @@ class AuthService:
         ).first()
         
         if usuario and usuario.verificar_password(password):
-            usuario.ultimo_acceso = datetime.utcnow()
-            db.session.commit()
-            return usuario
+            # El último acceso se persiste en lote (ver UltimoAccesoService)
+            UltimoAccesoService.registrar(usuario.id)
+            return UltimoAccesoService.aplicar_pendiente(usuario)
         
         return None
     
     @staticmethod
     def obtener_usuario_por_id(user_id: int):
         """Obtiene un usuario por ID"""
-        return Usuario.query.filter(Usuario.id == user_id).first()
+        usuario = Usuario.query.filter(Usuario.id == user_id).first()
+        # Último acceso todavía en el buffer (se persiste en lote)
+        return UltimoAccesoService.aplicar_pendiente(usuario)
     
     @staticmethod
     def actualizar_perfil(user_id: int, nombre_completo: str = None, 
@@ -70,16 +73,25 @@ class AuthService:
             if existing:
                 return None, "El email ya está en uso"
         
+        # Foto: data URL o base64 para reemplazarla, '' para quitarla
+        foto_anterior = None
+        if foto_perfil == '':
+            foto_anterior = FotoPerfilService.quitar(usuario)
+        elif foto_perfil is not None:
+            try:
+                foto_anterior = FotoPerfilService.guardar(usuario, foto_perfil)
+            except ValueError as e:
+                return None, str(e)
+        
         if nombre_completo is not None:
             usuario.nombre_completo = nombre_completo
         if email is not None:
             usuario.email = email
-        if foto_perfil is not None:
-            usuario.foto_perfil = foto_perfil
         if dia_inicio_semana is not None:
             usuario.dia_inicio_semana = dia_inicio_semana
         
         db.session.commit()
+        FotoPerfilService.eliminar_anterior(usuario.id, foto_anterior)
         return usuario, "Perfil actualizado"
     
     @staticmethod
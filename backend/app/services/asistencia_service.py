@@ -14,7 +14,7 @@ from app.utils import (
     calcular_horas_debidas_dia
 )
 from datetime import datetime, date, time, timedelta, timezone
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List, Dict
 
 LOCAL_TZ = timezone(timedelta(hours=-3))
 
@@ -46,7 +46,7 @@ class AsistenciaService:
             empleado = Empleado.query.get(empleado_id)
             proyecto = Proyecto.query.get(proyecto_id)
             
-            if not empleado or not proyecto:
+            if not empleado or not proyecto or proyecto.eliminado:
                 return None, "Empleado o proyecto no encontrado"
             
             # Verificar que no exista ya un marcado para este día
@@ -114,6 +114,10 @@ class AsistenciaService:
             if hora is None:
                 hora = datetime.now(LOCAL_TZ).time()
             
+            proyecto = Proyecto.query.get(proyecto_id)
+            if not proyecto or proyecto.eliminado:
+                return None, "Proyecto no encontrado"
+            
             # Buscar el marcado de entrada
             marcado = MarcadoAsistencia.query.filter_by(
                 empleado_id=empleado_id,
@@ -132,24 +136,8 @@ class AsistenciaService:
             marcado.salida_marcada_manualmente = True
             marcado.confirmacion_continua = confirmar_continuidad
             
-            # Calcular horas trabajadas
-            horas_trabajadas = marcado.calcular_horas_trabajadas()
-            marcado.horas_trabajadas = horas_trabajadas
-            
-            # Calcular horas extras y normales
-            proyecto = Proyecto.query.get(proyecto_id)
             config = obtener_configuracion_asistencia(proyecto_id)
             
-            if config and config.modo_asistencia_activo:
-                horas_normales, horas_extras = calcular_horas_extras(
-                    horas_trabajadas, proyecto, marcado.turno
-                )
-                marcado.horas_normales = horas_normales
-                marcado.horas_extras = horas_extras
-            else:
-                marcado.horas_normales = horas_trabajadas
-                marcado.horas_extras = 0
-            
             # Actualizar o crear registro en la tabla dias
             dia = Dia.query.filter_by(
                 proyecto_id=proyecto_id,
@@ -158,20 +146,13 @@ class AsistenciaService:
             ).first()
             
             if not dia:
-                dia = Dia(
-                    proyecto_id=proyecto_id,
-                    empleado_id=empleado_id,
-                    fecha=fecha,
-                    dia_semana=fecha.strftime('%A')
-                )
+                dia = AsistenciaService._nuevo_dia(proyecto_id, empleado_id, fecha)
                 db.session.add(dia)
             
-            dia.horas_trabajadas = float(horas_trabajadas)
-            dia.horas_reales = float(horas_trabajadas)
-            dia.hora_entrada = marcado.hora_entrada
-            dia.hora_salida = marcado.hora_salida
-            dia.horas_extras = float(marcado.horas_extras)
+            # Calcular horas trabajadas, normales y extras y volcarlas al día
+            AsistenciaService._aplicar_salida(marcado, proyecto, config, dia)
             
+            db.session.flush()
             marcado.dia_id = dia.id
             
             db.session.commit()
@@ -191,6 +172,188 @@ class AsistenciaService:
     
 
     
+    @staticmethod
+    def marcar_lote(proyecto_id: int, marcados: List[Dict]):
+        """
+        Procesa un lote de entradas/salidas de varios empleados de un mismo proyecto
+        con una única precarga de marcados y días y un único commit
+        
+        Args:
+            proyecto_id: ID del proyecto
+            marcados: Lista de dicts con empleado_id, tipo ('entrada' o 'salida'),
+                      fecha (date), hora (time) y confirmar_continuidad (opcional)
+        
+        Returns:
+            Tupla (resultados, error). resultados es una lista alineada con la entrada:
+            {'indice', 'ok', 'error', 'marcado'}
+        """
+        try:
+            proyecto = Proyecto.query.get(proyecto_id)
+            if not proyecto or proyecto.eliminado:
+                return None, "Proyecto no encontrado"
+            
+            config = obtener_configuracion_asistencia(proyecto_id)
+            ahora = datetime.now(LOCAL_TZ)
+            
+            # Completar fecha/hora por defecto antes de la precarga
+            for item in marcados:
+                if item.get('fecha') is None:
+                    item['fecha'] = ahora.date()
+                if item.get('hora') is None:
+                    item['hora'] = ahora.time()
+            
+            empleado_ids = {item['empleado_id'] for item in marcados}
+            fechas = {item['fecha'] for item in marcados}
+            
+            # Precarga única de empleados, marcados y días involucrados
+            empleados = {
+                e.id: e for e in Empleado.query.filter(
+                    Empleado.proyecto_id == proyecto_id,
+                    Empleado.id.in_(empleado_ids)
+                ).all()
+            }
+            
+            marcados_existentes = {
+                (m.empleado_id, m.fecha): m for m in MarcadoAsistencia.query.filter(
+                    MarcadoAsistencia.proyecto_id == proyecto_id,
+                    MarcadoAsistencia.empleado_id.in_(empleado_ids),
+                    MarcadoAsistencia.fecha.in_(fechas)
+                ).all()
+            }
+            
+            dias_existentes = {
+                (d.empleado_id, d.fecha): d for d in Dia.query.filter(
+                    Dia.proyecto_id == proyecto_id,
+                    Dia.empleado_id.in_(empleado_ids),
+                    Dia.fecha.in_(fechas)
+                ).all()
+            }
+            
+            resultados = []
+            salidas = []
+            
+            for indice, item in enumerate(marcados):
+                empleado_id = item['empleado_id']
+                fecha = item['fecha']
+                clave = (empleado_id, fecha)
+                
+                if empleado_id not in empleados:
+                    resultados.append({'indice': indice, 'ok': False,
+                                       'error': 'Empleado no encontrado en el proyecto', 'marcado': None})
+                    continue
+                
+                marcado = marcados_existentes.get(clave)
+                
+                if item['tipo'] == 'entrada':
+                    if marcado and marcado.hora_entrada:
+                        resultados.append({'indice': indice, 'ok': False,
+                                           'error': 'Ya existe un marcado de entrada para este día', 'marcado': None})
+                        continue
+                    
+                    if not marcado:
+                        marcado = MarcadoAsistencia(
+                            empleado_id=empleado_id,
+                            proyecto_id=proyecto_id,
+                            fecha=fecha
+                        )
+                        db.session.add(marcado)
+                        marcados_existentes[clave] = marcado
+                    
+                    marcado.hora_entrada = item['hora']
+                    marcado.entrada_marcada_manualmente = True
+                    marcado.turno = marcado.detectar_turno_automatico(proyecto)
+                
+                else:
+                    if not marcado or not marcado.hora_entrada:
+                        resultados.append({'indice': indice, 'ok': False,
+                                           'error': 'No se encontró un marcado de entrada para este día', 'marcado': None})
+                        continue
+                    
+                    if marcado.hora_salida:
+                        resultados.append({'indice': indice, 'ok': False,
+                                           'error': 'Ya existe un marcado de salida para este día', 'marcado': None})
+                        continue
+                    
+                    marcado.hora_salida = item['hora']
+                    marcado.salida_marcada_manualmente = True
+                    marcado.confirmacion_continua = bool(item.get('confirmar_continuidad', False))
+                    
+                    dia = dias_existentes.get(clave)
+                    if not dia:
+                        dia = AsistenciaService._nuevo_dia(proyecto_id, empleado_id, fecha)
+                        db.session.add(dia)
+                        dias_existentes[clave] = dia
+                    
+                    AsistenciaService._aplicar_salida(marcado, proyecto, config, dia)
+                    salidas.append((marcado, dia))
+                
+                resultados.append({'indice': indice, 'ok': True, 'error': None, 'marcado': marcado})
+            
+            # Un único flush para obtener IDs de días nuevos y un único commit
+            db.session.flush()
+            for marcado, dia in salidas:
+                marcado.dia_id = dia.id
+            
+            # Horas extras según política, con una sola consulta de deudas y en el mismo commit
+            if config:
+                AsistenciaService._procesar_horas_extras_lote(
+                    proyecto_id,
+                    [(marcado.empleado_id, marcado.horas_extras) for marcado, _ in salidas],
+                    config
+                )
+            
+            db.session.commit()
+            
+            for resultado in resultados:
+                if resultado['marcado'] is not None:
+                    resultado['marcado'] = resultado['marcado'].to_dict()
+            
+            return resultados, None
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al procesar lote de marcados: {str(e)}")
+            return None, str(e)
+    
+    @staticmethod
+    def _calcular_horas_extras(marcado, proyecto, config) -> Tuple[float, float]:
+        """
+        Calcula (horas_normales, horas_extras) de un marcado según la configuración
+        Si el modo asistencia no está activo todas las horas se consideran normales
+        """
+        horas_trabajadas = float(marcado.horas_trabajadas or 0)
+        
+        if config and config.modo_asistencia_activo:
+            return calcular_horas_extras(horas_trabajadas, proyecto, marcado.turno)
+        
+        return horas_trabajadas, 0.0
+    
+    @staticmethod
+    def _aplicar_salida(marcado, proyecto, config, dia):
+        """Calcula las horas del marcado con salida y las vuelca en su registro de días"""
+        marcado.horas_trabajadas = marcado.calcular_horas_trabajadas()
+        marcado.horas_normales, marcado.horas_extras = AsistenciaService._calcular_horas_extras(
+            marcado, proyecto, config
+        )
+        
+        dia.horas_trabajadas = float(marcado.horas_trabajadas)
+        dia.horas_reales = float(marcado.horas_trabajadas)
+        dia.hora_entrada = marcado.hora_entrada
+        dia.hora_salida = marcado.hora_salida
+        dia.horas_extras = float(marcado.horas_extras)
+    
+    @staticmethod
+    def _nuevo_dia(proyecto_id: int, empleado_id: int, fecha: date):
+        """Crea (sin agregar a la sesión) un registro de día vacío para el empleado"""
+        return Dia(
+            proyecto_id=proyecto_id,
+            empleado_id=empleado_id,
+            fecha=fecha,
+            dia_semana=fecha.strftime('%A'),
+            horas_trabajadas=0,
+            horas_reales=0
+        )
+    
     @staticmethod
     def _procesar_horas_extras(empleado_id: int, proyecto_id: int, horas_extras: float, config):
         """Procesa las horas extras según la política configurada"""
@@ -225,6 +388,39 @@ class AsistenciaService:
         
         # elif politica == 'separar_cuentas': No hace nada, se mantienen separadas
     
+    @staticmethod
+    def _procesar_horas_extras_lote(proyecto_id: int, extras: List[Tuple[int, float]], config):
+        """
+        Procesa las horas extras de varios marcados según la política configurada, con
+        una sola consulta de deudas activas y sin commit (lo hace el llamador)
+        
+        Args:
+            proyecto_id: ID del proyecto
+            extras: Lista de (empleado_id, horas_extras) en el orden de los marcados
+        """
+        extras = [(empleado_id, float(horas)) for empleado_id, horas in extras if horas and horas > 0]
+        
+        # 'bloquear_extras' y 'separar_cuentas' no modifican las deudas
+        if not extras or config.politica_horas_extras != 'compensar_deuda':
+            return
+        
+        deudas = {}
+        for deuda in DeudaHoras.query.filter(
+            DeudaHoras.proyecto_id == proyecto_id,
+            DeudaHoras.empleado_id.in_({empleado_id for empleado_id, _ in extras}),
+            DeudaHoras.estado == 'activa'
+        ).order_by(DeudaHoras.fecha_inicio).all():
+            deudas.setdefault(deuda.empleado_id, []).append(deuda)
+        
+        for empleado_id, horas_restantes in extras:
+            for deuda in deudas.get(empleado_id, []):
+                if horas_restantes <= 0:
+                    break
+                # Una salida anterior del mismo lote pudo dejarla compensada
+                if deuda.estado != 'activa':
+                    continue
+                horas_restantes = deuda.compensar_con_horas_extras(horas_restantes, confirmar=False)
+    
     @staticmethod
     def obtener_marcados_empleado(
         empleado_id: int, 
@@ -258,6 +454,10 @@ class AsistenciaService:
             if not config or not config.modo_asistencia_activo:
                 return
             
+            proyecto = Proyecto.query.get(proyecto_id)
+            if not proyecto or proyecto.eliminado:
+                return
+            
             # Obtener empleados activos del proyecto
             empleados = Empleado.query.filter_by(
                 proyecto_id=proyecto_id,
@@ -265,8 +465,6 @@ class AsistenciaService:
                 estado_asistencia='activo'
             ).all()
             
-            proyecto = Proyecto.query.get(proyecto_id)
-            
             for empleado in empleados:
                 # Verificar si tiene marcado para ese día
                 marcado = MarcadoAsistencia.query.filter_by(
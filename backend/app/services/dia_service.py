@@ -1,10 +1,32 @@
 from app import db
 from app.models.dia import Dia, tarea_dia
-from app.models.tarea import Tarea
+from app.models.tarea import Tarea, tarea_fecha
 from app.models.usuario import Usuario
-from app.models.proyecto import Proyecto
-from sqlalchemy import func
+from app.models.proyecto import Proyecto, proyecto_vigente
+from app.models.empleado import Empleado
+from app.services.version_service import PERIODO_PROYECTO, VersionService
+from sqlalchemy import func, select, update
 from app.utils.formatters import formato_a_horas, horas_a_formato
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Iterator, List, Optional, Tuple
+
+# Filas que se leen del cursor por vez en las consultas por rango (cursor del lado del servidor)
+FILAS_POR_LECTURA = 2000
+
+# Columnas numéricas de la matriz de horas
+COLUMNAS_HORAS = ('horas_trabajadas', 'horas_reales', 'horas_extras')
+
+# Horarios que la matriz devuelve como minutos desde la medianoche (con minutos=True)
+COLUMNAS_HORARIOS = {
+    'corrido': ('hora_entrada', 'hora_salida'),
+    'turnos': ('turno_manana_entrada', 'turno_manana_salida', 'turno_tarde_entrada', 'turno_tarde_salida'),
+}
+
+
+def _minutos(valor) -> Optional[int]:
+    """time -> minutos desde la medianoche"""
+    return valor.hour * 60 + valor.minute if valor is not None else None
 
 class DiaService:
     @staticmethod
@@ -12,6 +34,7 @@ class DiaService:
         """Obtiene días del mes, opcionalmente filtrados por empleado"""
         query = Dia.query.filter(
             Dia.proyecto_id == proyecto_id,
+            proyecto_vigente(Dia.proyecto_id),
             func.extract('year', Dia.fecha) == anio,
             func.extract('month', Dia.fecha) == mes
         )
@@ -24,15 +47,119 @@ class DiaService:
         
         return query.order_by(Dia.fecha.asc()).all()
     
+    @staticmethod
+    def iterar_dias_rango(proyecto_id: int, desde: date, hasta: date,
+                          empleado_ids: Optional[List[int]] = None) -> Iterator[Tuple[Optional[int], list]]:
+        """
+        Días de un proyecto entre dos fechas, agrupados por empleado, en una sola consulta
+        sobre el índice (proyecto_id, fecha). Las filas se leen de a FILAS_POR_LECTURA con
+        un cursor del lado del servidor y se serializan sin instanciar objetos Dia
+
+        Args:
+            proyecto_id: ID del proyecto
+            desde: Primera fecha (incluida)
+            hasta: Última fecha (incluida)
+            empleado_ids: Empleados a incluir (None = todos; en proyectos personales, los días sin empleado)
+
+        Yields:
+            (empleado_id, lista de días como to_dict()) por empleado, ordenados por empleado y fecha
+        """
+        consulta = (
+            select(*Dia.columnas_dict())
+            .where(Dia.proyecto_id == proyecto_id, Dia.fecha.between(desde, hasta))
+            .order_by(Dia.empleado_id, Dia.fecha)
+            .execution_options(yield_per=FILAS_POR_LECTURA)
+        )
+        if empleado_ids is not None:
+            consulta = consulta.where(Dia.empleado_id.in_(empleado_ids))
+        
+        filas = db.session.execute(consulta)
+        for empleado_id, grupo in groupby(filas, key=lambda fila: fila.empleado_id):
+            yield empleado_id, [Dia.fila_a_dict(fila) for fila in grupo]
+    
+    @staticmethod
+    def obtener_matriz_rango(proyecto: Proyecto, desde: date, hasta: date,
+                             empleado_ids: Optional[List[int]] = None, minutos: bool = False) -> dict:
+        """
+        Días de un rango como matriz empleados x fechas: ejes compartidos y una matriz
+        por columna (una fila por empleado, una posición por fecha; null si no hay día).
+        Se arma directamente de las filas de la consulta, sin objetos Dia ni to_dict()
+        
+        Args:
+            proyecto: Proyecto
+            desde: Primera fecha (incluida)
+            hasta: Última fecha (incluida)
+            empleado_ids: Empleados a incluir (None = todos)
+            minutos: Incluir los horarios del modo del proyecto como minutos desde la medianoche
+        
+        Returns:
+            Diccionario con fechas, empleados, nombres, ids y una matriz por columna
+        """
+        cantidad_fechas = (hasta - desde).days + 1
+        
+        # Eje de empleados (los proyectos personales tienen una sola fila, sin empleado)
+        if proyecto.tipo_proyecto == 'empleados':
+            consulta = select(Empleado.id, Empleado.nombre).where(Empleado.proyecto_id == proyecto.id)
+            if empleado_ids is not None:
+                consulta = consulta.where(Empleado.id.in_(empleado_ids))
+            ejes = db.session.execute(consulta.order_by(Empleado.id)).all()
+        else:
+            ejes = [(None, None)]
+        posicion = {empleado_id: i for i, (empleado_id, _) in enumerate(ejes)}
+        
+        horarios = COLUMNAS_HORARIOS.get(proyecto.modo_horarios, ()) if minutos else ()
+        columnas = ('id',) + COLUMNAS_HORAS + horarios
+        matrices = {columna: [[None] * cantidad_fechas for _ in ejes] for columna in columnas}
+        
+        filas = db.session.execute(
+            select(Dia.empleado_id, Dia.fecha, *(getattr(Dia, columna) for columna in columnas))
+            .where(Dia.proyecto_id == proyecto.id, Dia.fecha.between(desde, hasta))
+        )
+        ordenadas = [matrices[columna] for columna in columnas]
+        cantidad_horas = 1 + len(COLUMNAS_HORAS)
+        for fila in filas:
+            i = posicion.get(fila[0])
+            if i is None:
+                continue
+            j = (fila[1] - desde).days
+            for k, matriz in enumerate(ordenadas):
+                valor = fila[2 + k]
+                matriz[i][j] = valor if k < cantidad_horas else _minutos(valor)
+        
+        matriz = {
+            'proyecto_id': proyecto.id,
+            'desde': desde.isoformat(),
+            'hasta': hasta.isoformat(),
+            'fechas': [(desde + timedelta(days=d)).isoformat() for d in range(cantidad_fechas)],
+            'empleados': [empleado_id for empleado_id, _ in ejes],
+            'nombres': [nombre for _, nombre in ejes],
+        }
+        matriz.update(('ids' if columna == 'id' else columna, valores) for columna, valores in matrices.items())
+        return matriz
+    
+    @staticmethod
+    def rango_semana(fecha: date, dia_inicio_semana: int = 0) -> Tuple[date, date]:
+        """
+        Primer y último día de la semana que contiene la fecha
+        
+        Args:
+            fecha: Fecha de la semana
+            dia_inicio_semana: Preferencia del usuario (0 = domingo, 1 = lunes)
+        """
+        # weekday(): lunes = 0 ... domingo = 6
+        inicio = 6 if not dia_inicio_semana else dia_inicio_semana - 1
+        desde = fecha - timedelta(days=(fecha.weekday() - inicio) % 7)
+        return desde, desde + timedelta(days=6)
+    
     @staticmethod
     def obtener_dia_por_id(dia_id: int):
         """Obtiene un día por ID"""
-        return Dia.query.filter(Dia.id == dia_id).first()
+        return Dia.query.filter(Dia.id == dia_id, proyecto_vigente(Dia.proyecto_id)).first()
     
     @staticmethod
     def actualizar_horas_dia(dia_id: int, horas_str: str, user_id: int):
         """Actualiza horas del día"""
-        dia = Dia.query.filter(Dia.id == dia_id).first()
+        dia = Dia.query.filter(Dia.id == dia_id, proyecto_vigente(Dia.proyecto_id)).first()
         if not dia:
             return None
         
@@ -55,17 +182,19 @@ class DiaService:
             dia.horas_trabajadas = horas_float
             dia.horas_reales = 0
         
-        db.session.commit()
-        db.session.refresh(dia)
-        
-        # Recalcular tareas afectadas
+        # Día y tareas afectadas en una sola transacción
+        db.session.flush()
         DiaService.recalcular_tareas_afectadas(dia, user_id)
+        db.session.commit()
         
         return dia
     
     @staticmethod
     def recalcular_tareas_afectadas(dia: Dia, user_id: int):
-        """Recalcula tareas afectadas según la configuración del usuario"""
+        """
+        Recalcula tareas afectadas según la configuración del usuario, sin commit:
+        se aplica en la misma transacción que la escritura del día
+        """
         tareas = Tarea.query.join(tarea_dia).filter(
             tarea_dia.c.dia_id == dia.id
         ).all()
@@ -83,14 +212,31 @@ class DiaService:
             
             tarea.horas = horas_a_formato(total_horas)
         
-        db.session.commit()
+        # Tareas de proyectos de empleados asociadas a la fecha del día: horas_trabajadas
+        # de todos los empleados en sus fechas, sumadas en una sola consulta
+        totales = db.session.execute(
+            Tarea.dias_de_fechas(tarea_fecha.c.tarea_id, func.coalesce(func.sum(Dia.horas_trabajadas), 0))
+            .where(tarea_fecha.c.tarea_id.in_(
+                select(tarea_fecha.c.tarea_id)
+                .join(Tarea, Tarea.id == tarea_fecha.c.tarea_id)
+                .where(Tarea.proyecto_id == dia.proyecto_id, tarea_fecha.c.fecha == dia.fecha)
+            ))
+            .group_by(tarea_fecha.c.tarea_id)
+        ).all()
+        for tarea_id, total_horas in totales:
+            db.session.execute(
+                update(Tarea).where(Tarea.id == tarea_id).values(horas=horas_a_formato(float(total_horas)))
+            )
+        if totales:
+            # El UPDATE masivo no pasa por el flush del ORM: se incrementa la versión a mano
+            VersionService.incrementar([(dia.proyecto_id, PERIODO_PROYECTO)])
     
     @staticmethod
     def actualizar_horarios_dia(dia_id: int, hora_entrada_str: str, hora_salida_str: str, user_id: int):
         """Actualiza horarios de entrada/salida y calcula horas_trabajadas automáticamente"""
         from datetime import datetime, timedelta
         
-        dia = Dia.query.filter(Dia.id == dia_id).first()
+        dia = Dia.query.filter(Dia.id == dia_id, proyecto_vigente(Dia.proyecto_id)).first()
         if not dia:
             return None
         
@@ -119,11 +265,10 @@ class DiaService:
             # Las horas_reales no se modifican en tablero de empleados
             # pero si existían, las mantenemos
             
-            db.session.commit()
-            db.session.refresh(dia)
-            
-            # Recalcular tareas afectadas
+            # Día y tareas afectadas en una sola transacción
+            db.session.flush()
             DiaService.recalcular_tareas_afectadas(dia, user_id)
+            db.session.commit()
             
             return dia
             
@@ -147,7 +292,7 @@ class DiaService:
         """
         from datetime import datetime, timedelta
         
-        dia = Dia.query.filter(Dia.id == dia_id).first()
+        dia = Dia.query.filter(Dia.id == dia_id, proyecto_vigente(Dia.proyecto_id)).first()
         if not dia:
             return None
         
@@ -228,12 +373,11 @@ class DiaService:
             # Guardar horas extras calculadas
             dia.horas_extras = round(horas_extras_calculadas, 2) if horas_extras_calculadas > 0 else 0
             
-            db.session.commit()
-            db.session.refresh(dia)
-            
-            # Recalcular tareas si es necesario
+            # Recalcular tareas si es necesario (en la misma transacción que el día)
+            db.session.flush()
             if user_id:
                 DiaService.recalcular_tareas_afectadas(dia, user_id)
+            db.session.commit()
             
             return dia
             
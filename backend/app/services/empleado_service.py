@@ -1,10 +1,71 @@
 from app import db
 from app.models.empleado import Empleado
 from app.models.dia import Dia
+from app.services.proyecto_mes_service import ProyectoMesService
+from app.services.version_service import VersionService, PERIODO_PROYECTO
 from app.utils.constants import DIAS_ES
+from sqlalchemy import func, insert, select
+from typing import List, Optional
 import calendar
+import time
+from datetime import date
 from datetime import datetime as dt
 
+# Máximo de empleados por importación
+IMPORTACION_MAX_EMPLEADOS = 5000
+
+# Filas por sentencia INSERT de la importación (acota el tamaño de cada paquete a MySQL)
+FILAS_POR_SENTENCIA = 5000
+
+
+def _calendario(meses) -> List[tuple]:
+    """(fecha, nombre del día) de todos los días de los meses dados"""
+    return [
+        (fecha, DIAS_ES[fecha.weekday()])
+        for anio, mes in meses
+        for fecha in (date(anio, mes, dia) for dia in range(1, calendar.monthrange(anio, mes)[1] + 1))
+    ]
+
+
+def _insertar_por_partes(tabla, filas: list):
+    """INSERT multi-fila dentro de la transacción actual, en partes de FILAS_POR_SENTENCIA"""
+    conexion = db.session.connection()
+    for inicio in range(0, len(filas), FILAS_POR_SENTENCIA):
+        conexion.execute(insert(tabla), filas[inicio:inicio + FILAS_POR_SENTENCIA])
+
+
+def _validar_filas(empleados: list):
+    """
+    Normaliza las filas de la importación
+
+    Returns:
+        Tupla (filas [{'nombre', 'email'}], errores [{'fila', 'error'}])
+    """
+    filas, errores, emails = [], [], set()
+    for indice, fila in enumerate(empleados):
+        if isinstance(fila, str):
+            fila = {'nombre': fila}
+        if not isinstance(fila, dict):
+            errores.append({'fila': indice, 'error': 'Cada empleado debe ser un objeto o un nombre'})
+            continue
+
+        nombre = str(fila.get('nombre') or '').strip()
+        email = str(fila.get('email') or '').strip().lower() or None
+
+        if not nombre:
+            errores.append({'fila': indice, 'error': 'Falta el nombre'})
+        elif len(nombre) > 255:
+            errores.append({'fila': indice, 'error': 'El nombre supera los 255 caracteres'})
+        elif email and ('@' not in email or len(email) > 255):
+            errores.append({'fila': indice, 'error': f'Email inválido: {email}'})
+        elif email and email in emails:
+            errores.append({'fila': indice, 'error': f'Email repetido: {email}'})
+        else:
+            if email:
+                emails.add(email)
+            filas.append({'nombre': nombre, 'email': email})
+    return filas, errores
+
 class EmpleadoService:
     @staticmethod
     def obtener_empleados_proyecto(proyecto_id: int):
@@ -21,29 +82,25 @@ class EmpleadoService:
         """Agrega un empleado a un proyecto y genera sus días"""
         from app.models.proyecto import Proyecto
         
-        proyecto = Proyecto.query.filter_by(id=proyecto_id).first()
+        # Mismo bloqueo del proyecto que importar_empleados: serializa las altas de empleados
+        proyecto = db.session.execute(
+            select(Proyecto).where(Proyecto.id == proyecto_id, Proyecto.eliminado == False).with_for_update()
+        ).scalar_one_or_none()
         if not proyecto or proyecto.tipo_proyecto != 'empleados':
+            db.session.rollback()
             return None
         
-        # Crear empleado
+        # Crear empleado (flush para obtener el ID; el empleado y sus días van en un solo commit)
         empleado = Empleado(
             nombre=nombre,
             proyecto_id=proyecto_id,
             activo=True
         )
         db.session.add(empleado)
-        db.session.commit()
-        db.session.refresh(empleado)
+        db.session.flush()
         
         # Generar días para todos los meses existentes del proyecto
-        dias_existentes = db.session.query(
-            db.func.extract('year', Dia.fecha).label('anio'),
-            db.func.extract('month', Dia.fecha).label('mes')
-        ).filter(Dia.proyecto_id == proyecto_id).distinct().all()
-        
-        for anio_mes in dias_existentes:
-            anio = int(anio_mes[0])
-            mes = int(anio_mes[1])
+        for anio, mes in ProyectoMesService.obtener_meses(proyecto_id):
             month_range = calendar.monthrange(anio, mes)[1]
             
             for day in range(1, month_range + 1):
@@ -63,6 +120,114 @@ class EmpleadoService:
         db.session.commit()
         return empleado
     
+    @staticmethod
+    def importar_empleados(proyecto_id: int, empleados: list, invitar: bool = False,
+                           mensaje_invitacion: Optional[str] = None):
+        """
+        Importa empleados en bloque: inserta los empleados, sus días de todos los meses
+        del proyecto y (opcionalmente) sus invitaciones con INSERTs multi-fila en una
+        sola transacción. Los emails de las invitaciones se envían en segundo plano.
+
+        Args:
+            proyecto_id: ID del proyecto (tipo 'empleados')
+            empleados: Lista de {'nombre', 'email' (opcional)} o de nombres
+            invitar: Crear invitaciones para los empleados con email
+            mensaje_invitacion: Mensaje personalizado de las invitaciones
+
+        Returns:
+            Tupla (resultado, error); con filas inválidas el error es la lista de errores por fila
+        """
+        from app.models.proyecto import Proyecto
+        from app.services.invitacion_service import InvitacionService
+
+        if not empleados:
+            return None, 'Se requiere al menos un empleado'
+        if len(empleados) > IMPORTACION_MAX_EMPLEADOS:
+            return None, f'Máximo {IMPORTACION_MAX_EMPLEADOS} empleados por importación'
+
+        filas, errores = _validar_filas(empleados)
+        if errores:
+            return None, errores
+
+        inicio = time.perf_counter()
+        try:
+            # El bloqueo del proyecto serializa las altas de empleados: los IDs nuevos
+            # son los mayores al último existente (MySQL no tiene INSERT ... RETURNING)
+            proyecto = db.session.execute(
+                select(Proyecto).where(Proyecto.id == proyecto_id, Proyecto.eliminado == False).with_for_update()
+            ).scalar_one_or_none()
+            if not proyecto or proyecto.tipo_proyecto != 'empleados':
+                db.session.rollback()
+                return None, 'Proyecto no encontrado o no es de tipo empleados'
+
+            id_previo = db.session.execute(
+                select(func.coalesce(func.max(Empleado.id), 0)).where(Empleado.proyecto_id == proyecto_id)
+            ).scalar()
+
+            _insertar_por_partes(Empleado.__table__, [
+                {'nombre': fila['nombre'], 'proyecto_id': proyecto_id, 'activo': True}
+                for fila in filas
+            ])
+
+            creados = db.session.execute(
+                select(Empleado.id, Empleado.nombre)
+                .where(Empleado.proyecto_id == proyecto_id, Empleado.id > id_previo)
+                .order_by(Empleado.id)
+            ).all()
+            if [e.nombre for e in creados] != [fila['nombre'] for fila in filas]:
+                raise RuntimeError('Los empleados insertados no coinciden con la importación')
+
+            # Días de todos los meses del proyecto para cada empleado nuevo
+            meses = ProyectoMesService.obtener_meses(proyecto_id)
+            calendario = _calendario(meses)
+            _insertar_por_partes(Dia.__table__, [
+                {
+                    'fecha': fecha,
+                    'dia_semana': dia_semana,
+                    'horas_trabajadas': 0,
+                    'horas_reales': 0,
+                    'proyecto_id': proyecto_id,
+                    'empleado_id': empleado.id
+                }
+                for empleado in creados
+                for fecha, dia_semana in calendario
+            ])
+
+            VersionService.incrementar(
+                [(proyecto_id, PERIODO_PROYECTO)] + [(proyecto_id, anio * 100 + mes) for anio, mes in meses]
+            )
+
+            invitaciones, trabajo_envio = 0, None
+            if invitar:
+                invitaciones, trabajo_envio = InvitacionService.crear_invitaciones_lote(
+                    proyecto_id,
+                    [(empleado.id, fila['email']) for empleado, fila in zip(creados, filas) if fila['email']],
+                    mensaje_invitacion
+                )
+
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al importar empleados: {str(e)}")
+            return None, str(e)
+
+        segundos = time.perf_counter() - inicio
+        dias = len(creados) * len(calendario)
+        print(f"📥 Importación en proyecto {proyecto_id}: {len(creados)} empleados, "
+              f"{dias} días, {invitaciones} invitaciones en {segundos:.2f}s")
+
+        return {
+            'empleados_creados': len(creados),
+            'dias_creados': dias,
+            'invitaciones_creadas': invitaciones,
+            'trabajo_envio_id': trabajo_envio.id if trabajo_envio else None,
+            'segundos': round(segundos, 3),
+            'empleados_por_segundo': round(len(creados) / segundos, 1) if segundos else None,
+            'filas_por_segundo': round((len(creados) + dias + invitaciones) / segundos, 1) if segundos else None,
+            'empleados': [{'id': e.id, 'nombre': e.nombre} for e in creados]
+        }, None
+    
     @staticmethod
     def actualizar_empleado(empleado_id: int, nombre: str = None, activo: bool = None):
         """Actualiza un empleado"""
@@ -80,12 +245,7 @@ class EmpleadoService:
     
     @staticmethod
     def eliminar_empleado(empleado_id: int):
-        """Elimina un empleado y todos sus días"""
-        empleado = Empleado.query.filter_by(id=empleado_id).first()
-        if not empleado:
-            return False
+        """Elimina un empleado y todos sus datos (días, marcados, deudas) con DELETEs por lotes"""
+        from app.services.purga_service import PurgaService
         
-        # Los días se eliminarán automáticamente por el cascade
-        db.session.delete(empleado)
-        db.session.commit()
-        return True
+        return PurgaService.eliminar_empleado(empleado_id)
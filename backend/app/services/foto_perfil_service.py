@@ -0,0 +1,238 @@
+"""
+Servicio de fotos de perfil
+Decodifica la imagen subida (data URL o base64), la recorta al centro en un
+cuadrado y genera variantes de tamaño fijo en WebP y JPEG. Las variantes se
+codifican en paralelo en un pool de hilos (Pillow libera el GIL al redimensionar
+y comprimir) y se guardan en el almacén de imágenes bajo
+'<usuario_id>/<hash>/<lado>.<formato>'. La fila del usuario solo guarda el hash.
+"""
+
+from app.config import FOTOS_TAMANOS, FOTOS_WORKERS, FOTOS_MAX_BYTES
+from app.utils.almacen_imagenes import obtener_almacen
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+import base64
+import binascii
+import hashlib
+import io
+import threading
+
+TAMANOS = tuple(sorted({int(lado) for lado in FOTOS_TAMANOS.split(',')}, reverse=True))
+MAX_BYTES = int(FOTOS_MAX_BYTES)
+
+# Límite de píxeles de la imagen original (evita bombas de descompresión)
+MAX_PIXELES = 40_000_000
+
+# Formato -> (formato de Pillow, opciones de guardado)
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+MIMETYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+
+# Errores de Pillow con archivos dañados (truncados, encabezados inválidos) al decodificar
+ERRORES_DECODIFICACION = (OSError, SyntaxError)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Pillow se importa recién al procesar la primera foto: los procesos que no
+# reciben fotos (scheduler, scripts, la mayoría de los requests) no lo cargan
+Image = None
+ImageOps = None
+
+
+def _cargar_pillow():
+    global Image, ImageOps
+    if Image is None:
+        from PIL import Image as modulo_image, ImageOps as modulo_image_ops
+        ImageOps = modulo_image_ops
+        Image = modulo_image
+    return Image
+
+
+def _obtener_pool() -> ThreadPoolExecutor:
+    """Pool de hilos del proceso (se crea en el primer uso, después del fork de gunicorn)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=int(FOTOS_WORKERS), thread_name_prefix='fotos')
+    return _pool
+
+
+def _clave(usuario_id: int, huella: str, lado: int = None, formato: str = None) -> str:
+    if lado is None:
+        return f"{usuario_id}/{huella}"
+    return f"{usuario_id}/{huella}/{lado}.{formato}"
+
+
+def decodificar(foto) -> bytes:
+    """
+    Obtiene los bytes de la imagen
+
+    Args:
+        foto: Data URL ('data:image/png;base64,...'), base64 o bytes
+
+    Returns:
+        Contenido de la imagen
+
+    Raises:
+        ValueError: Si no es base64 válido o supera FOTOS_MAX_BYTES
+    """
+    if isinstance(foto, bytes):
+        datos = foto
+    else:
+        if foto.startswith('data:'):
+            foto = foto.partition(',')[2]
+        # Se rechaza antes de decodificar (4 caracteres base64 = 3 bytes)
+        if len(foto) * 3 // 4 > MAX_BYTES:
+            raise ValueError(f"La imagen supera el máximo de {MAX_BYTES // (1024 * 1024)} MB")
+        try:
+            datos = base64.b64decode(foto, validate=False)
+        except (binascii.Error, ValueError):
+            raise ValueError("La foto no es una imagen en base64 válida")
+
+    if len(datos) > MAX_BYTES:
+        raise ValueError(f"La imagen supera el máximo de {MAX_BYTES // (1024 * 1024)} MB")
+    return datos
+
+
+def _abrir_cuadrada(datos: bytes, lado: int) -> 'Image.Image':
+    """Abre la imagen, aplica la orientación EXIF y la recorta al centro en lado x lado"""
+    try:
+        imagen = Image.open(io.BytesIO(datos))
+    except Image.UnidentifiedImageError:
+        raise ValueError("El archivo no es una imagen válida")
+    except Image.DecompressionBombError:
+        # Pillow la rechaza al abrirla, antes de la verificación de MAX_PIXELES
+        raise ValueError("La imagen tiene demasiados píxeles")
+
+    ancho, alto = imagen.size
+    if ancho * alto > MAX_PIXELES:
+        raise ValueError("La imagen tiene demasiados píxeles")
+
+    # JPEG: decodifica directamente a una escala reducida (1/2, 1/4, 1/8) si alcanza
+    imagen.draft('RGB', (lado, lado))
+    try:
+        imagen = ImageOps.exif_transpose(imagen)
+    except Exception:
+        pass  # EXIF corrupto: se usa la orientación original
+
+    if imagen.mode in ('RGBA', 'LA', 'P'):
+        # Fondo blanco para transparencias (JPEG no las admite)
+        imagen = imagen.convert('RGBA')
+        fondo = Image.new('RGB', imagen.size, (255, 255, 255))
+        fondo.paste(imagen, mask=imagen.getchannel('A'))
+        imagen = fondo
+    elif imagen.mode != 'RGB':
+        imagen = imagen.convert('RGB')
+
+    # Recorte centrado y reducción en un solo paso (reducing_gap: reducción previa rápida)
+    ancho, alto = imagen.size
+    corte = min(ancho, alto)
+    izquierda, arriba = (ancho - corte) // 2, (alto - corte) // 2
+    return imagen.resize(
+        (lado, lado), Image.LANCZOS,
+        box=(izquierda, arriba, izquierda + corte, arriba + corte),
+        reducing_gap=3.0
+    )
+
+
+def _codificar(cuadrada: 'Image.Image', lado: int, formato: str) -> bytes:
+    """Redimensiona la imagen cuadrada y la comprime en el formato pedido"""
+    imagen = cuadrada if cuadrada.size[0] == lado else cuadrada.resize((lado, lado), Image.LANCZOS)
+    formato_pil, opciones = FORMATOS[formato]
+    salida = io.BytesIO()
+    imagen.save(salida, formato_pil, **opciones)
+    return salida.getvalue()
+
+
+class FotoPerfilService:
+    """Servicio para procesar, guardar y eliminar fotos de perfil"""
+
+    @staticmethod
+    def procesar(datos: bytes) -> Tuple[str, Dict[Tuple[int, str], bytes]]:
+        """
+        Genera las variantes de una imagen
+
+        Args:
+            datos: Contenido de la imagen original
+
+        Returns:
+            (hash del contenido, {(lado, formato): bytes})
+
+        Raises:
+            ValueError: Si la imagen no es válida o está dañada
+        """
+        huella = hashlib.sha256(datos).hexdigest()[:32]
+        try:
+            _cargar_pillow()
+            # La decodificación real ocurre al redimensionar: ahí aparecen los archivos truncados
+            cuadrada = _abrir_cuadrada(datos, TAMANOS[0])
+
+            # Una copia por tarea: Image.save modifica la imagen (encoderinfo) y no es
+            # seguro usar la misma instancia desde varios hilos
+            pool = _obtener_pool()
+            futuros = {
+                (lado, formato): pool.submit(_codificar, cuadrada.copy(), lado, formato)
+                for lado in TAMANOS for formato in FORMATOS
+            }
+            return huella, {variante: futuro.result() for variante, futuro in futuros.items()}
+        except ERRORES_DECODIFICACION:
+            raise ValueError("La imagen está dañada o incompleta")
+
+    @staticmethod
+    def guardar(usuario, foto) -> str:
+        """
+        Procesa la foto, guarda sus variantes y la asigna al usuario (sin commit).
+        Las variantes de la foto anterior se eliminan con eliminar_anterior() después del commit
+
+        Args:
+            usuario: Instancia de Usuario
+            foto: Data URL, base64 o bytes
+
+        Returns:
+            Hash de la foto anterior (o None)
+
+        Raises:
+            ValueError: Si la imagen no es válida
+        """
+        anterior = usuario.foto_perfil_hash
+        huella, variantes = FotoPerfilService.procesar(decodificar(foto))
+
+        if huella != anterior:
+            almacen = obtener_almacen()
+            for (lado, formato), contenido in variantes.items():
+                almacen.guardar(_clave(usuario.id, huella, lado, formato), contenido)
+
+        usuario.foto_perfil_hash = huella
+        usuario.foto_perfil = None
+        return anterior if anterior != huella else None
+
+    @staticmethod
+    def quitar(usuario) -> str:
+        """Quita la foto del usuario (sin commit); devuelve el hash anterior"""
+        anterior = usuario.foto_perfil_hash
+        usuario.foto_perfil_hash = None
+        usuario.foto_perfil = None
+        return anterior
+
+    @staticmethod
+    def eliminar_anterior(usuario_id: int, huella: str):
+        """Elimina del almacén las variantes de una foto reemplazada"""
+        if not huella:
+            return
+        try:
+            obtener_almacen().eliminar_prefijo(_clave(usuario_id, huella))
+        except Exception as e:
+            # Un archivo huérfano no afecta al usuario: solo se registra
+            print(f"⚠️ No se pudo eliminar la foto anterior {usuario_id}/{huella}: {e}")
+
+    @staticmethod
+    def ruta_variante(usuario_id: int, huella: str, lado: int, formato: str):
+        """Ruta local de una variante para servirla, o None si no existe"""
+        if lado not in TAMANOS or formato not in FORMATOS:
+            return None
+        return obtener_almacen().ruta(_clave(usuario_id, huella, lado, formato))
@@ -0,0 +1,167 @@
+"""
+Servicio para escrituras idempotentes con claves provistas por el cliente
+Un reintento con la misma clave devuelve la respuesta almacenada sin volver a ejecutar la operación
+"""
+
+from app import db
+from app.models import ClaveIdempotencia
+from app.config import IDEMPOTENCIA_TTL_HORAS
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timezone, timedelta
+import hashlib
+import time
+
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
+# Segundos tras los cuales una solicitud 'en_proceso' se considera abandonada (worker caído)
+SEGUNDOS_SOLICITUD_ABANDONADA = 120
+
+
+def _ahora():
+    """Hora local sin tzinfo (como se almacena en MySQL)"""
+    return datetime.now(LOCAL_TZ).replace(tzinfo=None)
+
+
+class IdempotenciaService:
+    """Servicio para reservar claves de idempotencia y almacenar sus respuestas"""
+
+    @staticmethod
+    def calcular_hash(cuerpo: bytes) -> str:
+        """Hash SHA-256 del cuerpo de la solicitud"""
+        return hashlib.sha256(cuerpo or b'').hexdigest()
+
+    @staticmethod
+    def reservar(usuario_id: int, clave: str, endpoint: str, hash_solicitud: str):
+        """
+        Intenta reservar una clave para ejecutar la operación
+        La restricción única (usuario_id, clave) serializa los duplicados concurrentes:
+        solo una solicitud logra insertar la reserva
+
+        Args:
+            usuario_id: ID del usuario autenticado
+            clave: Valor del header Idempotency-Key
+            endpoint: Endpoint que se está ejecutando
+            hash_solicitud: Hash del body de la solicitud
+
+        Returns:
+            Tupla (estado, registro):
+            - ('reservada', registro): ejecutar la operación
+            - ('completada', registro): reenviar la respuesta almacenada
+            - ('en_proceso', None): otra solicitud con la misma clave sigue ejecutándose
+            - ('conflicto', None): la clave ya se usó con otro endpoint o body
+        """
+        registro = IdempotenciaService._buscar(usuario_id, clave)
+
+        if registro is not None:
+            if registro.fecha_expiracion <= _ahora() or IdempotenciaService._abandonada(registro):
+                # Clave vencida o reserva huérfana: se libera y se vuelve a reservar
+                db.session.delete(registro)
+                db.session.commit()
+            else:
+                return IdempotenciaService._estado_existente(registro, endpoint, hash_solicitud)
+
+        registro = ClaveIdempotencia(
+            usuario_id=usuario_id,
+            clave=clave,
+            endpoint=endpoint,
+            hash_solicitud=hash_solicitud,
+            estado='en_proceso',
+            fecha_creacion=_ahora(),
+            fecha_expiracion=_ahora() + timedelta(hours=int(IDEMPOTENCIA_TTL_HORAS))
+        )
+
+        try:
+            db.session.add(registro)
+            db.session.commit()
+            return 'reservada', registro
+        except IntegrityError:
+            # Otra solicitud concurrente reservó la clave primero
+            db.session.rollback()
+            registro = IdempotenciaService._buscar(usuario_id, clave)
+            if registro is None:
+                return 'en_proceso', None
+            return IdempotenciaService._estado_existente(registro, endpoint, hash_solicitud)
+
+    @staticmethod
+    def esperar_respuesta(usuario_id: int, clave: str, timeout_segundos: float = 5.0):
+        """
+        Espera a que una solicitud concurrente con la misma clave termine
+
+        Returns:
+            Registro completado o None si no terminó dentro del timeout
+        """
+        limite = time.monotonic() + timeout_segundos
+
+        while time.monotonic() < limite:
+            time.sleep(0.1)
+            db.session.expire_all()
+            registro = IdempotenciaService._buscar(usuario_id, clave)
+            if registro is None:
+                return None
+            if registro.estado == 'completada':
+                return registro
+
+        return None
+
+    @staticmethod
+    def completar(registro_id: int, codigo_estado: int, respuesta: str):
+        """Guarda la respuesta de la operación para futuros reintentos"""
+        try:
+            registro = ClaveIdempotencia.query.get(registro_id)
+            if registro:
+                registro.estado = 'completada'
+                registro.codigo_estado = codigo_estado
+                registro.respuesta = respuesta
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al completar clave de idempotencia: {str(e)}")
+
+    @staticmethod
+    def liberar(registro_id: int):
+        """Elimina la reserva cuando la operación falló, para permitir reintentar"""
+        try:
+            db.session.rollback()
+            ClaveIdempotencia.query.filter_by(id=registro_id).delete()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al liberar clave de idempotencia: {str(e)}")
+
+    @staticmethod
+    def purgar_expiradas() -> int:
+        """
+        Elimina las claves vencidas (tarea programada)
+
+        Returns:
+            Cantidad de claves eliminadas
+        """
+        try:
+            cantidad = ClaveIdempotencia.query.filter(
+                ClaveIdempotencia.fecha_expiracion <= _ahora()
+            ).delete(synchronize_session=False)
+            db.session.commit()
+            return cantidad
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al purgar claves de idempotencia: {str(e)}")
+            return 0
+
+    @staticmethod
+    def _buscar(usuario_id: int, clave: str):
+        return ClaveIdempotencia.query.filter_by(usuario_id=usuario_id, clave=clave).first()
+
+    @staticmethod
+    def _abandonada(registro) -> bool:
+        return (
+            registro.estado == 'en_proceso' and
+            registro.fecha_creacion <= _ahora() - timedelta(seconds=SEGUNDOS_SOLICITUD_ABANDONADA)
+        )
+
+    @staticmethod
+    def _estado_existente(registro, endpoint: str, hash_solicitud: str):
+        if registro.endpoint != endpoint or registro.hash_solicitud != hash_solicitud:
+            return 'conflicto', None
+        if registro.estado == 'completada':
+            return 'completada', registro
+        return 'en_proceso', None
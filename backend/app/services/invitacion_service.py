@@ -3,13 +3,20 @@ Servicio para gestión de invitaciones a proyectos
 """
 
 from app import db
-from app.models import InvitacionProyecto, Notificacion, Empleado, Usuario, Proyecto, EmpleadoUsuario
+from app.models import InvitacionProyecto, Notificacion, Empleado, Usuario, Proyecto, EmpleadoUsuario, TrabajoFondo
+from app.models.proyecto import proyecto_vigente
 from app.services.email_service import EmailService
+from app.services.recalculo_service import RecalculoService
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, insert, select, update
 
 LOCAL_TZ = timezone(timedelta(hours=-3))
 
+TIPO_ENVIO_INVITACIONES = 'envio_invitaciones'
+
+# Emails enviados por commit en el envío en segundo plano
+ENVIO_TAMANO_LOTE = 50
+
 
 class InvitacionService:
     """Servicio para manejar invitaciones a proyectos"""
@@ -85,8 +92,8 @@ class InvitacionService:
             Invitación creada o None si hay error
         """
         try:
-            # Verificar que el proyecto y empleado existen
-            proyecto = Proyecto.query.get(proyecto_id)
+            # Verificar que el proyecto (no eliminado) y el empleado existen
+            proyecto = Proyecto.query.filter(Proyecto.id == proyecto_id, Proyecto.eliminado == False).first()
             empleado = Empleado.query.get(empleado_id)
             admin = Usuario.query.get(admin_usuario_id)
             
@@ -166,7 +173,9 @@ class InvitacionService:
         """
         try:
             # Buscar la invitación
-            invitacion = InvitacionProyecto.query.filter_by(token=token).first()
+            invitacion = InvitacionProyecto.query.filter(
+                InvitacionProyecto.token == token, proyecto_vigente(InvitacionProyecto.proyecto_id)
+            ).first()
             
             if not invitacion:
                 return None, "Invitación no encontrada"
@@ -241,7 +250,9 @@ class InvitacionService:
         """
         try:
             # Buscar la invitación
-            invitacion = InvitacionProyecto.query.filter_by(token=token).first()
+            invitacion = InvitacionProyecto.query.filter(
+                InvitacionProyecto.token == token, proyecto_vigente(InvitacionProyecto.proyecto_id)
+            ).first()
             
             if not invitacion:
                 return None, "Invitación no encontrada"
@@ -320,7 +331,9 @@ class InvitacionService:
             Resultado de la operación
         """
         try:
-            invitacion = InvitacionProyecto.query.filter_by(token=token).first()
+            invitacion = InvitacionProyecto.query.filter(
+                InvitacionProyecto.token == token, proyecto_vigente(InvitacionProyecto.proyecto_id)
+            ).first()
             
             if not invitacion:
                 return None, "Invitación no encontrada"
@@ -379,7 +392,9 @@ class InvitacionService:
     def reenviar_invitacion(invitacion_id: int, admin_usuario_id: int):
         """Reenvía una invitación existente"""
         try:
-            invitacion = InvitacionProyecto.query.get(invitacion_id)
+            invitacion = InvitacionProyecto.query.filter(
+                InvitacionProyecto.id == invitacion_id, proyecto_vigente(InvitacionProyecto.proyecto_id)
+            ).first()
             
             if not invitacion:
                 return None, "Invitación no encontrada"
@@ -431,3 +446,154 @@ class InvitacionService:
         except Exception as e:
             db.session.rollback()
             return None, str(e)
+    
+    @staticmethod
+    def crear_invitaciones_lote(proyecto_id: int, destinatarios: list, mensaje_invitacion: str = None):
+        """
+        Crea invitaciones en bloque dentro de la transacción actual (sin commit) y encola
+        el envío de sus emails, que hace el scheduler con procesar_envios_pendientes()
+
+        Args:
+            proyecto_id: ID del proyecto
+            destinatarios: Lista de (empleado_id, email) de empleados sin usuario asociado
+            mensaje_invitacion: Mensaje personalizado opcional
+
+        Returns:
+            Tupla (cantidad de invitaciones, TrabajoFondo del envío o None)
+        """
+        if not destinatarios:
+            return 0, None
+
+        # Usuarios ya registrados, en una sola consulta (los emails llegan en minúsculas)
+        emails = [email for _, email in destinatarios]
+        email_normalizado = func.lower(Usuario.email)
+        usuarios = dict(db.session.execute(
+            select(email_normalizado, Usuario.id).where(email_normalizado.in_(emails))
+        ).all())
+
+        ahora = datetime.now(LOCAL_TZ)
+        expiracion = InvitacionProyecto.crear_fecha_expiracion()
+        db.session.connection().execute(insert(InvitacionProyecto.__table__), [
+            {
+                'proyecto_id': proyecto_id,
+                'empleado_id': empleado_id,
+                'email_destinatario': email,
+                'usuario_existente_id': usuarios.get(email),
+                'estado': 'pendiente',
+                'token': InvitacionProyecto.generar_token(),
+                'mensaje_invitacion': mensaje_invitacion,
+                'fecha_envio': ahora,
+                'fecha_expiracion': expiracion,
+                'email_pendiente': True,
+                'intentos_reenvio': 0
+            }
+            for empleado_id, email in destinatarios
+        ])
+
+        trabajo = TrabajoFondo(
+            tipo=TIPO_ENVIO_INVITACIONES,
+            proyecto_id=proyecto_id,
+            estado='pendiente',
+            total=len(destinatarios)
+        )
+        db.session.add(trabajo)
+        db.session.flush()
+
+        return len(destinatarios), trabajo
+    
+    @staticmethod
+    def procesar_envios_pendientes() -> int:
+        """
+        Envía los emails de las invitaciones creadas en lote (tarea programada)
+
+        Returns:
+            Cantidad de trabajos procesados
+        """
+        procesados = 0
+
+        while True:
+            trabajo = RecalculoService.reclamar_siguiente(TIPO_ENVIO_INVITACIONES)
+            if trabajo is None:
+                break
+            InvitacionService.procesar_envio(trabajo)
+            procesados += 1
+
+        return procesados
+    
+    @staticmethod
+    def procesar_envio(trabajo, tamano_lote: int = ENVIO_TAMANO_LOTE):
+        """
+        Envía por lotes los emails pendientes de un proyecto desde el checkpoint del trabajo.
+        Cada lote marca sus invitaciones como enviadas y guarda el checkpoint en un commit;
+        si falla un email la invitación queda creada y se puede reenviar desde el panel
+
+        Args:
+            trabajo: TrabajoFondo en estado 'en_proceso'
+            tamano_lote: Emails por commit
+
+        Returns:
+            El trabajo con su estado final
+        """
+        trabajo_id = trabajo.id
+
+        try:
+            proyecto = Proyecto.query.get(trabajo.proyecto_id)
+            if not proyecto:
+                raise ValueError('Proyecto no encontrado')
+            admin = Usuario.query.get(proyecto.usuario_id)
+            nombre_admin = admin.nombre_completo or admin.username
+
+            while True:
+                invitaciones = InvitacionProyecto.query.filter(
+                    InvitacionProyecto.proyecto_id == proyecto.id,
+                    InvitacionProyecto.email_pendiente == True,
+                    InvitacionProyecto.id > trabajo.checkpoint
+                ).order_by(InvitacionProyecto.id).limit(tamano_lote).all()
+
+                if not invitaciones:
+                    break
+
+                enviados = 0
+                for invitacion in invitaciones:
+                    try:
+                        if EmailService.enviar_invitacion_proyecto(
+                            email_destinatario=invitacion.email_destinatario,
+                            nombre_proyecto=proyecto.nombre,
+                            nombre_admin=nombre_admin,
+                            token=invitacion.token,
+                            mensaje_personalizado=invitacion.mensaje_invitacion,
+                            es_nuevo_usuario=invitacion.usuario_existente_id is None
+                        ):
+                            enviados += 1
+                    except Exception as email_error:
+                        print(f"⚠️ No se pudo enviar la invitación {invitacion.id}: {str(email_error)}")
+
+                db.session.execute(
+                    update(InvitacionProyecto)
+                    .where(InvitacionProyecto.id.in_([i.id for i in invitaciones]))
+                    .values(email_pendiente=False)
+                )
+                trabajo.checkpoint = invitaciones[-1].id
+                trabajo.procesados += len(invitaciones)
+                trabajo.actualizados += enviados
+                db.session.commit()
+
+                db.session.refresh(trabajo)
+                if trabajo.estado != 'en_proceso':
+                    print(f"⏹️ Envío de invitaciones {trabajo_id} interrumpido (estado: {trabajo.estado})")
+                    return trabajo
+
+                if len(invitaciones) < tamano_lote:
+                    break
+
+            RecalculoService.finalizar(trabajo_id, 'completado')
+            print(f"📧 Envío de invitaciones {trabajo_id} completado: "
+                  f"{trabajo.actualizados}/{trabajo.procesados} emails enviados")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error en envío de invitaciones {trabajo_id}: {str(e)}")
+            RecalculoService.finalizar(trabajo_id, 'error', str(e))
+
+        db.session.refresh(trabajo)
+        return trabajo
@@ -10,7 +10,8 @@ from app.models import (
 )
 from app.utils import (
     obtener_hora_cierre_turno,
-    calcular_horas_extras
+    calcular_horas_extras,
+    calcular_horas_lote
 )
 from datetime import datetime, date, time, timedelta, timezone
 from app.services.notificacion_service import NotificacionService
@@ -35,6 +36,7 @@ class MarcadoAutomaticoService:
                 ConfiguracionAsistencia,
                 Proyecto.id == ConfiguracionAsistencia.proyecto_id
             ).filter(
+                Proyecto.eliminado == False,
                 ConfiguracionAsistencia.modo_asistencia_activo == True,
                 ConfiguracionAsistencia.marcar_salida_automatica == True
             ).all()
@@ -59,14 +61,35 @@ class MarcadoAutomaticoService:
                     MarcadoAsistencia.hora_salida.is_(None)
                 ).all()
                 
+                a_cerrar = []
                 for marcado in marcados_pendientes:
-                    if MarcadoAutomaticoService._debe_marcar_salida_automatica(
+                    if not MarcadoAutomaticoService._debe_marcar_salida_automatica(
                         marcado, proyecto, config
                     ):
-                        MarcadoAutomaticoService._marcar_salida_automatica(
-                            marcado, proyecto, config
-                        )
-                        marcados_procesados += 1
+                        continue
+                    
+                    hora_cierre = obtener_hora_cierre_turno(proyecto, marcado.turno)
+                    if not hora_cierre:
+                        print(f"⚠️ No se pudo determinar hora de cierre para marcado {marcado.id}")
+                        continue
+                    a_cerrar.append((marcado, hora_cierre))
+                
+                if not a_cerrar:
+                    continue
+                
+                # Horas de todos los marcados del proyecto en una sola pasada
+                horas = zip(*calcular_horas_lote(
+                    [marcado.hora_entrada for marcado, _ in a_cerrar],
+                    [hora_cierre for _, hora_cierre in a_cerrar],
+                    [marcado.turno for marcado, _ in a_cerrar],
+                    proyecto
+                ))
+                
+                for (marcado, hora_cierre), horas_marcado in zip(a_cerrar, horas):
+                    MarcadoAutomaticoService._marcar_salida_automatica(
+                        marcado, proyecto, config, hora_cierre, horas_marcado
+                    )
+                    marcados_procesados += 1
             
             db.session.commit()
             print(f"✅ Proceso completado. {marcados_procesados} marcados procesados automáticamente")
@@ -118,11 +141,18 @@ class MarcadoAutomaticoService:
 
     
     @staticmethod
-    def _marcar_salida_automatica(marcado, proyecto, config):
-        """Marca la salida automática en la hora de cierre del turno"""
+    def _marcar_salida_automatica(marcado, proyecto, config, hora_cierre=None, horas=None):
+        """
+        Marca la salida automática en la hora de cierre del turno
+        
+        Args:
+            hora_cierre: Hora de cierre ya resuelta (si no, se obtiene del proyecto)
+            horas: Tupla (trabajadas, normales, extras) precalculada con calcular_horas_lote
+        """
         try:
             # Obtener hora de cierre
-            hora_cierre = obtener_hora_cierre_turno(proyecto, marcado.turno)
+            if hora_cierre is None:
+                hora_cierre = obtener_hora_cierre_turno(proyecto, marcado.turno)
             
             if not hora_cierre:
                 print(f"⚠️ No se pudo determinar hora de cierre para marcado {marcado.id}")
@@ -132,14 +162,16 @@ class MarcadoAutomaticoService:
             marcado.hora_salida = hora_cierre
             marcado.salida_marcada_automaticamente = True
             
-            # Calcular horas trabajadas
-            horas_trabajadas = marcado.calcular_horas_trabajadas()
-            marcado.horas_trabajadas = horas_trabajadas
+            if horas is not None:
+                horas_trabajadas, horas_normales, horas_extras = horas
+            else:
+                # Calcular horas trabajadas, extras y normales
+                horas_trabajadas = marcado.calcular_horas_trabajadas()
+                horas_normales, horas_extras = calcular_horas_extras(
+                    horas_trabajadas, proyecto, marcado.turno
+                )
             
-            # Calcular horas extras y normales
-            horas_normales, horas_extras = calcular_horas_extras(
-                horas_trabajadas, proyecto, marcado.turno
-            )
+            marcado.horas_trabajadas = horas_trabajadas
             marcado.horas_normales = horas_normales
             marcado.horas_extras = horas_extras
             
@@ -234,7 +266,7 @@ def ejecutar_marcado_automatico():
     """
     from app import create_app, db
     
-    app = create_app()
+    app = create_app(crear_tablas=False, registrar_rutas=False)
     with app.app_context():
         MarcadoAutomaticoService.procesar_marcados_automaticos()
         MarcadoAutomaticoService.procesar_horas_extras_con_confirmacion()
@@ -0,0 +1,66 @@
+"""
+Servicio del índice de meses por proyecto (tabla proyecto_meses)
+Cada vez que se insertan días (alta de proyecto, alta de mes, días creados por
+el sistema de asistencia) se registra su mes en el mismo flush, así la lista de
+meses de un proyecto es una lectura por clave primaria en lugar de un DISTINCT
+sobre todos sus días.
+"""
+
+from app import db
+from app.models import Dia, ProyectoMes
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Tuple
+
+
+class ProyectoMesService:
+    """Servicio para mantener y consultar los meses de cada proyecto"""
+
+    @staticmethod
+    def configurar():
+        """Registra el evento de flush que anota los meses de los días nuevos (una sola vez por proceso)"""
+        if not event.contains(Session, 'after_flush', _al_hacer_flush):
+            event.listen(Session, 'after_flush', _al_hacer_flush)
+
+    @staticmethod
+    def registrar(claves: Iterable[Tuple[int, int, int]], session=None):
+        """
+        Registra meses de proyectos dentro de la transacción actual (ignora los existentes)
+
+        Args:
+            claves: Tuplas (proyecto_id, anio, mes)
+            session: Sesión a usar (por defecto db.session)
+        """
+        claves = sorted(set(claves))
+        if not claves:
+            return
+        (session or db.session).connection().execute(
+            insert(ProyectoMes.__table__).prefix_with('IGNORE'),
+            [{'proyecto_id': proyecto_id, 'anio': anio, 'mes': mes} for proyecto_id, anio, mes in claves]
+        )
+
+    @staticmethod
+    def obtener_meses(proyecto_id: int) -> List[Tuple[int, int]]:
+        """Meses del proyecto como (anio, mes), ordenados"""
+        return [
+            (fila.anio, fila.mes)
+            for fila in db.session.execute(
+                select(ProyectoMes.anio, ProyectoMes.mes)
+                .where(ProyectoMes.proyecto_id == proyecto_id)
+                .order_by(ProyectoMes.anio, ProyectoMes.mes)
+            )
+        ]
+
+    @staticmethod
+    def existe(proyecto_id: int, anio: int, mes: int) -> bool:
+        """Indica si el proyecto ya tiene días en ese mes"""
+        return db.session.get(ProyectoMes, (proyecto_id, anio, mes)) is not None
+
+
+def _al_hacer_flush(session, flush_context):
+    claves = {
+        (objeto.proyecto_id, objeto.fecha.year, objeto.fecha.month)
+        for objeto in session.new
+        if isinstance(objeto, Dia) and objeto.proyecto_id and objeto.fecha
+    }
+    ProyectoMesService.registrar(claves, session)
@@ -3,13 +3,17 @@ from app.models.proyecto import Proyecto
 from app.models.dia import Dia
 from app.models.usuario import Usuario
 from app.models.empleado import Empleado
-from sqlalchemy import func
-from datetime import date, timedelta
+from app.services.proyecto_mes_service import ProyectoMesService
+from sqlalchemy import func, select, union
+from sqlalchemy.orm import load_only, selectinload
+from datetime import date, timedelta, timezone
 from app.utils.constants import DIAS_ES
 from app.utils.formatters import horas_a_formato
 import calendar
 from datetime import datetime as dt
 
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
 class ProyectoService:
     @staticmethod
     def crear_proyecto(nombre: str, descripcion: str, anio: int, mes: int, usuario_id: int, 
@@ -49,21 +53,25 @@ class ProyectoService:
         )
         
         db.session.add(proyecto)
-        db.session.commit()
-        db.session.refresh(proyecto)
         
-        # Si es proyecto con empleados, crear empleados
+        # Si es proyecto con empleados, importar empleados y sus días en bloque
+        # (misma transacción que el proyecto: si la importación falla no queda a medias)
         if tipo_proyecto == 'empleados' and empleados:
-            for nombre_empleado in empleados:
-                empleado = Empleado(
-                    nombre=nombre_empleado,
-                    proyecto_id=proyecto.id,
-                    activo=True
-                )
-                db.session.add(empleado)
+            from app.services.empleado_service import EmpleadoService
+            
+            db.session.flush()
+            ProyectoMesService.registrar([(proyecto.id, anio, mes)])
+            _, error = EmpleadoService.importar_empleados(proyecto.id, empleados)
+            if error:
+                db.session.rollback()
+                if not isinstance(error, str):
+                    error = '; '.join(f"Empleado {e['fila'] + 1}: {e['error']}" for e in error)
+                raise ValueError(error)
+        else:
             db.session.commit()
+        db.session.refresh(proyecto)
         
-        # Generar días
+        # Generar días (proyectos personales; los de empleados ya los tienen)
         ProyectoService.generar_dias_proyecto(proyecto)
         
         return proyecto
@@ -113,68 +121,147 @@ class ProyectoService:
         db.session.commit()
     
     @staticmethod
-    def obtener_proyectos_usuario(usuario_id: int):
-        """Obtiene proyectos del usuario (como admin o como empleado)"""
-        from app.models.empleado import Empleado
+    def ids_proyectos_usuario(usuario_id: int):
+        """Subconsulta (UNION) con los ids de los proyectos del usuario como admin o como empleado"""
+        return union(
+            select(Proyecto.id.label('id')).where(Proyecto.usuario_id == usuario_id, Proyecto.eliminado == False),
+            select(Empleado.proyecto_id.label('id'))
+            .join(Proyecto, Proyecto.id == Empleado.proyecto_id)
+            .where(Empleado.usuario_id == usuario_id, Proyecto.eliminado == False),
+        ).subquery('proyectos_usuario')
+    
+    @staticmethod
+    def obtener_proyectos_usuario(usuario_id: int, limite: int = None, desplazamiento: int = 0,
+                                  campos: tuple = None, incluir_usuario: bool = False):
+        """
+        Obtiene proyectos del usuario (como admin o como empleado) en una sola consulta,
+        ordenados con los activos primero y luego por ID descendente
+        
+        Args:
+            usuario_id: ID del usuario
+            limite: Cantidad máxima de proyectos (None = todos)
+            desplazamiento: Proyectos a saltear (paginación)
+            campos: Campos a cargar (None = todos); con 'empleados' se cargan sus empleados
+            incluir_usuario: Cargar también el usuario asociado de cada empleado
+        """
+        ids = ProyectoService.ids_proyectos_usuario(usuario_id)
+        query = Proyecto.query.join(ids, ids.c.id == Proyecto.id).order_by(
+            Proyecto.activo.desc(), Proyecto.id.desc()
+        )
         
-        # Proyectos donde el usuario es el admin
-        proyectos_admin = Proyecto.query.filter(
-            Proyecto.usuario_id == usuario_id
-        ).all()
+        if campos is not None:
+            columnas = {'id', 'activo', *campos}
+            if 'empleados' in campos:
+                columnas.add('tipo_proyecto')
+            columnas.discard('empleados')
+            query = query.options(load_only(*[getattr(Proyecto, columna) for columna in columnas]))
         
-        # Proyectos donde el usuario es empleado
-        proyectos_empleado = Proyecto.query.join(
-            Empleado, Empleado.proyecto_id == Proyecto.id
-        ).filter(
-            Empleado.usuario_id == usuario_id
-        ).all()
+        if campos is None or 'empleados' in campos:
+            # Empleados de todos los proyectos en una consulta (IN) en lugar de una por proyecto
+            empleados = selectinload(Proyecto.empleados)
+            if incluir_usuario:
+                empleados = empleados.selectinload(Empleado.usuario_asociado)
+            query = query.options(empleados)
+        
+        if limite is not None:
+            query = query.limit(limite).offset(desplazamiento)
+        return query.all()
+    
+    @staticmethod
+    def contar_proyectos_usuario(usuario_id: int) -> int:
+        """Cantidad de proyectos del usuario (total para la paginación)"""
+        ids = ProyectoService.ids_proyectos_usuario(usuario_id)
+        return db.session.execute(select(func.count()).select_from(ids)).scalar()
+    
+    @staticmethod
+    def obtener_resumen_proyectos_usuario(usuario_id: int, limite: int = None, desplazamiento: int = 0):
+        """
+        Resumen de los proyectos del usuario con cantidad de empleados, de tareas y horas
+        trabajadas del mes actual, en una sola consulta agrupada (sin cargar objetos)
+        
+        Returns:
+            Lista de diccionarios, en el mismo orden que obtener_proyectos_usuario
+        """
+        from app.models.tarea import Tarea
         
-        # Combinar y eliminar duplicados
-        proyectos_ids = set()
-        proyectos_unicos = []
+        ids = ProyectoService.ids_proyectos_usuario(usuario_id)
+        hoy = dt.now(LOCAL_TZ).date()
+        inicio_mes = hoy.replace(day=1)
+        inicio_siguiente = (inicio_mes + timedelta(days=32)).replace(day=1)
+        
+        empleados = (
+            select(Empleado.proyecto_id, func.count(Empleado.id).label('cantidad'))
+            .join(ids, ids.c.id == Empleado.proyecto_id)
+            .group_by(Empleado.proyecto_id)
+            .subquery()
+        )
+        tareas = (
+            select(Tarea.proyecto_id, func.count(Tarea.id).label('cantidad'))
+            .join(ids, ids.c.id == Tarea.proyecto_id)
+            .group_by(Tarea.proyecto_id)
+            .subquery()
+        )
+        horas = (
+            select(Dia.proyecto_id, func.sum(Dia.horas_trabajadas).label('total'))
+            .join(ids, ids.c.id == Dia.proyecto_id)
+            .where(Dia.fecha >= inicio_mes, Dia.fecha < inicio_siguiente)
+            .group_by(Dia.proyecto_id)
+            .subquery()
+        )
         
-        for proyecto in proyectos_admin + proyectos_empleado:
-            if proyecto.id not in proyectos_ids:
-                proyectos_ids.add(proyecto.id)
-                proyectos_unicos.append(proyecto)
+        consulta = (
+            select(
+                Proyecto.id, Proyecto.nombre, Proyecto.anio, Proyecto.mes, Proyecto.activo,
+                Proyecto.tipo_proyecto, Proyecto.usuario_id,
+                func.coalesce(empleados.c.cantidad, 0).label('empleados_count'),
+                func.coalesce(tareas.c.cantidad, 0).label('tareas_count'),
+                func.coalesce(horas.c.total, 0).label('horas_mes'),
+            )
+            .join(ids, ids.c.id == Proyecto.id)
+            .outerjoin(empleados, empleados.c.proyecto_id == Proyecto.id)
+            .outerjoin(tareas, tareas.c.proyecto_id == Proyecto.id)
+            .outerjoin(horas, horas.c.proyecto_id == Proyecto.id)
+            .order_by(Proyecto.activo.desc(), Proyecto.id.desc())
+        )
+        if limite is not None:
+            consulta = consulta.limit(limite).offset(desplazamiento)
         
-        # Ordenar: activos primero, luego por ID descendente
-        return sorted(proyectos_unicos, key=lambda p: (not p.activo, -p.id))
+        return [
+            {
+                'id': fila.id,
+                'nombre': fila.nombre,
+                'anio': fila.anio,
+                'mes': fila.mes,
+                'activo': fila.activo,
+                'tipo_proyecto': fila.tipo_proyecto,
+                'usuario_id': fila.usuario_id,
+                'empleados_count': fila.empleados_count,
+                'tareas_count': fila.tareas_count,
+                'horas_mes': round(float(fila.horas_mes), 2),
+                'horas_mes_formato': horas_a_formato(float(fila.horas_mes)),
+            }
+            for fila in db.session.execute(consulta)
+        ]
     
     @staticmethod
     def obtener_proyecto_por_id(proyecto_id: int):
-        """Obtiene un proyecto por ID"""
-        return Proyecto.query.filter(Proyecto.id == proyecto_id).first()
+        """Obtiene un proyecto por ID (los eliminados pendientes de purga no se devuelven)"""
+        return Proyecto.query.filter(Proyecto.id == proyecto_id, Proyecto.eliminado == False).first()
     
     @staticmethod
     def obtener_meses_proyecto(proyecto_id: int):
-        """Obtiene meses del proyecto"""
-        fechas = db.session.query(Dia.fecha).filter(
-            Dia.proyecto_id == proyecto_id
-        ).distinct().all()
-        
-        años_meses = set()
-        for fecha_tupla in fechas:
-            fecha = fecha_tupla[0]
-            años_meses.add((fecha.year, fecha.month))
-        
-        return sorted(list(años_meses))
+        """Obtiene meses del proyecto (lectura del índice proyecto_meses)"""
+        return ProyectoMesService.obtener_meses(proyecto_id)
     
     @staticmethod
     def agregar_mes_proyecto(proyecto_id: int, anio: int, mes: int):
         """Agrega un mes al proyecto"""
-        proyecto = Proyecto.query.filter(Proyecto.id == proyecto_id).first()
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         if not proyecto:
             return False
         
         # Verificar si ya existe
-        existing = Dia.query.filter(
-            Dia.proyecto_id == proyecto_id,
-            func.extract('year', Dia.fecha) == anio,
-            func.extract('month', Dia.fecha) == mes
-        ).first()
-        
-        if existing:
+        if ProyectoMesService.existe(proyecto_id, anio, mes):
             return False
         
         # Crear días
@@ -219,7 +306,7 @@ class ProyectoService:
     @staticmethod
     def cambiar_estado_proyecto(proyecto_id: int, activo: bool):
         """Cambia estado del proyecto"""
-        proyecto = Proyecto.query.filter(Proyecto.id == proyecto_id).first()
+        proyecto = ProyectoService.obtener_proyecto_por_id(proyecto_id)
         if proyecto:
             proyecto.activo = activo
             db.session.commit()
@@ -235,7 +322,8 @@ class ProyectoService:
         # Proyectos activos
         proyectos_activos = Proyecto.query.filter(
             Proyecto.usuario_id == user_id,
-            Proyecto.activo == True
+            Proyecto.activo == True,
+            Proyecto.eliminado == False
         ).count()
         
         # Campo a usar
@@ -244,7 +332,7 @@ class ProyectoService:
         # Total horas
         total_horas = db.session.query(func.sum(campo_horas)).join(
             Proyecto, Dia.proyecto_id == Proyecto.id
-        ).filter(Proyecto.usuario_id == user_id).scalar() or 0
+        ).filter(Proyecto.usuario_id == user_id, Proyecto.eliminado == False).scalar() or 0
         
         # Horas semana
         inicio_semana = date.today() - timedelta(days=7)
@@ -252,6 +340,7 @@ class ProyectoService:
             Proyecto, Dia.proyecto_id == Proyecto.id
         ).filter(
             Proyecto.usuario_id == user_id,
+            Proyecto.eliminado == False,
             Dia.fecha >= inicio_semana
         ).scalar() or 0
         
@@ -260,6 +349,7 @@ class ProyectoService:
             Proyecto, Dia.proyecto_id == Proyecto.id
         ).filter(
             Proyecto.usuario_id == user_id,
+            Proyecto.eliminado == False,
             campo_horas > 0
         ).scalar() or 0
         
@@ -275,16 +365,14 @@ class ProyectoService:
     
     @staticmethod
     def eliminar_proyecto(proyecto_id: int):
-        """Elimina un proyecto y todos sus datos asociados (días, tareas, empleados)"""
-        proyecto = Proyecto.query.filter(Proyecto.id == proyecto_id).first()
-        if not proyecto:
-            return False
+        """
+        Elimina un proyecto: lo oculta de inmediato y encola la purga de sus datos
+        (días, tareas, empleados, asistencia), que se borran por lotes en segundo plano
         
-        # SQLAlchemy automáticamente eliminará:
-        # - Días (cascade="all, delete-orphan")
-        # - Tareas (cascade="all, delete-orphan")
-        # - Empleados (cascade="all, delete-orphan")
-        # - Relaciones en tarea_dia (por la configuración de la tabla intermedia)
-        db.session.delete(proyecto)
-        db.session.commit()
-        return True
+        Returns:
+            Trabajo de purga o None si el proyecto no existe
+        """
+        from app.services.purga_service import PurgaService
+        
+        trabajo, _ = PurgaService.encolar_proyecto(proyecto_id)
+        return trabajo
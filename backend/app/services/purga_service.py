@@ -0,0 +1,365 @@
+"""
+Servicio de purga de proyectos y empleados eliminados
+Borra los datos con DELETEs por lotes de ID (SELECT de hasta PURGA_TAMANO_LOTE IDs
+y DELETE ... WHERE id IN) en lugar de cargar todas las filas en la sesión para
+las cascadas del ORM. Cada lote es una transacción corta, así no se retienen
+bloqueos durante toda la eliminación.
+
+Los proyectos se marcan como eliminados (dejan de verse de inmediato) y un trabajo
+de fondo 'purga_proyecto' recorre las etapas en orden de claves foráneas. El
+checkpoint del trabajo es la etapa actual: como cada etapa solo borra lo que
+queda, un trabajo interrumpido se reanuda desde su etapa sin repetir trabajo.
+Una purga que termina en 'error' se vuelve a encolar pasados PURGA_REINTENTO_MINUTOS
+(el error queda visible en GET /proyectos/<id>/eliminacion mientras tanto), así el
+proyecto no queda eliminado a medias para siempre.
+Al terminar se borra la fila del proyecto y con ella (ON DELETE CASCADE) el trabajo.
+"""
+
+from app import db
+from app.models import (
+    TrabajoFondo, Proyecto, Dia, Tarea, Empleado, EmpleadoUsuario, InvitacionProyecto,
+    MarcadoAsistencia, DeudaHoras, Justificacion, ConfiguracionAsistencia,
+    VersionProyecto, ProyectoMes
+)
+from app.models.dia import tarea_dia
+from app.models.tarea import tarea_fecha
+from app.config import PURGA_TAMANO_LOTE, PURGA_PAUSA_SEGUNDOS, PURGA_REINTENTO_MINUTOS
+from app.services.recalculo_service import RecalculoService
+from app.services.version_service import VersionService
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+import time
+
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
+TIPO_PURGA_PROYECTO = 'purga_proyecto'
+
+
+def _ahora():
+    """Hora local sin tzinfo (como se almacena en MySQL)"""
+    return datetime.now(LOCAL_TZ).replace(tzinfo=None)
+
+
+def _etapas_proyecto(proyecto_id: int) -> list:
+    """
+    Etapas de la purga de un proyecto, en orden de claves foráneas:
+    (tabla, filtro, columnas de tablas de asociación a borrar antes de cada lote)
+    """
+    empleados = select(Empleado.id).where(Empleado.proyecto_id == proyecto_id)
+    return [
+        (Justificacion.__table__, Justificacion.proyecto_id == proyecto_id, ()),
+        (DeudaHoras.__table__, DeudaHoras.proyecto_id == proyecto_id, ()),
+        (MarcadoAsistencia.__table__, MarcadoAsistencia.proyecto_id == proyecto_id, ()),
+        (InvitacionProyecto.__table__, InvitacionProyecto.proyecto_id == proyecto_id, ()),
+        (EmpleadoUsuario.__table__, EmpleadoUsuario.empleado_id.in_(empleados), ()),
+        (Tarea.__table__, Tarea.proyecto_id == proyecto_id, (tarea_dia.c.tarea_id, tarea_fecha.c.tarea_id)),
+        (Dia.__table__, Dia.proyecto_id == proyecto_id, (tarea_dia.c.dia_id,)),
+        (Empleado.__table__, Empleado.proyecto_id == proyecto_id, ()),
+        (ConfiguracionAsistencia.__table__, ConfiguracionAsistencia.proyecto_id == proyecto_id, ()),
+    ]
+
+
+def _etapas_empleado(empleado_id: int) -> list:
+    """Etapas de la purga de un empleado (ver _etapas_proyecto)"""
+    return [
+        (Justificacion.__table__, Justificacion.empleado_id == empleado_id, ()),
+        (DeudaHoras.__table__, DeudaHoras.empleado_id == empleado_id, ()),
+        (MarcadoAsistencia.__table__, MarcadoAsistencia.empleado_id == empleado_id, ()),
+        (InvitacionProyecto.__table__, InvitacionProyecto.empleado_id == empleado_id, ()),
+        (EmpleadoUsuario.__table__, EmpleadoUsuario.empleado_id == empleado_id, ()),
+        (Dia.__table__, Dia.empleado_id == empleado_id, (tarea_dia.c.dia_id,)),
+    ]
+
+
+def _borrar_lote(tabla, filtro, dependientes, tamano_lote: int) -> int:
+    """
+    Borra hasta tamano_lote filas (por ID ascendente) que cumplen el filtro
+
+    Returns:
+        Cantidad de filas borradas de la tabla (0 = etapa terminada)
+    """
+    conexion = db.session.connection()
+    ids = conexion.execute(
+        select(tabla.c.id).where(filtro).order_by(tabla.c.id).limit(tamano_lote)
+    ).scalars().all()
+    if not ids:
+        return 0
+
+    for columna in dependientes:
+        conexion.execute(delete(columna.table).where(columna.in_(ids)))
+    conexion.execute(delete(tabla).where(tabla.c.id.in_(ids)))
+    return len(ids)
+
+
+class PurgaService:
+    """Servicio para eliminar proyectos y empleados con DELETEs por lotes"""
+
+    @staticmethod
+    def encolar_proyecto(proyecto_id: int):
+        """
+        Marca el proyecto como eliminado (deja de verse de inmediato), cancela sus
+        trabajos activos y encola la purga de sus datos
+
+        Args:
+            proyecto_id: ID del proyecto
+
+        Returns:
+            Tupla (trabajo, error)
+        """
+        try:
+            proyecto = Proyecto.query.get(proyecto_id)
+            if not proyecto:
+                return None, "Proyecto no encontrado"
+
+            if proyecto.eliminado:
+                trabajo = PurgaService.obtener(proyecto_id)
+                if trabajo and trabajo.estado in ('pendiente', 'en_proceso'):
+                    return trabajo, None
+
+            proyecto.eliminado = True
+            proyecto.fecha_eliminacion = _ahora()
+
+            db.session.execute(
+                update(TrabajoFondo)
+                .where(
+                    TrabajoFondo.proyecto_id == proyecto_id,
+                    TrabajoFondo.estado.in_(['pendiente', 'en_proceso'])
+                )
+                .values(estado='cancelado', fecha_fin=_ahora())
+            )
+
+            trabajo = TrabajoFondo(
+                tipo=TIPO_PURGA_PROYECTO,
+                proyecto_id=proyecto_id,
+                estado='pendiente'
+            )
+            db.session.add(trabajo)
+            db.session.commit()
+
+            print(f"🗑️ Proyecto {proyecto_id} marcado como eliminado; purga encolada")
+            return trabajo, None
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al encolar la purga del proyecto: {str(e)}")
+            return None, str(e)
+
+    @staticmethod
+    def obtener(proyecto_id: int):
+        """Obtiene la purga más reciente de un proyecto (None si ya terminó: el trabajo se borra con el proyecto)"""
+        return TrabajoFondo.query.filter_by(
+            proyecto_id=proyecto_id, tipo=TIPO_PURGA_PROYECTO
+        ).order_by(TrabajoFondo.id.desc()).first()
+
+    @staticmethod
+    def reintentar_fallidas() -> int:
+        """
+        Vuelve a 'pendiente' las purgas en 'error' hace más de PURGA_REINTENTO_MINUTOS
+        cuyo proyecto sigue eliminado y no tiene otra purga activa. Conservan el
+        checkpoint (se reanudan desde su etapa) y el último error
+
+        Returns:
+            Cantidad de purgas reencoladas
+        """
+        limite = _ahora() - timedelta(minutes=int(PURGA_REINTENTO_MINUTOS))
+        activa = aliased(TrabajoFondo)
+
+        try:
+            # SELECT y luego UPDATE por ID: MySQL no admite un UPDATE con subconsulta a su misma tabla
+            ids = db.session.execute(
+                select(TrabajoFondo.id).where(
+                    TrabajoFondo.tipo == TIPO_PURGA_PROYECTO,
+                    TrabajoFondo.estado == 'error',
+                    TrabajoFondo.fecha_fin < limite,
+                    db.exists().where(
+                        Proyecto.id == TrabajoFondo.proyecto_id, Proyecto.eliminado == True
+                    ),
+                    ~db.exists().where(
+                        activa.proyecto_id == TrabajoFondo.proyecto_id,
+                        activa.tipo == TIPO_PURGA_PROYECTO,
+                        activa.estado.in_(['pendiente', 'en_proceso'])
+                    )
+                )
+            ).scalars().all()
+            if not ids:
+                return 0
+
+            resultado = db.session.execute(
+                update(TrabajoFondo)
+                .where(TrabajoFondo.id.in_(ids), TrabajoFondo.estado == 'error')
+                .values(estado='pendiente', fecha_fin=None, fecha_actualizacion=_ahora()),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al reencolar purgas fallidas: {str(e)}")
+            return 0
+
+        print(f"🔁 {resultado.rowcount} purga(s) fallida(s) reencolada(s)")
+        return resultado.rowcount
+
+    @staticmethod
+    def procesar_pendientes() -> int:
+        """
+        Procesa todas las purgas pendientes o abandonadas, y las fallidas que ya
+        pueden reintentarse (tarea programada)
+
+        Returns:
+            Cantidad de trabajos procesados
+        """
+        PurgaService.reintentar_fallidas()
+        procesados = 0
+
+        while True:
+            trabajo = RecalculoService.reclamar_siguiente(TIPO_PURGA_PROYECTO)
+            if trabajo is None:
+                break
+            PurgaService.procesar(trabajo)
+            procesados += 1
+
+        return procesados
+
+    @staticmethod
+    def procesar(trabajo, tamano_lote: Optional[int] = None, pausa_segundos: Optional[float] = None) -> bool:
+        """
+        Purga un proyecto desde la etapa guardada en el checkpoint del trabajo
+
+        Args:
+            trabajo: TrabajoFondo en estado 'en_proceso'
+            tamano_lote: Filas por DELETE (por defecto PURGA_TAMANO_LOTE)
+            pausa_segundos: Pausa entre lotes (por defecto PURGA_PAUSA_SEGUNDOS)
+
+        Returns:
+            True si el proyecto quedó eliminado
+        """
+        tamano_lote = tamano_lote or int(PURGA_TAMANO_LOTE)
+        pausa_segundos = float(PURGA_PAUSA_SEGUNDOS) if pausa_segundos is None else pausa_segundos
+        trabajo_id, proyecto_id = trabajo.id, trabajo.proyecto_id
+        etapas = _etapas_proyecto(proyecto_id)
+        inicio = time.perf_counter()
+
+        try:
+            if trabajo.checkpoint == 0 and trabajo.procesados == 0:
+                trabajo.total = sum(
+                    db.session.execute(select(func.count()).select_from(tabla).where(filtro)).scalar()
+                    for tabla, filtro, _ in etapas
+                )
+                db.session.commit()
+
+            print(f"🗑️ Purga {trabajo_id} del proyecto {proyecto_id}: desde etapa {trabajo.checkpoint}")
+
+            reintentado = False
+            while True:
+                while trabajo.checkpoint < len(etapas):
+                    tabla, filtro, dependientes = etapas[trabajo.checkpoint]
+                    borradas = _borrar_lote(tabla, filtro, dependientes, tamano_lote)
+
+                    # Avance en la misma transacción que el lote
+                    trabajo.procesados += borradas
+                    if borradas < tamano_lote:
+                        trabajo.checkpoint += 1
+                    db.session.commit()
+
+                    db.session.refresh(trabajo)
+                    if trabajo.estado != 'en_proceso':
+                        print(f"⏹️ Purga {trabajo_id} interrumpida (estado: {trabajo.estado})")
+                        return False
+
+                    if borradas and pausa_segundos > 0:
+                        time.sleep(pausa_segundos)
+
+                procesados = trabajo.procesados
+                try:
+                    PurgaService._borrar_proyecto(proyecto_id)
+                    break
+                except IntegrityError:
+                    # Filas escritas durante la purga (p. ej. un marcado en curso): una pasada más
+                    db.session.rollback()
+                    if reintentado:
+                        raise
+                    reintentado = True
+                    trabajo.checkpoint = 0
+                    db.session.commit()
+
+            print(f"✅ Purga del proyecto {proyecto_id} completada: {procesados} filas "
+                  f"en {time.perf_counter() - inicio:.1f}s")
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error en purga {trabajo_id}: {str(e)}")
+            RecalculoService.finalizar(trabajo_id, 'error', str(e))
+            return False
+
+    @staticmethod
+    def purgar_proyecto(proyecto_id: int, tamano_lote: Optional[int] = None) -> bool:
+        """
+        Elimina un proyecto en el momento, sin esperar al scheduler (scripts y benchmarks)
+
+        Returns:
+            True si el proyecto quedó eliminado
+        """
+        trabajo, error = PurgaService.encolar_proyecto(proyecto_id)
+        if error:
+            return False
+        trabajo.estado = 'en_proceso'
+        trabajo.fecha_inicio = _ahora()
+        db.session.commit()
+        return PurgaService.procesar(trabajo, tamano_lote=tamano_lote, pausa_segundos=0)
+
+    @staticmethod
+    def eliminar_empleado(empleado_id: int, tamano_lote: Optional[int] = None) -> bool:
+        """
+        Elimina un empleado y sus datos con DELETEs por lotes (un commit por lote).
+        Los datos de un empleado están acotados, así que se borra en el momento; si se
+        interrumpe, volver a llamarlo continúa con lo que queda
+
+        Args:
+            empleado_id: ID del empleado
+            tamano_lote: Filas por DELETE (por defecto PURGA_TAMANO_LOTE)
+
+        Returns:
+            True si se eliminó, False si no existe
+        """
+        tamano_lote = tamano_lote or int(PURGA_TAMANO_LOTE)
+        empleado = Empleado.query.get(empleado_id)
+        if not empleado:
+            return False
+        proyecto_id = empleado.proyecto_id
+
+        # Periodos con días del empleado: sus versiones cambian al borrarlos
+        periodos = {
+            fila.anio * 100 + fila.mes
+            for fila in db.session.execute(
+                select(ProyectoMes.anio, ProyectoMes.mes).where(ProyectoMes.proyecto_id == proyecto_id)
+            )
+        }
+
+        for tabla, filtro, dependientes in _etapas_empleado(empleado_id):
+            while True:
+                borradas = _borrar_lote(tabla, filtro, dependientes, tamano_lote)
+                db.session.commit()
+                if borradas < tamano_lote:
+                    break
+
+        db.session.delete(empleado)
+        db.session.flush()
+        VersionService.incrementar([(proyecto_id, periodo) for periodo in periodos])
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def _borrar_proyecto(proyecto_id: int):
+        """Última etapa: tablas sin ID propio y la fila del proyecto (borra también sus trabajos)"""
+        conexion = db.session.connection()
+        conexion.execute(delete(VersionProyecto.__table__).where(VersionProyecto.proyecto_id == proyecto_id))
+        conexion.execute(delete(ProyectoMes.__table__).where(ProyectoMes.proyecto_id == proyecto_id))
+        conexion.execute(delete(TrabajoFondo.__table__).where(TrabajoFondo.proyecto_id == proyecto_id))
+        conexion.execute(delete(Proyecto.__table__).where(Proyecto.id == proyecto_id))
+        db.session.commit()
+        # Las filas borradas por SQL siguen en el mapa de identidad de la sesión
+        db.session.expunge_all()
@@ -0,0 +1,337 @@
+"""
+Servicio de recálculo de horas en segundo plano
+Cuando cambian los horarios de un proyecto recorre sus marcados cerrados por lotes
+(keyset por ID), recalcula horas normales/extras en bloque y las escribe con UPDATEs
+agrupados. Guarda un checkpoint por lote para poder reanudar y pausa entre lotes
+para no competir con el tráfico en vivo.
+"""
+
+from app import db
+from app.models import TrabajoFondo, MarcadoAsistencia, Dia, Proyecto
+from app.utils import obtener_configuracion_asistencia, calcular_horas_lote
+from app.config import RECALCULO_TAMANO_LOTE, RECALCULO_PAUSA_SEGUNDOS
+from app.services.version_service import VersionService, PERIODO_PROYECTO, periodo_de
+from sqlalchemy import update, or_, and_
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Optional
+import time
+
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
+TIPO_RECALCULO = 'recalculo_horas'
+
+# Un trabajo 'en_proceso' sin avances durante este tiempo se considera abandonado
+MINUTOS_TRABAJO_ABANDONADO = 10
+
+
+def _ahora():
+    """Hora local sin tzinfo (como se almacena en MySQL)"""
+    return datetime.now(LOCAL_TZ).replace(tzinfo=None)
+
+
+def _a_float(valor) -> float:
+    return float(valor) if valor is not None else 0.0
+
+
+class RecalculoService:
+    """Servicio para encolar, procesar y consultar recálculos de horas"""
+
+    @staticmethod
+    def encolar(proyecto_id: int):
+        """
+        Encola el recálculo de un proyecto. Cancela los recálculos activos del mismo
+        proyecto, ya que el nuevo recorre todos los marcados con los horarios vigentes.
+
+        Args:
+            proyecto_id: ID del proyecto
+
+        Returns:
+            Tupla (trabajo, error)
+        """
+        try:
+            db.session.execute(
+                update(TrabajoFondo)
+                .where(
+                    TrabajoFondo.tipo == TIPO_RECALCULO,
+                    TrabajoFondo.proyecto_id == proyecto_id,
+                    TrabajoFondo.estado.in_(['pendiente', 'en_proceso'])
+                )
+                .values(estado='cancelado', fecha_fin=_ahora())
+            )
+
+            total = RecalculoService._consulta_marcados(proyecto_id).count()
+
+            trabajo = TrabajoFondo(
+                tipo=TIPO_RECALCULO,
+                proyecto_id=proyecto_id,
+                estado='pendiente',
+                total=total
+            )
+            db.session.add(trabajo)
+            db.session.commit()
+
+            print(f"📋 Recálculo de horas encolado para proyecto {proyecto_id} ({total} marcados)")
+            return trabajo, None
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al encolar recálculo: {str(e)}")
+            return None, str(e)
+
+    @staticmethod
+    def obtener(proyecto_id: int, trabajo_id: int):
+        """Obtiene un recálculo de un proyecto"""
+        return TrabajoFondo.query.filter_by(
+            id=trabajo_id, proyecto_id=proyecto_id, tipo=TIPO_RECALCULO
+        ).first()
+
+    @staticmethod
+    def listar(proyecto_id: int, limite: int = 10):
+        """Obtiene los últimos recálculos de un proyecto"""
+        return TrabajoFondo.query.filter_by(
+            proyecto_id=proyecto_id, tipo=TIPO_RECALCULO
+        ).order_by(TrabajoFondo.id.desc()).limit(limite).all()
+
+    @staticmethod
+    def procesar_pendientes() -> int:
+        """
+        Procesa todos los recálculos pendientes o abandonados (tarea programada)
+
+        Returns:
+            Cantidad de trabajos procesados
+        """
+        procesados = 0
+
+        while True:
+            trabajo = RecalculoService.reclamar_siguiente()
+            if trabajo is None:
+                break
+            RecalculoService.procesar(trabajo)
+            procesados += 1
+
+        return procesados
+
+    @staticmethod
+    def reclamar_siguiente(tipo: str = TIPO_RECALCULO):
+        """
+        Toma el siguiente trabajo pendiente (o uno 'en_proceso' abandonado por un
+        proceso caído) con un UPDATE condicional, para que dos procesos no tomen el mismo
+
+        Args:
+            tipo: Tipo de trabajo (los demás servicios con trabajos en segundo plano lo reutilizan)
+
+        Returns:
+            TrabajoFondo reclamado o None
+        """
+        limite_abandono = _ahora() - timedelta(minutes=MINUTOS_TRABAJO_ABANDONADO)
+
+        candidatos = TrabajoFondo.query.filter(
+            TrabajoFondo.tipo == tipo,
+            or_(
+                TrabajoFondo.estado == 'pendiente',
+                and_(
+                    TrabajoFondo.estado == 'en_proceso',
+                    TrabajoFondo.fecha_actualizacion < limite_abandono
+                )
+            )
+        ).order_by(TrabajoFondo.id).limit(5).all()
+
+        for candidato in candidatos:
+            ahora = _ahora()
+            resultado = db.session.execute(
+                update(TrabajoFondo)
+                .where(
+                    TrabajoFondo.id == candidato.id,
+                    TrabajoFondo.estado == candidato.estado,
+                    TrabajoFondo.fecha_actualizacion == candidato.fecha_actualizacion
+                )
+                .values(
+                    estado='en_proceso',
+                    fecha_inicio=candidato.fecha_inicio or ahora,
+                    fecha_actualizacion=ahora
+                )
+            )
+            db.session.commit()
+
+            if resultado.rowcount == 1:
+                db.session.refresh(candidato)
+                return candidato
+
+        return None
+
+    @staticmethod
+    def procesar(
+        trabajo,
+        tamano_lote: Optional[int] = None,
+        pausa_segundos: Optional[float] = None,
+        al_avanzar: Optional[Callable] = None
+    ):
+        """
+        Procesa un recálculo desde su checkpoint hasta el final
+
+        Args:
+            trabajo: TrabajoFondo en estado 'en_proceso'
+            tamano_lote: Marcados por lote (por defecto RECALCULO_TAMANO_LOTE)
+            pausa_segundos: Pausa entre lotes (por defecto RECALCULO_PAUSA_SEGUNDOS)
+            al_avanzar: Callback opcional invocado con el trabajo después de cada lote
+
+        Returns:
+            El trabajo con su estado final
+        """
+        tamano_lote = tamano_lote or int(RECALCULO_TAMANO_LOTE)
+        pausa_segundos = float(RECALCULO_PAUSA_SEGUNDOS) if pausa_segundos is None else pausa_segundos
+        trabajo_id = trabajo.id
+
+        try:
+            proyecto = Proyecto.query.get(trabajo.proyecto_id)
+            if not proyecto:
+                raise ValueError('Proyecto no encontrado')
+
+            config = obtener_configuracion_asistencia(proyecto.id)
+            aplicar_extras = bool(config and config.modo_asistencia_activo)
+
+            print(f"🔄 Recálculo {trabajo_id} del proyecto {proyecto.id}: desde marcado {trabajo.checkpoint}")
+
+            while True:
+                filas = RecalculoService._consulta_marcados(proyecto.id).with_entities(
+                    MarcadoAsistencia.id,
+                    MarcadoAsistencia.empleado_id,
+                    MarcadoAsistencia.fecha,
+                    MarcadoAsistencia.turno,
+                    MarcadoAsistencia.hora_entrada,
+                    MarcadoAsistencia.hora_salida,
+                    MarcadoAsistencia.dia_id,
+                    MarcadoAsistencia.horas_trabajadas,
+                    MarcadoAsistencia.horas_normales,
+                    MarcadoAsistencia.horas_extras
+                ).filter(
+                    MarcadoAsistencia.id > trabajo.checkpoint
+                ).order_by(MarcadoAsistencia.id).limit(tamano_lote).all()
+
+                if not filas:
+                    break
+
+                actualizados = RecalculoService._recalcular_lote(proyecto, filas, aplicar_extras)
+
+                # Checkpoint en la misma transacción que los UPDATEs del lote
+                trabajo.checkpoint = filas[-1].id
+                trabajo.procesados += len(filas)
+                trabajo.actualizados += actualizados
+                db.session.commit()
+
+                db.session.refresh(trabajo)
+                if trabajo.estado != 'en_proceso':
+                    print(f"⏹️ Recálculo {trabajo_id} interrumpido (estado: {trabajo.estado})")
+                    return trabajo
+
+                if al_avanzar:
+                    al_avanzar(trabajo)
+
+                if len(filas) < tamano_lote:
+                    break
+
+                if pausa_segundos > 0:
+                    time.sleep(pausa_segundos)
+
+            RecalculoService.finalizar(trabajo_id, 'completado')
+            print(f"✅ Recálculo {trabajo_id} completado: {trabajo.procesados} marcados, "
+                  f"{trabajo.actualizados} actualizados")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error en recálculo {trabajo_id}: {str(e)}")
+            RecalculoService.finalizar(trabajo_id, 'error', str(e))
+
+        db.session.refresh(trabajo)
+        return trabajo
+
+    @staticmethod
+    def _consulta_marcados(proyecto_id: int):
+        """Marcados cerrados (con entrada y salida) del proyecto"""
+        return MarcadoAsistencia.query.filter(
+            MarcadoAsistencia.proyecto_id == proyecto_id,
+            MarcadoAsistencia.hora_entrada.isnot(None),
+            MarcadoAsistencia.hora_salida.isnot(None)
+        )
+
+    @staticmethod
+    def _recalcular_lote(proyecto, filas, aplicar_extras: bool) -> int:
+        """
+        Recalcula un lote y escribe solo las filas que cambiaron
+
+        Returns:
+            Cantidad de marcados actualizados
+        """
+        trabajadas, normales, extras = calcular_horas_lote(
+            [fila.hora_entrada for fila in filas],
+            [fila.hora_salida for fila in filas],
+            [fila.turno for fila in filas],
+            proyecto,
+            aplicar_extras
+        )
+
+        # Días de los marcados sin dia_id asociado, en una sola consulta
+        sin_dia = [fila for fila in filas if fila.dia_id is None]
+        dias_por_clave = {}
+        if sin_dia:
+            dias_por_clave = {
+                (dia.empleado_id, dia.fecha): dia.id for dia in db.session.query(
+                    Dia.id, Dia.empleado_id, Dia.fecha
+                ).filter(
+                    Dia.proyecto_id == proyecto.id,
+                    Dia.empleado_id.in_({fila.empleado_id for fila in sin_dia}),
+                    Dia.fecha.between(min(f.fecha for f in sin_dia), max(f.fecha for f in sin_dia))
+                )
+            }
+
+        cambios_marcados = []
+        cambios_dias = []
+        periodos = set()
+
+        for fila, horas, horas_normales, horas_extras in zip(filas, trabajadas, normales, extras):
+            if (_a_float(fila.horas_trabajadas), _a_float(fila.horas_normales), _a_float(fila.horas_extras)) == \
+                    (horas, horas_normales, horas_extras):
+                continue
+
+            cambios_marcados.append({
+                'id': fila.id,
+                'horas_trabajadas': horas,
+                'horas_normales': horas_normales,
+                'horas_extras': horas_extras
+            })
+
+            dia_id = fila.dia_id or dias_por_clave.get((fila.empleado_id, fila.fecha))
+            if dia_id:
+                cambios_dias.append({
+                    'id': dia_id,
+                    'horas_trabajadas': horas,
+                    'horas_reales': horas,
+                    'horas_extras': horas_extras
+                })
+                periodos.add(periodo_de(fila.fecha))
+
+        # UPDATE por clave primaria agrupado (executemany)
+        if cambios_marcados:
+            db.session.execute(update(MarcadoAsistencia), cambios_marcados)
+        if cambios_dias:
+            db.session.execute(update(Dia), cambios_dias)
+            # El UPDATE masivo no pasa por el flush: se invalidan a mano los ETag de días y tareas
+            VersionService.incrementar(
+                [(proyecto.id, PERIODO_PROYECTO)] + [(proyecto.id, periodo) for periodo in periodos]
+            )
+
+        return len(cambios_marcados)
+
+    @staticmethod
+    def finalizar(trabajo_id: int, estado: str, error: Optional[str] = None):
+        """Cierra el trabajo (de cualquier tipo) salvo que haya sido cancelado mientras se procesaba"""
+        try:
+            db.session.execute(
+                update(TrabajoFondo)
+                .where(TrabajoFondo.id == trabajo_id, TrabajoFondo.estado == 'en_proceso')
+                .values(estado=estado, error=error, fecha_fin=_ahora(), fecha_actualizacion=_ahora())
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al finalizar trabajo {trabajo_id}: {str(e)}")
@@ -0,0 +1,380 @@
+"""
+Servicio para sincronizar marcados registrados sin conexión
+Fusiona lotes de marcas con timestamp en MarcadoAsistencia y Dia aplicando
+reglas de conflicto deterministas y recalculando horas una sola vez por día
+"""
+
+from app import db
+from app.models import MarcadoAsistencia, Empleado, Proyecto, Dia
+from app.services.asistencia_service import AsistenciaService
+from app.utils import obtener_configuracion_asistencia
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional
+
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
+# Columnas del delta compacto devuelto al cliente
+CAMPOS_DELTA = [
+    'id', 'empleado_id', 'fecha', 'turno', 'hora_entrada', 'hora_salida',
+    'horas_trabajadas', 'horas_normales', 'horas_extras', 'salida_automatica'
+]
+
+
+class SincronizacionService:
+    """
+    Reglas de conflicto (independientes del orden de llegada):
+    - Las marcas se agrupan por empleado y fecha local del timestamp.
+    - Una salida de madrugada sin entrada previa ese día, anterior a la hora de una
+      entrada abierta del día anterior, cierra ese turno nocturno (va al día anterior).
+    - Entrada: gana la más temprana entre la existente y las recibidas.
+    - Salida: gana la más tardía entre la existente y las recibidas. Una salida
+      real reemplaza siempre a una salida marcada automáticamente.
+    - Una salida anterior o igual a la entrada final se descarta.
+    - Una salida sin entrada (existente ni recibida) se descarta.
+    - Una marca igual al valor ya registrado se informa como 'duplicado'.
+    """
+
+    @staticmethod
+    def sincronizar(
+        proyecto_id: int,
+        marcas: List[Dict],
+        desde: Optional[datetime] = None,
+        empleados_visibles: Optional[set] = None
+    ):
+        """
+        Sincroniza un lote de marcas offline
+
+        Args:
+            proyecto_id: ID del proyecto
+            marcas: Lista de dicts {'indice', 'empleado_id', 'tipo', 'momento'} con
+                    momento como datetime en hora local
+            desde: Si se indica, el delta incluye además los marcados modificados desde entonces
+            empleados_visibles: Empleados cuyo estado puede devolverse (None = todos)
+
+        Returns:
+            Tupla (resultado, error). resultado = {'estados': [[indice, estado], ...], 'delta': {...}}
+        """
+        try:
+            proyecto = Proyecto.query.filter(Proyecto.id == proyecto_id, Proyecto.eliminado == False).first()
+            if not proyecto:
+                return None, "Proyecto no encontrado"
+
+            config = obtener_configuracion_asistencia(proyecto_id)
+
+            empleado_ids = {
+                e.id for e in Empleado.query.filter(
+                    Empleado.proyecto_id == proyecto_id,
+                    Empleado.id.in_({m['empleado_id'] for m in marcas})
+                ).all()
+            } if marcas else set()
+
+            estados = {}
+            grupos = {}
+
+            for marca in marcas:
+                if marca['empleado_id'] not in empleado_ids:
+                    estados[marca['indice']] = 'empleado_invalido'
+                    continue
+                clave = (marca['empleado_id'], marca['momento'].date())
+                grupos.setdefault(clave, []).append(marca)
+
+            # Precarga única de marcados y días afectados (y del día anterior a cada
+            # salida, que puede cerrar un turno nocturno)
+            fechas = {fecha for _, fecha in grupos}
+            fechas |= {
+                fecha - timedelta(days=1) for (_, fecha), marcas_dia in grupos.items()
+                if any(m['tipo'] == 'salida' for m in marcas_dia)
+            }
+            marcados = {}
+            dias = {}
+
+            if grupos:
+                marcados = {
+                    (m.empleado_id, m.fecha): m for m in MarcadoAsistencia.query.filter(
+                        MarcadoAsistencia.proyecto_id == proyecto_id,
+                        MarcadoAsistencia.empleado_id.in_(empleado_ids),
+                        MarcadoAsistencia.fecha.in_(fechas)
+                    ).all()
+                }
+                dias = {
+                    (d.empleado_id, d.fecha): d for d in Dia.query.filter(
+                        Dia.proyecto_id == proyecto_id,
+                        Dia.empleado_id.in_(empleado_ids),
+                        Dia.fecha.in_(fechas)
+                    ).all()
+                }
+
+            SincronizacionService._asignar_salidas_nocturnas(grupos, marcados)
+
+            # Una transacción por empleado
+            por_empleado = {}
+            for clave in grupos:
+                por_empleado.setdefault(clave[0], []).append(clave)
+
+            afectados = []
+
+            for empleado_id, claves in sorted(por_empleado.items()):
+                pendientes_extras = []
+                try:
+                    for clave in sorted(claves):
+                        marcado, salida_nueva = SincronizacionService._fusionar_dia(
+                            proyecto, config, clave, grupos[clave], marcados, dias, estados
+                        )
+                        if marcado is not None:
+                            afectados.append(marcado)
+                            if salida_nueva:
+                                pendientes_extras.append(marcado)
+
+                    db.session.flush()
+                    for clave in claves:
+                        marcado = marcados.get(clave)
+                        dia = dias.get(clave)
+                        if marcado is not None and dia is not None and marcado.hora_salida:
+                            marcado.dia_id = dia.id
+
+                    db.session.commit()
+
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Error al sincronizar marcados del empleado {empleado_id}: {str(e)}")
+                    for clave in claves:
+                        for marca in grupos[clave]:
+                            estados[marca['indice']] = 'error'
+                        marcados.pop(clave, None)
+                        dias.pop(clave, None)
+                    afectados = [m for m in afectados if m.empleado_id != empleado_id]
+                    continue
+
+                # Procesar horas extras según política (solo salidas nuevas)
+                if config:
+                    for marcado in pendientes_extras:
+                        if marcado.horas_extras and marcado.horas_extras > 0:
+                            AsistenciaService._procesar_horas_extras(
+                                empleado_id, proyecto_id, marcado.horas_extras, config
+                            )
+
+            delta = SincronizacionService._construir_delta(
+                proyecto_id, afectados, desde, empleados_visibles
+            )
+
+            return {
+                'estados': [[indice, estados[indice]] for indice in sorted(estados)],
+                'delta': delta
+            }, None
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al sincronizar marcados offline: {str(e)}")
+            return None, str(e)
+
+    @staticmethod
+    def _fusionar_dia(proyecto, config, clave, marcas_dia, marcados, dias, estados):
+        """
+        Aplica las reglas de conflicto a las marcas de un empleado en un día
+
+        Returns:
+            Tupla (marcado modificado o None, True si se registró una salida nueva)
+        """
+        empleado_id, fecha = clave
+        marcado = marcados.get(clave)
+
+        entradas = sorted((m for m in marcas_dia if m['tipo'] == 'entrada'), key=lambda m: m['momento'])
+        salidas = sorted((m for m in marcas_dia if m['tipo'] == 'salida'), key=lambda m: m['momento'])
+
+        entrada_actual = marcado.hora_entrada if marcado else None
+        salida_actual = marcado.hora_salida if marcado else None
+        salida_automatica = bool(marcado and marcado.salida_marcada_automaticamente)
+
+        # Entrada: la más temprana
+        entrada_final = entrada_actual
+        for marca in entradas:
+            hora = marca['momento'].time().replace(microsecond=0)
+            if entrada_final is None or hora < entrada_final:
+                entrada_final = hora
+        for marca in entradas:
+            hora = marca['momento'].time().replace(microsecond=0)
+            estados[marca['indice']] = SincronizacionService._estado_marca(hora, entrada_final, entrada_actual)
+
+        # Salida: la más tardía (una salida real reemplaza a la automática). Se compara
+        # con fecha: una salida nocturna del día siguiente es posterior a la entrada
+        inicio = datetime.combine(fecha, entrada_final) if entrada_final else None
+        momento_actual = SincronizacionService._momento_salida(fecha, entrada_actual, salida_actual)
+        momento_final = None if salida_automatica else momento_actual
+        for marca in salidas:
+            momento = SincronizacionService._momento_marca(marca)
+            if inicio is None or momento <= inicio:
+                estados[marca['indice']] = 'descartado'
+                continue
+            if momento_final is None or momento > momento_final:
+                momento_final = momento
+        for marca in salidas:
+            if marca['indice'] in estados:
+                continue
+            momento = SincronizacionService._momento_marca(marca)
+            estados[marca['indice']] = SincronizacionService._estado_marca(momento, momento_final, momento_actual)
+
+        # Sin salidas reales válidas, la salida automática existente se conserva
+        if momento_final is None and salida_automatica:
+            momento_final = momento_actual
+        salida_final = momento_final.time() if momento_final else None
+
+        if entrada_final == entrada_actual and salida_final == salida_actual:
+            return None, False
+
+        if marcado is None:
+            marcado = MarcadoAsistencia(
+                empleado_id=empleado_id,
+                proyecto_id=proyecto.id,
+                fecha=fecha
+            )
+            db.session.add(marcado)
+            marcados[clave] = marcado
+
+        if entrada_final != entrada_actual:
+            marcado.hora_entrada = entrada_final
+            marcado.entrada_marcada_manualmente = True
+            marcado.turno = marcado.detectar_turno_automatico(proyecto)
+
+        salida_nueva = False
+        if salida_final != salida_actual:
+            salida_nueva = salida_final is not None and (salida_actual is None or salida_automatica)
+            marcado.hora_salida = salida_final
+            marcado.salida_marcada_manualmente = salida_final is not None
+            marcado.salida_marcada_automaticamente = False
+
+        marcado.observaciones = (marcado.observaciones or '') + \
+            f"\n[Sincronizado desde marcado offline el {datetime.now(LOCAL_TZ).strftime('%Y-%m-%d %H:%M:%S')}]"
+
+        # Recalcular horas una única vez por día afectado
+        if marcado.hora_entrada and marcado.hora_salida:
+            dia = dias.get(clave)
+            if dia is None:
+                dia = AsistenciaService._nuevo_dia(proyecto.id, empleado_id, fecha)
+                db.session.add(dia)
+                dias[clave] = dia
+            AsistenciaService._aplicar_salida(marcado, proyecto, config, dia)
+
+        return marcado, salida_nueva
+
+    @staticmethod
+    def _asignar_salidas_nocturnas(grupos, marcados):
+        """
+        Pasa al grupo del día anterior las salidas de madrugada que cierran un turno
+        nocturno: sin entrada anterior a ellas en su propio día y antes de la hora de
+        la entrada nocturna del día anterior (ver _entrada_abierta)
+        """
+        for clave in sorted(grupos):
+            empleado_id, fecha = clave
+            anterior = (empleado_id, fecha - timedelta(days=1))
+            entrada_anterior = SincronizacionService._entrada_abierta(anterior, grupos, marcados)
+            if entrada_anterior is None:
+                continue
+
+            entradas = [m['momento'].time() for m in grupos[clave] if m['tipo'] == 'entrada']
+            marcado = marcados.get(clave)
+            if marcado and marcado.hora_entrada:
+                entradas.append(marcado.hora_entrada)
+            primera_entrada = min(entradas, default=None)
+
+            nocturnas = [
+                m for m in grupos[clave]
+                if m['tipo'] == 'salida'
+                and m['momento'].time() < entrada_anterior
+                and (primera_entrada is None or m['momento'].time() <= primera_entrada)
+            ]
+            if not nocturnas:
+                continue
+
+            for marca in nocturnas:
+                marca['dia_siguiente'] = True
+            grupos.setdefault(anterior, []).extend(nocturnas)
+            grupos[clave] = [m for m in grupos[clave] if not m.get('dia_siguiente')]
+            if not grupos[clave]:
+                del grupos[clave]
+
+    @staticmethod
+    def _entrada_abierta(clave, grupos, marcados):
+        """
+        Hora de entrada de un día cuyo turno sigue abierto (sin salida real) o ya cerró
+        de madrugada del día siguiente, así un reenvío de esa salida es 'duplicado'
+        (None si no hay entrada o el turno cerró el mismo día)
+        """
+        marcas_dia = grupos.get(clave, [])
+        marcado = marcados.get(clave)
+
+        entradas = [m['momento'].time() for m in marcas_dia if m['tipo'] == 'entrada']
+        if marcado and marcado.hora_entrada:
+            entradas.append(marcado.hora_entrada)
+        if not entradas:
+            return None
+        entrada = min(entradas)
+
+        if (marcado and marcado.hora_salida and not marcado.salida_marcada_automaticamente
+                and marcado.hora_salida >= entrada):
+            return None
+        if any(
+            m['tipo'] == 'salida' and not m.get('dia_siguiente') and m['momento'].time() > entrada
+            for m in marcas_dia
+        ):
+            return None
+        return entrada
+
+    @staticmethod
+    def _momento_marca(marca) -> datetime:
+        """Fecha y hora local (sin microsegundos ni zona) de una marca recibida"""
+        momento = marca['momento']
+        return datetime.combine(momento.date(), momento.time().replace(microsecond=0))
+
+    @staticmethod
+    def _momento_salida(fecha, hora_entrada, hora_salida) -> Optional[datetime]:
+        """Fecha y hora de una salida registrada (del día siguiente si es anterior a la entrada)"""
+        if hora_salida is None:
+            return None
+        if hora_entrada is not None and hora_salida < hora_entrada:
+            fecha += timedelta(days=1)
+        return datetime.combine(fecha, hora_salida)
+
+    @staticmethod
+    def _estado_marca(hora, hora_final, hora_actual) -> str:
+        """Estado de una marca recibida respecto del valor final del día"""
+        if hora == hora_actual:
+            return 'duplicado'
+        if hora == hora_final:
+            return 'aplicado'
+        return 'descartado'
+
+    @staticmethod
+    def _construir_delta(proyecto_id, afectados, desde, empleados_visibles):
+        """Arma el delta compacto (columnas + filas) del estado en el servidor"""
+        por_id = {m.id: m for m in afectados}
+
+        if desde is not None:
+            query = MarcadoAsistencia.query.filter(
+                MarcadoAsistencia.proyecto_id == proyecto_id,
+                MarcadoAsistencia.fecha_actualizacion >= desde.replace(tzinfo=None)
+            )
+            if empleados_visibles is not None:
+                query = query.filter(MarcadoAsistencia.empleado_id.in_(empleados_visibles))
+            for marcado in query.all():
+                por_id.setdefault(marcado.id, marcado)
+
+        filas = []
+        for marcado in sorted(por_id.values(), key=lambda m: (m.empleado_id, m.fecha)):
+            filas.append([
+                marcado.id,
+                marcado.empleado_id,
+                marcado.fecha.isoformat(),
+                marcado.turno,
+                marcado.hora_entrada.strftime('%H:%M:%S') if marcado.hora_entrada else None,
+                marcado.hora_salida.strftime('%H:%M:%S') if marcado.hora_salida else None,
+                float(marcado.horas_trabajadas or 0),
+                float(marcado.horas_normales or 0),
+                float(marcado.horas_extras or 0),
+                bool(marcado.salida_marcada_automaticamente),
+            ])
+
+        return {
+            'campos': CAMPOS_DELTA,
+            'filas': filas,
+            'servidor_ts': datetime.now(LOCAL_TZ).isoformat()
+        }
@@ -1,17 +1,59 @@
 from app import db
-from app.models.tarea import Tarea
+from app.models.tarea import Tarea, tarea_fecha
 from app.models.dia import Dia, tarea_dia
 from app.models.usuario import Usuario
-from sqlalchemy import func
+from app.models.proyecto import proyecto_vigente
+from app.services.version_service import VersionService
+from sqlalchemy import func, select
 from app.utils.formatters import horas_a_formato
 
 class TareaService:
+    @staticmethod
+    def _es_proyecto_empleados(proyecto_id: int) -> bool:
+        from app.models.proyecto import Proyecto
+        
+        proyecto = Proyecto.query.get(proyecto_id)
+        return bool(proyecto and proyecto.tipo_proyecto == 'empleados')
+    
+    @staticmethod
+    def _asignar_dias(tarea: Tarea, dias_ids: list):
+        """
+        Asocia la tarea a los días seleccionados. En proyectos de empleados se guardan
+        las fechas (tarea_fecha): la tarea cubre a todos los empleados en esas fechas,
+        incluidos los que se agreguen después
+        """
+        if not TareaService._es_proyecto_empleados(tarea.proyecto_id):
+            # Para proyectos personales, usar solo los IDs recibidos
+            tarea.dias = Dia.query.filter(Dia.id.in_(dias_ids)).all() if dias_ids else []
+            return
+        
+        fechas = []
+        if dias_ids:
+            fechas = db.session.execute(
+                select(Dia.fecha).distinct()
+                .where(Dia.id.in_(dias_ids), Dia.proyecto_id == tarea.proyecto_id)
+                .order_by(Dia.fecha)
+            ).scalars().all()
+        
+        db.session.flush()  # tarea.id para tareas nuevas
+        db.session.execute(tarea_fecha.delete().where(tarea_fecha.c.tarea_id == tarea.id))
+        if fechas:
+            db.session.execute(tarea_fecha.insert(), [{'tarea_id': tarea.id, 'fecha': fecha} for fecha in fechas])
+        # Filas de tarea_dia anteriores a tarea_fecha
+        tarea.dias = []
+        tarea._datos_empleados = None
+        # tarea_fecha no pasa por el flush del ORM: se incrementa la versión a mano
+        VersionService.incrementar([(tarea.proyecto_id, 0)])
+    
     @staticmethod
     def crear_tarea(proyecto_id: int, titulo: str, detalle: str = "", 
                    que_falta: str = "", dias_ids: list = None, usuario_id: int = None):
-        """Crea una nueva tarea"""
+        """Crea una nueva tarea (None si el proyecto no existe o está eliminado)"""
         from app.models.proyecto import Proyecto
         
+        if not Proyecto.query.filter(Proyecto.id == proyecto_id, Proyecto.eliminado == False).first():
+            return None
+        
         tarea = Tarea(
             titulo=titulo,
             detalle=detalle,
@@ -19,58 +61,36 @@ class TareaService:
             proyecto_id=proyecto_id,
             horas="00:00"  # Inicializar con 00:00
         )
-        
-        if dias_ids:
-            # Para proyectos de empleados, incluir todos los días con esas fechas
-            proyecto = Proyecto.query.get(proyecto_id)
-            if proyecto and proyecto.tipo_proyecto == 'empleados':
-                # Obtener las fechas de los días seleccionados
-                dias_seleccionados = Dia.query.filter(Dia.id.in_(dias_ids)).all()
-                fechas = [dia.fecha for dia in dias_seleccionados]
-                
-                # Buscar TODOS los días con esas fechas (todos los empleados)
-                dias = Dia.query.filter(
-                    Dia.proyecto_id == proyecto_id,
-                    Dia.fecha.in_(fechas)
-                ).all()
-            else:
-                # Para proyectos personales, usar solo los IDs recibidos
-                dias = Dia.query.filter(Dia.id.in_(dias_ids)).all()
-            
-            tarea.dias = dias
-        
         db.session.add(tarea)
-        db.session.commit()
         
-        # Siempre recalcular horas
-        if usuario_id:
-            tarea.horas = TareaService.calcular_horas_tarea(tarea, usuario_id)
-        else:
-            # Sin usuario_id, calcular sumando horas_trabajadas directamente
-            if tarea.dias:
-                total_horas = sum(dia.horas_trabajadas or 0 for dia in tarea.dias)
-                tarea.horas = horas_a_formato(total_horas)
+        if dias_ids:
+            TareaService._asignar_dias(tarea, dias_ids)
         
+        # Siempre recalcular horas (sin usuario_id se suman horas_trabajadas)
+        tarea.horas = TareaService.calcular_horas_tarea(tarea, usuario_id)
         db.session.commit()
         
         return tarea
     
     @staticmethod
     def obtener_tareas_proyecto(proyecto_id: int):
-        """Obtiene tareas del proyecto"""
-        return Tarea.query.filter(Tarea.proyecto_id == proyecto_id).all()
+        """Obtiene tareas del proyecto (con días y desglose precargados en proyectos de empleados)"""
+        tareas = Tarea.query.filter(Tarea.proyecto_id == proyecto_id, proyecto_vigente(Tarea.proyecto_id)).all()
+        if tareas and TareaService._es_proyecto_empleados(proyecto_id):
+            Tarea.cargar_datos_empleados(tareas)
+        return tareas
     
     @staticmethod
     def obtener_tarea_por_id(tarea_id: int):
         """Obtiene una tarea por ID"""
-        return Tarea.query.filter(Tarea.id == tarea_id).first()
+        return Tarea.query.filter(Tarea.id == tarea_id, proyecto_vigente(Tarea.proyecto_id)).first()
     
     @staticmethod
     def actualizar_tarea(tarea_id: int, titulo: str = None, 
                         detalle: str = None, que_falta: str = None, 
                         dias_ids: list = None, usuario_id: int = None):
         """Actualiza una tarea"""
-        tarea = Tarea.query.filter(Tarea.id == tarea_id).first()
+        tarea = Tarea.query.filter(Tarea.id == tarea_id, proyecto_vigente(Tarea.proyecto_id)).first()
         
         if not tarea:
             return None
@@ -82,31 +102,9 @@ class TareaService:
         if que_falta is not None:
             tarea.que_falta = que_falta
         
-        # Actualizar días si se proporciona (incluso si es lista vacía)
+        # Actualizar días si se proporciona (lista vacía = quitar todos)
         if dias_ids is not None:
-            if len(dias_ids) > 0:
-                # Para proyectos de empleados, incluir todos los días con esas fechas
-                from app.models.proyecto import Proyecto
-                proyecto = Proyecto.query.get(tarea.proyecto_id)
-                
-                if proyecto and proyecto.tipo_proyecto == 'empleados':
-                    # Obtener las fechas de los días seleccionados
-                    dias_seleccionados = Dia.query.filter(Dia.id.in_(dias_ids)).all()
-                    fechas = [dia.fecha for dia in dias_seleccionados]
-                    
-                    # Buscar TODOS los días con esas fechas (todos los empleados)
-                    dias = Dia.query.filter(
-                        Dia.proyecto_id == tarea.proyecto_id,
-                        Dia.fecha.in_(fechas)
-                    ).all()
-                else:
-                    # Para proyectos personales, usar solo los IDs recibidos
-                    dias = Dia.query.filter(Dia.id.in_(dias_ids)).all()
-                
-                tarea.dias = dias
-            else:
-                # Si lista vacía, eliminar todos los días
-                tarea.dias = []
+            TareaService._asignar_dias(tarea, dias_ids)
             
             # Recalcular horas siempre que se actualizan los días
             if usuario_id:
@@ -118,7 +116,7 @@ class TareaService:
     @staticmethod
     def eliminar_tarea(tarea_id: int):
         """Elimina una tarea"""
-        tarea = Tarea.query.filter(Tarea.id == tarea_id).first()
+        tarea = Tarea.query.filter(Tarea.id == tarea_id, proyecto_vigente(Tarea.proyecto_id)).first()
         
         if tarea:
             db.session.delete(tarea)
@@ -129,26 +127,26 @@ class TareaService:
     @staticmethod
     def calcular_horas_tarea(tarea: Tarea, usuario_id: int) -> str:
         """Calcula horas de la tarea según la configuración del usuario y tipo de proyecto"""
+        # Para proyectos de empleados, siempre usar horas_trabajadas de todos los
+        # empleados en las fechas de la tarea (una suma en la base de datos)
+        if TareaService._es_proyecto_empleados(tarea.proyecto_id):
+            total_horas = db.session.execute(
+                Tarea.dias_de_fechas(func.coalesce(func.sum(Dia.horas_trabajadas), 0))
+                .where(tarea_fecha.c.tarea_id == tarea.id)
+            ).scalar()
+            return horas_a_formato(float(total_horas))
+        
         if not tarea.dias:
             return "00:00"
         
-        from app.models.proyecto import Proyecto
-        
-        proyecto = Proyecto.query.filter(Proyecto.id == tarea.proyecto_id).first()
+        # Para proyectos personales, usar configuración del usuario
         usuario = Usuario.query.filter(Usuario.id == usuario_id).first()
+        usar_horas_reales = usuario.usar_horas_reales if usuario else False
         
-        # Para proyectos de empleados, siempre usar horas_trabajadas
-        if proyecto and proyecto.tipo_proyecto == 'empleados':
-            # Suma horas_trabajadas de todos los días de todos los empleados
-            total_horas = sum(dia.horas_trabajadas or 0 for dia in tarea.dias)
+        if usar_horas_reales:
+            total_horas = sum(dia.horas_reales or 0 for dia in tarea.dias)
         else:
-            # Para proyectos personales, usar configuración del usuario
-            usar_horas_reales = usuario.usar_horas_reales if usuario else False
-            
-            if usar_horas_reales:
-                total_horas = sum(dia.horas_reales or 0 for dia in tarea.dias)
-            else:
-                total_horas = sum(dia.horas_trabajadas or 0 for dia in tarea.dias)
+            total_horas = sum(dia.horas_trabajadas or 0 for dia in tarea.dias)
         
         return horas_a_formato(total_horas)
     
@@ -161,6 +159,7 @@ class TareaService:
             func.min(Dia.id).label('dia_id')
         ).filter(
             Dia.proyecto_id == proyecto_id,
+            proyecto_vigente(Dia.proyecto_id),
             func.extract('year', Dia.fecha) == anio,
             func.extract('month', Dia.fecha) == mes,
             Dia.horas_trabajadas > 0
@@ -172,18 +171,21 @@ class TareaService:
             Dia.id == subquery.c.dia_id
         ).order_by(Dia.fecha.asc()).all()
         
-        # Días ocupados
-        query_tareas = Tarea.query.filter(Tarea.proyecto_id == proyecto_id)
+        # Días ocupados por otras tareas: por día (tarea_dia) o por fecha (tarea_fecha)
+        filtro_tareas = [Tarea.proyecto_id == proyecto_id]
         if tarea_excluir_id:
-            query_tareas = query_tareas.filter(Tarea.id != tarea_excluir_id)
-        
-        tareas = query_tareas.all()
-        dias_ocupados = set()
+            filtro_tareas.append(Tarea.id != tarea_excluir_id)
         
-        for tarea in tareas:
-            for dia in tarea.dias:
-                dias_ocupados.add(dia.id)
+        dias_ocupados = set(db.session.execute(
+            select(tarea_dia.c.dia_id).join(Tarea, Tarea.id == tarea_dia.c.tarea_id).where(*filtro_tareas)
+        ).scalars())
+        fechas_ocupadas = set(db.session.execute(
+            select(tarea_fecha.c.fecha).join(Tarea, Tarea.id == tarea_fecha.c.tarea_id).where(*filtro_tareas)
+        ).scalars())
         
         # Filtrar disponibles
-        dias_disponibles = [dia for dia in todos_dias if dia.id not in dias_ocupados]
+        dias_disponibles = [
+            dia for dia in todos_dias
+            if dia.id not in dias_ocupados and dia.fecha not in fechas_ocupadas
+        ]
         return dias_disponibles
@@ -0,0 +1,174 @@
+"""
+Servicio para registrar el último acceso de los usuarios
+Acumula los accesos en memoria y los escribe en un único UPDATE masivo por intervalo,
+así el login no abre una transacción de escritura sobre la tabla usuarios
+"""
+
+from app import db
+from app.models.usuario import Usuario
+from app.config import ULTIMO_ACCESO_FLUSH_SEGUNDOS
+from sqlalchemy import update, case
+from sqlalchemy.orm.attributes import set_committed_value
+from datetime import datetime
+import threading
+import atexit
+import os
+
+
+class UltimoAccesoService:
+    """Buffer en memoria de accesos pendientes de persistir (por proceso)"""
+
+    _pendientes = {}
+    _lock = threading.Lock()
+    _app = None
+    _hilo = None
+    _pid = None
+    _detener = threading.Event()
+
+    @staticmethod
+    def configurar(app):
+        """
+        Asocia la app Flask al servicio para poder abrir contextos desde el hilo de flush
+
+        Args:
+            app: Aplicación Flask
+        """
+        UltimoAccesoService._app = app
+
+    @staticmethod
+    def registrar(usuario_id: int, momento: datetime = None):
+        """
+        Registra un acceso sin tocar la base de datos
+
+        Args:
+            usuario_id: ID del usuario
+            momento: Fecha y hora del acceso (default: ahora en UTC)
+        """
+        if momento is None:
+            momento = datetime.utcnow()
+
+        with UltimoAccesoService._lock:
+            anterior = UltimoAccesoService._pendientes.get(usuario_id)
+            if anterior is None or momento > anterior:
+                UltimoAccesoService._pendientes[usuario_id] = momento
+
+        UltimoAccesoService._asegurar_hilo()
+
+    @staticmethod
+    def obtener_pendiente(usuario_id: int):
+        """Devuelve el último acceso aún no persistido de un usuario (o None)"""
+        with UltimoAccesoService._lock:
+            return UltimoAccesoService._pendientes.get(usuario_id)
+
+    @staticmethod
+    def aplicar_pendiente(usuario):
+        """
+        Muestra en la instancia el último acceso aún no persistido, sin marcarla como
+        modificada (no genera un UPDATE al hacer commit)
+
+        Args:
+            usuario: Instancia de Usuario (o None)
+
+        Returns:
+            La misma instancia
+        """
+        if usuario is None:
+            return None
+        pendiente = UltimoAccesoService.obtener_pendiente(usuario.id)
+        if pendiente is not None and (usuario.ultimo_acceso is None or pendiente > usuario.ultimo_acceso):
+            set_committed_value(usuario, 'ultimo_acceso', pendiente)
+        return usuario
+
+    @staticmethod
+    def flush() -> int:
+        """
+        Persiste los accesos acumulados con un único UPDATE ... CASE
+        Debe llamarse dentro de un contexto de aplicación
+
+        Returns:
+            Cantidad de usuarios actualizados
+        """
+        with UltimoAccesoService._lock:
+            pendientes = UltimoAccesoService._pendientes
+            UltimoAccesoService._pendientes = {}
+
+        if not pendientes:
+            return 0
+
+        try:
+            db.session.execute(
+                update(Usuario)
+                .where(Usuario.id.in_(list(pendientes.keys())))
+                .values(ultimo_acceso=case(pendientes, value=Usuario.id))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            return len(pendientes)
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al persistir últimos accesos: {str(e)}")
+
+            # Reincorporar los accesos para el próximo intento sin pisar otros más nuevos
+            with UltimoAccesoService._lock:
+                for usuario_id, momento in pendientes.items():
+                    actual = UltimoAccesoService._pendientes.get(usuario_id)
+                    if actual is None or momento > actual:
+                        UltimoAccesoService._pendientes[usuario_id] = momento
+            return 0
+
+    @staticmethod
+    def _flush_con_contexto():
+        """Ejecuta el flush abriendo un contexto de aplicación"""
+        app = UltimoAccesoService._app
+        if app is None:
+            return 0
+
+        with app.app_context():
+            return UltimoAccesoService.flush()
+
+    @staticmethod
+    def _asegurar_hilo():
+        """
+        Inicia el hilo de flush periódico si no está corriendo en este proceso.
+        Se verifica el PID porque los hilos no sobreviven a un fork (workers de gunicorn)
+        """
+        if UltimoAccesoService._pid == os.getpid() and UltimoAccesoService._hilo is not None:
+            return
+
+        with UltimoAccesoService._lock:
+            if UltimoAccesoService._pid == os.getpid() and UltimoAccesoService._hilo is not None:
+                return
+
+            UltimoAccesoService._detener = threading.Event()
+            UltimoAccesoService._hilo = threading.Thread(
+                target=UltimoAccesoService._bucle_flush,
+                name='ultimo-acceso-flush',
+                daemon=True
+            )
+            UltimoAccesoService._pid = os.getpid()
+            UltimoAccesoService._hilo.start()
+
+    @staticmethod
+    def _bucle_flush():
+        """Bucle del hilo de fondo: flush cada ULTIMO_ACCESO_FLUSH_SEGUNDOS"""
+        intervalo = int(ULTIMO_ACCESO_FLUSH_SEGUNDOS)
+        detener = UltimoAccesoService._detener
+
+        while not detener.wait(intervalo):
+            try:
+                UltimoAccesoService._flush_con_contexto()
+            except Exception as e:
+                print(f"Error en flush periódico de últimos accesos: {str(e)}")
+
+    @staticmethod
+    def detener():
+        """Detiene el hilo de fondo y persiste lo pendiente (se llama al cerrar el proceso)"""
+        UltimoAccesoService._detener.set()
+        try:
+            UltimoAccesoService._flush_con_contexto()
+        except Exception as e:
+            print(f"Error en flush final de últimos accesos: {str(e)}")
+
+
+atexit.register(UltimoAccesoService.detener)
@@ -0,0 +1,196 @@
+"""
+Servicio de versiones de datos por proyecto
+Cada escritura de días, tareas, empleados o del proyecto incrementa (en la misma
+transacción) el contador del proyecto y, para los días, el del mes afectado. Los
+GET de la grilla del mes, las tareas y la lista de proyectos arman su ETag con
+estos contadores y responden 304 sin cargar ni serializar filas.
+
+Las escrituras por ORM se detectan en el evento after_flush de la sesión. Los
+UPDATE masivos que no pasan por el flush (p. ej. el recálculo en segundo plano)
+deben llamar a VersionService.incrementar.
+"""
+
+from app import db
+from app.models import Dia, Empleado, Proyecto, Tarea, VersionProyecto
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone, timedelta
+from typing import Iterable, Optional, Tuple
+import hashlib
+
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
+# Periodo de la versión que cubre todo el proyecto
+PERIODO_PROYECTO = 0
+
+# Cambiar al modificar el formato de las respuestas versionadas (invalida los ETag emitidos)
+VERSION_FORMATO = 1
+
+
+def periodo_de(fecha) -> int:
+    """Periodo AAAAMM de una fecha"""
+    return fecha.year * 100 + fecha.month
+
+
+def _ahora():
+    """Hora local sin tzinfo (como se almacena en MySQL)"""
+    return datetime.now(LOCAL_TZ).replace(tzinfo=None)
+
+
+def _valores(objeto, atributo: str) -> list:
+    """Valor actual y, si cambió en este flush, el anterior"""
+    historial = inspect(objeto).attrs[atributo].history
+    valores = [v for v in (historial.added or ()) if v is not None]
+    valores += [v for v in (historial.deleted or ()) if v is not None]
+    if not valores:
+        actual = getattr(objeto, atributo, None)
+        if actual is not None:
+            valores.append(actual)
+    return valores
+
+
+def _claves_de(objeto) -> Iterable[Tuple[int, int]]:
+    """(proyecto_id, periodo) afectados por la escritura de un objeto"""
+    if isinstance(objeto, Proyecto):
+        yield objeto.id, PERIODO_PROYECTO
+    elif isinstance(objeto, Dia):
+        for proyecto_id in _valores(objeto, 'proyecto_id'):
+            yield proyecto_id, PERIODO_PROYECTO
+            for fecha in _valores(objeto, 'fecha'):
+                yield proyecto_id, periodo_de(fecha)
+    elif isinstance(objeto, (Tarea, Empleado)):
+        for proyecto_id in _valores(objeto, 'proyecto_id'):
+            yield proyecto_id, PERIODO_PROYECTO
+
+
+class VersionService:
+    """Servicio para incrementar y consultar las versiones de datos de los proyectos"""
+
+    @staticmethod
+    def configurar():
+        """Registra los eventos de flush que incrementan las versiones (una sola vez por proceso)"""
+        if not event.contains(Session, 'after_flush', _al_hacer_flush):
+            event.listen(Session, 'before_flush', _antes_del_flush)
+            event.listen(Session, 'after_flush', _al_hacer_flush)
+
+    @staticmethod
+    def incrementar(claves: Iterable[Tuple[int, int]], session=None):
+        """
+        Incrementa las versiones dentro de la transacción actual
+
+        Args:
+            claves: Pares (proyecto_id, periodo); el periodo 0 es el proyecto completo
+            session: Sesión a usar (por defecto db.session)
+        """
+        claves = sorted(set(claves))  # Orden fijo para no provocar deadlocks entre transacciones
+        if not claves:
+            return
+
+        tabla = VersionProyecto.__table__
+        ahora = _ahora()
+        sentencia = insert(tabla).on_duplicate_key_update(
+            version=tabla.c.version + 1,
+            fecha_actualizacion=ahora
+        )
+        (session or db.session).connection().execute(sentencia, [
+            {'proyecto_id': proyecto_id, 'periodo': periodo, 'version': 1, 'fecha_actualizacion': ahora}
+            for proyecto_id, periodo in claves
+        ])
+
+    @staticmethod
+    def obtener(proyecto_id: int, periodo: int = PERIODO_PROYECTO) -> Tuple[int, Optional[datetime]]:
+        """
+        Versión actual de un proyecto o de uno de sus meses
+
+        Returns:
+            (version, fecha_actualizacion); (0, None) si nunca se escribió
+        """
+        fila = db.session.execute(
+            select(VersionProyecto.version, VersionProyecto.fecha_actualizacion)
+            .where(VersionProyecto.proyecto_id == proyecto_id, VersionProyecto.periodo == periodo)
+        ).first()
+        return (fila.version, fila.fecha_actualizacion) if fila else (0, None)
+
+    @staticmethod
+    def obtener_periodos(proyecto_id: int, periodos: Iterable[int]) -> Tuple[str, Optional[datetime]]:
+        """
+        Huella de varios meses de un proyecto (consultas por rango de fechas)
+
+        Returns:
+            (huella, última fecha de actualización)
+        """
+        periodos = sorted(set(periodos))
+        versiones = dict(
+            ((fila.periodo, (fila.version, fila.fecha_actualizacion)) for fila in db.session.execute(
+                select(VersionProyecto.periodo, VersionProyecto.version, VersionProyecto.fecha_actualizacion)
+                .where(VersionProyecto.proyecto_id == proyecto_id, VersionProyecto.periodo.in_(periodos))
+            ))
+        )
+        huella = hashlib.sha1(
+            ','.join(f'{periodo}:{versiones.get(periodo, (0, None))[0]}' for periodo in periodos).encode()
+        ).hexdigest()[:20]
+        fechas = [fecha for _, fecha in versiones.values() if fecha]
+        return huella, max(fechas) if fechas else None
+
+    @staticmethod
+    def obtener_proyectos_usuario(usuario_id: int) -> Tuple[str, Optional[datetime]]:
+        """
+        Huella de la lista de proyectos del usuario (como admin o como empleado):
+        cambia si se agrega o quita un proyecto o si cambia alguno de ellos
+
+        Returns:
+            (huella, última fecha de actualización)
+        """
+        from app.services.proyecto_service import ProyectoService
+        
+        ids_proyectos = ProyectoService.ids_proyectos_usuario(usuario_id)
+
+        filas = db.session.execute(
+            select(ids_proyectos.c.id, VersionProyecto.version, VersionProyecto.fecha_actualizacion)
+            .outerjoin(VersionProyecto, (VersionProyecto.proyecto_id == ids_proyectos.c.id)
+                       & (VersionProyecto.periodo == PERIODO_PROYECTO))
+            .order_by(ids_proyectos.c.id)
+        ).all()
+
+        huella = hashlib.sha1(
+            ','.join(f'{fila.id}:{fila.version or 0}' for fila in filas).encode()
+        ).hexdigest()[:20]
+        fechas = [fila.fecha_actualizacion for fila in filas if fila.fecha_actualizacion]
+        return huella, max(fechas) if fechas else None
+
+    @staticmethod
+    def etag(*partes) -> str:
+        """ETag a partir de las partes que identifican la versión de la respuesta"""
+        return '-'.join(str(parte) for parte in (f'f{VERSION_FORMATO}',) + partes)
+
+
+def _antes_del_flush(session, flush_context, instancias):
+    # Las filas a eliminar todavía existen: se leen sus claves antes de borrarlas
+    claves = set()
+    eliminados = set()
+    for objeto in session.deleted:
+        if isinstance(objeto, Proyecto):
+            eliminados.add(objeto.id)
+        else:
+            claves.update(_claves_de(objeto))
+    session.info['versiones_eliminadas'] = (claves, eliminados)
+
+
+def _al_hacer_flush(session, flush_context):
+    claves, eliminados = session.info.pop('versiones_eliminadas', (set(), set()))
+
+    for objeto in session.new:
+        claves.update(_claves_de(objeto))
+    for objeto in session.dirty:
+        if session.is_modified(objeto):
+            claves.update(_claves_de(objeto))
+
+    if eliminados:
+        # La lista de proyectos ya cambia al no estar el proyecto; sus versiones se descartan
+        session.connection().execute(
+            VersionProyecto.__table__.delete().where(VersionProyecto.proyecto_id.in_(eliminados))
+        )
+        claves = {clave for clave in claves if clave[0] not in eliminados}
+
+    VersionService.incrementar(claves, session)
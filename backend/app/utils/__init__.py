@@ -9,6 +9,14 @@ from .horario_utils import (
     validar_configuracion_horarios
 )
 
+from .horario_compilado import (
+    HorarioCompilado,
+    obtener_horario_compilado,
+    invalidar_horario_compilado
+)
+
+from .calculo_masivo import calcular_horas_lote
+
 from .db_utils import (
     obtener_configuracion_asistencia,
     obtener_o_crear_configuracion_asistencia,
@@ -24,6 +32,12 @@ __all__ = [
     'calcular_horas_extras',
     'calcular_horas_debidas_dia',
     'validar_configuracion_horarios',
+    # Horarios compilados
+    'HorarioCompilado',
+    'obtener_horario_compilado',
+    'invalidar_horario_compilado',
+    # Cálculo masivo
+    'calcular_horas_lote',
     # DB utils
     'obtener_configuracion_asistencia',
     'obtener_o_crear_configuracion_asistencia',
@@ -0,0 +1,90 @@
+"""
+Almacén de archivos de imágenes (fotos de perfil).
+Las claves son rutas relativas ('12/3fa9c0.../256.webp') y el contenido nunca se
+modifica: una imagen nueva lleva otra clave, por eso se puede servir con caché
+de larga duración. FOTOS_ALMACEN elige la implementación ('local' por defecto);
+otro almacén (p. ej. un bucket) solo debe implementar AlmacenImagenes.
+"""
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+from app.config import FOTOS_ALMACEN, FOTOS_DIRECTORIO
+
+# Directorio base del backend (para resolver rutas relativas de FOTOS_DIRECTORIO)
+_DIRECTORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class AlmacenImagenes:
+    """Interfaz de un almacén de imágenes"""
+
+    def guardar(self, clave: str, datos: bytes):
+        """Guarda el contenido bajo la clave (reemplaza si existe)"""
+        raise NotImplementedError
+
+    def ruta(self, clave: str) -> Optional[str]:
+        """Ruta local del archivo para enviarlo con send_file, o None si no existe"""
+        raise NotImplementedError
+
+    def eliminar_prefijo(self, prefijo: str):
+        """Elimina todas las claves que empiezan con el prefijo (p. ej. una foto y sus variantes)"""
+        raise NotImplementedError
+
+
+class AlmacenLocal(AlmacenImagenes):
+    """Almacén en el sistema de archivos (un directorio compartido por todos los workers)"""
+
+    def __init__(self, directorio: str):
+        self.directorio = os.path.realpath(os.path.join(_DIRECTORIO_BACKEND, directorio))
+
+    def _ruta_segura(self, clave: str) -> str:
+        ruta = os.path.realpath(os.path.join(self.directorio, clave))
+        if not ruta.startswith(self.directorio + os.sep):
+            raise ValueError(f'Clave de imagen inválida: {clave}')
+        return ruta
+
+    def guardar(self, clave: str, datos: bytes):
+        ruta = self._ruta_segura(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        # Escritura atómica: otro worker nunca sirve un archivo a medio escribir
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as archivo:
+                archivo.write(datos)
+            os.replace(temporal, ruta)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.unlink(temporal)
+            raise
+
+    def ruta(self, clave: str) -> Optional[str]:
+        try:
+            ruta = self._ruta_segura(clave)
+        except ValueError:
+            return None
+        return ruta if os.path.isfile(ruta) else None
+
+    def eliminar_prefijo(self, prefijo: str):
+        ruta = self._ruta_segura(prefijo.rstrip('/'))
+        if os.path.isdir(ruta):
+            shutil.rmtree(ruta, ignore_errors=True)
+        elif os.path.isfile(ruta):
+            os.unlink(ruta)
+
+
+ALMACENES = {
+    'local': lambda: AlmacenLocal(FOTOS_DIRECTORIO),
+}
+
+_almacen = None
+
+
+def obtener_almacen() -> AlmacenImagenes:
+    """Almacén configurado en FOTOS_ALMACEN (una instancia por proceso)"""
+    global _almacen
+    if _almacen is None:
+        if FOTOS_ALMACEN not in ALMACENES:
+            raise RuntimeError(f"FOTOS_ALMACEN desconocido: {FOTOS_ALMACEN} (opciones: {', '.join(ALMACENES)})")
+        _almacen = ALMACENES[FOTOS_ALMACEN]()
+    return _almacen
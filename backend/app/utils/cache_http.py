@@ -0,0 +1,81 @@
+"""
+GET condicionales (ETag / Last-Modified).
+La ruta calcula un ETag barato (p. ej. con VersionService) y pasa una función que
+arma la respuesta completa; si el cliente ya tiene esa versión se responde 304
+sin llamarla, es decir, sin cargar ni serializar filas. Con cachear=True la
+respuesta completa además se guarda en la caché del servidor bajo el ETag (ver
+cache_respuestas), así otro cliente con la misma versión no la vuelve a generar.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from flask import make_response, request
+
+from app.utils.cache_respuestas import respuesta_cacheada
+from app.utils.msgpack_rapido import acepta_msgpack
+
+# Zona horaria en que se guardan las fechas (naive) en MySQL
+LOCAL_TZ = timezone(timedelta(hours=-3))
+
+
+def _ultima_modificacion_estable(fecha: Optional[datetime]) -> Optional[datetime]:
+    """
+    Last-Modified tiene resolución de segundos: solo se publica si la última escritura
+    ocurrió hace al menos dos segundos (margen para relojes de distintos hosts), así
+    una escritura posterior siempre cae en un segundo mayor e If-Modified-Since no
+    puede ocultarla
+    """
+    if fecha is None:
+        return None
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=LOCAL_TZ)
+    fecha = fecha.replace(microsecond=0)
+    if datetime.now(timezone.utc) - fecha < timedelta(seconds=2):
+        return None
+    return fecha
+
+
+def respuesta_condicional(etag: str, ultima_modificacion: Optional[datetime], generar: Callable,
+                          cachear: bool = False):
+    """
+    Responde 304 si el cliente tiene la versión actual; si no, genera la respuesta
+    y le agrega los validadores
+
+    Args:
+        etag: Identificador de la versión de los datos (sin comillas)
+        ultima_modificacion: Fecha de la última escritura (naive = hora local), o None
+        generar: Función sin argumentos que devuelve la respuesta de la ruta
+        cachear: Guardar la respuesta serializada en la caché del servidor (el ETag
+            debe identificar por completo los datos, sin depender del usuario)
+
+    Returns:
+        Response de Flask
+    """
+    ultima_modificacion = _ultima_modificacion_estable(ultima_modificacion)
+    if acepta_msgpack():
+        # Otra representación de los mismos datos: otro ETag
+        etag = f'{etag}-mp'
+
+    if request.if_none_match:
+        no_modificado = request.if_none_match.contains(etag)
+    else:
+        no_modificado = bool(
+            ultima_modificacion and request.if_modified_since
+            and ultima_modificacion <= request.if_modified_since
+        )
+
+    if no_modificado:
+        respuesta = make_response('', 304)
+    else:
+        respuesta = respuesta_cacheada(etag, generar) if cachear else make_response(generar())
+        if respuesta.status_code != 200:
+            return respuesta
+
+    respuesta.set_etag(etag)
+    if ultima_modificacion:
+        respuesta.last_modified = ultima_modificacion
+    # El navegador puede guardarla pero debe revalidar siempre (con If-None-Match)
+    respuesta.headers['Cache-Control'] = 'private, no-cache'
+    respuesta.vary.add('Authorization')
+    respuesta.vary.add('Accept')
+    return respuesta
@@ -0,0 +1,222 @@
+"""
+Caché de respuestas serializadas en el servidor.
+Guarda los bytes ya serializados de respuestas cuyo ETag identifica la versión de
+los datos (p. ej. la grilla del mes: proyecto, mes, versión del mes y empleado).
+Como la clave incluye la versión, una escritura nunca deja una entrada vieja
+visible: la siguiente lectura usa otra clave y la anterior sale por LRU.
+
+CACHE_RESPUESTAS elige el almacenamiento:
+    'memoria': LRU acotado por entradas y bytes en cada proceso (por defecto)
+    'redis':   el mismo LRU delante de un Redis compartido por todos los workers
+               (requiere el paquete redis; si no responde se sigue solo con memoria)
+    'no':      sin caché
+Las métricas (aciertos, fallos, desalojos, bytes) son por proceso.
+"""
+import os
+import threading
+from collections import OrderedDict
+from importlib.util import find_spec
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app, make_response
+
+from app.config import (
+    CACHE_RESPUESTAS, CACHE_RESPUESTAS_MAX_ENTRADAS, CACHE_RESPUESTAS_MAX_BYTES,
+    CACHE_RESPUESTAS_REDIS_URL, CACHE_RESPUESTAS_TTL_SEGUNDOS
+)
+
+REDIS_DISPONIBLE = find_spec('redis') is not None
+
+# Prefijo de las claves en el almacenamiento compartido
+PREFIJO_REDIS = 'mishoras:respuestas:'
+
+# Separador entre el mimetype y el cuerpo en el valor guardado en Redis
+_SEPARADOR = b'\n'
+
+
+class CacheRespuestas:
+    """LRU del proceso (y Redis opcional) de respuestas serializadas: clave -> (mimetype, bytes)"""
+
+    _lock = threading.Lock()
+    _entradas = OrderedDict()
+    _bytes = 0
+    _metricas = {}
+    _pid = os.getpid()
+    _redis = None
+    _redis_pid = None
+
+    max_entradas = int(CACHE_RESPUESTAS_MAX_ENTRADAS)
+    max_bytes = int(CACHE_RESPUESTAS_MAX_BYTES)
+    ttl_segundos = int(CACHE_RESPUESTAS_TTL_SEGUNDOS)
+
+    @staticmethod
+    def activa() -> bool:
+        return CACHE_RESPUESTAS in ('memoria', 'redis')
+
+    @classmethod
+    def _metricas_vacias(cls) -> Dict:
+        return {
+            'aciertos_memoria': 0,
+            'aciertos_compartida': 0,
+            'fallos': 0,
+            'guardadas': 0,
+            'desalojadas': 0,
+            'omitidas': 0,
+            'errores_compartida': 0,
+        }
+
+    @classmethod
+    def _verificar_proceso(cls):
+        """Un worker hijo no hereda las métricas del proceso maestro (se llama con el lock tomado)"""
+        if cls._pid != os.getpid() or not cls._metricas:
+            cls._metricas = cls._metricas_vacias()
+            cls._pid = os.getpid()
+
+    @classmethod
+    def _contar(cls, metrica: str):
+        with cls._lock:
+            cls._verificar_proceso()
+            cls._metricas[metrica] += 1
+
+    @classmethod
+    def _cliente_redis(cls):
+        """Cliente de Redis del proceso (se crea después del fork), o None si no se usa"""
+        if CACHE_RESPUESTAS != 'redis' or not REDIS_DISPONIBLE:
+            return None
+        if cls._redis_pid != os.getpid():
+            import redis
+            cls._redis = redis.Redis.from_url(
+                CACHE_RESPUESTAS_REDIS_URL, socket_timeout=0.2, socket_connect_timeout=0.2
+            )
+            cls._redis_pid = os.getpid()
+        return cls._redis
+
+    @classmethod
+    def obtener(cls, clave: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Respuesta guardada bajo la clave
+
+        Returns:
+            (mimetype, cuerpo) o None si no está
+        """
+        with cls._lock:
+            cls._verificar_proceso()
+            entrada = cls._entradas.get(clave)
+            if entrada is not None:
+                cls._entradas.move_to_end(clave)
+                cls._metricas['aciertos_memoria'] += 1
+                return entrada
+
+        cliente = cls._cliente_redis()
+        if cliente is not None:
+            try:
+                valor = cliente.get(PREFIJO_REDIS + clave)
+            except Exception as e:
+                print(f"⚠️ Caché compartida no disponible: {e}")
+                cls._contar('errores_compartida')
+                valor = None
+            if valor is not None:
+                mimetype, _, cuerpo = valor.partition(_SEPARADOR)
+                entrada = (mimetype.decode('ascii'), cuerpo)
+                cls._guardar_local(clave, entrada)
+                cls._contar('aciertos_compartida')
+                return entrada
+
+        cls._contar('fallos')
+        return None
+
+    @classmethod
+    def guardar(cls, clave: str, mimetype: str, cuerpo: bytes):
+        """Guarda una respuesta (se omite si por sí sola supera la cuarta parte del máximo de bytes)"""
+        if len(cuerpo) > cls.max_bytes // 4:
+            cls._contar('omitidas')
+            return
+
+        cls._guardar_local(clave, (mimetype, cuerpo))
+        cls._contar('guardadas')
+
+        cliente = cls._cliente_redis()
+        if cliente is not None:
+            try:
+                cliente.set(
+                    PREFIJO_REDIS + clave, mimetype.encode('ascii') + _SEPARADOR + cuerpo,
+                    ex=cls.ttl_segundos
+                )
+            except Exception as e:
+                print(f"⚠️ Caché compartida no disponible: {e}")
+                cls._contar('errores_compartida')
+
+    @classmethod
+    def _guardar_local(cls, clave: str, entrada: Tuple[str, bytes]):
+        with cls._lock:
+            cls._verificar_proceso()
+            anterior = cls._entradas.pop(clave, None)
+            if anterior is not None:
+                cls._bytes -= len(anterior[1])
+            cls._entradas[clave] = entrada
+            cls._bytes += len(entrada[1])
+
+            # Desalojo de las menos usadas hasta volver a los límites
+            while len(cls._entradas) > cls.max_entradas or cls._bytes > cls.max_bytes:
+                _, desalojada = cls._entradas.popitem(last=False)
+                cls._bytes -= len(desalojada[1])
+                cls._metricas['desalojadas'] += 1
+
+    @classmethod
+    def vaciar(cls):
+        """Vacía la memoria del proceso y reinicia sus métricas (Redis no se toca)"""
+        with cls._lock:
+            cls._entradas = OrderedDict()
+            cls._bytes = 0
+            cls._metricas = cls._metricas_vacias()
+            cls._pid = os.getpid()
+
+    @classmethod
+    def snapshot(cls) -> Dict:
+        """
+        Métricas del proceso actual
+
+        Returns:
+            Diccionario con pid, almacenamiento, contadores, entradas y bytes en memoria
+        """
+        with cls._lock:
+            cls._verificar_proceso()
+            metricas = dict(cls._metricas)
+            aciertos = metricas['aciertos_memoria'] + metricas['aciertos_compartida']
+            consultas = aciertos + metricas['fallos']
+            return {
+                'pid': cls._pid,
+                'almacenamiento': CACHE_RESPUESTAS if cls.activa() else 'no',
+                'compartida_disponible': CACHE_RESPUESTAS == 'redis' and REDIS_DISPONIBLE,
+                **metricas,
+                'tasa_aciertos': round(aciertos / consultas, 4) if consultas else None,
+                'entradas': len(cls._entradas),
+                'bytes': cls._bytes,
+                'max_entradas': cls.max_entradas,
+                'max_bytes': cls.max_bytes,
+            }
+
+
+def respuesta_cacheada(clave: str, generar: Callable):
+    """
+    Devuelve la respuesta guardada bajo la clave o la genera y la guarda
+
+    Args:
+        clave: Identifica la versión y la representación de los datos (p. ej. el ETag)
+        generar: Función sin argumentos que devuelve la respuesta de la ruta
+
+    Returns:
+        Response de Flask (solo se guardan las respuestas 200 completas)
+    """
+    if not CacheRespuestas.activa():
+        return make_response(generar())
+
+    entrada = CacheRespuestas.obtener(clave)
+    if entrada is not None:
+        mimetype, cuerpo = entrada
+        return current_app.response_class(cuerpo, mimetype=mimetype)
+
+    respuesta = make_response(generar())
+    if respuesta.status_code == 200 and not respuesta.is_streamed:
+        CacheRespuestas.guardar(clave, respuesta.mimetype, respuesta.get_data())
+    return respuesta
@@ -0,0 +1,158 @@
+"""
+Cálculo masivo de horas trabajadas, normales y extras.
+Equivalente vectorizado de MarcadoAsistencia.calcular_horas_trabajadas y
+horario_utils.calcular_horas_extras para procesos por lotes (cierre automático,
+recálculos, exportaciones). Usa NumPy si está instalado y, si no, un bucle en
+Python puro con los mismos resultados.
+"""
+import importlib.util
+from typing import List, Optional, Sequence, Tuple
+from .horario_compilado import obtener_horario_compilado
+
+# NumPy se importa recién en el primer cálculo grande (importarlo demora el arranque)
+NUMPY_DISPONIBLE = importlib.util.find_spec('numpy') is not None
+np = None
+
+
+def _cargar_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+# Por debajo de este tamaño el bucle en Python es más rápido que armar arrays
+MIN_FILAS_NUMPY = 64
+
+_MICROSEGUNDOS_DIA = 86_400_000_000
+
+# Distancia a x.xx5 por debajo de la cual se delega el redondeo en round() de Python,
+# para que los empates den exactamente lo mismo que la función escalar
+_TOLERANCIA_EMPATE = 1e-6
+
+
+def _microsegundos(hora) -> Optional[int]:
+    """Microsegundos desde medianoche de un objeto time (None si no hay hora)"""
+    if hora is None:
+        return None
+    return ((hora.hour * 60 + hora.minute) * 60 + hora.second) * 1_000_000 + hora.microsecond
+
+
+def _horas_esperadas_por_turno(horario, turnos: Sequence[Optional[str]]) -> Tuple[list, list]:
+    """Horas esperadas y si el rango está completo, por fila"""
+    rangos = {}
+    esperadas = []
+    completos = []
+    for turno in turnos:
+        rango = rangos.get(turno)
+        if rango is None:
+            rango = horario.turno(turno)
+            rangos[turno] = rango
+        esperadas.append(rango.horas_esperadas)
+        completos.append(rango.completo)
+    return esperadas, completos
+
+
+def calcular_horas_lote(
+    entradas: Sequence,
+    salidas: Sequence,
+    turnos: Sequence[Optional[str]],
+    proyecto,
+    aplicar_extras: bool = True
+) -> Tuple[List[float], List[float], List[float]]:
+    """
+    Calcula horas trabajadas, normales y extras de muchos marcados en una sola pasada.
+
+    Args:
+        entradas: Horas de entrada (objetos time o None)
+        salidas: Horas de salida (objetos time o None)
+        turnos: Turno de cada marcado ('manana', 'tarde', 'especial' o None)
+        proyecto: Objeto Proyecto con configuración de horarios
+        aplicar_extras: Si es False todas las horas se consideran normales
+                        (modo asistencia inactivo)
+
+    Returns:
+        Tupla (horas_trabajadas, horas_normales, horas_extras) como listas de float
+        redondeadas a 2 decimales, en el mismo orden que la entrada
+    """
+    if not (len(entradas) == len(salidas) == len(turnos)):
+        raise ValueError('entradas, salidas y turnos deben tener la misma longitud')
+
+    horario = obtener_horario_compilado(proyecto)
+    esperadas, completos = _horas_esperadas_por_turno(horario, turnos)
+
+    inicio = [_microsegundos(h) for h in entradas]
+    fin = [_microsegundos(h) for h in salidas]
+
+    if NUMPY_DISPONIBLE and len(inicio) >= MIN_FILAS_NUMPY:
+        _cargar_numpy()
+        return _calcular_numpy(inicio, fin, esperadas, completos, aplicar_extras)
+    return _calcular_python(inicio, fin, esperadas, completos, aplicar_extras)
+
+
+def _calcular_python(inicio, fin, esperadas, completos, aplicar_extras):
+    trabajadas = []
+    normales = []
+    extras = []
+
+    for entrada, salida, horas_esperadas, completo in zip(inicio, fin, esperadas, completos):
+        if entrada is None or salida is None:
+            horas = 0.0
+        else:
+            diferencia = salida - entrada
+            if diferencia <= 0:
+                diferencia += _MICROSEGUNDOS_DIA
+            horas = round(diferencia / 1_000_000 / 3600, 2)
+
+        trabajadas.append(horas)
+
+        if not aplicar_extras or not completo:
+            normales.append(horas)
+            extras.append(0.0)
+        elif horas > horas_esperadas:
+            normales.append(round(horas_esperadas, 2))
+            extras.append(round(horas - horas_esperadas, 2))
+        else:
+            normales.append(round(horas, 2))
+            extras.append(0.0)
+
+    return trabajadas, normales, extras
+
+
+def _redondear(valores):
+    """
+    np.round(x, 2) escala por 100 y redondea al par, lo que puede diferir de round()
+    en valores que quedan casi exactamente en x.xx5; esos pocos se redondean con Python
+    """
+    redondeados = np.round(valores, 2)
+    escalados = valores * 100
+    empates = np.abs(escalados - np.floor(escalados) - 0.5) < _TOLERANCIA_EMPATE
+    if empates.any():
+        indices = np.nonzero(empates)[0]
+        redondeados[indices] = [round(float(valores[i]), 2) for i in indices]
+    return redondeados
+
+
+def _calcular_numpy(inicio, fin, esperadas, completos, aplicar_extras):
+    entrada = np.array([np.nan if s is None else s for s in inicio], dtype=np.float64)
+    salida = np.array([np.nan if s is None else s for s in fin], dtype=np.float64)
+    horas_esperadas = np.asarray(esperadas, dtype=np.float64)
+    completo = np.asarray(completos, dtype=bool)
+
+    validos = ~(np.isnan(entrada) | np.isnan(salida))
+    diferencia = np.where(validos, salida - entrada, 0.0)
+    diferencia = np.where(validos & (diferencia <= 0), diferencia + _MICROSEGUNDOS_DIA, diferencia)
+    trabajadas = np.where(validos, _redondear(diferencia / 1_000_000 / 3600), 0.0)
+
+    if not aplicar_extras:
+        return trabajadas.tolist(), trabajadas.tolist(), [0.0] * len(trabajadas)
+
+    con_extras = completo & (trabajadas > horas_esperadas)
+    normales = np.where(
+        completo,
+        _redondear(np.where(con_extras, horas_esperadas, trabajadas)),
+        trabajadas
+    )
+    extras = np.where(con_extras, _redondear(trabajadas - horas_esperadas), 0.0)
+
+    return trabajadas.tolist(), normales.tolist(), extras.tolist()
@@ -0,0 +1,237 @@
+"""
+Captura de consultas SQL.
+Escucha before/after_cursor_execute de SQLAlchemy y acumula, por forma normalizada
+de la sentencia (literales y parámetros reemplazados por ?), la cantidad de
+ejecuciones, el tiempo total y máximo, percentiles de latencia, filas y una
+muestra de parámetros para EXPLAIN (scripts/asesor_indices.py). La muestra se
+guarda sin textos (literales y parámetros de texto o binarios pasan a '?'):
+contraseñas, emails, tokens o cuerpos de solicitudes nunca quedan en memoria.
+Las estadísticas son por proceso (cada worker de gunicorn acumula las suyas).
+"""
+import os
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Formas distintas que se conservan; al superarlo se descartan las menos costosas
+MAX_FORMAS = 2000
+
+# Latencias guardadas por forma para calcular percentiles (muestreo reservoir)
+MAX_MUESTRAS_LATENCIA = 512
+
+_CADENA = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_PARAMETRO = re.compile(r"%\(\w+\)s|%s|\?")
+_NUMERO = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalizar_sql(sql: str) -> str:
+    """
+    Forma normalizada de una sentencia: sin literales ni parámetros y con las listas
+    IN (...) colapsadas, para agrupar ejecuciones de la misma consulta
+    """
+    forma = _CADENA.sub('?', sql)
+    forma = _PARAMETRO.sub('?', forma)
+    forma = _NUMERO.sub('?', forma)
+    forma = _LISTA.sub('(?)', forma)
+    return _ESPACIOS.sub(' ', forma).strip()
+
+
+# Valor con el que se reemplazan los textos de la muestra
+TEXTO_REDACTADO = '?'
+
+
+def _redactar(valor):
+    """Parámetro sin textos: conserva números, fechas y NULL (suficiente para EXPLAIN)"""
+    if isinstance(valor, (str, bytes, bytearray, memoryview)):
+        return TEXTO_REDACTADO
+    if isinstance(valor, (list, tuple)):
+        return [_redactar(v) for v in valor]
+    if isinstance(valor, dict):
+        return {clave: _redactar(v) for clave, v in valor.items()}
+    if valor is None or isinstance(valor, (bool, int, float, Decimal, datetime, date, dt_time)):
+        return valor
+    return TEXTO_REDACTADO
+
+
+def _serializable(valor):
+    """Convierte un parámetro a un valor JSON que MySQL acepte al repetir la consulta"""
+    if isinstance(valor, (datetime, date, dt_time)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, (bytes, bytearray)):
+        return None
+    if isinstance(valor, (list, tuple)):
+        return [_serializable(v) for v in valor]
+    if isinstance(valor, dict):
+        return {clave: _serializable(v) for clave, v in valor.items()}
+    return valor
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+class CapturaConsultas:
+    """Estadísticas de consultas SQL del proceso actual"""
+
+    _lock = threading.Lock()
+    _formas = {}
+    _pid = os.getpid()
+    _desde = time.time()
+
+    @classmethod
+    def reiniciar(cls):
+        with cls._lock:
+            cls._formas = {}
+            cls._pid = os.getpid()
+            cls._desde = time.time()
+
+    @classmethod
+    def registrar(cls, sql: str, parametros, duracion: float, filas: int):
+        """Acumula una ejecución de la sentencia"""
+        forma = normalizar_sql(sql)
+
+        with cls._lock:
+            if cls._pid != os.getpid():
+                # Un worker hijo no hereda las estadísticas del proceso maestro
+                cls._formas = {}
+                cls._pid = os.getpid()
+                cls._desde = time.time()
+
+            datos = cls._formas.get(forma)
+            if datos is None:
+                if len(cls._formas) >= MAX_FORMAS:
+                    cls._descartar_menos_costosas()
+                datos = cls._formas[forma] = {
+                    'cantidad': 0,
+                    'tiempo_total': 0.0,
+                    'tiempo_max': 0.0,
+                    'filas': 0,
+                    'latencias': [],
+                    'sql': None,
+                    'parametros': None,
+                }
+
+            datos['cantidad'] += 1
+            datos['tiempo_total'] += duracion
+            if duracion > datos['tiempo_max']:
+                datos['tiempo_max'] = duracion
+                # La ejecución más lenta es la mejor candidata para EXPLAIN
+                datos['sql'] = _CADENA.sub(f"'{TEXTO_REDACTADO}'", sql)
+                datos['parametros'] = _redactar(parametros)
+            if filas and filas > 0:
+                datos['filas'] += filas
+
+            latencias = datos['latencias']
+            if len(latencias) < MAX_MUESTRAS_LATENCIA:
+                latencias.append(duracion)
+            else:
+                indice = random.randrange(datos['cantidad'])
+                if indice < MAX_MUESTRAS_LATENCIA:
+                    latencias[indice] = duracion
+
+    @classmethod
+    def _descartar_menos_costosas(cls):
+        # Se conserva la mitad con mayor tiempo total
+        ordenadas = sorted(cls._formas.items(), key=lambda item: item[1]['tiempo_total'], reverse=True)
+        cls._formas = dict(ordenadas[:MAX_FORMAS // 2])
+
+    @classmethod
+    def top(cls, limite: int = 20, orden: str = 'tiempo_total', incluir_muestras: bool = False) -> Dict:
+        """
+        Consultas con mayor costo
+
+        Args:
+            limite: Cantidad de formas a devolver
+            orden: 'tiempo_total', 'cantidad', 'p95' o 'tiempo_max'
+            incluir_muestras: Incluir la sentencia y parámetros de la ejecución más lenta
+
+        Returns:
+            Diccionario con pid, segundos capturados y la lista de consultas
+        """
+        with cls._lock:
+            copia = [(forma, dict(datos, latencias=list(datos['latencias']))) for forma, datos in cls._formas.items()]
+            pid, desde = cls._pid, cls._desde
+
+        consultas = []
+        for forma, datos in copia:
+            latencias = datos['latencias']
+            consulta = {
+                'forma': forma,
+                'cantidad': datos['cantidad'],
+                'tiempo_total_ms': round(datos['tiempo_total'] * 1000, 3),
+                'tiempo_promedio_ms': round(datos['tiempo_total'] * 1000 / datos['cantidad'], 3),
+                'tiempo_max_ms': round(datos['tiempo_max'] * 1000, 3),
+                'p50_ms': round(_percentil(latencias, 0.50) * 1000, 3),
+                'p95_ms': round(_percentil(latencias, 0.95) * 1000, 3),
+                'p99_ms': round(_percentil(latencias, 0.99) * 1000, 3),
+                'filas': datos['filas'],
+            }
+            if incluir_muestras:
+                consulta['sql'] = datos['sql']
+                consulta['parametros'] = _serializable(datos['parametros'])
+            consultas.append(consulta)
+
+        clave = {
+            'cantidad': 'cantidad',
+            'p95': 'p95_ms',
+            'tiempo_max': 'tiempo_max_ms',
+        }.get(orden, 'tiempo_total_ms')
+        consultas.sort(key=lambda c: c[clave], reverse=True)
+
+        return {
+            'pid': pid,
+            'segundos_capturados': round(time.time() - desde, 1),
+            'formas': len(copia),
+            'consultas': consultas[:limite],
+        }
+
+
+def configurar_captura_consultas() -> None:
+    """Registra los eventos de captura en todos los engines (una sola vez por proceso)"""
+    if event.contains(Engine, 'after_cursor_execute', _despues_de_ejecutar):
+        return
+    event.listen(Engine, 'before_cursor_execute', _antes_de_ejecutar)
+    event.listen(Engine, 'after_cursor_execute', _despues_de_ejecutar)
+    event.listen(Engine, 'handle_error', _al_fallar)
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('inicio_consulta', []).append(time.perf_counter())
+
+
+def _al_fallar(contexto):
+    """Una consulta que falla no llega a after_cursor_execute: se descarta su inicio"""
+    conn = contexto.connection
+    if conn is None:
+        return
+    pila = conn.info.get('inicio_consulta')
+    if pila:
+        pila.pop()
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    pila = conn.info.get('inicio_consulta')
+    if not pila:
+        return
+    duracion = time.perf_counter() - pila.pop()
+
+    if executemany and parameters:
+        parameters = parameters[0]
+
+    CapturaConsultas.registrar(statement, parameters, duracion, getattr(cursor, 'rowcount', 0))
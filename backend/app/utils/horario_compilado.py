@@ -0,0 +1,141 @@
+"""
+Horarios laborales precompilados por proyecto.
+Deriva una sola vez los rangos de cada turno (horas esperadas, hora de cierre)
+a partir de los atributos del Proyecto y los cachea por proyecto, evitando
+recalcularlos con datetime.combine en cada llamada.
+"""
+from typing import Optional
+
+# Máximo de proyectos cacheados antes de vaciar la caché
+MAX_HORARIOS_CACHEADOS = 1024
+
+_ATRIBUTOS_HORARIO = (
+    'modo_horarios',
+    'horario_inicio', 'horario_fin',
+    'turno_manana_inicio', 'turno_manana_fin',
+    'turno_tarde_inicio', 'turno_tarde_fin',
+)
+
+_cache = {}
+
+
+def _microsegundos(hora) -> int:
+    """Offset de un objeto time desde medianoche, en microsegundos"""
+    return ((hora.hour * 60 + hora.minute) * 60 + hora.second) * 1_000_000 + hora.microsecond
+
+
+def horas_entre(hora_inicio, hora_fin) -> float:
+    """
+    Horas entre dos horarios sin crear datetimes.
+    Si la hora de fin es menor o igual a la de inicio, cruza medianoche.
+    """
+    diferencia = _microsegundos(hora_fin) - _microsegundos(hora_inicio)
+    if diferencia <= 0:
+        diferencia += 86_400_000_000
+    return (diferencia / 1_000_000) / 3600
+
+
+class _Inmutable:
+    """Base para objetos compilados: los atributos solo se asignan en __init__"""
+    __slots__ = ()
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError(f'{type(self).__name__} es inmutable')
+
+    def __delattr__(self, nombre):
+        raise AttributeError(f'{type(self).__name__} es inmutable')
+
+
+class TurnoCompilado(_Inmutable):
+    """Rango horario de un turno con sus valores derivados"""
+    __slots__ = ('inicio', 'fin', 'horas_esperadas')
+
+    def __init__(self, inicio, fin):
+        asignar = object.__setattr__
+        asignar(self, 'inicio', inicio)
+        asignar(self, 'fin', fin)
+        asignar(self, 'horas_esperadas', horas_entre(inicio, fin) if inicio and fin else 0.0)
+
+    @property
+    def completo(self) -> bool:
+        """True si el turno tiene inicio y fin configurados"""
+        return bool(self.inicio and self.fin)
+
+
+class HorarioCompilado(_Inmutable):
+    """Horario laboral de un proyecto, listo para consultas repetidas"""
+    __slots__ = ('firma', 'modo', 'general', 'manana', 'tarde', 'horas_debidas_dia')
+
+    def __init__(self, firma: tuple):
+        modo = firma[0]
+        general = TurnoCompilado(firma[1], firma[2])
+        manana = TurnoCompilado(firma[3], firma[4])
+        tarde = TurnoCompilado(firma[5], firma[6])
+
+        if modo == 'turnos':
+            horas_debidas = manana.horas_esperadas + tarde.horas_esperadas
+        elif modo == 'corrido':
+            horas_debidas = general.horas_esperadas
+        else:
+            horas_debidas = 0.0
+
+        asignar = object.__setattr__
+        asignar(self, 'firma', firma)
+        asignar(self, 'modo', modo)
+        asignar(self, 'general', general)
+        asignar(self, 'manana', manana)
+        asignar(self, 'tarde', tarde)
+        asignar(self, 'horas_debidas_dia', horas_debidas)
+
+    def turno(self, turno: Optional[str] = None) -> TurnoCompilado:
+        """Rango aplicable a un turno ('manana', 'tarde' o None/especial = horario general)"""
+        if self.modo == 'turnos':
+            if turno == 'manana':
+                return self.manana
+            if turno == 'tarde':
+                return self.tarde
+        return self.general
+
+    def hora_cierre(self, turno: Optional[str] = None):
+        """Hora de cierre del turno, o None si el modo de horarios no es conocido"""
+        if self.modo == 'corrido':
+            return self.general.fin
+        if self.modo == 'turnos':
+            return self.turno(turno).fin
+        return None
+
+
+def _firma(proyecto) -> tuple:
+    return tuple(getattr(proyecto, atributo) for atributo in _ATRIBUTOS_HORARIO)
+
+
+def obtener_horario_compilado(proyecto) -> HorarioCompilado:
+    """
+    Obtiene el horario compilado de un proyecto desde la caché.
+    Se recompila si cambió alguno de los atributos de horario (por ejemplo, en otro worker).
+
+    Args:
+        proyecto: Objeto Proyecto con configuración de horarios
+
+    Returns:
+        HorarioCompilado del proyecto
+    """
+    firma = _firma(proyecto)
+    proyecto_id = getattr(proyecto, 'id', None)
+
+    if proyecto_id is None:
+        return HorarioCompilado(firma)
+
+    horario = _cache.get(proyecto_id)
+    if horario is None or horario.firma != firma:
+        if len(_cache) >= MAX_HORARIOS_CACHEADOS:
+            _cache.clear()
+        horario = HorarioCompilado(firma)
+        _cache[proyecto_id] = horario
+
+    return horario
+
+
+def invalidar_horario_compilado(proyecto_id: int) -> None:
+    """Descarta el horario compilado de un proyecto (tras cambiar su configuración)"""
+    _cache.pop(proyecto_id, None)
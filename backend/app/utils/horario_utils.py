@@ -2,9 +2,8 @@
 Utilidades para cálculo y manejo de horarios laborales.
 Centraliza la lógica repetida de horarios en diferentes servicios.
 """
-from datetime import datetime, date, timedelta
 from typing import Tuple, Optional
-from time import time as get_time
+from .horario_compilado import obtener_horario_compilado, horas_entre
 
 
 def obtener_horarios_turno(proyecto, turno: Optional[str] = None) -> Tuple[Optional[object], Optional[object]]:
@@ -18,17 +17,8 @@ def obtener_horarios_turno(proyecto, turno: Optional[str] = None) -> Tuple[Optio
     Returns:
         Tupla (hora_inicio, hora_fin) como objetos time
     """
-    if proyecto.modo_horarios == 'turnos':
-        if turno == 'manana':
-            return proyecto.turno_manana_inicio, proyecto.turno_manana_fin
-        elif turno == 'tarde':
-            return proyecto.turno_tarde_inicio, proyecto.turno_tarde_fin
-        else:
-            # Turno especial o no definido, usar horario general
-            return proyecto.horario_inicio, proyecto.horario_fin
-    else:
-        # Modo corrido
-        return proyecto.horario_inicio, proyecto.horario_fin
+    horario = obtener_horario_compilado(proyecto).turno(turno)
+    return horario.inicio, horario.fin
 
 
 def obtener_hora_cierre_turno(proyecto, turno: Optional[str] = None) -> Optional[object]:
@@ -42,18 +32,7 @@ def obtener_hora_cierre_turno(proyecto, turno: Optional[str] = None) -> Optional
     Returns:
         Objeto time con la hora de cierre o None
     """
-    if proyecto.modo_horarios == 'corrido':
-        return proyecto.horario_fin
-    elif proyecto.modo_horarios == 'turnos':
-        if turno == 'manana':
-            return proyecto.turno_manana_fin
-        elif turno == 'tarde':
-            return proyecto.turno_tarde_fin
-        else:
-            # Turno especial o no definido, usar horario general
-            return proyecto.horario_fin
-    
-    return None
+    return obtener_horario_compilado(proyecto).hora_cierre(turno)
 
 
 def calcular_horas_esperadas(hora_inicio, hora_fin) -> float:
@@ -71,14 +50,7 @@ def calcular_horas_esperadas(hora_inicio, hora_fin) -> float:
     if not hora_inicio or not hora_fin:
         return 0.0
     
-    hora_inicio_dt = datetime.combine(date.today(), hora_inicio)
-    hora_fin_dt = datetime.combine(date.today(), hora_fin)
-    
-    # Si la hora de fin es menor o igual a la de inicio, cruza medianoche
-    if hora_fin_dt <= hora_inicio_dt:
-        hora_fin_dt += timedelta(days=1)
-    
-    return (hora_fin_dt - hora_inicio_dt).total_seconds() / 3600
+    return horas_entre(hora_inicio, hora_fin)
 
 
 def calcular_horas_extras(
@@ -99,14 +71,13 @@ def calcular_horas_extras(
     """
     horas_trabajadas = float(horas_trabajadas)
     
-    # Obtener horario laboral esperado
-    hora_inicio, hora_fin = obtener_horarios_turno(proyecto, turno)
+    # Obtener horario laboral esperado (precompilado por proyecto)
+    horario = obtener_horario_compilado(proyecto).turno(turno)
     
-    if not hora_inicio or not hora_fin:
+    if not horario.completo:
         return horas_trabajadas, 0.0
     
-    # Calcular horas esperadas
-    horas_esperadas = calcular_horas_esperadas(hora_inicio, hora_fin)
+    horas_esperadas = horario.horas_esperadas
     
     # Calcular horas extras
     if horas_trabajadas > horas_esperadas:
@@ -138,35 +109,8 @@ def calcular_horas_debidas_dia(proyecto, empleado=None, turno: Optional[str] = N
     #         empleado.horario_fin
     #     )
     
-    if proyecto.modo_horarios == 'turnos':
-        # En turnos, calcular horas de ambos turnos si aplica
-        horas_dia = 0.0
-        
-        if proyecto.turno_manana_inicio and proyecto.turno_manana_fin:
-            horas_manana = calcular_horas_esperadas(
-                proyecto.turno_manana_inicio,
-                proyecto.turno_manana_fin
-            )
-            horas_dia += horas_manana
-        
-        if proyecto.turno_tarde_inicio and proyecto.turno_tarde_fin:
-            horas_tarde = calcular_horas_esperadas(
-                proyecto.turno_tarde_inicio,
-                proyecto.turno_tarde_fin
-            )
-            horas_dia += horas_tarde
-        
-        return horas_dia
-    
-    elif proyecto.modo_horarios == 'corrido':
-        # En modo corrido, usar horario general
-        if proyecto.horario_inicio and proyecto.horario_fin:
-            return calcular_horas_esperadas(
-                proyecto.horario_inicio,
-                proyecto.horario_fin
-            )
-    
-    return 0.0
+    # En turnos suma ambos turnos configurados; en corrido usa el horario general
+    return obtener_horario_compilado(proyecto).horas_debidas_dia
 
 
 def validar_configuracion_horarios(proyecto) -> Tuple[bool, Optional[str]]:
@@ -0,0 +1,313 @@
+"""
+Instrumentación por solicitud.
+Mide en cada solicitud HTTP el tiempo total, la cantidad y el tiempo de las
+consultas SQL, las filas leídas, el tiempo de serialización JSON y los bytes de
+la respuesta. Lo publica en el header Server-Timing, lo acumula por endpoint para
+/metrics (formato Prometheus) y avisa cuando una solicitud repite la misma forma
+de consulta más de N_MAS_1_UMBRAL veces (típico N+1 de relaciones lazy).
+Las métricas son por proceso (cada worker de gunicorn acumula las suyas).
+"""
+import os
+import threading
+import time
+from typing import Dict
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.captura_consultas import normalizar_sql
+from app.utils.json_rapido import ProveedorJSONRapido
+
+# Límites superiores (segundos) del histograma de duración de solicitudes
+BUCKETS_DURACION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MedicionSolicitud:
+    """Acumulador de la solicitud en curso (vive en flask.g)"""
+
+    __slots__ = ('inicio', 'consultas', 'tiempo_sql', 'filas', 'tiempo_serializacion', 'formas')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.filas = 0
+        self.tiempo_serializacion = 0.0
+        self.formas = {}
+
+
+class MetricasSolicitudes:
+    """Totales por endpoint del proceso actual"""
+
+    _lock = threading.Lock()
+    _endpoints = {}
+    _pid = os.getpid()
+
+    @classmethod
+    def reiniciar(cls):
+        with cls._lock:
+            cls._endpoints = {}
+            cls._pid = os.getpid()
+
+    @classmethod
+    def registrar(cls, metodo: str, endpoint: str, estado: int, duracion: float,
+                  medicion: MedicionSolicitud, bytes_respuesta: int, sospechas_n_mas_1: int):
+        with cls._lock:
+            if cls._pid != os.getpid():
+                # Un worker hijo no hereda las métricas del proceso maestro
+                cls._endpoints = {}
+                cls._pid = os.getpid()
+
+            datos = cls._endpoints.get((metodo, endpoint))
+            if datos is None:
+                datos = cls._endpoints[(metodo, endpoint)] = {
+                    'solicitudes': {},
+                    'duracion_total': 0.0,
+                    'duracion_max': 0.0,
+                    'buckets': [0] * len(BUCKETS_DURACION),
+                    'consultas': 0,
+                    'tiempo_sql': 0.0,
+                    'filas': 0,
+                    'tiempo_serializacion': 0.0,
+                    'bytes': 0,
+                    'n_mas_1': 0,
+                }
+
+            datos['solicitudes'][estado] = datos['solicitudes'].get(estado, 0) + 1
+            datos['duracion_total'] += duracion
+            if duracion > datos['duracion_max']:
+                datos['duracion_max'] = duracion
+            for indice, limite in enumerate(BUCKETS_DURACION):
+                if duracion <= limite:
+                    datos['buckets'][indice] += 1
+                    break
+            datos['consultas'] += medicion.consultas
+            datos['tiempo_sql'] += medicion.tiempo_sql
+            datos['filas'] += medicion.filas
+            datos['tiempo_serializacion'] += medicion.tiempo_serializacion
+            datos['bytes'] += bytes_respuesta
+            datos['n_mas_1'] += sospechas_n_mas_1
+
+    @classmethod
+    def snapshot(cls) -> Dict:
+        """
+        Copia de los totales por endpoint
+
+        Returns:
+            Diccionario con el pid y {(metodo, endpoint): totales}
+        """
+        with cls._lock:
+            endpoints = {
+                clave: dict(datos, solicitudes=dict(datos['solicitudes']), buckets=list(datos['buckets']))
+                for clave, datos in cls._endpoints.items()
+            }
+            return {'pid': cls._pid, 'endpoints': endpoints}
+
+
+class ProveedorJSONMedido(ProveedorJSONRapido):
+    """Proveedor JSON de la app que suma a la solicitud el tiempo de serialización"""
+
+    def serializar(self, obj, indentar: bool = False) -> bytes:
+        return self._medir(super().serializar, obj, indentar)
+
+    def serializar_msgpack(self, obj) -> bytes:
+        return self._medir(super().serializar_msgpack, obj)
+
+    @staticmethod
+    def _medir(serializar, *args) -> bytes:
+        if not has_request_context():
+            return serializar(*args)
+
+        inicio = time.perf_counter()
+        try:
+            return serializar(*args)
+        finally:
+            medicion = g.get('medicion')
+            if medicion is not None:
+                medicion.tiempo_serializacion += time.perf_counter() - inicio
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('inicio_medicion', []).append(time.perf_counter())
+
+
+def _al_fallar(contexto):
+    """Una consulta que falla no llega a after_cursor_execute: se descarta su inicio"""
+    conn = contexto.connection
+    if conn is None:
+        return
+    pila = conn.info.get('inicio_medicion')
+    if pila:
+        pila.pop()
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    pila = conn.info.get('inicio_medicion')
+    if not pila or not has_request_context():
+        return
+    duracion = time.perf_counter() - pila.pop()
+
+    medicion = g.get('medicion')
+    if medicion is None:
+        return
+    medicion.consultas += 1
+    medicion.tiempo_sql += duracion
+    filas = getattr(cursor, 'rowcount', 0)
+    if filas and filas > 0:
+        medicion.filas += filas
+    forma = normalizar_sql(statement)
+    medicion.formas[forma] = medicion.formas.get(forma, 0) + 1
+
+
+def configurar_instrumentacion(app, server_timing: bool = True, umbral_n_mas_1: int = 10) -> None:
+    """
+    Registra la medición por solicitud en la app
+
+    Args:
+        app: Aplicación Flask
+        server_timing: Agregar el header Server-Timing a las respuestas
+        umbral_n_mas_1: Repeticiones de una misma forma de consulta en una solicitud
+            a partir de las cuales se avisa un posible N+1 (0 = no avisar)
+    """
+    app.json = ProveedorJSONMedido(app)
+
+    if not event.contains(Engine, 'after_cursor_execute', _despues_de_ejecutar):
+        event.listen(Engine, 'before_cursor_execute', _antes_de_ejecutar)
+        event.listen(Engine, 'after_cursor_execute', _despues_de_ejecutar)
+        event.listen(Engine, 'handle_error', _al_fallar)
+
+    @app.before_request
+    def _iniciar_medicion():
+        g.medicion = MedicionSolicitud()
+
+    @app.after_request
+    def _finalizar_medicion(response):
+        medicion = g.pop('medicion', None)
+        if medicion is None:
+            return response
+
+        duracion = time.perf_counter() - medicion.inicio
+        endpoint = request.url_rule.rule if request.url_rule else 'sin_ruta'
+
+        sospechas = 0
+        if umbral_n_mas_1 > 0:
+            for forma, cantidad in medicion.formas.items():
+                if cantidad > umbral_n_mas_1:
+                    sospechas += 1
+                    print(f"⚠️ Posible N+1 en {request.method} {endpoint}: "
+                          f"{cantidad} ejecuciones de {forma[:160]}")
+
+        if response.direct_passthrough or response.is_streamed:
+            bytes_respuesta = response.content_length or 0
+        else:
+            bytes_respuesta = response.calculate_content_length() or 0
+
+        MetricasSolicitudes.registrar(
+            request.method, endpoint, response.status_code, duracion, medicion, bytes_respuesta, sospechas
+        )
+
+        if server_timing:
+            response.headers.add(
+                'Server-Timing',
+                f'app;dur={duracion * 1000:.1f}, '
+                f'db;dur={medicion.tiempo_sql * 1000:.1f};desc="{medicion.consultas} consultas", '
+                f'ser;dur={medicion.tiempo_serializacion * 1000:.1f}'
+            )
+
+        return response
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(**valores) -> str:
+    return ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in valores.items())
+
+
+def exportar_prometheus(pool_snapshot: Dict = None, cache_snapshot: Dict = None) -> str:
+    """
+    Métricas del worker en formato de texto de Prometheus
+
+    Args:
+        pool_snapshot: Resultado de MetricasPool.snapshot(pool) para incluir el pool de conexiones
+        cache_snapshot: Resultado de CacheRespuestas.snapshot() para incluir la caché de respuestas
+
+    Returns:
+        Texto para la respuesta de /metrics
+    """
+    datos = MetricasSolicitudes.snapshot()
+    worker = datos['pid']
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda, muestras):
+        lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} {tipo}')
+        lineas.extend(muestras)
+
+    endpoints = sorted(datos['endpoints'].items())
+
+    metrica('mishoras_http_solicitudes_total', 'counter', 'Solicitudes atendidas', [
+        f'mishoras_http_solicitudes_total{{{_etiquetas(worker=worker, metodo=m, endpoint=e, estado=estado)}}} {cantidad}'
+        for (m, e), d in endpoints for estado, cantidad in sorted(d['solicitudes'].items())
+    ])
+
+    muestras = []
+    for (m, e), d in endpoints:
+        base = _etiquetas(worker=worker, metodo=m, endpoint=e)
+        total = sum(d['solicitudes'].values())
+        acumulado = 0
+        for limite, cantidad in zip(BUCKETS_DURACION, d['buckets']):
+            acumulado += cantidad
+            muestras.append(f'mishoras_http_duracion_segundos_bucket{{{base},le="{limite}"}} {acumulado}')
+        muestras.append(f'mishoras_http_duracion_segundos_bucket{{{base},le="+Inf"}} {total}')
+        muestras.append(f'mishoras_http_duracion_segundos_sum{{{base}}} {d["duracion_total"]:.6f}')
+        muestras.append(f'mishoras_http_duracion_segundos_count{{{base}}} {total}')
+    metrica('mishoras_http_duracion_segundos', 'histogram', 'Duración de las solicitudes', muestras)
+
+    for nombre, clave, ayuda in (
+        ('mishoras_http_consultas_sql_total', 'consultas', 'Consultas SQL ejecutadas por las solicitudes'),
+        ('mishoras_http_sql_segundos_total', 'tiempo_sql', 'Tiempo en consultas SQL'),
+        ('mishoras_http_filas_sql_total', 'filas', 'Filas leídas o afectadas por las consultas'),
+        ('mishoras_http_serializacion_segundos_total', 'tiempo_serializacion', 'Tiempo de serialización JSON'),
+        ('mishoras_http_respuesta_bytes_total', 'bytes', 'Bytes de las respuestas'),
+        ('mishoras_http_n_mas_1_total', 'n_mas_1', 'Formas de consulta repetidas por encima del umbral N+1'),
+    ):
+        metrica(nombre, 'counter', ayuda, [
+            f'{nombre}{{{_etiquetas(worker=worker, metodo=m, endpoint=e)}}} {d[clave]}'
+            for (m, e), d in endpoints
+        ])
+
+    if pool_snapshot:
+        etiqueta = _etiquetas(worker=worker)
+        for clave in ('checkouts', 'esperas', 'timeouts', 'invalidaciones', 'pings_fallidos'):
+            nombre = f'mishoras_db_pool_{clave}_total'
+            metrica(nombre, 'counter', f'Pool de conexiones: {clave}', [f'{nombre}{{{etiqueta}}} {pool_snapshot[clave]}'])
+        metrica('mishoras_db_pool_espera_segundos_total', 'counter', 'Espera total por una conexión libre',
+                [f'mishoras_db_pool_espera_segundos_total{{{etiqueta}}} {pool_snapshot["tiempo_espera_total"]:.6f}'])
+        if 'pool' in pool_snapshot:
+            metrica('mishoras_db_pool_en_uso', 'gauge', 'Conexiones tomadas del pool',
+                    [f'mishoras_db_pool_en_uso{{{etiqueta}}} {pool_snapshot["pool"]["en_uso"]}'])
+
+    if cache_snapshot:
+        etiqueta = _etiquetas(worker=worker)
+        metrica('mishoras_cache_respuestas_aciertos_total', 'counter', 'Respuestas servidas desde la caché', [
+            f'mishoras_cache_respuestas_aciertos_total{{{etiqueta},nivel="{nivel}"}} {cache_snapshot[f"aciertos_{nivel}"]}'
+            for nivel in ('memoria', 'compartida')
+        ])
+        for clave, ayuda in (
+            ('fallos', 'Respuestas que no estaban en la caché'),
+            ('guardadas', 'Respuestas guardadas en la caché'),
+            ('desalojadas', 'Respuestas desalojadas del LRU en memoria'),
+            ('omitidas', 'Respuestas demasiado grandes para guardarse'),
+            ('errores_compartida', 'Errores de la caché compartida'),
+        ):
+            nombre = f'mishoras_cache_respuestas_{clave}_total'
+            metrica(nombre, 'counter', ayuda, [f'{nombre}{{{etiqueta}}} {cache_snapshot[clave]}'])
+        for clave, ayuda in (('entradas', 'Respuestas en el LRU en memoria'), ('bytes', 'Bytes en el LRU en memoria')):
+            nombre = f'mishoras_cache_respuestas_{clave}'
+            metrica(nombre, 'gauge', ayuda, [f'{nombre}{{{etiqueta}}} {cache_snapshot[clave]}'])
+
+    return '\n'.join(lineas) + '\n'
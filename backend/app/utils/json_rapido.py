@@ -0,0 +1,116 @@
+"""
+Proveedor JSON rápido para Flask (jsonify, success_response, ApiResponse).
+Usa orjson si está instalado (se carga recién en la primera respuesta) y, si no,
+la librería estándar con la misma salida: fechas y horas en ISO 8601, Decimal
+como float (igual que los to_dict), UTF-8 sin escapar y sin ordenar claves.
+Los clientes que piden 'Accept: application/msgpack' reciben MessagePack
+(ver msgpack_rapido).
+"""
+import dataclasses
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from importlib.util import find_spec
+from uuid import UUID
+
+from flask.json.provider import DefaultJSONProvider
+
+from app.config import JSON_ORJSON, JSON_COMPACTO, API_MSGPACK
+from app.utils.msgpack_rapido import MIMETYPE_MSGPACK, acepta_msgpack, serializar_msgpack
+
+ORJSON_DISPONIBLE = find_spec('orjson') is not None
+
+_orjson = None
+
+
+def _cargar_orjson():
+    global _orjson
+    if _orjson is None:
+        import orjson
+        _orjson = orjson
+    return _orjson
+
+
+def _por_defecto(valor):
+    """Tipos que la librería estándar (u orjson) no serializa por sí misma"""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date, time)):
+        return valor.isoformat()
+    if isinstance(valor, UUID):
+        return str(valor)
+    if isinstance(valor, bytes):
+        return valor.decode('utf-8', 'replace')
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        return dataclasses.asdict(valor)
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    if hasattr(valor, '__html__'):
+        return str(valor.__html__())
+    raise TypeError(f'Objeto de tipo {type(valor).__name__} no serializable a JSON')
+
+
+class ProveedorJSONRapido(DefaultJSONProvider):
+    """
+    Proveedor JSON de la app
+
+    usar_orjson: Serializar con orjson cuando está instalado (JSON_ORJSON)
+    compact: True = sin espacios, False = indentado, None = indentado solo en debug (JSON_COMPACTO)
+    """
+
+    usar_orjson = JSON_ORJSON
+    compact = {'true': True, 'false': False}.get(JSON_COMPACTO)
+    sort_keys = False
+    ensure_ascii = False
+
+    def _indentar(self) -> bool:
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def serializar(self, obj, indentar: bool = False) -> bytes:
+        """Serializa a bytes UTF-8 (la ruta que usan las respuestas)"""
+        if self.usar_orjson and ORJSON_DISPONIBLE:
+            orjson = _cargar_orjson()
+            opciones = orjson.OPT_NON_STR_KEYS
+            if indentar:
+                opciones |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=_por_defecto, option=opciones)
+            except TypeError:
+                # orjson es estricto (enteros de más de 64 bits, claves mixtas): se reintenta con json
+                pass
+
+        if indentar:
+            texto = json.dumps(obj, default=_por_defecto, ensure_ascii=False, indent=2)
+        else:
+            texto = json.dumps(obj, default=_por_defecto, ensure_ascii=False, separators=(',', ':'))
+        return texto.encode('utf-8')
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            kwargs.setdefault('default', _por_defecto)
+            kwargs.setdefault('ensure_ascii', False)
+            return json.dumps(obj, **kwargs)
+        return self.serializar(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if not kwargs and self.usar_orjson and ORJSON_DISPONIBLE:
+            return _cargar_orjson().loads(s)
+        return json.loads(s, **kwargs)
+
+    def serializar_msgpack(self, obj) -> bytes:
+        """Serializa a MessagePack (respuestas negociadas con Accept: application/msgpack)"""
+        return serializar_msgpack(obj)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if acepta_msgpack():
+            try:
+                respuesta = self._app.response_class(self.serializar_msgpack(obj), mimetype=MIMETYPE_MSGPACK)
+                respuesta.vary.add('Accept')
+                return respuesta
+            except (TypeError, ValueError, OverflowError):
+                pass  # Objeto no codificable en MessagePack: se responde JSON
+        respuesta = self._app.response_class(self.serializar(obj, self._indentar()) + b'\n', mimetype=self.mimetype)
+        if API_MSGPACK:
+            respuesta.vary.add('Accept')
+        return respuesta
@@ -0,0 +1,116 @@
+"""
+Respuestas en MessagePack por negociación de contenido.
+Si el cliente pide 'Accept: application/msgpack' (y msgpack está instalado) las
+respuestas de jsonify / ApiResponse se codifican en MessagePack en lugar de JSON;
+en cualquier otro caso, o si el objeto no se puede codificar, se responde JSON.
+
+Tipos de extensión (el cliente registra los mismos códigos en su decodificador):
+    1: date      'AAAA-MM-DD'
+    2: datetime  ISO 8601 (sin zona = hora local, como en la base)
+    3: time      'HH:MM[:SS]'
+    4: Decimal   texto decimal exacto
+Los to_dict ya entregan fechas y horas como texto; las extensiones cubren los
+valores que llegan sin convertir.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from importlib.util import find_spec
+
+from flask import g, has_request_context, request
+
+from app.config import API_MSGPACK
+
+MSGPACK_DISPONIBLE = find_spec('msgpack') is not None
+
+MIMETYPE_MSGPACK = 'application/msgpack'
+
+# Alias que todavía envían algunos clientes
+_MIMETYPES_ACEPTADOS = (MIMETYPE_MSGPACK, 'application/x-msgpack')
+
+EXT_FECHA = 1
+EXT_FECHA_HORA = 2
+EXT_HORA = 3
+EXT_DECIMAL = 4
+
+_msgpack = None
+
+
+def _cargar_msgpack():
+    global _msgpack
+    if _msgpack is None:
+        import msgpack
+        _msgpack = msgpack
+    return _msgpack
+
+
+# Tipo exacto -> código de extensión (búsqueda por diccionario: el hook se llama por cada valor)
+_EXTENSIONES = {
+    datetime: EXT_FECHA_HORA,
+    date: EXT_FECHA,
+    time: EXT_HORA,
+    Decimal: EXT_DECIMAL,
+}
+
+
+def _a_extension(valor):
+    """Tipos sin representación nativa en MessagePack"""
+    codigo = _EXTENSIONES.get(type(valor))
+    if codigo is not None:
+        texto = str(valor) if codigo == EXT_DECIMAL else valor.isoformat()
+        return _msgpack.ExtType(codigo, texto.encode('ascii'))
+
+    # Subclases (p. ej. de datetime) y el resto de los tipos que admite la respuesta JSON
+    for tipo, codigo in _EXTENSIONES.items():
+        if isinstance(valor, tipo):
+            texto = str(valor) if codigo == EXT_DECIMAL else valor.isoformat()
+            return _msgpack.ExtType(codigo, texto.encode('ascii'))
+
+    from app.utils.json_rapido import _por_defecto
+    return _por_defecto(valor)
+
+
+def serializar_msgpack(obj) -> bytes:
+    """
+    Codifica un objeto en MessagePack
+
+    Raises:
+        TypeError / OverflowError / ValueError: Si el objeto no se puede codificar
+    """
+    return _cargar_msgpack().packb(obj, default=_a_extension, use_bin_type=True, datetime=False)
+
+
+def deserializar_msgpack(datos: bytes):
+    """Decodifica MessagePack convirtiendo las extensiones a texto (como en JSON)"""
+    msgpack = _cargar_msgpack()
+
+    def _desde_extension(codigo, datos):
+        if codigo in (EXT_FECHA, EXT_FECHA_HORA, EXT_HORA, EXT_DECIMAL):
+            return datos.decode('ascii')
+        return msgpack.ExtType(codigo, datos)
+
+    return msgpack.unpackb(datos, ext_hook=_desde_extension, raw=False, strict_map_key=False)
+
+
+def solo_json():
+    """
+    La solicitud actual responde JSON aunque el cliente pida MessagePack (p. ej. las
+    escrituras idempotentes, cuya respuesta se guarda como texto y se reenvía tal cual)
+    """
+    g.solo_json = True
+
+
+def acepta_msgpack() -> bool:
+    """
+    Indica si la solicitud actual pide MessagePack: el cliente debe nombrarlo
+    explícitamente en Accept (un '*/*' no alcanza) con calidad no menor que JSON
+    """
+    if not (API_MSGPACK and MSGPACK_DISPONIBLE and has_request_context()):
+        return False
+    if g.get('solo_json'):
+        return False
+    aceptados = request.accept_mimetypes
+    calidad = max(
+        (q for mimetype, q in aceptados if mimetype in _MIMETYPES_ACEPTADOS),
+        default=0
+    )
+    return calidad > 0 and calidad >= aceptados['application/json']
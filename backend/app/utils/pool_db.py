@@ -0,0 +1,210 @@
+"""
+Pool de conexiones instrumentado.
+QueuePool que mide la espera de cada checkout y contadores alimentados por los
+eventos del pool (checkouts, esperas, overflow, invalidaciones), más un ping
+alternativo a pool_pre_ping que solo valida conexiones inactivas hace un tiempo.
+Las métricas son por proceso (cada worker de gunicorn tiene su propio pool).
+"""
+import os
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# Una espera de checkout mayor a este umbral cuenta como "espera" (pool agotado)
+UMBRAL_ESPERA_SEGUNDOS = 0.005
+
+# Límites superiores (segundos) del histograma de esperas de checkout
+_BUCKETS_ESPERA = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class MetricasPool:
+    """Contadores del pool de conexiones del proceso actual"""
+
+    _lock = threading.Lock()
+    _contadores = {}
+    _buckets = []
+    _pico_en_uso = 0
+    _pico_overflow = 0
+    _pid = None
+
+    @classmethod
+    def reiniciar(cls):
+        """Pone los contadores en cero (también tras un fork)"""
+        with cls._lock:
+            cls._contadores = {
+                'checkouts': 0,
+                'checkins': 0,
+                'esperas': 0,
+                'timeouts': 0,
+                'tiempo_espera_total': 0.0,
+                'tiempo_espera_max': 0.0,
+                'conexiones_creadas': 0,
+                'conexiones_cerradas': 0,
+                'invalidaciones': 0,
+                'invalidaciones_suaves': 0,
+                'pings': 0,
+                'pings_fallidos': 0,
+            }
+            cls._buckets = [0] * (len(_BUCKETS_ESPERA) + 1)
+            cls._pico_en_uso = 0
+            cls._pico_overflow = 0
+            cls._pid = os.getpid()
+
+    @classmethod
+    def _verificar_proceso(cls):
+        # Un worker hijo no debe heredar los contadores del proceso maestro
+        if cls._pid != os.getpid():
+            cls.reiniciar()
+
+    @classmethod
+    def incrementar(cls, contador: str, cantidad: int = 1):
+        cls._verificar_proceso()
+        with cls._lock:
+            cls._contadores[contador] += cantidad
+
+    @classmethod
+    def registrar_espera(cls, segundos: float, pool):
+        cls._verificar_proceso()
+        with cls._lock:
+            c = cls._contadores
+            c['checkouts'] += 1
+            c['tiempo_espera_total'] += segundos
+            if segundos > c['tiempo_espera_max']:
+                c['tiempo_espera_max'] = segundos
+            if segundos > UMBRAL_ESPERA_SEGUNDOS:
+                c['esperas'] += 1
+
+            for indice, limite in enumerate(_BUCKETS_ESPERA):
+                if segundos <= limite:
+                    cls._buckets[indice] += 1
+                    break
+            else:
+                cls._buckets[-1] += 1
+
+            en_uso = pool.checkedout()
+            if en_uso > cls._pico_en_uso:
+                cls._pico_en_uso = en_uso
+            overflow = max(pool.overflow(), 0)
+            if overflow > cls._pico_overflow:
+                cls._pico_overflow = overflow
+
+    @classmethod
+    def snapshot(cls, pool=None) -> Dict:
+        """
+        Copia de las métricas actuales
+
+        Args:
+            pool: Pool del engine para incluir su estado actual (opcional)
+
+        Returns:
+            Diccionario con contadores, histograma de esperas y estado del pool
+        """
+        cls._verificar_proceso()
+        with cls._lock:
+            datos = dict(cls._contadores)
+            checkouts = datos['checkouts']
+            datos['tiempo_espera_promedio'] = datos['tiempo_espera_total'] / checkouts if checkouts else 0.0
+            datos['histograma_espera'] = {
+                **{f'<={limite}s': cantidad for limite, cantidad in zip(_BUCKETS_ESPERA, cls._buckets)},
+                f'>{_BUCKETS_ESPERA[-1]}s': cls._buckets[-1]
+            }
+            datos['pico_en_uso'] = cls._pico_en_uso
+            datos['pico_overflow'] = cls._pico_overflow
+            datos['pid'] = cls._pid
+
+        if pool is not None and isinstance(pool, QueuePool):
+            datos['pool'] = {
+                'tamano': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'timeout': pool.timeout(),
+                'en_uso': pool.checkedout(),
+                'disponibles': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'estado': pool.status(),
+            }
+
+        return datos
+
+
+MetricasPool.reiniciar()
+
+
+class QueuePoolInstrumentado(QueuePool):
+    """QueuePool que mide cuánto espera cada checkout por una conexión libre"""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except exc.TimeoutError:
+            MetricasPool.incrementar('timeouts')
+            raise
+        MetricasPool.registrar_espera(time.perf_counter() - inicio, self)
+        return conexion
+
+
+def _ping(dbapi_connection) -> None:
+    """Valida la conexión con el ping nativo del driver (o SELECT 1)"""
+    ping = getattr(dbapi_connection, 'ping', None)
+    if ping is not None:
+        ping(reconnect=False)
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+
+
+def configurar_eventos_pool(ping_inactividad_segundos: float = 0) -> None:
+    """
+    Registra los eventos de instrumentación sobre QueuePoolInstrumentado.
+
+    Args:
+        ping_inactividad_segundos: Si es mayor a 0, en el checkout se hace ping solo
+            a las conexiones que estuvieron inactivas al menos este tiempo; una
+            conexión caída se descarta y el pool entrega otra
+    """
+    if getattr(QueuePoolInstrumentado, '_eventos_configurados', False):
+        return
+    QueuePoolInstrumentado._eventos_configurados = True
+
+    @event.listens_for(QueuePoolInstrumentado, 'connect')
+    def _al_conectar(dbapi_connection, connection_record):
+        MetricasPool.incrementar('conexiones_creadas')
+        connection_record.info['ultimo_uso'] = time.monotonic()
+
+    @event.listens_for(QueuePoolInstrumentado, 'checkout')
+    def _al_tomar(dbapi_connection, connection_record, connection_proxy):
+        ahora = time.monotonic()
+        ultimo_uso = connection_record.info.get('ultimo_uso', ahora)
+        connection_record.info['ultimo_uso'] = ahora
+
+        if ping_inactividad_segundos > 0 and ahora - ultimo_uso >= ping_inactividad_segundos:
+            MetricasPool.incrementar('pings')
+            try:
+                _ping(dbapi_connection)
+            except Exception:
+                MetricasPool.incrementar('pings_fallidos')
+                # El pool invalida esta conexión y reintenta con una nueva
+                raise exc.DisconnectionError()
+
+    @event.listens_for(QueuePoolInstrumentado, 'checkin')
+    def _al_devolver(dbapi_connection, connection_record):
+        MetricasPool.incrementar('checkins')
+        connection_record.info['ultimo_uso'] = time.monotonic()
+
+    @event.listens_for(QueuePoolInstrumentado, 'invalidate')
+    def _al_invalidar(dbapi_connection, connection_record, exception):
+        MetricasPool.incrementar('invalidaciones')
+
+    @event.listens_for(QueuePoolInstrumentado, 'soft_invalidate')
+    def _al_invalidar_suave(dbapi_connection, connection_record, exception):
+        MetricasPool.incrementar('invalidaciones_suaves')
+
+    @event.listens_for(QueuePoolInstrumentado, 'close')
+    def _al_cerrar(dbapi_connection, connection_record):
+        MetricasPool.incrementar('conexiones_cerradas')
@@ -1,5 +1,7 @@
 """
 Response Utils - Centraliza respuestas estandarizadas
+Se serializan con el proveedor JSON de la app, que responde MessagePack a los
+clientes que envían 'Accept: application/msgpack' (ver utils/msgpack_rapido.py)
 """
 
 from flask import jsonify
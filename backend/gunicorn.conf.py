@@ -0,0 +1,67 @@
+"""
+Configuración de gunicorn para el backend
+Uso: gunicorn -c gunicorn.conf.py wsgi:app
+
+Con preload_app (producción) el código se carga una sola vez en el master: kill -HUP
+solo reinicia los workers desde esa misma imagen y NO carga código nuevo.
+
+En Docker el master es el PID 1 del contenedor: se despliega reiniciándolo
+(make restart-backend, o de a un contenedor detrás del balanceador); gunicorn
+recibe el SIGTERM y termina las solicitudes en curso (graceful_timeout).
+
+Fuera de un contenedor, para cargar código nuevo sin cortar solicitudes:
+    1. kill -USR2 $(cat /tmp/gunicorn.pid)         (master nuevo con el código nuevo;
+                                                   el anterior pasa a gunicorn.pid.oldbin)
+    2. kill -WINCH $(cat /tmp/gunicorn.pid.oldbin) (el master viejo cierra sus workers
+                                                   cuando terminan lo que atienden)
+    3. kill -TERM $(cat /tmp/gunicorn.pid.oldbin)  (termina el master viejo)
+HUP sirve para reabrir los logs o aplicar cambios de esta configuración.
+Las tareas programadas NO corren acá: se ejecutan en un proceso dedicado (scheduler.py)
+"""
+
+import multiprocessing
+import os
+
+_debug = os.getenv('FLASK_DEBUG') == 'True'
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '5000')}"
+
+# Workers según CPUs (2 x núcleos + 1) salvo que se indique GUNICORN_WORKERS
+workers = int(os.getenv('GUNICORN_WORKERS') or multiprocessing.cpu_count() * 2 + 1)
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Cargar la app una vez en el master y compartirla con los workers (copy-on-write).
+# En desarrollo se recarga al cambiar el código, lo que es incompatible con preload
+reload = _debug
+preload_app = not _debug
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+# Reciclar workers periódicamente para acotar el crecimiento de memoria
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+
+# Necesario para la secuencia USR2/WINCH/TERM (el master viejo queda en <pidfile>.oldbin)
+pidfile = os.getenv('GUNICORN_PIDFILE', '/tmp/gunicorn.pid')
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """
+    Con preload, el master pudo abrir conexiones a la BD al crear la app.
+    Cada worker descarta las heredadas (sin cerrarlas, siguen siendo del master)
+    y abre las suyas
+    """
+    if not server.cfg.preload_app:
+        return
+
+    from app import db
+
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
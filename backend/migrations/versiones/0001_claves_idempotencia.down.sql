@@ -0,0 +1,5 @@
+-- ============================================
+-- Reversión: Claves de idempotencia
+-- ============================================
+
+DROP TABLE IF EXISTS claves_idempotencia;
@@ -0,0 +1,23 @@
+-- ============================================
+-- Migración: Claves de idempotencia
+-- Fecha: 2026-10-19
+-- Descripción: Permite reintentar marcados (entrada/salida/lote) con el header
+--              Idempotency-Key sin duplicar la operación
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS claves_idempotencia (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    usuario_id INT NOT NULL,
+    clave VARCHAR(100) NOT NULL,
+    endpoint VARCHAR(100) NOT NULL,
+    hash_solicitud VARCHAR(64) NOT NULL,
+    estado ENUM('en_proceso', 'completada') NOT NULL DEFAULT 'en_proceso',
+    codigo_estado INT NULL,
+    respuesta MEDIUMTEXT NULL,
+    fecha_creacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    fecha_expiracion DATETIME NOT NULL,
+    
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+    UNIQUE KEY uq_idempotencia_usuario_clave (usuario_id, clave),
+    INDEX idx_idempotencia_expiracion (fecha_expiracion)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,5 @@
+-- ============================================
+-- Reversión: Trabajos en segundo plano
+-- ============================================
+
+DROP TABLE IF EXISTS trabajos_fondo;
@@ -0,0 +1,26 @@
+-- ============================================
+-- Migración: Trabajos en segundo plano
+-- Fecha: 2026-10-19
+-- Descripción: Registro de trabajos de fondo (recálculo de horas al cambiar
+--              los horarios de un proyecto) con progreso y checkpoint reanudable
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS trabajos_fondo (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    tipo VARCHAR(50) NOT NULL,
+    proyecto_id INT NOT NULL,
+    estado ENUM('pendiente', 'en_proceso', 'completado', 'error', 'cancelado') NOT NULL DEFAULT 'pendiente',
+    checkpoint INT NOT NULL DEFAULT 0,
+    procesados INT NOT NULL DEFAULT 0,
+    actualizados INT NOT NULL DEFAULT 0,
+    total INT NOT NULL DEFAULT 0,
+    error TEXT NULL,
+    fecha_creacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    fecha_inicio DATETIME NULL,
+    fecha_fin DATETIME NULL,
+    fecha_actualizacion DATETIME NULL,
+    
+    FOREIGN KEY (proyecto_id) REFERENCES proyectos(id) ON DELETE CASCADE,
+    INDEX idx_trabajos_fondo_proyecto (proyecto_id),
+    INDEX idx_trabajos_fondo_estado (estado, fecha_actualizacion)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
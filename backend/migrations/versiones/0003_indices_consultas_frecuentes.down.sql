@@ -0,0 +1,7 @@
+-- ============================================
+-- Reversión: Índices compuestos para consultas frecuentes
+-- ============================================
+
+DROP INDEX idx_marcados_salida_pendiente ON marcados_asistencia;
+
+DROP INDEX idx_justificaciones_proyecto_estado ON justificaciones;
@@ -0,0 +1,13 @@
+-- ============================================
+-- Migración: Índices compuestos para consultas frecuentes
+-- Fecha: 2026-10-19
+-- Descripción: Propuestos por scripts/asesor_indices.py a partir de la captura
+--              de consultas: marcados abiertos por proyecto (cierre automático
+--              de salidas) y justificaciones por proyecto/estado ordenadas por fecha
+-- ============================================
+
+CREATE INDEX idx_marcados_salida_pendiente
+    ON marcados_asistencia (proyecto_id, salida_marcada_manualmente, salida_marcada_automaticamente, hora_salida);
+
+CREATE INDEX idx_justificaciones_proyecto_estado
+    ON justificaciones (proyecto_id, estado, fecha_creacion);
@@ -0,0 +1,5 @@
+-- ============================================
+-- Reversión: Versiones de datos por proyecto y mes
+-- ============================================
+
+DROP TABLE IF EXISTS versiones_proyecto;
@@ -0,0 +1,16 @@
+-- ============================================
+-- Migración: Versiones de datos por proyecto y mes
+-- Fecha: 2026-10-19
+-- Descripción: Contadores que se incrementan con cada escritura de días, tareas,
+--              empleados o del proyecto; permiten responder GET condicionales
+--              (If-None-Match -> 304) sin leer ni serializar filas
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS versiones_proyecto (
+    proyecto_id INT NOT NULL,
+    periodo INT NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0,
+    fecha_actualizacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (proyecto_id, periodo)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,6 @@
+-- ============================================
+-- Reversión: Fotos de perfil en el almacén de imágenes
+-- (las fotos ya convertidas quedan en el almacén; foto_perfil no se restaura)
+-- ============================================
+
+ALTER TABLE usuarios DROP COLUMN foto_perfil_hash;
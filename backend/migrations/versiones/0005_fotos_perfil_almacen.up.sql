@@ -0,0 +1,11 @@
+-- ============================================
+-- Migración: Fotos de perfil en el almacén de imágenes
+-- Fecha: 2026-10-19
+-- Descripción: La foto deja de guardarse como data URL en usuarios.foto_perfil;
+--              se guarda en el almacén (FOTOS_ALMACEN) en variantes redimensionadas
+--              y la fila solo conserva el hash del contenido. Las fotos existentes
+--              se convierten con python scripts/migrar_fotos_perfil.py, que vacía
+--              foto_perfil a medida que las procesa
+-- ============================================
+
+ALTER TABLE usuarios ADD COLUMN foto_perfil_hash VARCHAR(32) NULL;
@@ -0,0 +1,14 @@
+-- ============================================
+-- Reversión: Tareas por fecha en proyectos de empleados
+-- (vuelve a asociar cada tarea con los días de todos los empleados en sus fechas)
+-- ============================================
+
+INSERT IGNORE INTO tarea_dia (tarea_id, dia_id)
+SELECT tf.tarea_id, d.id
+FROM tarea_fecha tf
+JOIN tareas t ON t.id = tf.tarea_id
+JOIN dias d ON d.proyecto_id = t.proyecto_id AND d.fecha = tf.fecha;
+
+DROP INDEX idx_dias_proyecto_fecha ON dias;
+
+DROP TABLE IF EXISTS tarea_fecha;
@@ -0,0 +1,32 @@
+-- ============================================
+-- Migración: Tareas por fecha en proyectos de empleados
+-- Fecha: 2026-10-19
+-- Descripción: En proyectos de empleados una tarea se asocia a fechas
+--              (tarea_fecha) en lugar de a cada día de cada empleado
+--              (tarea_dia crecía como tareas x fechas x empleados). Se compactan
+--              las filas existentes y se eliminan de tarea_dia
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS tarea_fecha (
+    tarea_id INT NOT NULL,
+    fecha DATE NOT NULL,
+    
+    PRIMARY KEY (tarea_id, fecha),
+    CONSTRAINT fk_tarea_fecha_tarea FOREIGN KEY (tarea_id) REFERENCES tareas(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Los días de un proyecto se buscan por (proyecto_id, fecha) al resolver las fechas de las tareas
+CREATE INDEX idx_dias_proyecto_fecha ON dias (proyecto_id, fecha);
+
+INSERT IGNORE INTO tarea_fecha (tarea_id, fecha)
+SELECT DISTINCT td.tarea_id, d.fecha
+FROM tarea_dia td
+JOIN dias d ON d.id = td.dia_id
+JOIN tareas t ON t.id = td.tarea_id
+JOIN proyectos p ON p.id = t.proyecto_id
+WHERE p.tipo_proyecto = 'empleados';
+
+DELETE td FROM tarea_dia td
+JOIN tareas t ON t.id = td.tarea_id
+JOIN proyectos p ON p.id = t.proyecto_id
+WHERE p.tipo_proyecto = 'empleados';
@@ -0,0 +1,5 @@
+-- ============================================
+-- Reversión: Índice de meses por proyecto
+-- ============================================
+
+DROP TABLE IF EXISTS proyecto_meses;
@@ -0,0 +1,22 @@
+-- ============================================
+-- Migración: Índice de meses por proyecto
+-- Fecha: 2026-10-19
+-- Descripción: Tabla proyecto_meses con los meses que tiene cargados cada
+--              proyecto; reemplaza el DISTINCT sobre todos sus días al listar
+--              meses y al generar los días de un empleado nuevo. Se completa
+--              con los meses de los días existentes
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS proyecto_meses (
+    proyecto_id INT NOT NULL,
+    anio INT NOT NULL,
+    mes INT NOT NULL,
+    fecha_creacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (proyecto_id, anio, mes),
+    CONSTRAINT fk_proyecto_meses_proyecto FOREIGN KEY (proyecto_id) REFERENCES proyectos(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO proyecto_meses (proyecto_id, anio, mes)
+SELECT DISTINCT proyecto_id, YEAR(fecha), MONTH(fecha)
+FROM dias;
@@ -0,0 +1,7 @@
+-- ============================================
+-- Reversión: Cola de emails de invitaciones
+-- ============================================
+
+DROP INDEX idx_invitaciones_email_pendiente ON invitaciones_proyecto;
+
+ALTER TABLE invitaciones_proyecto DROP COLUMN email_pendiente;
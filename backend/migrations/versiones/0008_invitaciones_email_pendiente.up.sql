@@ -0,0 +1,12 @@
+-- ============================================
+-- Migración: Cola de emails de invitaciones
+-- Fecha: 2026-10-19
+-- Descripción: Las invitaciones creadas en la importación masiva de empleados
+--              quedan con email_pendiente = 1 y el scheduler envía los emails
+--              en segundo plano (trabajos_fondo tipo 'envio_invitaciones')
+-- ============================================
+
+ALTER TABLE invitaciones_proyecto ADD COLUMN email_pendiente BOOLEAN NOT NULL DEFAULT FALSE;
+
+CREATE INDEX idx_invitaciones_email_pendiente
+    ON invitaciones_proyecto (proyecto_id, email_pendiente);
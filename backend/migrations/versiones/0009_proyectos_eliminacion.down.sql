@@ -0,0 +1,9 @@
+-- ============================================
+-- Reversión: Eliminación diferida de proyectos
+-- ============================================
+
+DROP INDEX idx_proyectos_usuario_eliminado ON proyectos;
+
+ALTER TABLE proyectos
+    DROP COLUMN fecha_eliminacion,
+    DROP COLUMN eliminado;
@@ -0,0 +1,13 @@
+-- ============================================
+-- Migración: Eliminación diferida de proyectos
+-- Fecha: 2026-10-19
+-- Descripción: Al eliminar un proyecto se marca como eliminado (deja de verse
+--              de inmediato) y un trabajo de fondo 'purga_proyecto' borra sus
+--              datos por lotes de ID con DELETEs acotados
+-- ============================================
+
+ALTER TABLE proyectos
+    ADD COLUMN eliminado BOOLEAN NOT NULL DEFAULT FALSE,
+    ADD COLUMN fecha_eliminacion DATETIME NULL;
+
+CREATE INDEX idx_proyectos_usuario_eliminado ON proyectos (usuario_id, eliminado);
@@ -5,6 +5,10 @@ Usa APScheduler para ejecutar procesos en segundo plano
 
 from apscheduler.schedulers.blocking import BlockingScheduler
 from app.services.marcado_automatico_service import MarcadoAutomaticoService
+from app.services.idempotencia_service import IdempotenciaService
+from app.services.recalculo_service import RecalculoService
+from app.services.invitacion_service import InvitacionService
+from app.services.purga_service import PurgaService
 from app import create_app
 import logging
 
@@ -16,8 +20,8 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# Crear app para contexto
-app = create_app()
+# Crear app para contexto (sin rutas HTTP ni creación de tablas)
+app = create_app(crear_tablas=False, registrar_rutas=False)
 
 def ejecutar_marcado_automatico():
     """Ejecuta el marcado automático de salida"""
@@ -39,6 +43,45 @@ def ejecutar_horas_extras():
         except Exception as e:
             logger.error(f"❌ Error en procesamiento de horas extras: {str(e)}")
 
+def ejecutar_purga_idempotencia():
+    """Elimina las claves de idempotencia vencidas"""
+    with app.app_context():
+        try:
+            cantidad = IdempotenciaService.purgar_expiradas()
+            logger.info(f"✅ Claves de idempotencia purgadas: {cantidad}")
+        except Exception as e:
+            logger.error(f"❌ Error al purgar claves de idempotencia: {str(e)}")
+
+def ejecutar_recalculos():
+    """Procesa los recálculos de horas pendientes"""
+    with app.app_context():
+        try:
+            cantidad = RecalculoService.procesar_pendientes()
+            if cantidad:
+                logger.info(f"✅ Recálculos de horas procesados: {cantidad}")
+        except Exception as e:
+            logger.error(f"❌ Error al procesar recálculos de horas: {str(e)}")
+
+def ejecutar_envio_invitaciones():
+    """Envía los emails de las invitaciones creadas en lote"""
+    with app.app_context():
+        try:
+            cantidad = InvitacionService.procesar_envios_pendientes()
+            if cantidad:
+                logger.info(f"✅ Envíos de invitaciones procesados: {cantidad}")
+        except Exception as e:
+            logger.error(f"❌ Error al enviar invitaciones: {str(e)}")
+
+def ejecutar_purgas():
+    """Borra por lotes los datos de los proyectos eliminados"""
+    with app.app_context():
+        try:
+            cantidad = PurgaService.procesar_pendientes()
+            if cantidad:
+                logger.info(f"✅ Purgas de proyectos procesadas: {cantidad}")
+        except Exception as e:
+            logger.error(f"❌ Error al purgar proyectos eliminados: {str(e)}")
+
 if __name__ == '__main__':
     scheduler = BlockingScheduler()
     
@@ -62,10 +105,51 @@ if __name__ == '__main__':
         name='Procesamiento de horas extras'
     )
     
+    # Purgar claves de idempotencia vencidas una vez al día
+    scheduler.add_job(
+        ejecutar_purga_idempotencia,
+        'cron',
+        hour=3,
+        minute=30,
+        id='purga_idempotencia',
+        name='Purga de claves de idempotencia'
+    )
+    
+    # Procesar recálculos de horas pendientes cada minuto
+    scheduler.add_job(
+        ejecutar_recalculos,
+        'interval',
+        minutes=1,
+        id='recalculos',
+        name='Recálculo de horas'
+    )
+    
+    # Enviar los emails de invitaciones importadas en lote cada minuto
+    scheduler.add_job(
+        ejecutar_envio_invitaciones,
+        'interval',
+        minutes=1,
+        id='envio_invitaciones',
+        name='Envío de invitaciones'
+    )
+    
+    # Purgar los proyectos eliminados cada minuto
+    scheduler.add_job(
+        ejecutar_purgas,
+        'interval',
+        minutes=1,
+        id='purgas',
+        name='Purga de proyectos eliminados'
+    )
+    
     logger.info("🚀 Scheduler iniciado")
     logger.info("📅 Tareas programadas:")
     logger.info("  - Marcado automático: cada hora en punto")
     logger.info("  - Horas extras: cada 2 horas")
+    logger.info("  - Purga de claves de idempotencia: diaria 03:30")
+    logger.info("  - Recálculo de horas: cada minuto")
+    logger.info("  - Envío de invitaciones: cada minuto")
+    logger.info("  - Purga de proyectos eliminados: cada minuto")
     
     try:
         scheduler.start()
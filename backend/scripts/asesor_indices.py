@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Asesor de índices a partir de la captura de consultas (app/utils/captura_consultas.py)
+Toma las consultas más costosas de /api/metricas/consultas (o de archivos JSON
+guardados de ese endpoint), ejecuta EXPLAIN con la muestra de cada una y propone
+índices compuestos: columnas de igualdad (=, IN, IS NULL), luego la primera de
+rango, o las de ORDER BY si no hay rango. Omite las propuestas que un índice
+existente ya cubre (mismo prefijo de columnas).
+
+La captura está apagada por defecto: el backend debe correr con CAPTURA_CONSULTAS=True.
+Las estadísticas son por worker: --repeticiones consulta el endpoint varias veces
+para juntar los workers que atiendan cada solicitud.
+
+Uso:
+    python scripts/asesor_indices.py --url http://localhost:22000 --token <METRICS_TOKEN>
+    python scripts/asesor_indices.py --url http://localhost:22000 --jwt <JWT> --guardar consultas.json
+    python scripts/asesor_indices.py --archivo consultas.json --top 10 --generar-migracion indices_asesor
+"""
+
+import sys
+import os
+import argparse
+import json
+import re
+import urllib.request
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from migrar import DIRECTORIO_VERSIONES, cargar_migraciones
+
+# Sentencias que admiten EXPLAIN
+_EXPLICABLES = ('SELECT', 'UPDATE', 'DELETE')
+
+# Tablas propias del motor o de las herramientas que no se analizan
+_TABLAS_IGNORADAS = ('information_schema', 'performance_schema', 'schema_migraciones')
+
+_PATRON_TABLA = re.compile(r'\b(?:FROM|JOIN|UPDATE)\s+`?(\w+)`?(?:\s+(?:AS\s+)?`?(?!(?:WHERE|SET|INNER|LEFT|RIGHT|JOIN|ON|ORDER|GROUP|LIMIT|FOR)\b)(\w+)`?)?', re.IGNORECASE)
+_PATRON_ORDEN = re.compile(r'\bORDER\s+BY\s+(.*?)(?:\bLIMIT\b|\bFOR\s+UPDATE\b|$)', re.IGNORECASE | re.DOTALL)
+_PATRON_AGRUPACION = re.compile(r'\bGROUP\s+BY\s+(.*?)(?:\bHAVING\b|\bORDER\b|\bLIMIT\b|$)', re.IGNORECASE | re.DOTALL)
+
+# Operadores: igualdad (puede ir en cualquier posición del índice) o rango (cierra el índice)
+_IGUALDAD = {'=', '<=>', 'IS NULL', 'IN'}
+_RANGO = {'<', '>', '<=', '>=', 'BETWEEN', 'LIKE'}
+
+MAX_COLUMNAS_INDICE = 5
+
+
+# ----------------------------------------------------------------------------
+# Estadísticas de consultas
+# ----------------------------------------------------------------------------
+
+def obtener_estadisticas(url: str, token: str = None, jwt: str = None, top: int = 20, repeticiones: int = 1):
+    """Consulta /api/metricas/consultas (con muestras) y devuelve una respuesta por worker"""
+    headers = {}
+    if token:
+        headers['X-Metrics-Token'] = token
+    if jwt:
+        headers['Authorization'] = f'Bearer {jwt}'
+
+    destino = f"{url.rstrip('/')}/api/metricas/consultas?muestras=1&limite={max(top * 3, 50)}"
+    por_worker = {}
+    for _ in range(repeticiones):
+        with urllib.request.urlopen(urllib.request.Request(destino, headers=headers), timeout=30) as respuesta:
+            datos = json.loads(respuesta.read())
+        por_worker[datos.get('pid')] = datos
+
+    return list(por_worker.values())
+
+
+def combinar(respuestas):
+    """Suma las estadísticas de varios workers por forma de consulta"""
+    combinadas = {}
+
+    for respuesta in respuestas:
+        for consulta in respuesta.get('consultas', []):
+            actual = combinadas.get(consulta['forma'])
+            if actual is None:
+                combinadas[consulta['forma']] = dict(consulta)
+                continue
+            actual['cantidad'] += consulta['cantidad']
+            actual['tiempo_total_ms'] += consulta['tiempo_total_ms']
+            actual['filas'] += consulta.get('filas', 0)
+            actual['p95_ms'] = max(actual['p95_ms'], consulta['p95_ms'])
+            if consulta['tiempo_max_ms'] > actual['tiempo_max_ms']:
+                actual['tiempo_max_ms'] = consulta['tiempo_max_ms']
+                actual['sql'] = consulta.get('sql')
+                actual['parametros'] = consulta.get('parametros')
+
+    return sorted(combinadas.values(), key=lambda c: c['tiempo_total_ms'], reverse=True)
+
+
+# ----------------------------------------------------------------------------
+# Análisis de la sentencia
+# ----------------------------------------------------------------------------
+
+def alias_de_tablas(sql: str):
+    """Mapa alias -> tabla de las cláusulas FROM/JOIN/UPDATE"""
+    alias = {}
+    for tabla, nombre in _PATRON_TABLA.findall(sql):
+        alias[tabla] = tabla
+        if nombre:
+            alias[nombre] = tabla
+    return alias
+
+
+def predicados(sql: str, alias: str):
+    """
+    Columnas de `alias` usadas en condiciones, en orden de aparición
+
+    Returns:
+        Lista de (columna, 'igualdad' | 'rango')
+    """
+    patron = re.compile(
+        rf'\b`?{re.escape(alias)}`?\.`?(\w+)`?\s*'
+        r'(<=>|<=|>=|=|<>|!=|<|>|IS\s+NOT\s+NULL|IS\s+NULL|NOT\s+IN\b|IN\b|BETWEEN\b|LIKE\b)',
+        re.IGNORECASE
+    )
+    encontrados = []
+    for columna, operador in patron.findall(sql):
+        operador = re.sub(r'\s+', ' ', operador.upper())
+        if operador in _IGUALDAD:
+            encontrados.append((columna, 'igualdad'))
+        elif operador in _RANGO:
+            encontrados.append((columna, 'rango'))
+    return encontrados
+
+
+def columnas_de_clausula(patron, sql: str, alias: str):
+    coincidencia = patron.search(sql)
+    if not coincidencia:
+        return []
+    return re.findall(rf'\b`?{re.escape(alias)}`?\.`?(\w+)`?', coincidencia.group(1))
+
+
+def proponer_columnas(sql: str, alias: str):
+    """Columnas del índice compuesto sugerido para la tabla `alias` de la sentencia"""
+    columnas = []
+    rango = None
+
+    for columna, tipo in predicados(sql, alias):
+        if tipo == 'igualdad' and columna not in columnas:
+            columnas.append(columna)
+        elif tipo == 'rango' and rango is None:
+            rango = columna
+
+    if rango and rango not in columnas:
+        columnas.append(rango)
+    else:
+        # Sin rango, las columnas de GROUP BY / ORDER BY evitan el filesort
+        for columna in (columnas_de_clausula(_PATRON_AGRUPACION, sql, alias)
+                        or columnas_de_clausula(_PATRON_ORDEN, sql, alias)):
+            if columna not in columnas:
+                columnas.append(columna)
+
+    return columnas[:MAX_COLUMNAS_INDICE]
+
+
+# ----------------------------------------------------------------------------
+# Base de datos
+# ----------------------------------------------------------------------------
+
+def explicar(cursor, sql: str, parametros):
+    """Ejecuta EXPLAIN con los parámetros de muestra y devuelve las filas como diccionarios"""
+    if isinstance(parametros, list):
+        parametros = tuple(parametros)
+    elif parametros is None:
+        parametros = {}
+    cursor.execute(f'EXPLAIN {sql}', parametros)
+    columnas = [d[0] for d in cursor.description]
+    return [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+
+def indices_existentes(cursor, tabla: str, cache: dict):
+    """Índices de la tabla: {nombre: [columnas en orden]}"""
+    if tabla not in cache:
+        cursor.execute(
+            "SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+            (tabla,)
+        )
+        indices = {}
+        for nombre, columna in cursor.fetchall():
+            indices.setdefault(nombre, []).append(columna)
+        cache[tabla] = indices
+    return cache[tabla]
+
+
+def problemas_del_plan(fila: dict, filas_minimas: int):
+    """Motivos por los que una fila de EXPLAIN merece un índice"""
+    problemas = []
+    examinadas = int(fila.get('rows') or 0)
+    extra = fila.get('Extra') or ''
+    filtrado = float(fila.get('filtered') or 100)
+
+    if examinadas < filas_minimas:
+        return problemas
+
+    if fila.get('type') == 'ALL':
+        problemas.append('recorrido completo de la tabla')
+    elif fila.get('type') == 'index':
+        problemas.append('recorrido completo de un índice')
+    elif fila.get('key') and filtrado < 20:
+        problemas.append(f"índice {fila['key']} poco selectivo ({filtrado:.0f}% de filas útiles)")
+    if 'Using filesort' in extra:
+        problemas.append('ordenamiento sin índice (filesort)')
+    if 'Using temporary' in extra:
+        problemas.append('tabla temporal')
+
+    return problemas
+
+
+def nombre_indice(tabla: str, columnas) -> str:
+    return f"idx_{tabla}_{'_'.join(columnas)}"[:64]
+
+
+# ----------------------------------------------------------------------------
+# Asesor
+# ----------------------------------------------------------------------------
+
+def analizar(consultas, top: int, filas_minimas: int):
+    """Ejecuta EXPLAIN sobre las consultas y devuelve las propuestas de índices"""
+    propuestas = {}
+    cache_indices = {}
+
+    app = create_app(crear_tablas=False, registrar_rutas=False)
+    with app.app_context():
+        conexion = db.engine.raw_connection()
+        try:
+            cursor = conexion.cursor()
+            analizadas = 0
+
+            for consulta in consultas:
+                sql = consulta.get('sql')
+                if not sql or not sql.lstrip().upper().startswith(_EXPLICABLES):
+                    continue
+                if any(tabla in sql for tabla in _TABLAS_IGNORADAS):
+                    continue
+
+                analizadas += 1
+                if analizadas > top:
+                    break
+
+                print(f"\n#{analizadas}  {consulta['cantidad']} ejecuciones · total {consulta['tiempo_total_ms']:.1f} ms"
+                      f" · p95 {consulta['p95_ms']:.2f} ms · max {consulta['tiempo_max_ms']:.2f} ms")
+                print(f"    {consulta['forma'][:200]}")
+
+                try:
+                    plan = explicar(cursor, sql, consulta.get('parametros'))
+                except Exception as e:
+                    print(f"    ⚠️ No se pudo ejecutar EXPLAIN: {e}")
+                    continue
+
+                alias = alias_de_tablas(sql)
+                for fila in plan:
+                    print(f"    EXPLAIN {fila.get('table')}: type={fila.get('type')} key={fila.get('key') or '-'} "
+                          f"rows={fila.get('rows')} filtered={fila.get('filtered')} {fila.get('Extra') or ''}")
+
+                    problemas = problemas_del_plan(fila, filas_minimas)
+                    tabla = alias.get(fila.get('table'))
+                    if not problemas or not tabla:
+                        continue
+                    for problema in problemas:
+                        print(f"      ⚠️ {problema}")
+
+                    columnas = proponer_columnas(sql, fila['table'])
+                    if not columnas:
+                        print("      (sin columnas filtrables para indexar)")
+                        continue
+
+                    existentes = indices_existentes(cursor, tabla, cache_indices)
+                    cubierto = next(
+                        (nombre for nombre, cols in existentes.items() if cols[:len(columnas)] == columnas), None
+                    )
+                    if cubierto:
+                        print(f"      ✓ Ya cubierto por {cubierto} ({', '.join(existentes[cubierto])})")
+                        continue
+
+                    nombre = nombre_indice(tabla, columnas)
+                    redundantes = [
+                        n for n, cols in existentes.items()
+                        if n != 'PRIMARY' and columnas[:len(cols)] == cols
+                    ]
+                    propuesta = propuestas.setdefault(nombre, {
+                        'tabla': tabla, 'columnas': columnas, 'redundantes': redundantes, 'tiempo_total_ms': 0.0
+                    })
+                    propuesta['tiempo_total_ms'] += consulta['tiempo_total_ms']
+                    print(f"      💡 CREATE INDEX {nombre} ON {tabla} ({', '.join(columnas)});")
+                    if redundantes:
+                        print(f"         (deja redundante: {', '.join(redundantes)})")
+
+            cursor.close()
+        finally:
+            conexion.close()
+
+    return sorted(propuestas.items(), key=lambda item: item[1]['tiempo_total_ms'], reverse=True)
+
+
+def generar_migracion(propuestas, nombre: str):
+    """Escribe migrations/versiones/<siguiente>_<nombre>.up/down.sql con los índices propuestos"""
+    migraciones = cargar_migraciones()
+    version = (migraciones[-1].version if migraciones else 0) + 1
+    base = os.path.join(DIRECTORIO_VERSIONES, f'{version:04d}_{nombre}')
+
+    with open(f'{base}.up.sql', 'w') as archivo:
+        archivo.write(
+            "-- ============================================\n"
+            f"-- Migración: {nombre}\n"
+            "-- Descripción: Índices propuestos por scripts/asesor_indices.py\n"
+            "-- ============================================\n"
+        )
+        for indice, propuesta in propuestas:
+            archivo.write(f"\nCREATE INDEX {indice}\n    ON {propuesta['tabla']} ({', '.join(propuesta['columnas'])});\n")
+
+    with open(f'{base}.down.sql', 'w') as archivo:
+        archivo.write(
+            "-- ============================================\n"
+            f"-- Reversión: {nombre}\n"
+            "-- ============================================\n"
+        )
+        for indice, propuesta in propuestas:
+            archivo.write(f"\nDROP INDEX {indice} ON {propuesta['tabla']};\n")
+
+    print(f"\n📝 Migración generada: {os.path.relpath(base)}.up.sql / .down.sql")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Propone índices a partir de las consultas capturadas')
+    origen = parser.add_mutually_exclusive_group(required=True)
+    origen.add_argument('--url', help='Backend con /api/metricas/consultas')
+    origen.add_argument('--archivo', nargs='+', help='Respuestas JSON guardadas del endpoint')
+    parser.add_argument('--token', help='METRICS_TOKEN (header X-Metrics-Token)')
+    parser.add_argument('--jwt', help='JWT de un usuario de METRICS_ADMINS (si no se usa --token)')
+    parser.add_argument('--repeticiones', type=int, default=8, help='Consultas al endpoint para juntar workers')
+    parser.add_argument('--guardar', help='Guardar las estadísticas obtenidas en este archivo JSON')
+    parser.add_argument('--top', type=int, default=10, help='Consultas a analizar')
+    parser.add_argument('--filas-minimas', type=int, default=100,
+                        help='Filas examinadas a partir de las cuales un plan se considera costoso')
+    parser.add_argument('--generar-migracion', metavar='NOMBRE', help='Escribir las propuestas como migración versionada')
+    args = parser.parse_args()
+
+    if args.url:
+        respuestas = obtener_estadisticas(args.url, args.token, args.jwt, args.top, args.repeticiones)
+        if args.guardar:
+            with open(args.guardar, 'w') as archivo:
+                json.dump(respuestas, archivo, indent=2, ensure_ascii=False)
+    else:
+        respuestas = []
+        for ruta in args.archivo:
+            with open(ruta) as archivo:
+                datos = json.load(archivo)
+            respuestas.extend(datos if isinstance(datos, list) else [datos])
+
+    consultas = combinar(respuestas)
+    print(f"\n🔎 {len(consultas)} formas de consulta de {len(respuestas)} worker(s)")
+
+    propuestas = analizar(consultas, args.top, args.filas_minimas)
+
+    if not propuestas:
+        print("\n✅ Sin índices nuevos para proponer")
+        return
+
+    print(f"\n💡 {len(propuestas)} índice(s) propuesto(s), por tiempo total de las consultas afectadas:")
+    for indice, propuesta in propuestas:
+        print(f"  CREATE INDEX {indice} ON {propuesta['tabla']} ({', '.join(propuesta['columnas'])});"
+              f"  -- {propuesta['tiempo_total_ms']:.1f} ms")
+
+    if args.generar_migracion:
+        generar_migracion(propuestas, args.generar_migracion)
+
+
+if __name__ == '__main__':
+    main()
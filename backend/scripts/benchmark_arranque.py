@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío de create_app()
+Ejecuta cada variante en un proceso nuevo (imports incluidos) varias veces y
+muestra la mediana:
+  - completo:    create_all + todas las rutas (comportamiento anterior)
+  - fast-start:  sin create_all (FAST_START=True), con rutas (workers)
+  - sin rutas:   sin create_all ni blueprints (scheduler, scripts)
+
+Uso:
+    python scripts/benchmark_arranque.py --repeticiones 7
+"""
+
+import sys
+import os
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODIGO = """
+import time
+inicio = time.perf_counter()
+from app import create_app
+importado = time.perf_counter()
+create_app(crear_tablas={crear_tablas}, registrar_rutas={registrar_rutas})
+fin = time.perf_counter()
+print(importado - inicio, fin - importado)
+"""
+
+VARIANTES = [
+    ('completo', True, True),
+    ('fast-start', False, True),
+    ('sin rutas', False, False),
+]
+
+
+def medir(crear_tablas: bool, registrar_rutas: bool, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, '-c', CODIGO.format(crear_tablas=crear_tablas, registrar_rutas=registrar_rutas)],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip().splitlines()[-1]
+        importacion, factory = (float(valor) for valor in salida.split())
+        tiempos.append((importacion, factory))
+
+    return (
+        statistics.median(t[0] for t in tiempos) * 1000,
+        statistics.median(t[1] for t in tiempos) * 1000,
+        statistics.median(t[0] + t[1] for t in tiempos) * 1000,
+    )
+
+
+def main(repeticiones: int):
+    print(f"\n⏱️  Arranque en frío de create_app() (mediana de {repeticiones} procesos)\n")
+    print(f"  {'Variante':<12} {'import app':>12} {'create_app':>12} {'total':>10}")
+
+    for nombre, crear_tablas, registrar_rutas in VARIANTES:
+        importacion, factory, total = medir(crear_tablas, registrar_rutas, repeticiones)
+        print(f"  {nombre:<12} {importacion:10.1f}ms {factory:10.1f}ms {total:8.1f}ms")
+
+    print()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de arranque en frío de la app')
+    parser.add_argument('--repeticiones', type=int, default=7)
+    args = parser.parse_args()
+    main(args.repeticiones)
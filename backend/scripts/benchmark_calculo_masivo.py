@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Verificación y benchmark del cálculo masivo de horas (app/utils/calculo_masivo.py)
+Compara calcular_horas_lote (NumPy y Python puro) contra las funciones escalares
+MarcadoAsistencia.calcular_horas_trabajadas + calcular_horas_extras sobre
+marcados aleatorios y mide el tiempo de cada variante. No necesita base de datos.
+
+Uso:
+    python scripts/benchmark_calculo_masivo.py --filas 100000 --proyectos 200
+"""
+
+import sys
+import os
+import argparse
+import random
+import time as reloj
+from datetime import time
+from types import SimpleNamespace
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import MarcadoAsistencia
+from app.utils import calcular_horas_extras
+from app.utils import calculo_masivo
+
+NUMPY_INSTALADO = calculo_masivo.NUMPY_DISPONIBLE
+
+
+def hora_aleatoria(nulos=0.05):
+    if random.random() < nulos:
+        return None
+    return time(random.randrange(24), random.randrange(60), random.choice([0, 0, random.randrange(60)]))
+
+
+def proyecto_aleatorio(proyecto_id):
+    return SimpleNamespace(
+        id=proyecto_id,
+        modo_horarios=random.choice(['turnos', 'corrido', None]),
+        horario_inicio=hora_aleatoria(), horario_fin=hora_aleatoria(),
+        turno_manana_inicio=hora_aleatoria(), turno_manana_fin=hora_aleatoria(),
+        turno_tarde_inicio=hora_aleatoria(), turno_tarde_fin=hora_aleatoria(),
+    )
+
+
+def calcular_escalar(entradas, salidas, turnos, proyecto, aplicar_extras):
+    """Referencia: cálculo fila por fila con las funciones existentes"""
+    resultado = []
+    for entrada, salida, turno in zip(entradas, salidas, turnos):
+        horas = MarcadoAsistencia(hora_entrada=entrada, hora_salida=salida).calcular_horas_trabajadas()
+        if aplicar_extras:
+            normales, extras = calcular_horas_extras(horas, proyecto, turno)
+        else:
+            normales, extras = float(horas), 0.0
+        resultado.append((horas, normales, extras))
+    return resultado
+
+
+def verificar_paridad(proyectos: int, filas_por_proyecto: int) -> int:
+    diferencias = 0
+    variantes = [False, True] if NUMPY_INSTALADO else [False]
+
+    for proyecto_id in range(1, proyectos + 1):
+        proyecto = proyecto_aleatorio(proyecto_id)
+        entradas = [hora_aleatoria() for _ in range(filas_por_proyecto)]
+        salidas = [hora_aleatoria() for _ in range(filas_por_proyecto)]
+        turnos = [random.choice(['manana', 'tarde', 'especial', None]) for _ in range(filas_por_proyecto)]
+
+        for aplicar_extras in (True, False):
+            esperado = calcular_escalar(entradas, salidas, turnos, proyecto, aplicar_extras)
+            for usar_numpy in variantes:
+                calculo_masivo.NUMPY_DISPONIBLE = usar_numpy
+                obtenido = list(zip(*calculo_masivo.calcular_horas_lote(
+                    entradas, salidas, turnos, proyecto, aplicar_extras
+                )))
+                for fila, (a, b) in enumerate(zip(esperado, obtenido)):
+                    if tuple(a) != tuple(b):
+                        diferencias += 1
+                        if diferencias <= 5:
+                            print(f"  ❌ proyecto {proyecto_id} fila {fila}: escalar={a} lote={b}")
+
+    calculo_masivo.NUMPY_DISPONIBLE = NUMPY_INSTALADO
+    return diferencias
+
+
+def medir(nombre, funcion):
+    inicio = reloj.perf_counter()
+    funcion()
+    duracion = reloj.perf_counter() - inicio
+    print(f"  {nombre:<20} {duracion:8.3f}s")
+    return duracion
+
+
+def main(filas: int, proyectos: int):
+    print(f"\n🔍 Verificando paridad ({proyectos} proyectos)...")
+    diferencias = verificar_paridad(proyectos, 500)
+    if diferencias:
+        print(f"❌ {diferencias} diferencias encontradas")
+        sys.exit(1)
+    print("✅ Sin diferencias con el cálculo escalar")
+
+    proyecto = proyecto_aleatorio(0)
+    proyecto.modo_horarios = 'turnos'
+    entradas = [hora_aleatoria(0) for _ in range(filas)]
+    salidas = [hora_aleatoria(0) for _ in range(filas)]
+    turnos = [random.choice(['manana', 'tarde']) for _ in range(filas)]
+
+    print(f"\n⏱️  Tiempos para {filas} marcados:")
+    medir('Escalar', lambda: calcular_escalar(entradas, salidas, turnos, proyecto, True))
+
+    calculo_masivo.NUMPY_DISPONIBLE = False
+    medir('Lote (Python)', lambda: calculo_masivo.calcular_horas_lote(entradas, salidas, turnos, proyecto))
+
+    if NUMPY_INSTALADO:
+        calculo_masivo.NUMPY_DISPONIBLE = True
+        medir('Lote (NumPy)', lambda: calculo_masivo.calcular_horas_lote(entradas, salidas, turnos, proyecto))
+    else:
+        print("  Lote (NumPy)        no disponible (pip install numpy)")
+
+    print()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Paridad y benchmark del cálculo masivo de horas')
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--proyectos', type=int, default=200)
+    args = parser.parse_args()
+    main(args.filas, args.proyectos)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de los horarios precompilados (app/utils/horario_compilado.py)
+Simula los bucles de cierre automático y de detección de ausencias comparando
+la implementación anterior (datetime.combine en cada llamada) con la compilada.
+No necesita base de datos.
+
+Uso:
+    python scripts/benchmark_horarios.py --iteraciones 200000
+"""
+
+import sys
+import os
+import argparse
+import timeit
+from datetime import datetime, date, time, timedelta
+from types import SimpleNamespace
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.horario_utils import (
+    obtener_hora_cierre_turno,
+    calcular_horas_extras,
+    calcular_horas_debidas_dia
+)
+
+
+# ----------------------------------------------------------------------------
+# Implementación anterior (referencia)
+# ----------------------------------------------------------------------------
+
+def _horas_esperadas_anterior(hora_inicio, hora_fin):
+    if not hora_inicio or not hora_fin:
+        return 0.0
+    inicio = datetime.combine(date.today(), hora_inicio)
+    fin = datetime.combine(date.today(), hora_fin)
+    if fin <= inicio:
+        fin += timedelta(days=1)
+    return (fin - inicio).total_seconds() / 3600
+
+
+def _horarios_turno_anterior(proyecto, turno):
+    if proyecto.modo_horarios == 'turnos':
+        if turno == 'manana':
+            return proyecto.turno_manana_inicio, proyecto.turno_manana_fin
+        if turno == 'tarde':
+            return proyecto.turno_tarde_inicio, proyecto.turno_tarde_fin
+    return proyecto.horario_inicio, proyecto.horario_fin
+
+
+def _hora_cierre_anterior(proyecto, turno):
+    if proyecto.modo_horarios == 'corrido':
+        return proyecto.horario_fin
+    if proyecto.modo_horarios == 'turnos':
+        return _horarios_turno_anterior(proyecto, turno)[1]
+    return None
+
+
+def _horas_extras_anterior(horas, proyecto, turno):
+    horas = float(horas)
+    inicio, fin = _horarios_turno_anterior(proyecto, turno)
+    if not inicio or not fin:
+        return horas, 0.0
+    esperadas = _horas_esperadas_anterior(inicio, fin)
+    if horas > esperadas:
+        return round(esperadas, 2), round(horas - esperadas, 2)
+    return round(horas, 2), 0.0
+
+
+def _horas_debidas_anterior(proyecto):
+    if proyecto.modo_horarios == 'turnos':
+        return (_horas_esperadas_anterior(proyecto.turno_manana_inicio, proyecto.turno_manana_fin) +
+                _horas_esperadas_anterior(proyecto.turno_tarde_inicio, proyecto.turno_tarde_fin))
+    if proyecto.modo_horarios == 'corrido':
+        return _horas_esperadas_anterior(proyecto.horario_inicio, proyecto.horario_fin)
+    return 0.0
+
+
+# ----------------------------------------------------------------------------
+# Bucles simulados
+# ----------------------------------------------------------------------------
+
+def crear_proyecto():
+    return SimpleNamespace(
+        id=1,
+        modo_horarios='turnos',
+        horario_inicio=time(8, 0), horario_fin=time(17, 0),
+        turno_manana_inicio=time(8, 0), turno_manana_fin=time(12, 0),
+        turno_tarde_inicio=time(14, 0), turno_tarde_fin=time(18, 0),
+    )
+
+
+def bucle_cierre(proyecto, marcados, cierre, extras):
+    """Equivalente al bucle de MarcadoAutomaticoService por marcado pendiente"""
+    hora_actual = time(19, 0)
+    for turno, horas in marcados:
+        hora_cierre = cierre(proyecto, turno)
+        if hora_cierre and hora_actual >= hora_cierre:
+            extras(horas, proyecto, turno)
+
+
+def bucle_ausencias(proyecto, cantidad_empleados, debidas):
+    """Equivalente al bucle de AsistenciaService.detectar_ausencias por empleado"""
+    for _ in range(cantidad_empleados):
+        debidas(proyecto)
+
+
+def main(iteraciones: int):
+    proyecto = crear_proyecto()
+    marcados = [('manana', 4.5), ('tarde', 3.75), ('especial', 9.25), (None, 8.0)] * (iteraciones // 4)
+
+    casos = [
+        ('Cierre automático',
+         lambda: bucle_cierre(proyecto, marcados, _hora_cierre_anterior, _horas_extras_anterior),
+         lambda: bucle_cierre(proyecto, marcados, obtener_hora_cierre_turno, calcular_horas_extras)),
+        ('Detección de ausencias',
+         lambda: bucle_ausencias(proyecto, iteraciones, _horas_debidas_anterior),
+         lambda: bucle_ausencias(proyecto, iteraciones, lambda p: calcular_horas_debidas_dia(p))),
+    ]
+
+    print(f"\nIteraciones por bucle: {iteraciones}\n")
+    print(f"  {'Bucle':<24} {'Anterior':>10} {'Compilado':>10} {'Aceleración':>12}")
+
+    for nombre, anterior, compilado in casos:
+        t_anterior = min(timeit.repeat(anterior, number=1, repeat=5))
+        t_compilado = min(timeit.repeat(compilado, number=1, repeat=5))
+        print(f"  {nombre:<24} {t_anterior:9.3f}s {t_compilado:9.3f}s {t_anterior / t_compilado:11.1f}x")
+
+    print()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Micro-benchmark de horarios precompilados')
+    parser.add_argument('--iteraciones', type=int, default=200000)
+    args = parser.parse_args()
+    main(args.iteraciones)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la importación masiva de empleados vs. el alta individual
+Crea un proyecto temporal de empleados con varios meses, da de alta una muestra
+de empleados uno por uno (agregar_empleado) y luego importa N empleados en un
+solo lote, mostrando empleados y filas por segundo de cada modo.
+El proyecto temporal se elimina al terminar.
+
+Uso:
+    python scripts/benchmark_importacion.py --usuario-id 1 --empleados 1000 --meses 3
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import Dia
+from app.services.proyecto_service import ProyectoService
+from app.services.purga_service import PurgaService
+from app.services.empleado_service import EmpleadoService
+from datetime import date
+
+
+def ejecutar_benchmark(usuario_id: int, cantidad_empleados: int, cantidad_meses: int, muestra: int):
+    hoy = date.today()
+    proyecto = ProyectoService.crear_proyecto(
+        nombre='__benchmark_importacion__',
+        descripcion='Proyecto temporal de benchmark',
+        anio=hoy.year,
+        mes=hoy.month,
+        usuario_id=usuario_id,
+        tipo_proyecto='empleados',
+        empleados=['Empleado inicial']
+    )
+
+    try:
+        anio, mes = hoy.year, hoy.month
+        for _ in range(cantidad_meses - 1):
+            anio, mes = (anio, mes + 1) if mes < 12 else (anio + 1, 1)
+            ProyectoService.agregar_mes_proyecto(proyecto.id, anio, mes)
+
+        dias_por_empleado = Dia.query.filter_by(proyecto_id=proyecto.id).count()
+        print(f"\nProyecto temporal {proyecto.id}: {cantidad_meses} meses, {dias_por_empleado} días por empleado\n")
+
+        inicio = time.perf_counter()
+        for i in range(muestra):
+            EmpleadoService.agregar_empleado(proyecto.id, f'Individual {i}')
+        duracion = time.perf_counter() - inicio
+        print(f"  {'Alta individual':<20} {muestra:6d} empleados {duracion:8.3f} s "
+              f"{muestra / duracion:10.1f} empleados/s {muestra * (dias_por_empleado + 1) / duracion:12.1f} filas/s")
+
+        resultado, error = EmpleadoService.importar_empleados(
+            proyecto.id,
+            [{'nombre': f'Importado {i}'} for i in range(cantidad_empleados)]
+        )
+        if error:
+            raise RuntimeError(error)
+        print(f"  {'Importación en lote':<20} {resultado['empleados_creados']:6d} empleados "
+              f"{resultado['segundos']:8.3f} s {resultado['empleados_por_segundo']:10.1f} empleados/s "
+              f"{resultado['filas_por_segundo']:12.1f} filas/s")
+
+        print(f"\n  Aceleración por empleado: x{resultado['empleados_por_segundo'] / (muestra / duracion):.1f}\n")
+
+    finally:
+        db.session.rollback()
+        PurgaService.purgar_proyecto(proyecto.id)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de la importación masiva de empleados')
+    parser.add_argument('--usuario-id', type=int, required=True, help='Usuario dueño del proyecto temporal')
+    parser.add_argument('--empleados', type=int, default=1000, help='Empleados a importar en lote')
+    parser.add_argument('--meses', type=int, default=3, help='Meses del proyecto temporal')
+    parser.add_argument('--muestra', type=int, default=50, help='Empleados dados de alta uno por uno')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        ejecutar_benchmark(args.usuario_id, args.empleados, args.meses, args.muestra)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Verificación y benchmark de la serialización de respuestas
+1. Compara los serializadores precompilados (app/models/serializador.py) con los
+   to_dict anteriores (formato campo por campo) sobre un mes de marcados y días.
+2. Mide to_dict + JSON con el proveedor por defecto de Flask y con
+   ProveedorJSONRapido (orjson si está instalado, y librería estándar).
+3. Compara JSON y MessagePack (Accept: application/msgpack) en tiempo de
+   codificación y bytes sobre el mes en objetos, la matriz de días y los
+   valores sin convertir (fechas, horas y Decimal como extensiones).
+No necesita base de datos: usa instancias de los modelos sin sesión.
+
+Uso:
+    python scripts/benchmark_json.py --empleados 50 --dias 31
+"""
+
+import sys
+import os
+import argparse
+import random
+import time as reloj
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.models import Dia, Empleado, MarcadoAsistencia, Proyecto
+from app.utils import json_rapido, msgpack_rapido
+from app.utils.json_rapido import ProveedorJSONRapido
+
+
+# ----------------------------------------------------------------------------
+# to_dict anteriores (referencia)
+# ----------------------------------------------------------------------------
+
+def marcado_a_dict(m):
+    return {
+        'id': m.id,
+        'empleado_id': m.empleado_id,
+        'proyecto_id': m.proyecto_id,
+        'dia_id': m.dia_id,
+        'fecha': m.fecha.isoformat() if m.fecha else None,
+        'turno': m.turno,
+        'hora_entrada': m.hora_entrada.strftime('%H:%M:%S') if m.hora_entrada else None,
+        'hora_salida': m.hora_salida.strftime('%H:%M:%S') if m.hora_salida else None,
+        'entrada_marcada_manualmente': m.entrada_marcada_manualmente,
+        'salida_marcada_manualmente': m.salida_marcada_manualmente,
+        'salida_marcada_automaticamente': m.salida_marcada_automaticamente,
+        'confirmacion_continua': m.confirmacion_continua,
+        'confirmada_por_admin': m.confirmada_por_admin,
+        'horas_trabajadas': float(m.horas_trabajadas) if m.horas_trabajadas else 0,
+        'horas_extras': float(m.horas_extras) if m.horas_extras else 0,
+        'horas_normales': float(m.horas_normales) if m.horas_normales else 0,
+        'observaciones': m.observaciones,
+        'fecha_creacion': m.fecha_creacion.isoformat() if m.fecha_creacion else None,
+        'fecha_actualizacion': m.fecha_actualizacion.isoformat() if m.fecha_actualizacion else None,
+    }
+
+
+def dia_a_dict(d):
+    return {
+        'id': d.id,
+        'fecha': d.fecha.isoformat(),
+        'dia_semana': d.dia_semana,
+        'horas_trabajadas': d.horas_trabajadas,
+        'horas_reales': d.horas_reales,
+        'hora_entrada': d.hora_entrada.strftime('%H:%M') if d.hora_entrada else None,
+        'hora_salida': d.hora_salida.strftime('%H:%M') if d.hora_salida else None,
+        'turno_manana_entrada': d.turno_manana_entrada.strftime('%H:%M') if d.turno_manana_entrada else None,
+        'turno_manana_salida': d.turno_manana_salida.strftime('%H:%M') if d.turno_manana_salida else None,
+        'turno_tarde_entrada': d.turno_tarde_entrada.strftime('%H:%M') if d.turno_tarde_entrada else None,
+        'turno_tarde_salida': d.turno_tarde_salida.strftime('%H:%M') if d.turno_tarde_salida else None,
+        'horas_extras': d.horas_extras,
+        'proyecto_id': d.proyecto_id,
+        'empleado_id': d.empleado_id,
+    }
+
+
+def empleado_a_dict(e):
+    return {
+        'id': e.id,
+        'nombre': e.nombre,
+        'proyecto_id': e.proyecto_id,
+        'activo': e.activo,
+        'usuario_id': e.usuario_id,
+        'estado_asistencia': e.estado_asistencia,
+        'horario_especial_inicio': e.horario_especial_inicio.strftime('%H:%M') if e.horario_especial_inicio else None,
+        'horario_especial_fin': e.horario_especial_fin.strftime('%H:%M') if e.horario_especial_fin else None,
+        'usa_horario_especial': e.usa_horario_especial,
+        'fecha_creacion': e.fecha_creacion.isoformat() if e.fecha_creacion else None,
+    }
+
+
+def proyecto_a_dict(p):
+    return {
+        'id': p.id,
+        'nombre': p.nombre,
+        'descripcion': p.descripcion,
+        'anio': p.anio,
+        'mes': p.mes,
+        'usuario_id': p.usuario_id,
+        'activo': p.activo,
+        'tipo_proyecto': p.tipo_proyecto,
+        'horas_reales_activas': p.horas_reales_activas,
+        'modo_horarios': p.modo_horarios,
+        'horario_inicio': p.horario_inicio.strftime('%H:%M') if p.horario_inicio else None,
+        'horario_fin': p.horario_fin.strftime('%H:%M') if p.horario_fin else None,
+        'turno_manana_inicio': p.turno_manana_inicio.strftime('%H:%M') if p.turno_manana_inicio else None,
+        'turno_manana_fin': p.turno_manana_fin.strftime('%H:%M') if p.turno_manana_fin else None,
+        'turno_tarde_inicio': p.turno_tarde_inicio.strftime('%H:%M') if p.turno_tarde_inicio else None,
+        'turno_tarde_fin': p.turno_tarde_fin.strftime('%H:%M') if p.turno_tarde_fin else None,
+        'fecha_creacion': p.fecha_creacion.isoformat() if p.fecha_creacion else None,
+        'fecha_actualizacion': p.fecha_actualizacion.isoformat() if p.fecha_actualizacion else None,
+        'empleados': [empleado_a_dict(e) for e in p.empleados] if p.tipo_proyecto == 'empleados' else [],
+    }
+
+
+# ----------------------------------------------------------------------------
+# Datos de prueba
+# ----------------------------------------------------------------------------
+
+def hora(nulos=0.1):
+    if random.random() < nulos:
+        return None
+    return time(random.randrange(24), random.randrange(60), random.randrange(60))
+
+
+def horas(nulos=0.1):
+    if random.random() < nulos:
+        return None
+    return Decimal(random.randrange(0, 1200)) / 100
+
+
+def generar_mes(empleados: int, dias: int):
+    """Proyecto con empleados, y un mes de marcados y días por empleado"""
+    inicio = date(2026, 10, 1)
+    creado = datetime(2026, 9, 30, 8, 15, 42, 123456)
+
+    proyecto = Proyecto(
+        id=1, nombre='Obra Norte', descripcion='Proyecto de prueba', anio=2026, mes=10, usuario_id=1,
+        activo=True, tipo_proyecto='empleados', horas_reales_activas=True, modo_horarios='turnos',
+        horario_inicio=hora(), horario_fin=hora(), turno_manana_inicio=hora(), turno_manana_fin=hora(),
+        turno_tarde_inicio=hora(), turno_tarde_fin=hora(), fecha_creacion=creado, fecha_actualizacion=None,
+    )
+    proyecto.empleados = [
+        Empleado(
+            id=e, nombre=f'Empleado {e} Ñandú', proyecto_id=1, activo=True, usuario_id=None,
+            estado_asistencia='activo', horario_especial_inicio=hora(0.7), horario_especial_fin=hora(0.7),
+            usa_horario_especial=False, fecha_creacion=creado,
+        )
+        for e in range(1, empleados + 1)
+    ]
+
+    marcados, registros_dia = [], []
+    for e in range(1, empleados + 1):
+        for d in range(dias):
+            fecha = inicio + timedelta(days=d)
+            identificador = e * 1000 + d
+            marcados.append(MarcadoAsistencia(
+                id=identificador, empleado_id=e, proyecto_id=1, dia_id=identificador, fecha=fecha,
+                turno=random.choice(['manana', 'tarde', None]), hora_entrada=hora(), hora_salida=hora(),
+                entrada_marcada_manualmente=False, salida_marcada_manualmente=random.random() < 0.2,
+                salida_marcada_automaticamente=False, confirmacion_continua=False, confirmada_por_admin=False,
+                horas_trabajadas=horas(), horas_extras=horas(0.7), horas_normales=horas(),
+                observaciones=None, fecha_creacion=creado, fecha_actualizacion=creado,
+            ))
+            registros_dia.append(Dia(
+                id=identificador, fecha=fecha, dia_semana='lunes', horas_trabajadas=random.random() * 10,
+                horas_reales=random.random() * 10, hora_entrada=hora(), hora_salida=hora(),
+                turno_manana_entrada=hora(), turno_manana_salida=hora(), turno_tarde_entrada=hora(),
+                turno_tarde_salida=hora(), horas_extras=0.0, proyecto_id=1, empleado_id=e,
+            ))
+
+    return proyecto, marcados, registros_dia
+
+
+# ----------------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------------
+
+def verificar_paridad(proyecto, marcados, registros_dia) -> int:
+    diferencias = 0
+    pares = [(proyecto_a_dict(proyecto), proyecto.to_dict())]
+    pares += [(marcado_a_dict(m), m.to_dict()) for m in marcados]
+    pares += [(dia_a_dict(d), d.to_dict()) for d in registros_dia]
+
+    for esperado, obtenido in pares:
+        if esperado != obtenido or list(esperado) != list(obtenido):
+            diferencias += 1
+            if diferencias <= 5:
+                print(f"  ❌ esperado={esperado}\n     obtenido={obtenido}")
+    return diferencias
+
+
+def medir(nombre, funcion, repeticiones):
+    funcion()  # calentamiento
+    inicio = reloj.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    duracion = (reloj.perf_counter() - inicio) / repeticiones
+    tamano = f"{len(resultado) / 1024:8.1f} KB" if isinstance(resultado, (bytes, str)) else ''
+    print(f"  {nombre:<34} {duracion * 1000:9.2f} ms {tamano}")
+    return duracion
+
+
+def main(empleados: int, dias: int, repeticiones: int):
+    random.seed(7)
+    proyecto, marcados, registros_dia = generar_mes(empleados, dias)
+
+    print(f"\n🔍 Verificando paridad de to_dict ({len(marcados)} marcados, {len(registros_dia)} días)...")
+    diferencias = verificar_paridad(proyecto, marcados, registros_dia)
+    if diferencias:
+        print(f"❌ {diferencias} diferencias encontradas")
+        sys.exit(1)
+    print("✅ Mismo resultado (valores y orden de claves) que los to_dict anteriores")
+
+    def payload_anterior():
+        return {'success': True, 'message': 'Éxito', 'data': {
+            'proyecto': proyecto_a_dict(proyecto),
+            'marcados': [marcado_a_dict(m) for m in marcados],
+            'dias': [dia_a_dict(d) for d in registros_dia],
+        }}
+
+    def payload_nuevo():
+        return {'success': True, 'message': 'Éxito', 'data': {
+            'proyecto': proyecto.to_dict(),
+            'marcados': [m.to_dict() for m in marcados],
+            'dias': [d.to_dict() for d in registros_dia],
+        }}
+
+    app = Flask(__name__)
+    flask_json = DefaultJSONProvider(app)
+    rapido = ProveedorJSONRapido(app)
+    rapido.compact = True
+    datos = payload_nuevo()
+
+    print(f"\n⏱️  Payload de un mes ({empleados} empleados x {dias} días), promedio de {repeticiones}:")
+    with app.test_request_context():
+        medir('to_dict anterior', payload_anterior, repeticiones)
+        medir('to_dict precompilado', payload_nuevo, repeticiones)
+
+        medir('JSON Flask (por defecto)', lambda: flask_json.response(datos).get_data(), repeticiones)
+        rapido.usar_orjson = False
+        medir('JSON rápido (librería estándar)', lambda: rapido.response(datos).get_data(), repeticiones)
+        if json_rapido.ORJSON_DISPONIBLE:
+            rapido.usar_orjson = True
+            medir('JSON rápido (orjson)', lambda: rapido.response(datos).get_data(), repeticiones)
+        else:
+            print("  JSON rápido (orjson)               no disponible (pip install orjson)")
+
+        rapido.usar_orjson = json_rapido.ORJSON_DISPONIBLE
+        print()
+        total_anterior = medir('Total anterior', lambda: flask_json.response(payload_anterior()).get_data(), repeticiones)
+        total_nuevo = medir('Total nuevo', lambda: rapido.response(payload_nuevo()).get_data(), repeticiones)
+        print(f"\n  Mejora: {total_anterior / total_nuevo:.1f}x\n")
+
+    comparar_msgpack(app, rapido, marcados, registros_dia, datos, repeticiones)
+
+
+def matriz_dias(registros_dia) -> dict:
+    """Matriz empleados x fechas como la de DiaService.obtener_matriz_rango"""
+    fechas = sorted({d.fecha for d in registros_dia})
+    empleados = sorted({d.empleado_id for d in registros_dia})
+    fila, columna = {e: i for i, e in enumerate(empleados)}, {f: j for j, f in enumerate(fechas)}
+    matriz = {'fechas': [f.isoformat() for f in fechas], 'empleados': empleados}
+    for campo in ('id', 'horas_trabajadas', 'horas_reales', 'horas_extras'):
+        valores = [[None] * len(fechas) for _ in empleados]
+        for d in registros_dia:
+            valores[fila[d.empleado_id]][columna[d.fecha]] = getattr(d, campo)
+        matriz['ids' if campo == 'id' else campo] = valores
+    return matriz
+
+
+def comparar_msgpack(app, rapido, marcados, registros_dia, datos, repeticiones):
+    if not msgpack_rapido.MSGPACK_DISPONIBLE:
+        print("  MessagePack                          no disponible (pip install msgpack)\n")
+        return
+
+    crudos = [
+        {'id': m.id, 'fecha': m.fecha, 'hora_entrada': m.hora_entrada, 'hora_salida': m.hora_salida,
+         'horas_trabajadas': m.horas_trabajadas, 'fecha_creacion': m.fecha_creacion}
+        for m in marcados
+    ]
+    cargas = [
+        ('Mes (to_dict)', datos),
+        ('Matriz de días', matriz_dias(registros_dia)),
+        ('Marcados sin convertir', crudos),
+    ]
+
+    print(f"⏱️  JSON vs MessagePack, promedio de {repeticiones}:")
+    with app.test_request_context(headers={'Accept': 'application/json'}):
+        for nombre, carga in cargas:
+            t_json = medir(f'{nombre}: JSON', lambda: rapido.response(carga).get_data(), repeticiones)
+            t_mp = medir(f'{nombre}: MessagePack', lambda: msgpack_rapido.serializar_msgpack(carga), repeticiones)
+            bytes_json = len(rapido.response(carga).get_data())
+            bytes_mp = len(msgpack_rapido.serializar_msgpack(carga))
+            print(f"  {'':<34} codificación x{t_json / t_mp:.1f}, tamaño {bytes_mp / bytes_json:.0%} del JSON\n")
+
+    # Verifica la negociación de punta a punta (mismo contenido en ambos formatos)
+    with app.test_request_context(headers={'Accept': 'application/msgpack'}):
+        respuesta = rapido.response(datos)
+    decodificado = msgpack_rapido.deserializar_msgpack(respuesta.get_data())
+    igual = decodificado == json_rapido.json.loads(rapido.serializar(datos))
+    print(f"  Negociación: {respuesta.mimetype}, {'✅ mismo contenido que JSON' if igual else '❌ contenido distinto'}\n")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Paridad y benchmark de la serialización JSON')
+    parser.add_argument('--empleados', type=int, default=50)
+    parser.add_argument('--dias', type=int, default=31)
+    parser.add_argument('--repeticiones', type=int, default=10)
+    args = parser.parse_args()
+    main(args.empleados, args.dias, args.repeticiones)
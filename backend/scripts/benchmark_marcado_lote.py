@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark del marcado de asistencia en lote vs. marcado individual
+Crea un proyecto temporal con N empleados, marca entrada y salida de todos
+(uno por uno y luego en un único lote) y muestra el throughput de cada modo.
+El proyecto temporal se elimina al terminar.
+
+Uso:
+    python scripts/benchmark_marcado_lote.py --usuario-id 1 --empleados 1000
+"""
+
+import sys
+import os
+import argparse
+import time as reloj
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import Empleado
+from app.services.proyecto_service import ProyectoService
+from app.services.purga_service import PurgaService
+from app.services.asistencia_service import AsistenciaService
+from datetime import date, time
+
+
+def medir(descripcion, cantidad, funcion):
+    """Ejecuta la función y muestra duración y marcados por segundo"""
+    inicio = reloj.perf_counter()
+    funcion()
+    duracion = reloj.perf_counter() - inicio
+    print(f"  {descripcion:<28} {duracion:8.3f} s   {cantidad / duracion:10.1f} marcados/s")
+    return duracion
+
+
+def ejecutar_benchmark(usuario_id: int, cantidad_empleados: int):
+    hoy = date.today()
+    proyecto = ProyectoService.crear_proyecto(
+        nombre='__benchmark_marcado_lote__',
+        descripcion='Proyecto temporal de benchmark',
+        anio=hoy.year,
+        mes=hoy.month,
+        usuario_id=usuario_id,
+        tipo_proyecto='empleados',
+        empleados=[f'Empleado {i}' for i in range(cantidad_empleados)],
+        horario_inicio='08:00',
+        horario_fin='17:00'
+    )
+
+    try:
+        empleado_ids = [e.id for e in Empleado.query.filter_by(proyecto_id=proyecto.id).all()]
+        fecha_individual = date(hoy.year, hoy.month, 1)
+        fecha_lote = date(hoy.year, hoy.month, 2)
+        entrada, salida = time(8, 0), time(18, 30)
+
+        print(f"\nProyecto temporal {proyecto.id} con {len(empleado_ids)} empleados\n")
+
+        def individual(tipo, hora):
+            for empleado_id in empleado_ids:
+                if tipo == 'entrada':
+                    AsistenciaService.marcar_entrada(empleado_id, proyecto.id, fecha_individual, hora)
+                else:
+                    AsistenciaService.marcar_salida(empleado_id, proyecto.id, fecha_individual, hora)
+
+        def lote(tipo, hora):
+            items = [
+                {'empleado_id': empleado_id, 'tipo': tipo, 'fecha': fecha_lote, 'hora': hora}
+                for empleado_id in empleado_ids
+            ]
+            _, error = AsistenciaService.marcar_lote(proyecto.id, items)
+            if error:
+                raise RuntimeError(error)
+
+        t_ind = medir('Entradas individuales', len(empleado_ids), lambda: individual('entrada', entrada))
+        t_ind += medir('Salidas individuales', len(empleado_ids), lambda: individual('salida', salida))
+        t_lote = medir('Entradas en lote', len(empleado_ids), lambda: lote('entrada', entrada))
+        t_lote += medir('Salidas en lote', len(empleado_ids), lambda: lote('salida', salida))
+
+        print(f"\n  Aceleración total: x{t_ind / t_lote:.1f}\n")
+
+    finally:
+        db.session.rollback()
+        PurgaService.purgar_proyecto(proyecto.id)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de marcado de asistencia en lote')
+    parser.add_argument('--usuario-id', type=int, required=True, help='Usuario dueño del proyecto temporal')
+    parser.add_argument('--empleados', type=int, default=1000, help='Cantidad de empleados (marcados por lote)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        ejecutar_benchmark(args.usuario_id, args.empleados)
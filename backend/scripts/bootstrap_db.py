@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Crea las tablas que falten en la base de datos (db.create_all)
+Reemplaza la creación de tablas al arrancar cuando se usa FAST_START=True:
+ejecutar una vez por despliegue, antes de levantar los workers y el scheduler.
+
+Uso:
+    python scripts/bootstrap_db.py
+"""
+
+import sys
+import os
+import time
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from sqlalchemy import inspect
+import app.models  # noqa: F401 - registra todos los modelos en la metadata
+
+
+def bootstrap():
+    existentes = set(inspect(db.engine).get_table_names())
+    faltantes = [tabla for tabla in db.metadata.sorted_tables if tabla.name not in existentes]
+
+    if not faltantes:
+        print("✓ Todas las tablas ya existen")
+        return
+
+    inicio = time.perf_counter()
+    db.create_all()
+    print(f"✓ {len(faltantes)} tablas creadas en {time.perf_counter() - inicio:.2f}s: "
+          f"{', '.join(tabla.name for tabla in faltantes)}")
+
+
+if __name__ == '__main__':
+    aplicacion = create_app(crear_tablas=False, registrar_rutas=False)
+    with aplicacion.app_context():
+        try:
+            bootstrap()
+        except Exception as e:
+            print(f"❌ Error al crear tablas: {e}")
+            sys.exit(1)
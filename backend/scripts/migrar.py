@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""
+Ejecutor de migraciones versionadas del esquema MySQL
+Aplica y revierte los scripts de migrations/versiones en orden y registra cada
+versión aplicada en la tabla schema_migraciones.
+
+Archivos:
+    migrations/versiones/0003_indice_marcados_fecha.up.sql     (aplicar)
+    migrations/versiones/0003_indice_marcados_fecha.down.sql   (revertir)
+
+Pasos seguros para producción:
+  - CREATE INDEX / ALTER TABLE ... ADD|DROP INDEX se ejecutan con
+    ALGORITHM=INPLACE, LOCK=NONE (sin bloquear escrituras). Si MySQL no lo
+    soporta para esa operación, se reintenta sin esas opciones y se avisa.
+  - ALTER TABLE ... ADD COLUMN intenta primero ALGORITHM=INSTANT.
+  - Las cláusulas ADD COLUMN / ADD INDEX que ya existen, y DROP COLUMN / DROP INDEX
+    que ya no existen, se omiten: un script interrumpido se puede volver a ejecutar.
+  - --dry-run muestra las sentencias finales y estima la duración según las
+    filas de cada tabla (information_schema.TABLES).
+
+Uso:
+    python scripts/migrar.py estado
+    python scripts/migrar.py aplicar [--hasta 3] [--dry-run]
+    python scripts/migrar.py revertir [--pasos 1] [--dry-run]
+    python scripts/migrar.py marcar --hasta 2   (registrar como aplicadas sin ejecutar)
+"""
+
+import sys
+import os
+import argparse
+import hashlib
+import re
+import time
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+
+DIRECTORIO_VERSIONES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations', 'versiones'
+)
+
+TABLA_VERSIONES = 'schema_migraciones'
+
+# Velocidades aproximadas para estimar duraciones en --dry-run (filas por segundo)
+FILAS_POR_SEGUNDO = {
+    'indice': 250_000,   # Construcción de índice INPLACE
+    'copia': 50_000,     # ALTER que reconstruye la tabla
+}
+
+# Errores de MySQL cuando ALGORITHM/LOCK no se soportan para la operación
+ERRORES_ALGORITMO_NO_SOPORTADO = {1845, 1846}
+
+_PATRON_ARCHIVO = re.compile(r'^(\d{4})_(.+)\.(up|down)\.sql$')
+_PATRON_CREATE_INDEX = re.compile(
+    r'^CREATE\s+(?:UNIQUE\s+|FULLTEXT\s+)?INDEX\s+`?(\w+)`?\s+ON\s+`?(\w+)`?', re.IGNORECASE
+)
+_PATRON_DROP_INDEX = re.compile(r'^DROP\s+INDEX\s+`?(\w+)`?\s+ON\s+`?(\w+)`?', re.IGNORECASE)
+_PATRON_ALTER = re.compile(r'^ALTER\s+TABLE\s+`?(\w+)`?\s+(.*)$', re.IGNORECASE | re.DOTALL)
+_PATRON_ALGORITMO = re.compile(r'\bALGORITHM\s*=|\bLOCK\s*=', re.IGNORECASE)
+
+_CLAUSULA_ADD_COLUMN = re.compile(r'^ADD\s+(?:COLUMN\s+)?`?(\w+)`?\s', re.IGNORECASE)
+_CLAUSULA_ADD_INDEX = re.compile(
+    r'^ADD\s+(?:UNIQUE\s+|FULLTEXT\s+)?(?:INDEX|KEY)\s+`?(\w+)`?|^ADD\s+UNIQUE\s+`?(\w+)`?\s*\(',
+    re.IGNORECASE
+)
+_CLAUSULA_DROP_INDEX = re.compile(r'^DROP\s+(?:INDEX|KEY)\s+`?(\w+)`?', re.IGNORECASE)
+_CLAUSULA_DROP_COLUMN = re.compile(r'^DROP\s+(?:COLUMN\s+)?`?(\w+)`?\s*$', re.IGNORECASE)
+_CLAUSULA_CONSTRAINT = re.compile(r'^ADD\s+(?:CONSTRAINT|PRIMARY|FOREIGN|CHECK|PARTITION)\b', re.IGNORECASE)
+
+
+# ----------------------------------------------------------------------------
+# Lectura de archivos
+# ----------------------------------------------------------------------------
+
+class Migracion:
+    """Par de scripts up/down de una versión"""
+
+    def __init__(self, version: int, nombre: str):
+        self.version = version
+        self.nombre = nombre
+        self.archivo_up = None
+        self.archivo_down = None
+
+    @property
+    def checksum(self) -> str:
+        with open(self.archivo_up, 'rb') as archivo:
+            return hashlib.sha256(archivo.read()).hexdigest()
+
+    def __repr__(self):
+        return f"{self.version:04d}_{self.nombre}"
+
+
+def cargar_migraciones():
+    """Lee migrations/versiones y devuelve las migraciones ordenadas por versión"""
+    migraciones = {}
+
+    for archivo in sorted(os.listdir(DIRECTORIO_VERSIONES)):
+        coincidencia = _PATRON_ARCHIVO.match(archivo)
+        if not coincidencia:
+            continue
+        version, nombre, sentido = int(coincidencia.group(1)), coincidencia.group(2), coincidencia.group(3)
+        migracion = migraciones.setdefault(version, Migracion(version, nombre))
+        if migracion.nombre != nombre:
+            raise ValueError(f"La versión {version:04d} tiene nombres distintos: {migracion.nombre} / {nombre}")
+        ruta = os.path.join(DIRECTORIO_VERSIONES, archivo)
+        if sentido == 'up':
+            migracion.archivo_up = ruta
+        else:
+            migracion.archivo_down = ruta
+
+    for migracion in migraciones.values():
+        if migracion.archivo_up is None:
+            raise ValueError(f"Falta {migracion!r}.up.sql")
+
+    return [migraciones[v] for v in sorted(migraciones)]
+
+
+def dividir_sentencias(sql: str):
+    """Divide un script en sentencias (respeta comillas, descarta comentarios --)"""
+    sentencias = []
+    actual = []
+    comilla = None
+    i = 0
+
+    while i < len(sql):
+        caracter = sql[i]
+
+        if comilla:
+            actual.append(caracter)
+            if caracter == '\\':
+                actual.append(sql[i + 1:i + 2])
+                i += 2
+                continue
+            if caracter == comilla:
+                comilla = None
+        elif caracter in ("'", '"', '`'):
+            comilla = caracter
+            actual.append(caracter)
+        elif sql.startswith('--', i) or caracter == '#':
+            fin = sql.find('\n', i)
+            i = len(sql) if fin == -1 else fin
+            continue
+        elif caracter == ';':
+            sentencia = ''.join(actual).strip()
+            if sentencia:
+                sentencias.append(sentencia)
+            actual = []
+        else:
+            actual.append(caracter)
+        i += 1
+
+    sentencia = ''.join(actual).strip()
+    if sentencia:
+        sentencias.append(sentencia)
+
+    return sentencias
+
+
+def _dividir_clausulas(cuerpo: str):
+    """Divide el cuerpo de un ALTER TABLE en cláusulas separadas por comas de primer nivel"""
+    clausulas = []
+    actual = []
+    nivel = 0
+    comilla = None
+
+    for caracter in cuerpo:
+        if comilla:
+            if caracter == comilla:
+                comilla = None
+        elif caracter in ("'", '"', '`'):
+            comilla = caracter
+        elif caracter == '(':
+            nivel += 1
+        elif caracter == ')':
+            nivel -= 1
+        elif caracter == ',' and nivel == 0:
+            clausulas.append(''.join(actual).strip())
+            actual = []
+            continue
+        actual.append(caracter)
+
+    if ''.join(actual).strip():
+        clausulas.append(''.join(actual).strip())
+
+    return clausulas
+
+
+# ----------------------------------------------------------------------------
+# Esquema actual
+# ----------------------------------------------------------------------------
+
+class Esquema:
+    """Consultas a information_schema sobre la base actual"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def _uno(self, sql, parametros):
+        self.cursor.execute(sql, parametros)
+        return self.cursor.fetchone()
+
+    def existe_tabla(self, tabla: str) -> bool:
+        return self._uno(
+            "SELECT 1 FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (tabla,)
+        ) is not None
+
+    def existe_columna(self, tabla: str, columna: str) -> bool:
+        return self._uno(
+            "SELECT 1 FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+            (tabla, columna)
+        ) is not None
+
+    def existe_indice(self, tabla: str, indice: str) -> bool:
+        return self._uno(
+            "SELECT 1 FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1",
+            (tabla, indice)
+        ) is not None
+
+    def filas(self, tabla: str) -> int:
+        """Filas estimadas de la tabla (TABLE_ROWS de InnoDB, aproximado)"""
+        fila = self._uno(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (tabla,)
+        )
+        return int(fila[0] or 0) if fila else 0
+
+
+# ----------------------------------------------------------------------------
+# Planificación de sentencias
+# ----------------------------------------------------------------------------
+
+class Paso:
+    """Sentencia lista para ejecutar, con su alternativa y estimación"""
+
+    def __init__(self, sql, tabla=None, tipo='otro', alternativas=None, omitir=None):
+        self.sql = sql
+        self.tabla = tabla
+        self.tipo = tipo                      # 'instant', 'indice', 'copia' u 'otro'
+        self.alternativas = alternativas or []  # Variantes a probar si MySQL rechaza ALGORITHM/LOCK
+        self.omitir = omitir                  # Motivo para no ejecutarla (ya aplicada)
+
+
+def planificar(sentencia: str, esquema: Esquema) -> Paso:
+    """Convierte una sentencia en un Paso con opciones online y guardas de idempotencia"""
+    coincidencia = _PATRON_CREATE_INDEX.match(sentencia)
+    if coincidencia:
+        indice, tabla = coincidencia.groups()
+        if esquema.existe_indice(tabla, indice):
+            return Paso(sentencia, tabla, omitir=f"el índice {indice} ya existe")
+        if _PATRON_ALGORITMO.search(sentencia):
+            return Paso(sentencia, tabla, 'indice')
+        return Paso(f"{sentencia} ALGORITHM=INPLACE LOCK=NONE", tabla, 'indice', [sentencia])
+
+    coincidencia = _PATRON_DROP_INDEX.match(sentencia)
+    if coincidencia:
+        indice, tabla = coincidencia.groups()
+        if not esquema.existe_indice(tabla, indice):
+            return Paso(sentencia, tabla, omitir=f"el índice {indice} no existe")
+        if _PATRON_ALGORITMO.search(sentencia):
+            return Paso(sentencia, tabla, 'instant')
+        return Paso(f"{sentencia} ALGORITHM=INPLACE LOCK=NONE", tabla, 'instant', [sentencia])
+
+    coincidencia = _PATRON_ALTER.match(sentencia)
+    if coincidencia:
+        return _planificar_alter(sentencia, coincidencia.group(1), coincidencia.group(2), esquema)
+
+    return Paso(sentencia)
+
+
+def _planificar_alter(sentencia, tabla, cuerpo, esquema: Esquema) -> Paso:
+    if not esquema.existe_tabla(tabla):
+        # Tabla creada por un paso anterior del mismo script: no hay nada que verificar
+        return Paso(sentencia, tabla)
+
+    clausulas = _dividir_clausulas(cuerpo)
+    vigentes = []
+    omitidas = []
+    tipos = set()
+
+    for clausula in clausulas:
+        if _PATRON_ALGORITMO.match(clausula):
+            continue
+
+        indice = _CLAUSULA_ADD_INDEX.match(clausula)
+        if indice:
+            nombre = indice.group(1) or indice.group(2)
+            if esquema.existe_indice(tabla, nombre):
+                omitidas.append(clausula)
+                continue
+            tipos.add('indice')
+            vigentes.append(clausula)
+            continue
+
+        indice = _CLAUSULA_DROP_INDEX.match(clausula)
+        if indice:
+            if not esquema.existe_indice(tabla, indice.group(1)):
+                omitidas.append(clausula)
+                continue
+            tipos.add('drop_indice')
+            vigentes.append(clausula)
+            continue
+
+        columna = _CLAUSULA_DROP_COLUMN.match(clausula)
+        if columna:
+            if not esquema.existe_columna(tabla, columna.group(1)):
+                omitidas.append(clausula)
+                continue
+            tipos.add('copia')
+            vigentes.append(clausula)
+            continue
+
+        if not _CLAUSULA_CONSTRAINT.match(clausula):
+            columna = _CLAUSULA_ADD_COLUMN.match(clausula)
+            if columna and columna.group(1).upper() not in ('INDEX', 'KEY', 'UNIQUE', 'FULLTEXT'):
+                if esquema.existe_columna(tabla, columna.group(1)):
+                    omitidas.append(clausula)
+                    continue
+                tipos.add('columna')
+                vigentes.append(clausula)
+                continue
+
+        tipos.add('copia')
+        vigentes.append(clausula)
+
+    if not vigentes:
+        return Paso(sentencia, tabla, omitir='; '.join(omitidas) + ' (ya aplicado)')
+
+    base = f"ALTER TABLE {tabla} " + ',\n    '.join(vigentes)
+
+    if _PATRON_ALGORITMO.search(cuerpo):
+        # El autor eligió ALGORITHM/LOCK explícitamente: se respeta
+        opciones = [c for c in clausulas if _PATRON_ALGORITMO.match(c)]
+        return Paso(base + ', ' + ', '.join(opciones), tabla, 'copia')
+
+    if tipos == {'columna'}:
+        return Paso(
+            f"{base}, ALGORITHM=INSTANT", tabla, 'instant',
+            [f"{base}, ALGORITHM=INPLACE, LOCK=NONE", base]
+        )
+
+    if tipos <= {'indice', 'drop_indice'}:
+        tipo = 'indice' if 'indice' in tipos else 'instant'
+        return Paso(f"{base}, ALGORITHM=INPLACE, LOCK=NONE", tabla, tipo, [base])
+
+    return Paso(base, tabla, 'copia')
+
+
+def estimar_segundos(paso: Paso, esquema: Esquema):
+    """Duración estimada según las filas de la tabla, o None si no aplica"""
+    if paso.omitir or paso.tabla is None or paso.tipo not in FILAS_POR_SEGUNDO:
+        return None, None
+    filas = esquema.filas(paso.tabla)
+    return filas / FILAS_POR_SEGUNDO[paso.tipo], filas
+
+
+# ----------------------------------------------------------------------------
+# Ejecución
+# ----------------------------------------------------------------------------
+
+def _codigo_error(error) -> int:
+    return error.args[0] if error.args and isinstance(error.args[0], int) else 0
+
+
+def ejecutar_paso(cursor, paso: Paso):
+    """Ejecuta un paso, probando las alternativas si MySQL rechaza ALGORITHM/LOCK"""
+    intentos = [paso.sql] + paso.alternativas
+
+    for numero, sql in enumerate(intentos):
+        try:
+            cursor.execute(sql)
+            if numero > 0:
+                print(f"      ⚠️ Ejecutado sin la opción online original: {sql.splitlines()[0]}...")
+            return
+        except Exception as e:
+            if _codigo_error(e) in ERRORES_ALGORITMO_NO_SOPORTADO and numero < len(intentos) - 1:
+                print(f"      ⚠️ {e.args[1] if len(e.args) > 1 else e}")
+                continue
+            raise
+
+
+def ejecutar_script(conexion, ruta: str, dry_run: bool) -> float:
+    """
+    Planifica y ejecuta (o muestra, con dry_run) las sentencias de un script
+
+    Returns:
+        Segundos estimados (dry_run) o transcurridos
+    """
+    with open(ruta, encoding='utf-8') as archivo:
+        sentencias = dividir_sentencias(archivo.read())
+
+    cursor = conexion.cursor()
+    esquema = Esquema(cursor)
+    total = 0.0
+
+    for sentencia in sentencias:
+        paso = planificar(sentencia, esquema)
+        primera_linea = paso.sql.splitlines()[0]
+
+        if paso.omitir:
+            print(f"    ⏭️  {primera_linea[:90]} -- omitido: {paso.omitir}")
+            continue
+
+        if dry_run:
+            segundos, filas = estimar_segundos(paso, esquema)
+            estimacion = f" -- ≈{segundos:.1f}s ({filas} filas, {paso.tipo})" if segundos is not None else ''
+            print(f"    ▶ {paso.sql}{estimacion}")
+            total += segundos or 0
+            continue
+
+        inicio = time.perf_counter()
+        print(f"    ▶ {primera_linea[:100]}")
+        ejecutar_paso(cursor, paso)
+        conexion.commit()
+        total += time.perf_counter() - inicio
+
+    cursor.close()
+    return total
+
+
+def asegurar_tabla_versiones(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLA_VERSIONES} (
+            version INT PRIMARY KEY,
+            nombre VARCHAR(200) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            duracion_ms INT NOT NULL DEFAULT 0,
+            fecha_aplicacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def versiones_aplicadas(cursor):
+    cursor.execute(f"SELECT version, checksum, fecha_aplicacion FROM {TABLA_VERSIONES} ORDER BY version")
+    return {fila[0]: (fila[1], fila[2]) for fila in cursor.fetchall()}
+
+
+def comando_estado(conexion, migraciones):
+    cursor = conexion.cursor()
+    aplicadas = versiones_aplicadas(cursor)
+    cursor.close()
+
+    print(f"\n{'Versión':<8} {'Estado':<12} {'Aplicada':<20} Nombre")
+    for migracion in migraciones:
+        if migracion.version in aplicadas:
+            checksum, fecha = aplicadas[migracion.version]
+            estado = 'aplicada' if checksum == migracion.checksum else 'MODIFICADA'
+            print(f"{migracion.version:04d}     {estado:<12} {str(fecha):<20} {migracion.nombre}")
+        else:
+            print(f"{migracion.version:04d}     {'pendiente':<12} {'':<20} {migracion.nombre}")
+
+    conocidas = {m.version for m in migraciones}
+    for version in sorted(set(aplicadas) - conocidas):
+        print(f"{version:04d}     {'sin archivo':<12} {str(aplicadas[version][1]):<20} ?")
+    print()
+
+
+def comando_aplicar(conexion, migraciones, hasta=None, dry_run=False):
+    cursor = conexion.cursor()
+    aplicadas = versiones_aplicadas(cursor)
+    pendientes = [
+        m for m in migraciones
+        if m.version not in aplicadas and (hasta is None or m.version <= hasta)
+    ]
+
+    if not pendientes:
+        print("✓ No hay migraciones pendientes")
+        return
+
+    total = 0.0
+    for migracion in pendientes:
+        print(f"\n⬆️  {migracion!r}{' (dry-run)' if dry_run else ''}")
+        segundos = ejecutar_script(conexion, migracion.archivo_up, dry_run)
+        total += segundos
+
+        if not dry_run:
+            cursor.execute(
+                f"INSERT INTO {TABLA_VERSIONES} (version, nombre, checksum, duracion_ms) VALUES (%s, %s, %s, %s)",
+                (migracion.version, migracion.nombre, migracion.checksum, int(segundos * 1000))
+            )
+            conexion.commit()
+            print(f"  ✅ Aplicada en {segundos:.2f}s")
+
+    cursor.close()
+    if dry_run:
+        print(f"\n⏱️  Duración estimada total: ≈{total:.1f}s")
+
+
+def comando_revertir(conexion, migraciones, pasos=1, dry_run=False):
+    cursor = conexion.cursor()
+    aplicadas = versiones_aplicadas(cursor)
+    por_version = {m.version: m for m in migraciones}
+    a_revertir = sorted(aplicadas, reverse=True)[:pasos]
+
+    if not a_revertir:
+        print("✓ No hay migraciones aplicadas")
+        return
+
+    total = 0.0
+    for version in a_revertir:
+        migracion = por_version.get(version)
+        if migracion is None or migracion.archivo_down is None:
+            raise ValueError(f"La versión {version:04d} no tiene script .down.sql")
+
+        print(f"\n⬇️  {migracion!r}{' (dry-run)' if dry_run else ''}")
+        segundos = ejecutar_script(conexion, migracion.archivo_down, dry_run)
+        total += segundos
+
+        if not dry_run:
+            cursor.execute(f"DELETE FROM {TABLA_VERSIONES} WHERE version = %s", (version,))
+            conexion.commit()
+            print(f"  ✅ Revertida en {segundos:.2f}s")
+
+    cursor.close()
+    if dry_run:
+        print(f"\n⏱️  Duración estimada total: ≈{total:.1f}s")
+
+
+def comando_marcar(conexion, migraciones, hasta: int):
+    """Registra migraciones como aplicadas sin ejecutarlas (bases creadas con create_all)"""
+    cursor = conexion.cursor()
+    aplicadas = versiones_aplicadas(cursor)
+
+    for migracion in migraciones:
+        if migracion.version <= hasta and migracion.version not in aplicadas:
+            cursor.execute(
+                f"INSERT INTO {TABLA_VERSIONES} (version, nombre, checksum) VALUES (%s, %s, %s)",
+                (migracion.version, migracion.nombre, migracion.checksum)
+            )
+            print(f"  ✓ {migracion!r} marcada como aplicada")
+
+    conexion.commit()
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migraciones versionadas del esquema')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    subparsers.add_parser('estado', help='Muestra las migraciones aplicadas y pendientes')
+
+    aplicar = subparsers.add_parser('aplicar', help='Aplica las migraciones pendientes')
+    aplicar.add_argument('--hasta', type=int, help='Última versión a aplicar')
+    aplicar.add_argument('--dry-run', action='store_true', help='Muestra sentencias y tiempos estimados sin ejecutar')
+
+    revertir = subparsers.add_parser('revertir', help='Revierte las últimas migraciones aplicadas')
+    revertir.add_argument('--pasos', type=int, default=1)
+    revertir.add_argument('--dry-run', action='store_true')
+
+    marcar = subparsers.add_parser('marcar', help='Registra migraciones como aplicadas sin ejecutarlas')
+    marcar.add_argument('--hasta', type=int, required=True)
+
+    args = parser.parse_args()
+    migraciones = cargar_migraciones()
+
+    app = create_app(crear_tablas=False, registrar_rutas=False)
+    with app.app_context():
+        conexion = db.engine.raw_connection()
+        try:
+            cursor = conexion.cursor()
+            asegurar_tabla_versiones(cursor)
+            conexion.commit()
+            cursor.close()
+
+            if args.comando == 'estado':
+                comando_estado(conexion, migraciones)
+            elif args.comando == 'aplicar':
+                comando_aplicar(conexion, migraciones, args.hasta, args.dry_run)
+            elif args.comando == 'revertir':
+                comando_revertir(conexion, migraciones, args.pasos, args.dry_run)
+            elif args.comando == 'marcar':
+                comando_marcar(conexion, migraciones, args.hasta)
+        except Exception as e:
+            print(f"\n❌ Error en la migración: {e}")
+            print("   Las sentencias DDL ya ejecutadas no se revierten solas (MySQL hace commit implícito);")
+            print("   corregir el script y volver a ejecutar: los pasos ya aplicados se omiten.")
+            sys.exit(1)
+        finally:
+            conexion.close()
+
+
+if __name__ == '__main__':
+    main()
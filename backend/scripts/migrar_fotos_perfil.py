@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Pasa las fotos de perfil guardadas como data URL en usuarios.foto_perfil al
+almacén de imágenes (variantes redimensionadas) y vacía la columna.
+Procesa por lotes con un commit por lote; se puede interrumpir y volver a ejecutar.
+Requiere la migración 0005 (columna foto_perfil_hash).
+
+Uso:
+    python scripts/migrar_fotos_perfil.py [--lote 50] [--dry-run]
+"""
+
+import argparse
+import sys
+import os
+import time
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import Usuario
+from app.services.foto_perfil_service import FotoPerfilService, decodificar
+from sqlalchemy import select, update
+from sqlalchemy.orm import undefer
+
+
+def migrar(lote: int, dry_run: bool):
+    inicio = time.perf_counter()
+    migradas = invalidas = 0
+    ultimo_id = 0
+
+    while True:
+        usuarios = db.session.execute(
+            select(Usuario)
+            .options(undefer(Usuario.foto_perfil))
+            .where(Usuario.id > ultimo_id, Usuario.foto_perfil.isnot(None), Usuario.foto_perfil != '')
+            .order_by(Usuario.id)
+            .limit(lote)
+        ).scalars().all()
+        if not usuarios:
+            break
+        ultimo_id = usuarios[-1].id
+
+        for usuario in usuarios:
+            try:
+                if dry_run:
+                    FotoPerfilService.procesar(decodificar(usuario.foto_perfil))
+                else:
+                    FotoPerfilService.guardar(usuario, usuario.foto_perfil)
+                migradas += 1
+            except ValueError as e:
+                # Datos que no son una imagen: se descartan para no reintentarlos siempre
+                print(f"  ⚠️ Usuario {usuario.id}: {e}")
+                invalidas += 1
+                if not dry_run:
+                    usuario.foto_perfil = None
+
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+        print(f"  ✓ Hasta usuario {ultimo_id}: {migradas} migradas, {invalidas} inválidas")
+
+    if not dry_run:
+        # Las cadenas vacías equivalen a no tener foto
+        db.session.execute(update(Usuario).where(Usuario.foto_perfil == '').values(foto_perfil=None))
+        db.session.commit()
+
+    accion = "se migrarían" if dry_run else "migradas"
+    print(f"✓ {migradas} fotos {accion}, {invalidas} inválidas en {time.perf_counter() - inicio:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migra las fotos de perfil al almacén de imágenes')
+    parser.add_argument('--lote', type=int, default=50, help='Usuarios por commit')
+    parser.add_argument('--dry-run', action='store_true', help='Procesa las fotos sin guardar nada')
+    args = parser.parse_args()
+
+    aplicacion = create_app(crear_tablas=False, registrar_rutas=False)
+    with aplicacion.app_context():
+        migrar(args.lote, args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
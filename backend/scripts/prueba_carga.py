@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga: servidor de desarrollo de Flask vs. gunicorn
+Lanza N clientes concurrentes contra una ruta y reporta solicitudes/s y latencias.
+Con --comparar levanta ambos servidores (python main.py y gunicorn) en puertos
+libres, ejecuta la misma carga contra cada uno y los detiene al terminar.
+
+Uso:
+    python scripts/prueba_carga.py --comparar --concurrencia 32 --duracion 20
+    python scripts/prueba_carga.py --url http://localhost:22000 --ruta /api/proyectos --token <JWT>
+"""
+
+import sys
+import os
+import argparse
+import signal
+import subprocess
+import threading
+import time
+import urllib.request
+import urllib.error
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def ejecutar_carga(url: str, concurrencia: int, duracion: float, token: str = None):
+    """
+    Envía solicitudes GET desde `concurrencia` hilos durante `duracion` segundos
+
+    Returns:
+        Diccionario con total, errores, solicitudes/s y percentiles de latencia (ms)
+    """
+    latencias = []
+    errores = [0]
+    lock = threading.Lock()
+    limite = time.monotonic() + duracion
+
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+
+    def cliente():
+        propias = []
+        fallidas = 0
+        while time.monotonic() < limite:
+            inicio = time.perf_counter()
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30) as respuesta:
+                    respuesta.read()
+                propias.append(time.perf_counter() - inicio)
+            except (urllib.error.URLError, OSError):
+                fallidas += 1
+        with lock:
+            latencias.extend(propias)
+            errores[0] += fallidas
+
+    hilos = [threading.Thread(target=cliente) for _ in range(concurrencia)]
+    inicio = time.monotonic()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.monotonic() - inicio
+
+    latencias.sort()
+
+    def percentil(p):
+        if not latencias:
+            return 0.0
+        return latencias[min(int(len(latencias) * p), len(latencias) - 1)] * 1000
+
+    return {
+        'total': len(latencias),
+        'errores': errores[0],
+        'rps': len(latencias) / transcurrido,
+        'p50': percentil(0.50),
+        'p95': percentil(0.95),
+        'p99': percentil(0.99),
+    }
+
+
+def esperar_servidor(url: str, timeout: float = 30) -> bool:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return True
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    return False
+
+
+def levantar_servidor(comando, puerto: int):
+    entorno = dict(os.environ, API_HOST='127.0.0.1', API_PORT=str(puerto), FLASK_DEBUG='False')
+    return subprocess.Popen(
+        comando,
+        cwd=BACKEND_DIR,
+        env=entorno,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+def detener_servidor(proceso):
+    try:
+        os.killpg(proceso.pid, signal.SIGTERM)
+        proceso.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(proceso.pid, signal.SIGKILL)
+
+
+def imprimir(nombre, resultado):
+    print(f"  {nombre:<22} {resultado['rps']:9.1f} req/s  "
+          f"p50 {resultado['p50']:7.1f} ms  p95 {resultado['p95']:7.1f} ms  "
+          f"p99 {resultado['p99']:7.1f} ms  ({resultado['total']} ok, {resultado['errores']} errores)")
+
+
+def comparar(ruta: str, concurrencia: int, duracion: float, token: str = None):
+    servidores = [
+        ('Flask (dev server)', [sys.executable, 'main.py'], 18081),
+        ('gunicorn', [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'], 18082),
+    ]
+
+    print(f"\n🔥 Concurrencia {concurrencia}, {duracion:.0f}s por servidor, ruta {ruta}\n")
+
+    for nombre, comando, puerto in servidores:
+        proceso = levantar_servidor(comando, puerto)
+        try:
+            base = f'http://127.0.0.1:{puerto}'
+            if not esperar_servidor(base + '/api/metricas/salud'):
+                print(f"  ❌ {nombre} no respondió")
+                continue
+            ejecutar_carga(base + ruta, concurrencia, 2, token)  # calentamiento
+            imprimir(nombre, ejecutar_carga(base + ruta, concurrencia, duracion, token))
+        finally:
+            detener_servidor(proceso)
+
+    print()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prueba de carga del backend')
+    parser.add_argument('--comparar', action='store_true', help='Comparar servidor de desarrollo vs. gunicorn')
+    parser.add_argument('--url', default='http://localhost:5000', help='Servidor ya levantado (sin --comparar)')
+    parser.add_argument('--ruta', default='/api/metricas/salud')
+    parser.add_argument('--token', help='JWT para rutas autenticadas')
+    parser.add_argument('--concurrencia', type=int, default=32)
+    parser.add_argument('--duracion', type=float, default=20)
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(args.ruta, args.concurrencia, args.duracion, args.token)
+    else:
+        print(f"\n🔥 {args.url}{args.ruta} - concurrencia {args.concurrencia}, {args.duracion:.0f}s\n")
+        imprimir('Servidor', ejecutar_carga(args.url + args.ruta, args.concurrencia, args.duracion, args.token))
+        print()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Recalcula las horas normales/extras de los marcados de un proyecto
+Encola un recálculo (o reanuda uno existente desde su checkpoint) y lo procesa
+en este proceso mostrando el progreso. Útil para recálculos manuales sin esperar
+al scheduler.
+
+Uso:
+    python scripts/recalcular_horas.py --proyecto-id 12
+    python scripts/recalcular_horas.py --proyecto-id 12 --trabajo-id 40 --pausa 0
+"""
+
+import sys
+import os
+import argparse
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import TrabajoFondo
+from app.services.recalculo_service import RecalculoService, TIPO_RECALCULO, _ahora
+from sqlalchemy import update
+
+
+def mostrar_progreso(trabajo):
+    print(f"  {trabajo.procesados}/{trabajo.total} marcados ({trabajo.progreso:5.1f}%) "
+          f"- {trabajo.actualizados} actualizados - checkpoint {trabajo.checkpoint}")
+
+
+def main(proyecto_id: int, trabajo_id: int = None, tamano_lote: int = None, pausa: float = None):
+    if trabajo_id:
+        trabajo = RecalculoService.obtener(proyecto_id, trabajo_id)
+        if not trabajo:
+            print(f"❌ Recálculo {trabajo_id} no encontrado para el proyecto {proyecto_id}")
+            sys.exit(1)
+        if trabajo.estado in ('completado', 'cancelado'):
+            print(f"⚠️ El recálculo {trabajo_id} está {trabajo.estado}")
+            sys.exit(1)
+    else:
+        trabajo, error = RecalculoService.encolar(proyecto_id)
+        if error:
+            print(f"❌ {error}")
+            sys.exit(1)
+
+    # Tomar el trabajo para este proceso (el scheduler lo ignora mientras avance)
+    db.session.execute(
+        update(TrabajoFondo)
+        .where(TrabajoFondo.id == trabajo.id, TrabajoFondo.tipo == TIPO_RECALCULO)
+        .values(estado='en_proceso', error=None, fecha_inicio=trabajo.fecha_inicio or _ahora())
+    )
+    db.session.commit()
+    db.session.refresh(trabajo)
+
+    print(f"🔄 Recálculo {trabajo.id} del proyecto {proyecto_id} ({trabajo.total} marcados)")
+    trabajo = RecalculoService.procesar(trabajo, tamano_lote, pausa, al_avanzar=mostrar_progreso)
+
+    print(f"\nEstado final: {trabajo.estado}")
+    if trabajo.error:
+        print(f"Error: {trabajo.error}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Recálculo de horas de un proyecto')
+    parser.add_argument('--proyecto-id', type=int, required=True)
+    parser.add_argument('--trabajo-id', type=int, help='Reanudar un recálculo existente desde su checkpoint')
+    parser.add_argument('--tamano-lote', type=int, default=None)
+    parser.add_argument('--pausa', type=float, default=None, help='Segundos entre lotes')
+    args = parser.parse_args()
+
+    app = create_app(crear_tablas=False, registrar_rutas=False)
+    with app.app_context():
+        main(args.proyecto_id, args.trabajo_id, args.tamano_lote, args.pausa)
@@ -0,0 +1,12 @@
+"""
+Punto de entrada WSGI para producción
+Uso: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+
+app = create_app()